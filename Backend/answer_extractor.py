@@ -0,0 +1,141 @@
+# answer_extractor.py
+import re
+
+# How each required field is recognised in an answer: keywords naming it, the kind of
+# quantity it holds and the range of plausible values
+FIELD_HINTS = {
+    'financial.credit_score': (('credit score', 'cibil', 'score'), 'score', 300, 900),
+    'employment.net_monthly_salary': (('salary', 'income', 'earn', 'earning', 'take home', 'paid'), 'amount', 1000, 100000000),
+    'financial.monthly_expenses': (('expense', 'spend', 'spending', 'outgoing'), 'amount', 1000, 100000000),
+    'employment.work_experience': (('experience', 'working', 'worked', 'employed', 'job'), 'years', 0, 60),
+    'loan_request.loan_amount': (('loan amount', 'borrow', 'loan of', 'need'), 'amount', 1000, 10000000000),
+    'loan_request.loan_term': (('term', 'tenure', 'repay', 'repayment', 'pay it back', 'pay back'), 'years', 1, 40),
+    'loan_request.interest_rate': (('interest', 'rate'), 'percent', 0.1, 40),
+    'loan_request.property_value': (('property', 'house', 'flat', 'apartment', 'worth', 'valued'), 'amount', 1000, 10000000000),
+}
+
+# Keywords match whole words, optionally plural, so "rate" does not name the interest rate
+# in "separate" nor "term" the loan term in "determined"
+KEYWORD_PATTERNS = {
+    path: re.compile(r'\b(?:' + '|'.join(map(re.escape, keywords)) + r')s?\b')
+    for path, (keywords, _, _, _) in FIELD_HINTS.items()
+}
+
+MULTIPLIERS = {
+    'k': 1e3, 'thousand': 1e3, 'lakh': 1e5, 'lakhs': 1e5, 'lac': 1e5, 'lacs': 1e5,
+    'crore': 1e7, 'crores': 1e7, 'cr': 1e7, 'm': 1e6, 'million': 1e6, 'mn': 1e6,
+}
+
+UNITS = {
+    '%': 'percent', 'percent': 'percent', 'per cent': 'percent', 'pc': 'percent',
+    'years': 'years', 'year': 'years', 'yrs': 'years', 'yr': 'years',
+    'months': 'months', 'month': 'months',
+}
+
+NUMBER_PATTERN = re.compile(
+    r'(?<![\w.])(\d+(?:,\d+)*(?:\.\d+)?)\s*'
+    r'(k|thousand|lakhs?|lacs?|crores?|cr|million|mn|m)?\b\s*'
+    r'(%|per cent|percent|pc|years?|yrs?|months?)?',
+    re.IGNORECASE
+)
+
+# Answers that negate, hedge or quote yearly money need the model's judgement
+UNCERTAIN_PATTERN = re.compile(
+    r"n't\b|\b(not|no|never|dont|maybe|or|either|between|unsure|guess|annum|annual|annually|yearly|lpa|ctc|a year|per year)\b",
+    re.IGNORECASE
+)
+
+CURRENCY_PATTERN = re.compile(r'(₹|rs\.?|inr|rupees?)', re.IGNORECASE)
+
+# Longer answers carry more than one fact and are left to the model
+MAX_WORDS = 14
+
+
+def parse_quantity(text):
+    """Return (value, unit) for the single number in `text`, or None if there is not exactly one"""
+    matches = list(NUMBER_PATTERN.finditer(text))
+    if len(matches) != 1:
+        return None
+
+    digits, multiplier, unit = matches[0].groups()
+    value = float(digits.replace(',', ''))
+    if multiplier:
+        value *= MULTIPLIERS[multiplier.lower()]
+        unit = unit or 'currency'
+    if unit:
+        unit = UNITS.get(unit.lower(), unit)
+    elif CURRENCY_PATTERN.search(text):
+        unit = 'currency'
+    return value, unit
+
+
+def _compatible(kind, unit):
+    if unit is None:
+        return True
+    if unit == 'currency':
+        return kind == 'amount'
+    if unit == 'months':
+        return kind == 'years'
+    return kind == unit
+
+
+def _convert(kind, value, unit):
+    """The value in the field's unit, or None if it would have to be rounded to fit"""
+    if unit == 'months':
+        value /= 12
+    if kind == 'percent':
+        return value
+    if value != int(value):
+        # 18 months is not a whole number of years; guessing the tenure would change the EMI
+        return None if kind == 'years' else value
+    return int(value)
+
+
+def extract_answer(user_response, applicant_data, required_fields):
+    """Parse a one-number answer locally into the handle_user_response schema.
+
+    `required_fields` maps applicant data paths to field names, as REQUIRED_FIELDS does;
+    paths without hints are never filled locally. Returns None when the answer is not
+    confidently a single value for one field, so the caller falls back to Gemini.
+    """
+    text = user_response.strip().lower()
+    if not text or len(text.split()) > MAX_WORDS or UNCERTAIN_PATTERN.search(text):
+        return None
+
+    quantity = parse_quantity(text)
+    if quantity is None:
+        return None
+    value, unit = quantity
+
+    candidates = []
+    for path in required_fields:
+        if path not in FIELD_HINTS:
+            continue
+        _, kind, low, high = FIELD_HINTS[path]
+        if not _compatible(kind, unit):
+            continue
+        converted = _convert(kind, value, unit)
+        if converted is not None and low <= converted <= high:
+            named = KEYWORD_PATTERNS[path].search(text) is not None
+            candidates.append((path, converted, named))
+
+    # A field named in the answer wins; otherwise the answer must fit exactly one missing field
+    named = [candidate for candidate in candidates if candidate[2]]
+    if not named:
+        missing = {path for path in required_fields if not _field_value(applicant_data, path)}
+        named = [candidate for candidate in candidates if candidate[0] in missing]
+    if len(named) != 1:
+        return None
+
+    path, converted, _ = named[0]
+    category, field = path.split('.')
+    return {
+        "data_updates": {category: {field: converted}},
+        "needs_clarification": False,
+        "clarification_question": ""
+    }
+
+
+def _field_value(applicant_data, path):
+    category, field = path.split('.')
+    return (applicant_data or {}).get(category, {}).get(field)
@@ -0,0 +1,249 @@
+# applicant_schema.py
+import math
+from collections import namedtuple
+
+from answer_extractor import parse_quantity
+from applicant_store import empty_applicant_data, set_path, updates_to_paths
+
+# One applicant field: where it lives in applicant data, the name prompts and messages use
+# for it and how its value is coerced ('int', 'float', 'years' or 'text')
+SchemaField = namedtuple('SchemaField', ['path', 'category', 'key', 'name', 'kind'])
+
+
+def schema_field(path, name=None, kind='int'):
+    category, key = path.split('.')
+    return SchemaField(path, category, key, name or key, kind)
+
+
+# The fields a loan application needs, in the order the assistant asks for them. The
+# conversation, the Gemini prompts and the eligibility rules all read this one list.
+APPLICANT_SCHEMA = (
+    schema_field('financial.credit_score'),
+    schema_field('employment.net_monthly_salary', 'monthly_income'),
+    schema_field('financial.monthly_expenses'),
+    schema_field('employment.work_experience', kind='years'),
+    schema_field('loan_request.loan_amount'),
+    schema_field('loan_request.loan_term', kind='years'),
+    schema_field('loan_request.interest_rate', kind='float'),
+    schema_field('loan_request.property_value'),
+    schema_field('personal_information.date_of_birth', kind='text'),
+    schema_field('personal_information.gender', kind='text'),
+)
+
+FIELD_INDEX = {field.path: index for index, field in enumerate(APPLICANT_SCHEMA)}
+
+# Data path -> prompt name, for every required field
+REQUIRED_FIELDS = {field.path: field.name for field in APPLICANT_SCHEMA}
+
+# Numeric fields the eligibility rules test, by key -> category
+ELIGIBILITY_FIELDS = {field.key: field.category for field in APPLICANT_SCHEMA if field.kind != 'text'}
+
+
+def is_missing(value):
+    return value is None or value == ''
+
+
+def coerce(field, value):
+    """Parse a raw answer into the field's type, or None if it does not hold exactly one usable value.
+
+    Numbers written with separators, currency, multipliers or units ("Rs10,00,000", "9.2%",
+    "24 months") are understood; integer fields truncate like the original int() parsing,
+    except year fields, which reject anything that is not a whole number of years (18 months
+    is not 1 year of tenure).
+    """
+    if is_missing(value):
+        return None
+    if field.kind == 'text':
+        return str(value).strip()
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    else:
+        text = str(value).strip()
+        try:
+            number = float(text.replace(',', ''))
+        except ValueError:
+            quantity = parse_quantity(text.lower())
+            if quantity is None:
+                return None
+            number, unit = quantity
+            if unit == 'months' and field.kind == 'years':
+                number /= 12
+    if not math.isfinite(number):
+        return None
+    if field.kind == 'years' and number != int(number):
+        return None
+    return number if field.kind == 'float' else int(number)
+
+
+def compile_parser(field):
+    """coerce() for one field, with the common already-typed and plain-number cases tried first"""
+    if field.kind == 'text':
+        return lambda value: coerce(field, value)
+
+    if field.kind == 'float':
+        def parse(value):
+            if type(value) in (float, int, str):
+                try:
+                    number = float(value)
+                except ValueError:
+                    return coerce(field, value)
+                # Only finite numbers equal themselves after subtracting themselves
+                if number - number == 0:
+                    return number
+            return coerce(field, value)
+        return parse
+
+    def parse(value):
+        value_type = type(value)
+        if value_type is int:
+            return value
+        if value_type is str:
+            try:
+                return int(value)
+            except ValueError:
+                pass
+        return coerce(field, value)
+    return parse
+
+
+def compile_getter(path):
+    """Accessor for a dotted path, with the path split once instead of on every read"""
+    keys = tuple(path.split('.'))
+    if len(keys) == 2:
+        category, key = keys
+
+        def get(data):
+            details = data.get(category)
+            return details.get(key) if isinstance(details, dict) else None
+        return get
+
+    def get(data):
+        for key in keys:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(key)
+        return data
+    return get
+
+
+def compile_setter(path):
+    keys = tuple(path.split('.'))
+    if len(keys) == 2:
+        category, key = keys
+
+        def set_value(data, value):
+            details = data.get(category)
+            if not isinstance(details, dict):
+                details = data[category] = {}
+            details[key] = value
+        return set_value
+
+    return lambda data, value: set_path(data, path, value)
+
+
+PARSERS = tuple(compile_parser(field) for field in APPLICANT_SCHEMA)
+GETTERS = tuple(compile_getter(field.path) for field in APPLICANT_SCHEMA)
+SETTERS = tuple(compile_setter(field.path) for field in APPLICANT_SCHEMA)
+
+
+def missing_mask(applicant_data):
+    """Bitmask of the schema fields (by position) missing from plain applicant data"""
+    mask = 0
+    for index, get in enumerate(GETTERS):
+        if is_missing(get(applicant_data)):
+            mask |= 1 << index
+    return mask
+
+
+def fields_in_mask(mask):
+    """Schema fields whose bits are set, in schema order"""
+    fields = []
+    while mask:
+        low_bit = mask & -mask
+        fields.append(APPLICANT_SCHEMA[low_bit.bit_length() - 1])
+        mask ^= low_bit
+    return fields
+
+
+def missing_fields(applicant_data):
+    """Missing schema fields for an ApplicantRecord (from its bitmask) or plain applicant data"""
+    if isinstance(applicant_data, ApplicantRecord):
+        return fields_in_mask(applicant_data.missing_mask)
+    return fields_in_mask(missing_mask(applicant_data or {}))
+
+
+class ApplicantRecord:
+    """Applicant data with every schema field's parsed value and a missing-field bitmask.
+
+    `data` is the usual nested dict and is shared, not copied. Writes must go through set()
+    or update(), which re-parse just the written field and flip its bit, so completeness
+    checks never walk the data again.
+    """
+
+    __slots__ = ('data', 'values', 'missing_mask', '_eligibility_data')
+
+    def __init__(self, data=None):
+        self.data = data if data is not None else empty_applicant_data()
+        self.values = [None] * len(APPLICANT_SCHEMA)
+        self.missing_mask = 0
+        self._eligibility_data = None
+        for index in range(len(APPLICANT_SCHEMA)):
+            self._refresh(index)
+
+    def _refresh(self, index):
+        raw = GETTERS[index](self.data)
+        bit = 1 << index
+        if is_missing(raw):
+            self.missing_mask |= bit
+            self.values[index] = None
+        else:
+            self.missing_mask &= ~bit
+            self.values[index] = PARSERS[index](raw)
+        self._eligibility_data = None
+
+    def set(self, path, value):
+        """Set a field by dotted path; paths outside the schema are stored as they are"""
+        index = FIELD_INDEX.get(path)
+        if index is None:
+            set_path(self.data, path, value)
+            return
+        SETTERS[index](self.data, value)
+        self._refresh(index)
+
+    def update(self, updates):
+        """Apply handle_user_response's {category: {field: value}} data_updates"""
+        for path, value in updates_to_paths(updates).items():
+            self.set(path, value)
+
+    def get(self, path):
+        """Parsed value of a schema field, or None if it is missing or unparseable"""
+        return self.values[FIELD_INDEX[path]]
+
+    def is_complete(self):
+        return not self.missing_mask
+
+    def missing_fields(self):
+        return fields_in_mask(self.missing_mask)
+
+    def eligibility_data(self):
+        """Applicant data for the eligibility rules, holding the already parsed numbers.
+
+        Absent fields are left out, as before; empty or unparseable ones keep their raw
+        value so the rules still report them as invalid input.
+        """
+        if self._eligibility_data is None:
+            data = {}
+            for index, field in enumerate(APPLICANT_SCHEMA):
+                if field.kind == 'text':
+                    continue
+                value = self.values[index]
+                if value is None:
+                    details = self.data.get(field.category)
+                    if not isinstance(details, dict) or field.key not in details:
+                        continue
+                    value = details[field.key]
+                data.setdefault(field.category, {})[field.key] = value
+            self._eligibility_data = data
+        return self._eligibility_data
@@ -0,0 +1,289 @@
+# applicant_store.py
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from itertools import groupby
+from operator import itemgetter
+
+# Categories every applicant record starts with
+EMPTY_APPLICANT = ("personal_information", "identification", "employment", "financial", "loan_request")
+
+DEFAULT_APPLICANT_ID = 'default'
+# Applicant ids name files in a JSON store and event logs, so they cannot hold path characters
+APPLICANT_ID = re.compile(r'[A-Za-z0-9_-]{1,64}')
+LEGACY_DATA_FILE = 'applicant_data_structured.json'
+
+
+def is_valid_applicant_id(applicant_id):
+    return isinstance(applicant_id, str) and APPLICANT_ID.fullmatch(applicant_id) is not None
+
+
+def empty_applicant_data():
+    return {category: {} for category in EMPTY_APPLICANT}
+
+
+def flatten_paths(data, prefix=''):
+    """Map dotted paths to leaf values; empty dicts are kept as leaves so categories survive a round trip"""
+    fields = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            fields.update(flatten_paths(value, path + '.'))
+        else:
+            fields[path] = value
+    return fields
+
+
+def set_path(data, path, value):
+    """Set a dotted path in nested dicts, creating (or replacing non-dict) parents as needed"""
+    keys = path.split('.')
+    for key in keys[:-1]:
+        if not isinstance(data.get(key), dict):
+            data[key] = {}
+        data = data[key]
+    data[keys[-1]] = value
+
+
+def unflatten_paths(fields):
+    data = {}
+    # Shorter paths first, so a leaf never overwrites the children of a deeper path
+    for path in sorted(fields, key=lambda path: path.count('.')):
+        set_path(data, path, fields[path])
+    return data
+
+
+def updates_to_paths(updates):
+    """Turn handle_user_response's {category: {field: value}} data_updates into dotted-path upserts"""
+    paths = {}
+    for category, details in (updates or {}).items():
+        if isinstance(details, dict):
+            for key, value in details.items():
+                paths[f"{category}.{key}"] = value
+    return paths
+
+
+class JSONFileApplicantStore:
+    """One JSON file per applicant in a directory, replaced atomically on every write"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, applicant_id):
+        if not is_valid_applicant_id(applicant_id):
+            raise ValueError(f"Invalid applicant id {applicant_id!r}")
+        return os.path.join(self.directory, f"{applicant_id}.json")
+
+    def load(self, applicant_id):
+        try:
+            with open(self._path(applicant_id), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def save(self, applicant_id, data):
+        # Checked before anything is written, so a bad id leaves no temporary file behind
+        path = self._path(applicant_id)
+        # Write a temporary file and rename it over the old one, so readers never see a partial file
+        descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+                json.dump(data, file, indent=2, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def update(self, applicant_id, paths):
+        with self._lock:
+            data = self.load(applicant_id) or empty_applicant_data()
+            for path, value in paths.items():
+                set_path(data, path, value)
+            self.save(applicant_id, data)
+
+    def delete(self, applicant_id):
+        try:
+            os.remove(self._path(applicant_id))
+        except FileNotFoundError:
+            pass
+
+    def applicant_ids(self):
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith('.json'))
+
+    def export_jsonl(self, file):
+        count = 0
+        for applicant_id in self.applicant_ids():
+            file.write(json.dumps({'applicant_id': applicant_id, 'data': self.load(applicant_id)}, ensure_ascii=False) + '\n')
+            count += 1
+        return count
+
+    def import_jsonl(self, file):
+        count = 0
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                self.save(record['applicant_id'], record['data'])
+                count += 1
+        return count
+
+    def close(self):
+        pass
+
+
+class SQLiteApplicantStore:
+    """Applicant records in SQLite (WAL), one row per field keyed by applicant id and dotted path.
+
+    Updates touch only the fields that changed, and every write is a single transaction,
+    so concurrent sessions and processes never see or leave half-written records.
+    """
+
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=busy_timeout)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL loses at most the last transactions on power failure, never consistency
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS applicant_fields ("
+            "applicant_id TEXT, path TEXT, value TEXT, updated REAL, PRIMARY KEY (applicant_id, path)"
+            ") WITHOUT ROWID"
+        )
+
+    def _write(self, statements):
+        """Run (sql, parameters, many) statements in one immediate transaction"""
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, parameters, many in statements:
+                    if many:
+                        self._connection.executemany(sql, parameters)
+                    else:
+                        self._connection.execute(sql, parameters)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def load(self, applicant_id):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path, value FROM applicant_fields WHERE applicant_id = ?", (applicant_id,)
+            ).fetchall()
+        if not rows:
+            return None
+        return unflatten_paths({path: json.loads(value) for path, value in rows})
+
+    def save(self, applicant_id, data):
+        """Replace the whole record"""
+        now = time.time()
+        rows = [(applicant_id, path, json.dumps(value, ensure_ascii=False), now) for path, value in flatten_paths(data).items()]
+        self._write([
+            ("DELETE FROM applicant_fields WHERE applicant_id = ?", (applicant_id,), False),
+            ("INSERT INTO applicant_fields VALUES (?, ?, ?, ?)", rows, True),
+        ])
+
+    def update(self, applicant_id, paths):
+        """Upsert fields by dotted path, as update_applicant_data names them.
+
+        A value replaces anything stored below its path, and a leaf stored at one of its
+        parents (such as an empty category) makes way for it.
+        """
+        now = time.time()
+        statements = []
+        for path, value in paths.items():
+            leaves = flatten_paths(value, path + '.') if isinstance(value, dict) and value else {path: value}
+            keys = path.split('.')
+            parents = ['.'.join(keys[:i]) for i in range(1, len(keys))]
+            if parents:
+                statements.append((
+                    f"DELETE FROM applicant_fields WHERE applicant_id = ? AND path IN ({', '.join('?' * len(parents))})",
+                    (applicant_id, *parents), False
+                ))
+            statements.append((
+                "DELETE FROM applicant_fields WHERE applicant_id = ? AND substr(path, 1, ?) = ?",
+                (applicant_id, len(path) + 1, path + '.'), False
+            ))
+            statements.append((
+                "INSERT INTO applicant_fields VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (applicant_id, path) DO UPDATE SET value = excluded.value, updated = excluded.updated",
+                [(applicant_id, leaf, json.dumps(leaf_value, ensure_ascii=False), now) for leaf, leaf_value in leaves.items()],
+                True
+            ))
+        self._write(statements)
+
+    def delete(self, applicant_id):
+        self._write([("DELETE FROM applicant_fields WHERE applicant_id = ?", (applicant_id,), False)])
+
+    def applicant_ids(self):
+        with self._lock:
+            return [row[0] for row in self._connection.execute("SELECT DISTINCT applicant_id FROM applicant_fields ORDER BY applicant_id")]
+
+    def export_jsonl(self, file):
+        """Write every record as a JSON line {"applicant_id", "data"}, streaming rows in key order"""
+        count = 0
+        with self._lock:
+            cursor = self._connection.execute("SELECT applicant_id, path, value FROM applicant_fields ORDER BY applicant_id")
+            for applicant_id, rows in groupby(cursor, key=itemgetter(0)):
+                data = unflatten_paths({path: json.loads(value) for _, path, value in rows})
+                file.write(json.dumps({'applicant_id': applicant_id, 'data': data}, ensure_ascii=False) + '\n')
+                count += 1
+        return count
+
+    def import_jsonl(self, file, batch_size=1000):
+        """Load exported JSON lines, replacing existing records, `batch_size` records per transaction"""
+        count = 0
+        batch = []
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                batch.append((record['applicant_id'], record['data']))
+            if len(batch) >= batch_size:
+                self._import_batch(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self._import_batch(batch)
+            count += len(batch)
+        return count
+
+    def _import_batch(self, records):
+        now = time.time()
+        rows = [(applicant_id, path, json.dumps(value, ensure_ascii=False), now)
+                for applicant_id, data in records for path, value in flatten_paths(data).items()]
+        self._write([
+            ("DELETE FROM applicant_fields WHERE applicant_id = ?", [(applicant_id,) for applicant_id, _ in records], True),
+            ("INSERT INTO applicant_fields VALUES (?, ?, ?, ?)", rows, True),
+        ])
+
+    def close(self):
+        self._connection.close()
+
+
+def create_applicant_store(path=None):
+    """Applicant store at `path` (or APPLICANT_STORE_PATH): a directory of JSON files if it is one, otherwise SQLite"""
+    path = path or os.getenv("APPLICANT_STORE_PATH", "applicant_data.db")
+    if os.path.isdir(path):
+        return JSONFileApplicantStore(path)
+    return SQLiteApplicantStore(path)
+
+
+def load_or_migrate(store, applicant_id=DEFAULT_APPLICANT_ID, legacy_path=LEGACY_DATA_FILE):
+    """An applicant's record. The default applicant is seeded once from the old single JSON file; others start empty"""
+    data = store.load(applicant_id)
+    if data is not None:
+        return data
+    if applicant_id != DEFAULT_APPLICANT_ID:
+        return empty_applicant_data()
+    try:
+        with open(legacy_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return empty_applicant_data()
+    store.save(applicant_id, data)
+    return data
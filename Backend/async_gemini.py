@@ -0,0 +1,266 @@
+# async_gemini.py
+import asyncio
+import json
+import os
+import random
+from collections import deque
+
+import aiohttp
+import dotenv as load_dotenv
+
+from gemini_integration import ASSESSMENT_PROMPT, STRUCTURED_OUTPUT_CONFIG, SYSTEM_PROMPT, GeminiAI
+
+load_dotenv.load_dotenv()
+
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+# Rate limiting and transient server errors are retried, everything else fails fast
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class GeminiRequestError(Exception):
+    """Raised when a Gemini request fails after all retries"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class AsyncGeminiClient:
+    """asyncio Gemini REST client sharing one pooled HTTP session across all requests"""
+
+    def __init__(self, api_key=None, model='gemini-2.0-flash', base_url=None, max_concurrency=16,
+                 pool_size=64, timeout=30.0, max_retries=3, backoff_base=0.5, backoff_max=8.0, cache=None):
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        if not self.api_key:
+            raise ValueError("GEMINI_API_KEY environment variable not set")
+
+        self.model = model
+        self.base_url = (base_url or os.getenv("GEMINI_API_BASE") or DEFAULT_BASE_URL).rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Optional ResponseCache for prompts whose reply depends only on the prompt
+        self.cache = cache
+
+        # Caps in-flight requests across every caller sharing this client
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def warm_up(self):
+        """Create the pooled HTTP session now; call from inside the event loop"""
+        self._get_session()
+
+    def _get_session(self):
+        # Created on first use so the session binds to the running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    def _backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        try:
+            return max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            return delay
+
+    @staticmethod
+    def _payload(contents, system_instruction=None, generation_config=None):
+        payload = {'contents': contents}
+        if system_instruction:
+            payload['systemInstruction'] = {'parts': [{'text': system_instruction}]}
+        if generation_config:
+            payload['generationConfig'] = generation_config
+        return payload
+
+    async def generate_content(self, contents, system_instruction=None, generation_config=None):
+        """Send one generateContent request, retrying transient failures, and return the JSON reply"""
+        payload = self._payload(contents, system_instruction, generation_config)
+        url = f"{self.base_url}/models/{self.model}:generateContent"
+        session = self._get_session()
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    async with session.post(url, params={'key': self.api_key}, json=payload) as response:
+                        if response.status == 200:
+                            return await response.json()
+                        body = await response.text()
+                        error = GeminiRequestError(f"Gemini returned HTTP {response.status}: {body[:200]}", response.status)
+                        if response.status not in RETRYABLE_STATUSES:
+                            raise error
+                        retry_after = response.headers.get('Retry-After')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = GeminiRequestError(f"Gemini request failed: {e!r}")
+
+            if attempt == self.max_retries:
+                raise error
+            # Back off outside the semaphore so waiting retries don't hold a slot
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+    async def stream_content(self, contents, system_instruction=None, generation_config=None):
+        """Yield streamGenerateContent chunks (JSON, same shape as a full reply) as they arrive.
+
+        Transient failures are retried until the first chunk; a stream that breaks midway raises.
+        """
+        payload = self._payload(contents, system_instruction, generation_config)
+        url = f"{self.base_url}/models/{self.model}:streamGenerateContent"
+        session = self._get_session()
+        # The total timeout would cut long replies off, so only gaps between chunks are bounded
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+
+        started = False
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    async with session.post(url, params={'key': self.api_key, 'alt': 'sse'}, json=payload, timeout=timeout) as response:
+                        if response.status == 200:
+                            async for line in response.content:
+                                if line.startswith(b'data:'):
+                                    started = True
+                                    yield json.loads(line[5:])
+                            return
+                        body = await response.text()
+                        error = GeminiRequestError(f"Gemini returned HTTP {response.status}: {body[:200]}", response.status)
+                        if response.status not in RETRYABLE_STATUSES:
+                            raise error
+                        retry_after = response.headers.get('Retry-After')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = GeminiRequestError(f"Gemini stream failed: {e!r}")
+                if started:
+                    raise error
+
+            if attempt == self.max_retries:
+                raise error
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+    @staticmethod
+    def chunk_text(chunk):
+        """Text of a streamed chunk; the final chunk may carry only usage metadata"""
+        candidates = chunk.get('candidates') or [{}]
+        return ''.join(part.get('text', '') for part in candidates[0].get('content', {}).get('parts', []))
+
+    async def stream_text(self, prompt, system_instruction=None, generation_config=None):
+        """Single-turn request yielding reply text as it is generated"""
+        contents = [{'role': 'user', 'parts': [{'text': prompt}]}]
+        async for chunk in self.stream_content(contents, system_instruction, generation_config):
+            text = self.chunk_text(chunk)
+            if text:
+                yield text
+
+    @staticmethod
+    def response_text(response):
+        """Join the text parts of the first candidate in a generateContent reply"""
+        try:
+            parts = response['candidates'][0]['content']['parts']
+        except (KeyError, IndexError, TypeError):
+            raise GeminiRequestError(f"Gemini returned no candidates: {str(response)[:200]}")
+        return ''.join(part.get('text', '') for part in parts)
+
+    async def generate_text(self, prompt, system_instruction=None, generation_config=None):
+        """Single-turn request returning the reply text"""
+        contents = [{'role': 'user', 'parts': [{'text': prompt}]}]
+        response = await self.generate_content(contents, system_instruction, generation_config)
+        return self.response_text(response)
+
+    async def generate(self, prompt, *, cacheable, generation_config=None):
+        """Single-turn request; callers must state whether the reply may be served from the cache"""
+        if not cacheable or self.cache is None:
+            return await self.generate_text(prompt, generation_config=generation_config)
+
+        # Replies to the same prompt differ by generation config, so it is part of the key
+        cache_model = f"{self.model}|{json.dumps(generation_config, sort_keys=True)}" if generation_config else self.model
+        response_text = self.cache.lookup(cache_model, prompt)
+        if response_text is None:
+            response_text = await self.generate_text(prompt, generation_config=generation_config)
+            self.cache.store(cache_model, prompt, response_text)
+        return response_text
+
+    async def generate_many(self, prompts, system_instruction=None, generation_config=None):
+        """Fan out independent single-turn prompts concurrently, returning replies in order"""
+        return await asyncio.gather(*(self.generate_text(prompt, system_instruction, generation_config) for prompt in prompts))
+
+
+class AsyncGeminiChat:
+    """Multi-turn conversation over a shared AsyncGeminiClient, keeping the last `max_turns` exchanges"""
+
+    def __init__(self, client, system_instruction=None, max_turns=6):
+        self.client = client
+        self.system_instruction = system_instruction
+        # A user message and the model's reply per turn; older turns fall off so prompts stay bounded
+        self.history = deque(maxlen=2 * max_turns)
+        # Turns in one conversation must stay in order even when callers are concurrent
+        self._lock = asyncio.Lock()
+
+    async def send_message(self, text):
+        async with self._lock:
+            message = {'role': 'user', 'parts': [{'text': text}]}
+            response = await self.client.generate_content([*self.history, message], self.system_instruction)
+            reply = self.client.response_text(response)
+            self.history.extend([message, {'role': 'model', 'parts': [{'text': reply}]}])
+            return reply
+
+
+class AsyncGeminiAI:
+    """asyncio counterpart of GeminiAI; many instances can share one AsyncGeminiClient"""
+
+    def __init__(self, client, fast_path=True, structured_output=False):
+        self.client = client
+        self.fast_path = fast_path
+        # Ask for JSON matching USER_RESPONSE_SCHEMA instead of parsing it out of prose
+        self.structured_output = structured_output
+        # The system prompt travels as the request's system instruction instead of a billed first turn
+        self.chat = AsyncGeminiChat(client, SYSTEM_PROMPT)
+        # Context for extraction, which runs outside the chat
+        self.last_question = ""
+
+    async def update_context(self, applicant_data):
+        if not applicant_data:
+            return
+        await self.chat.send_message(GeminiAI.build_context(applicant_data))
+
+    async def get_next_question(self, applicant_data, conversation_history):
+        await self.update_context(applicant_data)
+
+        required_fields = GeminiAI.check_required_fields(applicant_data)
+        if not required_fields:
+            return "All information is complete. I can now proceed with your loan assessment."
+
+        self.last_question = await self.chat.send_message(GeminiAI.build_next_question_prompt(required_fields, conversation_history))
+        return self.last_question
+
+    async def handle_user_response(self, user_response, applicant_data):
+        if self.fast_path:
+            response_data = GeminiAI.extract_locally(user_response, applicant_data)
+            if response_data is not None:
+                return response_data
+
+        prompt = GeminiAI.build_extraction_prompt(user_response, applicant_data, self.last_question)
+        generation_config = STRUCTURED_OUTPUT_CONFIG if self.structured_output else None
+        response_text = await self.client.generate(prompt, cacheable=True, generation_config=generation_config)
+        return GeminiAI.parse_user_response(response_text)
+
+    async def assess_loan_eligibility(self, applicant_data):
+        await self.update_context(applicant_data)
+
+        missing_fields = GeminiAI.check_required_fields(applicant_data)
+        if missing_fields:
+            return f"I still need information about your {', '.join(missing_fields)} before I can assess your loan eligibility."
+
+        return await self.chat.send_message(ASSESSMENT_PROMPT)
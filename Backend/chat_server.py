@@ -0,0 +1,362 @@
+"""Loan assistant chat for many applicants at once, from one asyncio process.
+
+Every session shares one pooled AsyncGeminiClient, one LoanEligibilityEngine and one
+ReportService; what a session keeps of its own is the applicant record, a short window of
+model turns and the last few lines of conversation. Sessions idle for longer than
+`idle_timeout` are dropped. Fields are written through to the applicant store as they are
+answered, so an evicted applicant picks up where they left off, only without the chat window.
+
+    python Backend/chat_server.py --port 5002
+    curl -X POST localhost:5002/api/sessions -d '{"applicant_id": "A00001"}'
+    curl -X POST localhost:5002/api/sessions/A00001/messages -d '{"text": "My salary is 85000"}'
+
+Over a WebSocket at /api/sessions/{id}/ws the opening question, and then the reply to every
+{"text": ...} message, arrive as events: "update" with the fields that changed, one
+"sentence" per sentence as the model produces it, "report" once the application is
+complete, "error" if the model could not be reached, and "done" at the end of each turn.
+POST /api/sessions/{id}/stream sends the same events as Server-Sent Events, for clients that
+cannot hold a WebSocket open; without "text" it streams the opening question.
+
+    curl -N -X POST localhost:5002/api/sessions/A00001/stream -d '{"text": "My salary is 85000"}'
+"""
+import argparse
+import asyncio
+import json
+import resource
+import time
+import uuid
+from collections import OrderedDict, deque
+
+from aiohttp import WSMsgType, web
+
+from applicant_schema import ApplicantRecord
+from applicant_store import is_valid_applicant_id, load_or_migrate, updates_to_paths
+from async_gemini import GeminiRequestError
+from gemini_session import AsyncGeminiSession
+from streaming import async_sse_sentences, format_sse
+
+DEFAULT_MAX_SESSIONS = 50000
+DEFAULT_IDLE_TIMEOUT = 900.0
+# Model turns kept per session, and conversation lines quoted to the model when asking the next question
+MAX_TURNS = 4
+HISTORY_LINES = 6
+
+
+class ChatSession:
+    """One applicant's conversation"""
+
+    __slots__ = ('applicant_id', 'record', 'ai', 'history', 'last_active', 'lock')
+
+    def __init__(self, applicant_id, record, ai):
+        self.applicant_id = applicant_id
+        self.record = record
+        self.ai = ai
+        self.history = deque(maxlen=HISTORY_LINES)
+        self.last_active = time.monotonic()
+        # Turns of one session run in order even if it is open in two tabs
+        self.lock = asyncio.Lock()
+
+
+class ChatServer:
+    """Sessions keyed by applicant id, least recently active first"""
+
+    def __init__(self, client, store, reports, max_sessions=DEFAULT_MAX_SESSIONS,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, max_turns=MAX_TURNS):
+        self.client = client
+        self.store = store
+        self.reports = reports
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_turns = max_turns
+        self.sessions = OrderedDict()
+        self.turns = 0
+        self.evicted = 0
+        self._sweeper = None
+
+    async def session(self, applicant_id):
+        """The applicant's session, restored from the store if it is not in memory"""
+        session = self.sessions.get(applicant_id)
+        if session is None:
+            applicant_data = await asyncio.to_thread(load_or_migrate, self.store, applicant_id)
+            # Another request for the same applicant may have restored it meanwhile
+            session = self.sessions.get(applicant_id)
+            if session is None:
+                session = ChatSession(applicant_id, ApplicantRecord(applicant_data),
+                                      AsyncGeminiSession(self.client, max_turns=self.max_turns))
+                self.sessions[applicant_id] = session
+                while len(self.sessions) > self.max_sessions:
+                    self.sessions.popitem(last=False)
+                    self.evicted += 1
+        self.touch(session)
+        return session
+
+    def touch(self, session):
+        session.last_active = time.monotonic()
+        # A session evicted during a long turn comes back rather than losing its window
+        self.sessions[session.applicant_id] = session
+        self.sessions.move_to_end(session.applicant_id)
+
+    def end(self, applicant_id):
+        return self.sessions.pop(applicant_id, None)
+
+    def evict_idle(self, now=None):
+        """Drop sessions idle for longer than idle_timeout; the oldest are at the front, so this stops at the first active one"""
+        deadline = (now if now is not None else time.monotonic()) - self.idle_timeout
+        evicted = 0
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if session.last_active > deadline or session.lock.locked():
+                break
+            self.sessions.popitem(last=False)
+            evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(max(1.0, self.idle_timeout / 4))
+            self.evict_idle()
+
+    def warm_up(self):
+        """Compile the rule set and set up the model client before the first session arrives"""
+        self.reports.engine.rules
+        self.client.warm_up()
+
+    async def start(self, app=None):
+        self.warm_up()
+        self._sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self, app=None):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        await self.client.close()
+
+    async def _report_event(self, session):
+        # Off the event loop, so building a report never stalls the other sessions
+        _, report = await asyncio.to_thread(self.reports.report, session.applicant_id, session.record.data)
+        return {'type': 'report', 'report': report}
+
+    @staticmethod
+    def _error_event(error):
+        return {'type': 'error', 'message': "The assistant is unavailable right now, please try again.",
+                'detail': str(error), 'status': error.status}
+
+    async def _ask(self, session):
+        """Events for the next question, or for the assessment once nothing is missing"""
+        data = session.record.data
+        if session.record.is_complete():
+            sentences = session.ai.stream_assessment(data)
+        else:
+            sentences = session.ai.stream_next_question(data, "\n".join(session.history))
+        reply = []
+        async for sentence in sentences:
+            reply.append(sentence)
+            yield {'type': 'sentence', 'text': sentence}
+        session.history.append(f"AI: {' '.join(reply)}")
+        if session.record.is_complete():
+            yield await self._report_event(session)
+
+    async def open_events(self, session):
+        """The opening question of a session"""
+        async with session.lock:
+            try:
+                async for event in self._ask(session):
+                    yield event
+            except GeminiRequestError as e:
+                yield self._error_event(e)
+            self.touch(session)
+        yield {'type': 'done', 'complete': session.record.is_complete()}
+
+    async def turn_events(self, session, text):
+        """Events answering one user message"""
+        async with session.lock:
+            session.history.append(f"User: {text}")
+            try:
+                result = await session.ai.handle_user_response(text, session.record.data)
+                paths = updates_to_paths(result.get('data_updates'))
+                if paths:
+                    for path, value in paths.items():
+                        session.record.set(path, value)
+                    await asyncio.to_thread(self.store.update, session.applicant_id, paths)
+                    yield {'type': 'update', 'fields': paths}
+
+                if result.get('needs_clarification') and result.get('clarification_question'):
+                    session.history.append(f"AI: {result['clarification_question']}")
+                    yield {'type': 'sentence', 'text': result['clarification_question']}
+                else:
+                    async for event in self._ask(session):
+                        yield event
+            except GeminiRequestError as e:
+                yield self._error_event(e)
+            self.turns += 1
+            self.touch(session)
+        yield {'type': 'done', 'complete': session.record.is_complete()}
+
+    def stats(self):
+        return {
+            'sessions': len(self.sessions),
+            'turns': self.turns,
+            'evicted': self.evicted,
+            'cpu_seconds': time.process_time(),
+            'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'reports': self.reports.stats()
+        }
+
+
+async def collect(events):
+    """A turn's events folded into one JSON reply"""
+    reply = {'reply': [], 'updates': {}, 'complete': False}
+    async for event in events:
+        if event['type'] == 'sentence':
+            reply['reply'].append(event['text'])
+        elif event['type'] == 'update':
+            reply['updates'].update(event['fields'])
+        elif event['type'] == 'report':
+            reply['report'] = event['report']
+        elif event['type'] == 'error':
+            reply['error'] = event
+        else:
+            reply['complete'] = event['complete']
+    reply['reply'] = ' '.join(reply['reply'])
+    return reply
+
+
+def create_app(server):
+    """aiohttp app serving a ChatServer over HTTP and WebSockets"""
+    routes = web.RouteTableDef()
+
+    def session_id(value):
+        # Session ids double as applicant ids
+        if not is_valid_applicant_id(value):
+            raise web.HTTPBadRequest(text="Session ids are 1 to 64 letters, digits, '-' or '_'")
+        return value
+
+    async def read_json(request):
+        try:
+            body = await request.json() if request.can_read_body else {}
+        except json.JSONDecodeError:
+            raise web.HTTPBadRequest(text="Request body is not JSON")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text="Request body must be a JSON object")
+        return body
+
+    @routes.post('/api/sessions')
+    async def start_session(request):
+        body = await read_json(request)
+        applicant_id = session_id(str(body.get('applicant_id') or uuid.uuid4().hex))
+        session = await server.session(applicant_id)
+        reply = await collect(server.open_events(session))
+        return web.json_response({'session_id': applicant_id, **reply}, status=502 if 'error' in reply else 200)
+
+    @routes.post('/api/sessions/{session_id}/messages')
+    async def send_message(request):
+        body = await read_json(request)
+        text = str(body.get('text', '')).strip()
+        if not text:
+            raise web.HTTPBadRequest(text="Message text is empty")
+        session = await server.session(session_id(request.match_info['session_id']))
+        reply = await collect(server.turn_events(session, text))
+        return web.json_response(reply, status=502 if 'error' in reply else 200)
+
+    @routes.post('/api/sessions/{session_id}/stream')
+    async def stream_message(request):
+        applicant_id = session_id(request.match_info['session_id'])
+        body = await read_json(request)
+        text = str(body.get('text', '')).strip()
+        session = await server.session(applicant_id)
+        events = server.turn_events(session, text) if text else server.open_events(session)
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'})
+        await response.prepare(request)
+        done = {}
+
+        async def sentences():
+            # Sentences go through the SSE framing; updates, reports and errors are written as they arrive
+            async for event in events:
+                if event['type'] == 'sentence':
+                    yield event['text']
+                elif event['type'] == 'done':
+                    done['complete'] = event['complete']
+                else:
+                    await response.write(format_sse(event, event['type']).encode())
+
+        async for frame in async_sse_sentences(sentences(), done):
+            await response.write(frame.encode())
+        await response.write_eof()
+        return response
+
+    @routes.delete('/api/sessions/{session_id}')
+    async def end_session(request):
+        ended = server.end(session_id(request.match_info['session_id'])) is not None
+        return web.json_response({'ended': ended})
+
+    @routes.get('/api/sessions/{session_id}/ws')
+    async def session_socket(request):
+        # Checked before the upgrade, while the client can still be answered with a 400
+        applicant_id = session_id(request.match_info['session_id'])
+        ws = web.WebSocketResponse(heartbeat=30.0)
+        await ws.prepare(request)
+        session = await server.session(applicant_id)
+        async for event in server.open_events(session):
+            await ws.send_json(event)
+
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                continue
+            try:
+                text = str(json.loads(message.data).get('text', '')).strip()
+            except (json.JSONDecodeError, AttributeError):
+                text = message.data.strip()
+            if not text:
+                continue
+            # The session may have been evicted while the socket sat idle
+            session = await server.session(session.applicant_id)
+            async for event in server.turn_events(session, text):
+                await ws.send_json(event)
+        return ws
+
+    @routes.get('/api/chat/stats')
+    async def chat_stats(request):
+        return web.json_response(server.stats())
+
+    app = web.Application()
+    app.add_routes(routes)
+    app.on_startup.append(server.start)
+    app.on_cleanup.append(server.stop)
+    return app
+
+
+def create_chat_server(store=None, max_sessions=DEFAULT_MAX_SESSIONS, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                       max_concurrency=256, pool_size=256):
+    """Chat server over the applicant store, with one Gemini client, rule set and report cache for every session"""
+    from applicant_store import create_applicant_store
+    from async_gemini import AsyncGeminiClient
+    from gemini_integration import create_response_cache
+    from loan_eligibility import LoanEligibilityEngine
+    from report_service import ReportService
+
+    store = store or create_applicant_store()
+    client = AsyncGeminiClient(max_concurrency=max_concurrency, pool_size=pool_size, cache=create_response_cache())
+    reports = ReportService(store, LoanEligibilityEngine())
+    return ChatServer(client, store, reports, max_sessions=max_sessions, idle_timeout=idle_timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve loan assistant chat sessions")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5002)
+    parser.add_argument('--store', help="applicant store path (default APPLICANT_STORE_PATH)")
+    parser.add_argument('--max-sessions', type=int, default=DEFAULT_MAX_SESSIONS)
+    parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT, help="seconds before an idle session is dropped")
+    parser.add_argument('--max-concurrency', type=int, default=256, help="Gemini requests in flight across all sessions")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    from applicant_store import create_applicant_store
+    server = create_chat_server(create_applicant_store(args.store), args.max_sessions, args.idle_timeout,
+                                args.max_concurrency, args.max_concurrency)
+    web.run_app(create_app(server), host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,87 +1,69 @@
 # conversation_manager.py
-from gemini_integration import GeminiAI
+from applicant_schema import REQUIRED_FIELDS, ApplicantRecord
+from applicant_store import DEFAULT_APPLICANT_ID, create_applicant_store, load_or_migrate
+from event_log import open_event_log
+from gemini_session import GeminiSession
+from kyc_documents import ingest_documents
 from loan_eligibility import LoanEligibilityEngine
+from report_service import ReportService
+import asyncio
 import json
-from datetime import datetime
 import dotenv as load_dotenv
 
 load_dotenv.load_dotenv()
 
 
 class DynamicConversationManager:
-    def __init__(self):
-        self.ai = GeminiAI()
+    def __init__(self, applicant_id=DEFAULT_APPLICANT_ID, store=None, event_log=None):
+        self.ai = GeminiSession()
         self.eligibility_engine = LoanEligibilityEngine()
-        self.applicant_data = self.load_applicant_data()
-        self.conversation_history = []
+        self.applicant_id = applicant_id
+        self.store = store or create_applicant_store()
+        # The record keeps parsed values and which fields are missing in step with applicant_data
+        self.record = ApplicantRecord(self.load_applicant_data())
+        self.applicant_data = self.record.data
+        # Durable log of the session; the history itself keeps only the most recent lines
+        self.events = event_log or open_event_log(applicant_id, self.applicant_data)
+        self.conversation_history = self.events.history
         self.required_fields = self.get_required_fields()
+        # Reports and the Gemini assessment are rebuilt only when the applicant data or rules change
+        self.reports = ReportService(self.store, self.eligibility_engine,
+                                     assess=lambda applicant_id, applicant_data: self.ai.assess_loan_eligibility(applicant_data))
 
-    def load_applicant_data(self, file_path='applicant_data_structured.json'):
-        """Load applicant data from JSON file"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return json.load(file)
-        except FileNotFoundError:
-            print(f"File {file_path} not found. Starting with empty data.")
-            return {
-                "personal_information": {},
-                "identification": {},
-                "employment": {},
-                "financial": {},
-                "loan_request": {}
-            }
-
-    def save_applicant_data(self, file_path='applicant_data_structured.json'):
-        """Save updated applicant data to JSON file"""
-        with open(file_path, 'w', encoding='utf-8') as file:
-            json.dump(self.applicant_data, file, indent=2)
+    def warm_up(self):
+        """Set up the Gemini model now rather than on the first question; for servers to call at startup"""
+        self.ai.warm_up()
+
+    def load_applicant_data(self):
+        """Load this applicant's data from the store"""
+        return load_or_migrate(self.store, self.applicant_id)
+
+    def save_applicant_data(self):
+        """Save the whole applicant record to the store in one transaction"""
+        self.store.save(self.applicant_id, self.applicant_data)
 
     def get_required_fields(self):
         """Define the required fields for the conversation"""
-        return [
-            "personal_information.date_of_birth",
-            "personal_information.gender",
-            "employment.net_monthly_salary",
-            "financial.credit_score",
-            "loan_request.loan_amount",
-            "loan_request.loan_term",
-            "loan_request.interest_rate",
-            "loan_request.property_value"
-        ]
+        return list(REQUIRED_FIELDS)
 
     def is_data_complete(self):
         """Check if all required fields are filled"""
-        for field in self.required_fields:
-            keys = field.split('.')
-            data = self.applicant_data
-            for key in keys:
-                data = data.get(key, None)
-                if data is None:
-                    return False
-        return True
+        return self.record.is_complete()
 
     def get_missing_fields(self):
         """Get a list of missing fields"""
-        missing_fields = []
-        for field in self.required_fields:
-            keys = field.split('.')
-            data = self.applicant_data
-            for key in keys:
-                data = data.get(key, None)
-                if data is None:
-                    missing_fields.append(field)
-                    break
-        return missing_fields
+        return [field.path for field in self.record.missing_fields()]
 
     def update_applicant_data(self, field, value):
         """Update applicant data with the provided value"""
-        keys = field.split('.')
-        data = self.applicant_data
-        for key in keys[:-1]:
-            if key not in data:
-                data[key] = {}
-            data = data[key]
-        data[keys[-1]] = value
+        self.record.set(field, value)
+        # Write through, touching only this field
+        self.store.update(self.applicant_id, {field: value})
+        self.events.field_update(field, value)
+
+    def ingest_documents(self, sources, workers=None):
+        """Fill fields from KYC documents (paths, a directory or (name, bytes) uploads); returns one result per document"""
+        return list(ingest_documents(sources, self.update_applicant_data, workers))
 
     def start_conversation(self):
         """Start the dynamic conversation with the applicant (text-based only)"""
@@ -95,15 +77,10 @@ class DynamicConversationManager:
             for field in missing_fields:
                 field_name = field.split('.')[-1].replace('_', ' ').capitalize()
                 user_response = input(f"Please provide your {field_name}: ")
+                # Log the answer before the field update it causes, so replay sees them in order
+                self.events.utterance("User", user_response, field=field)
                 self.update_applicant_data(field, user_response)
 
-                # Save the conversation history
-                self.conversation_history.append({
-                    "field": field,
-                    "user_response": user_response,
-                    "timestamp": datetime.now().isoformat()
-                })
-
                 # Check if data is complete after each response
                 if self.is_data_complete():
                     print("All required information has been collected.")
@@ -111,14 +88,33 @@ class DynamicConversationManager:
 
         # Save the updated applicant data
         self.save_applicant_data()
+        self.events.snapshot()
         print("Conversation completed. Applicant data saved.")
 
     def provide_final_assessment(self):
         """Provide final loan eligibility assessment"""
-        eligibility_result = self.eligibility_engine.check_eligibility(self.applicant_data)
-        gemini_assessment = self.ai.assess_loan_eligibility(self.applicant_data)
+        _, report = self.reports.report(self.applicant_id, self.applicant_data, with_assessment=True)
+
+        # Print the report
+        print(self.format_final_report(report["eligibility_assessment"], report["ai_assessment"]))
 
-        # Prepare final report
+    async def provide_final_assessment_async(self, ai):
+        """Provide final loan eligibility assessment using an AsyncGeminiAI.
+
+        The Gemini assessment and the local eligibility check are independent, so they run concurrently.
+        """
+        eligibility_result, gemini_assessment = await asyncio.gather(
+            asyncio.to_thread(self.eligibility_engine.check_eligibility, self.record),
+            ai.assess_loan_eligibility(self.applicant_data)
+        )
+
+        final_report = self.format_final_report(eligibility_result, gemini_assessment)
+        print(final_report)
+        return final_report
+
+    @staticmethod
+    def format_final_report(eligibility_result, gemini_assessment):
+        """Prepare the final report text"""
         final_report = f"Loan Eligibility Report:\n\n{gemini_assessment}\n"
         
         if eligibility_result["status"] == "APPROVED":
@@ -136,8 +132,7 @@ class DynamicConversationManager:
             for factor in eligibility_result.get("factors", []):
                 final_report += f"\n- {factor}"
 
-        # Print the report
-        print(final_report)
+        return final_report
 
     def save_json_report(self, file_path='loan_report.json'):
         """Save the loan report to a JSON file"""
@@ -154,16 +149,5 @@ class DynamicConversationManager:
 
     def generate_json_report(self):
         """Generate a JSON report with applicant data and eligibility assessment"""
-        eligibility_result = self.eligibility_engine.check_eligibility(self.applicant_data)
-        
-        report = {
-            "applicant_data": self.applicant_data,
-            "eligibility_assessment": {
-                "status": eligibility_result["status"],
-                "factors": eligibility_result.get("factors", []),
-                "recommendations": eligibility_result.get("recommendations", [])
-            },
-            "report_date": datetime.now().strftime("%B %d, %Y, %I:%M %p %Z")
-        }
-        
-        return report
\ No newline at end of file
+        _, report = self.reports.report(self.applicant_id, self.applicant_data)
+        return report
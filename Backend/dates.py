@@ -0,0 +1,15 @@
+# dates.py
+from datetime import datetime
+
+# Day-first dates as Indian documents and bank exports write them
+DATE_FORMATS = ('%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%d/%m/%y', '%d-%m-%y', '%d-%b-%Y', '%d-%b-%y', '%d/%b/%Y')
+
+
+def parse_date(text):
+    """ISO date from the day-first dates Indian documents use, or None"""
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date().isoformat()
+        except ValueError:
+            pass
+    return None
@@ -0,0 +1,206 @@
+# event_log.py
+import copy
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from applicant_store import is_valid_applicant_id, set_path
+
+# Lines of recent conversation kept for prompts, as the voice bot used to slice off the history list
+HISTORY_SIZE = 6
+
+
+class SessionState:
+    """What replaying a session's events rebuilds: applicant data, recent history and position"""
+
+    def __init__(self, applicant_data=None, history=(), seq=0, history_size=HISTORY_SIZE):
+        self.applicant_data = applicant_data if applicant_data is not None else {}
+        self.history = deque(history, maxlen=history_size)
+        self.seq = seq
+        self.events_replayed = 0
+
+    def apply(self, event):
+        kind = event['type']
+        if kind == 'field_update':
+            set_path(self.applicant_data, event['path'], event['value'])
+        elif kind == 'utterance':
+            self.history.append(f"{event['role']}: {event['text']}")
+        elif kind == 'applicant_data':
+            self.applicant_data = copy.deepcopy(event['data'])
+        self.seq = event['seq']
+        self.events_replayed += 1
+
+
+def read_events(events_path, offset=0):
+    """Yield events from `offset` on; a final line torn by a crash mid-write is skipped"""
+    try:
+        file = open(events_path, 'rb')
+    except FileNotFoundError:
+        return
+    with file:
+        file.seek(offset)
+        for line in file:
+            if not line.endswith(b'\n'):
+                break
+            yield json.loads(line)
+
+
+def replay_session(path, history_size=HISTORY_SIZE):
+    """Rebuild a session from its latest snapshot plus the events logged after it"""
+    try:
+        with open(path + '.snapshot.json', 'r', encoding='utf-8') as file:
+            snapshot = json.load(file)
+    except FileNotFoundError:
+        snapshot = {'seq': 0, 'offset': 0, 'applicant_data': {}, 'history': []}
+    state = SessionState(snapshot['applicant_data'], snapshot['history'], snapshot['seq'], history_size)
+    for event in read_events(path + '.events.jsonl', snapshot['offset']):
+        state.apply(event)
+    return state
+
+
+def iter_sessions(directory):
+    """(session_id, events) for every logged session, in name order; events is a generator from the start of the log"""
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.events.jsonl'):
+            session_id = name[:-len('.events.jsonl')]
+            yield session_id, read_events(os.path.join(directory, name))
+
+
+class SessionEventLog:
+    """Append-only JSON-lines log of one session: utterances, field updates, model replies and timings.
+
+    Events are buffered and fsynced in batches, every `flush_every` events or, from a timer
+    thread, `flush_interval` seconds after the first unsynced event, so a session that goes
+    quiet is still on disk a second later. Every `snapshot_every` events the applicant data and recent history are written
+    to a snapshot with the log offset they correspond to, so resuming reads only the events
+    after it. Opening an existing log resumes the session where it stopped.
+    """
+
+    def __init__(self, path, applicant_data=None, flush_every=32, flush_interval=1.0, snapshot_every=200,
+                 history_size=HISTORY_SIZE):
+        self.path = path
+        self.events_path = path + '.events.jsonl'
+        self.snapshot_path = path + '.snapshot.json'
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self._truncate_torn_tail()
+        self.state = replay_session(path, history_size)
+        self.events_since_snapshot = self.state.events_replayed
+        self.pending = 0
+        self.syncs = 0
+        # The flush timer syncs from its own thread, so appends, syncs and snapshots take turns
+        self._lock = threading.RLock()
+        self._timer = None
+        self._file = open(self.events_path, 'ab')
+        if applicant_data is not None and self.state.seq == 0:
+            self.append('applicant_data', data=applicant_data)
+
+    def _truncate_torn_tail(self, block_size=65536):
+        """Cut a last line left half-written by a crash, so new events start on a line of their own"""
+        try:
+            file = open(self.events_path, 'r+b')
+        except FileNotFoundError:
+            return
+        with file:
+            end = file.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - block_size)
+                file.seek(start)
+                block = file.read(position - start)
+                newline = block.rfind(b'\n')
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position < end:
+                file.truncate(position)
+
+    @property
+    def history(self):
+        return self.state.history
+
+    @property
+    def applicant_data(self):
+        return self.state.applicant_data
+
+    def append(self, event_type, **fields):
+        with self._lock:
+            event = {'seq': self.state.seq + 1, 't': round(time.time(), 3), 'type': event_type, **fields}
+            self._file.write(json.dumps(event, separators=(',', ':'), ensure_ascii=False).encode('utf-8') + b'\n')
+            self.state.apply(event)
+            self.pending += 1
+            self.events_since_snapshot += 1
+            if self.pending >= self.flush_every:
+                self.sync()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_due)
+                self._timer.daemon = True
+                self._timer.start()
+            if self.events_since_snapshot >= self.snapshot_every:
+                self.snapshot()
+            return event
+
+    def utterance(self, role, text, **fields):
+        return self.append('utterance', role=role, text=text, **fields)
+
+    def field_update(self, path, value):
+        return self.append('field_update', path=path, value=value)
+
+    def model_reply(self, kind, text, seconds):
+        return self.append('model_reply', kind=kind, text=text, ms=round(seconds * 1000, 1))
+
+    def timing(self, stage, seconds):
+        return self.append('timing', stage=stage, ms=round(seconds * 1000, 1))
+
+    def sync(self):
+        """Make every appended event durable"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self.pending and not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self.syncs += 1
+                self.pending = 0
+
+    def _flush_due(self):
+        with self._lock:
+            self._timer = None
+            self.sync()
+
+    def snapshot(self):
+        with self._lock:
+            self.sync()
+            snapshot = {
+                'seq': self.state.seq,
+                'offset': self._file.tell(),
+                'applicant_data': self.state.applicant_data,
+                'history': list(self.state.history)
+            }
+            temp_path = self.snapshot_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(snapshot, file, ensure_ascii=False)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.snapshot_path)
+            self.events_since_snapshot = 0
+
+    def close(self):
+        with self._lock:
+            self.sync()
+            self._file.close()
+
+
+def open_event_log(session_id, applicant_data=None, directory=None, **options):
+    """Event log for a session under `directory` (or CONVERSATION_LOG_DIR), resumed if it already exists"""
+    # The id becomes a file name, so it must not be able to leave the directory
+    if not is_valid_applicant_id(session_id):
+        raise ValueError(f"Invalid session id {session_id!r}")
+    directory = directory or os.getenv("CONVERSATION_LOG_DIR", "conversation_logs")
+    os.makedirs(directory, exist_ok=True)
+    return SessionEventLog(os.path.join(directory, session_id), applicant_data, **options)
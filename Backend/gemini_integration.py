@@ -1,28 +1,21 @@
 # gemini_integration.py
-import google.generativeai as genai
 import os
+import heapq
 import json
 import re
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
 import dotenv as load_dotenv
+from answer_extractor import extract_answer
+from applicant_schema import APPLICANT_SCHEMA, REQUIRED_FIELDS, missing_fields
 
 load_dotenv.load_dotenv()
 
-class GeminiAI:
-    def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable not set")
-            
-        genai.configure(api_key=api_key)
-        
-        try:
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
-        except Exception as e:
-            print(f"Error initializing Gemini model: {e}")
-            print("Falling back to Gemini 1.5 Pro")
-            self.model = genai.GenerativeModel('gemini-1.5-pro')
-        
-        system_prompt = """
+SYSTEM_PROMPT = """
        You are an AI loan manager at a bank. Your job is to help customers apply for loans by:
 
     Gathering key loan and personal details in a conversational manner.
@@ -33,26 +26,350 @@ class GeminiAI:
 If data is insufficient, ask only for missing details concisely. Keep responses natural, professional, and structured. Provide JSON output when requested.
 
 Required information for loan application:
-- credit_score (financial.credit_score)
-- monthly_income (employment.net_monthly_salary)
-- monthly_expenses (financial.monthly_expenses)
-- work_experience (employment.work_experience)
-- loan_amount (loan_request.loan_amount)
-- loan_term (loan_request.loan_term)
-- interest_rate (loan_request.interest_rate)
-- property_value (loan_request.property_value)
+{required_fields}
 
 If all required information is present, respond with 'all info is complete' and proceed with assessment.
 If any required information is missing, ask only for the missing information.
+        """.format(required_fields="\n".join(f"- {name} ({path})" for path, name in REQUIRED_FIELDS.items()))
+
+# Structured-output request mode: the model replies with JSON matching this schema directly
+USER_RESPONSE_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'data_updates': {
+            'type': 'OBJECT',
+            'properties': {
+                category: {
+                    'type': 'OBJECT',
+                    'properties': {
+                        field.key: {'type': 'STRING' if field.kind == 'text' else 'NUMBER'}
+                        for field in APPLICANT_SCHEMA if field.category == category
+                    }
+                }
+                for category in dict.fromkeys(field.category for field in APPLICANT_SCHEMA)
+            }
+        },
+        'needs_clarification': {'type': 'BOOLEAN'},
+        'clarification_question': {'type': 'STRING'}
+    },
+    'required': ['data_updates', 'needs_clarification']
+}
+
+# Structured output is async-only: the REST AsyncGeminiClient sends this config (AsyncGeminiAI and
+# AsyncGeminiSession with structured_output=True), while the pinned SDK behind GeminiAI and
+# GeminiSession (google-generativeai 0.4.1) has no response_mime_type or response_schema, so the
+# synchronous classes always pull the JSON out of prose with find_json_object.
+STRUCTURED_OUTPUT_CONFIG = {'responseMimeType': 'application/json', 'responseSchema': USER_RESPONSE_SCHEMA}
+
+# Braces and string openings are the only characters the JSON scanner stops at
+JSON_TOKEN = re.compile(r'[{}"]')
+JSON_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+# Decodes in place, so trying a region never copies it out of the reply
+JSON_DECODER = json.JSONDecoder()
+# Each failed decode costs time in the reply's length (the error counts lines up to where it
+# failed), so a reply with more broken candidate objects than this is rejected outright
+MAX_JSON_ATTEMPTS = 100
+
+ASSESSMENT_PROMPT = """
+        Based on the applicant's information provided so far, provide a brief conversational assessment of their loan eligibility status (APPROVED, CONDITIONALLY APPROVED, NEEDS MORE INFORMATION, or REJECTED).
+        
+        Keep your response concise and friendly.
         """
+
+
+def find_json_object(text):
+    """Return the first complete JSON object in `text`, parsed.
+
+    One pass keeps a stack of open braces, skipping over string literals, so braces in prose
+    or inside JSON strings don't matter, and JSON is only decoded where a region closes. If
+    an outermost balanced region is not valid JSON, the balanced regions inside it are tried,
+    earliest first; so are those after a brace that is never closed. At most
+    MAX_JSON_ATTEMPTS regions are decoded, so the time taken is linear in the reply.
+    """
+    opened, closed = [], []
+    attempts = iter(range(MAX_JSON_ATTEMPTS))
+    position = text.find('{')
+    while position != -1:
+        match = JSON_TOKEN.search(text, position)
+        if match is None:
+            break
+        if match.group() == '"':
+            string = JSON_STRING.match(text, match.start())
+            if string is None:
+                break
+            position = string.end()
+            continue
+        position = match.end()
+        if match.group() == '{':
+            opened.append(match.start())
+            continue
+        closed.append((opened.pop(), position))
+        if not opened:
+            value = decode_first_region(text, closed, attempts)
+            if value is not None:
+                return value
+            closed = []
+            position = text.find('{', position)
+    value = decode_first_region(text, closed, attempts)
+    if value is not None:
+        return value
+    raise ValueError("No valid JSON found in Gemini's response.")
+
+
+def decode_first_region(text, regions, attempts):
+    """The first of the nested, balanced (start, end) regions, by start, that is exactly one JSON object.
+
+    JSON is context free, so a region inside one that failed to decode and spanning the
+    point where it failed would fail there too; it is skipped rather than decoded again.
+    Every decode takes one of `attempts`; ValueError is raised once they run out.
+    """
+    # (error position, end) of regions that failed, smallest error first, and the end of
+    # the last region nested too deeply to decode at all
+    failures = []
+    too_deep = -1
+    for start, end in sorted(regions):
+        # Regions start in order, so failures that ended, or failed, before this one starts never matter again
+        while failures and (failures[0][0] <= start or failures[0][1] <= start):
+            heapq.heappop(failures)
+        if start < too_deep or (failures and failures[0][0] < end):
+            continue
+        if next(attempts, None) is None:
+            raise ValueError(f"No valid JSON in the first {MAX_JSON_ATTEMPTS} objects of Gemini's response.")
+        try:
+            value, stop = JSON_DECODER.raw_decode(text, start)
+        except json.JSONDecodeError as e:
+            heapq.heappush(failures, (e.pos, end))
+            continue
+        except RecursionError:
+            too_deep = end
+            continue
+        if stop == end:
+            return value
+    return None
+
+
+def validate_user_response(data):
+    """Check a parsed user response against the data_updates schema, raising ValueError if it does not fit"""
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+
+    updates = data.get('data_updates', {})
+    if not isinstance(updates, dict):
+        raise ValueError("data_updates must be an object")
+    for category, fields in updates.items():
+        if not isinstance(fields, dict):
+            raise ValueError(f"data_updates.{category} must be an object")
+        for field, value in fields.items():
+            if value is not None and not isinstance(value, (str, int, float, bool)):
+                raise ValueError(f"data_updates.{category}.{field} must be a single value")
+
+    if not isinstance(data.get('needs_clarification', False), bool):
+        raise ValueError("needs_clarification must be true or false")
+    if not isinstance(data.get('clarification_question', ''), str):
+        raise ValueError("clarification_question must be a string")
+    return data
+
+
+def create_model():
+    """Configure the Gemini SDK and return the generative model"""
+    # The SDK takes about a second to import, so only code that talks to Gemini pays for it
+    import google.generativeai as genai
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY environment variable not set")
         
-        self.chat = self.model.start_chat(history=[])
-        self.chat.send_message(system_prompt)
+    genai.configure(api_key=api_key)
+    
+    try:
+        return genai.GenerativeModel('gemini-2.0-flash')
+    except Exception as e:
+        print(f"Error initializing Gemini model: {e}")
+        print("Falling back to Gemini 1.5 Pro")
+        return genai.GenerativeModel('gemini-1.5-pro')
+
+
+def normalize_prompt(prompt):
+    """Canonical form of a prompt for cache keys: NFKC text with whitespace runs collapsed"""
+    return ' '.join(unicodedata.normalize('NFKC', prompt).split())
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with a time-to-live"""
+
+    def __init__(self, max_entries=10000, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """On-disk LRU cache with a time-to-live, shared by every process using the same file"""
+
+    def __init__(self, path, max_entries=100000, ttl=86400):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, expires REAL, accessed REAL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT value, expires FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, value, now + self.ttl, now)
+            )
+            excess = self._count() - self.max_entries
+            if excess > 0:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)", (excess,)
+                )
+
+    def _count(self):
+        return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._count()
+
+    def close(self):
+        self._connection.close()
+
+
+class ResponseCache:
+    """Caches model replies for prompts whose output depends on nothing but the prompt text.
+
+    Keys combine the model name with the normalized prompt. Replies to chat messages depend
+    on the conversation history and must never be stored here.
+    """
+
+    def __init__(self, backend=None, log_every=0):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.log_every = log_every
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model_name, prompt):
+        return hashlib.sha256(f"{model_name}\0{normalize_prompt(prompt)}".encode('utf-8')).hexdigest()
+
+    def lookup(self, model_name, prompt):
+        value = self.backend.get(self.key(model_name, prompt))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        if self.log_every and (self.hits + self.misses) % self.log_every == 0:
+            stats = self.stats()
+            print(f"Response cache: {stats['hit_rate']:.1%} hit rate over {stats['lookups']} lookups, {stats['entries']} entries")
+        return value
+
+    def store(self, model_name, prompt, value):
+        self.backend.set(self.key(model_name, prompt), value)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'lookups': lookups,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self.backend)
+        }
+
+
+def create_response_cache(path=None):
+    """Response cache on disk at `path` (or GEMINI_CACHE_PATH) when given, otherwise in memory"""
+    path = path or os.getenv("GEMINI_CACHE_PATH")
+    return ResponseCache(SQLiteCacheBackend(path) if path else MemoryCacheBackend())
+
+
+class GeminiAI:
+    def __init__(self, cache=None, fast_path=True):
+        self._model = None
+        self._chat = None
+        self.cache = cache
+        self.fast_path = fast_path
+        # Context for extraction, which runs outside the chat
+        self.last_question = ""
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = create_model()
+        return self._model
+
+    @property
+    def chat(self):
+        """The chat, primed with the system prompt on first use rather than on construction"""
+        if self._chat is None:
+            chat = self.model.start_chat(history=[])
+            chat.send_message(SYSTEM_PROMPT)
+            self._chat = chat
+        return self._chat
+
+    def warm_up(self):
+        """Configure the model and prime the chat now, so the first question pays no setup"""
+        return self.chat
+
+    def generate(self, prompt, *, cacheable):
+        """Send a stand-alone prompt outside the chat.
+
+        Callers must state whether the reply depends only on the prompt; only those replies
+        are served from and stored in the response cache.
+        """
+        if not cacheable or self.cache is None:
+            return self.model.generate_content(prompt).text
         
-    def update_context(self, applicant_data):
-        if not applicant_data:
-            return
-            
+        response_text = self.cache.lookup(self.model.model_name, prompt)
+        if response_text is None:
+            response_text = self.model.generate_content(prompt).text
+            self.cache.store(self.model.model_name, prompt, response_text)
+        return response_text
+        
+    @staticmethod
+    def build_context(applicant_data):
+        """Summarize the applicant data collected so far for the model"""
         context = "Current applicant information:\n"
         for category, details in applicant_data.items():
             if isinstance(details, dict):
@@ -60,19 +377,17 @@ If any required information is missing, ask only for the missing information.
                 for key, value in details.items():
                     if value:
                         context += f"- {key.replace('_', ' ').title()}: {value}\n"
-        
-        self.chat.send_message(f"[SYSTEM] {context}")
-        
-    def get_next_question(self, applicant_data, conversation_history):
-        self.update_context(applicant_data)
-        
-        # First check if all required information is present
-        required_fields = self.check_required_fields(applicant_data)
-        
-        if not required_fields:
-            return "All information is complete. I can now proceed with your loan assessment."
-        
-        prompt = f"""
+        return f"[SYSTEM] {context}"
+
+    def update_context(self, applicant_data):
+        if not applicant_data:
+            return
+            
+        self.chat.send_message(self.build_context(applicant_data))
+
+    @staticmethod
+    def build_next_question_prompt(required_fields, conversation_history):
+        return f"""
         Based on the applicant information so far, what's the next question I should ask to progress their loan application?
         
         The following information is still missing:
@@ -86,33 +401,29 @@ If any required information is missing, ask only for the missing information.
         Ask only ONE brief and conversational question focused on gathering the missing information.
         """
         
-        response = self.chat.send_message(prompt)
-        return response.text
-    
-    def check_required_fields(self, applicant_data):
-        """Check if all required fields are present in the applicant data."""
-        missing_fields = []
-        
-        required_fields = {
-            'financial.credit_score': 'credit_score',
-            'employment.net_monthly_salary': 'monthly_income',
-            'financial.monthly_expenses': 'monthly_expenses',
-            'employment.work_experience': 'work_experience',
-            'loan_request.loan_amount': 'loan_amount',
-            'loan_request.loan_term': 'loan_term',
-            'loan_request.interest_rate': 'interest_rate',
-            'loan_request.property_value': 'property_value'
-        }
+    def get_next_question(self, applicant_data, conversation_history):
+        self.update_context(applicant_data)
+        
+        # First check if all required information is present
+        required_fields = self.check_required_fields(applicant_data)
+        
+        if not required_fields:
+            return "All information is complete. I can now proceed with your loan assessment."
         
-        for path, field_name in required_fields.items():
-            category, field = path.split('.')
-            if not applicant_data.get(category, {}).get(field, None):
-                missing_fields.append(field_name)
+        prompt = self.build_next_question_prompt(required_fields, conversation_history)
         
-        return missing_fields
+        response = self.chat.send_message(prompt)
+        self.last_question = response.text
+        return response.text
     
-    def handle_user_response(self, user_response, applicant_data):
-        prompt = f"""
+    @staticmethod
+    def check_required_fields(applicant_data):
+        """Check if all required fields are present in the applicant data (a dict or an ApplicantRecord)."""
+        return [field.name for field in missing_fields(applicant_data)]
+
+    @staticmethod
+    def build_user_response_prompt(user_response):
+        return f"""
         The user responded: "{user_response}"
 
         Extract relevant information from this response to update their application data.
@@ -132,22 +443,52 @@ If any required information is missing, ask only for the missing information.
         If clarification is needed or no data is found, adjust accordingly.
         """
 
-        response = self.chat.send_message(prompt)
-        
-        # Robust JSON extraction
-        json_str = self.extract_json(response.text)
-        
+    @staticmethod
+    def extract_locally(user_response, applicant_data):
+        """Answer parsed without Gemini when it is confidently one number for one required field, else None"""
+        return extract_answer(user_response, applicant_data, REQUIRED_FIELDS)
+
+    @classmethod
+    def build_extraction_prompt(cls, user_response, applicant_data, last_question=""):
+        """Stand-alone user response prompt, depending only on the question, the utterance and the missing fields.
+
+        The question the user is answering is part of the prompt, so a bare "yes" or "5" is read
+        against it and only shares a cached reply with the same answer to the same question.
+        """
+        missing_fields = cls.check_required_fields(applicant_data)
+        return f"""{SYSTEM_PROMPT}
+        The following information is still missing:
+        {', '.join(missing_fields) or 'nothing'}
+
+        The last question asked was: "{last_question or '(none)'}"
+        {cls.build_user_response_prompt(user_response)}"""
+
+    @classmethod
+    def parse_user_response(cls, response_text):
+        """Parse the model's reply to a user response prompt, asking to rephrase if it is not JSON"""
         try:
-            data = json.loads(json_str)
-            return data
+            return validate_user_response(find_json_object(response_text))
         except Exception as e:
             print(f"JSON parsing error: {e}")
-            print(f"Gemini raw response: {response.text}")
+            print(f"Gemini raw response: {response_text}")
             return {
                 "data_updates": {},
                 "needs_clarification": True,
                 "clarification_question": "I'm sorry, I had trouble understanding your last response clearly. Could you please rephrase?"
             }
+    
+    def handle_user_response(self, user_response, applicant_data):
+        if self.fast_path:
+            response_data = self.extract_locally(user_response, applicant_data)
+            if response_data is not None:
+                return response_data
+
+        # Extraction runs outside the chat so identical answers to the same question share a reply.
+        # The SDK cannot request structured output, so the JSON is found in the prose reply
+        prompt = self.build_extraction_prompt(user_response, applicant_data, self.last_question)
+
+        response_text = self.generate(prompt, cacheable=True)
+        return self.parse_user_response(response_text)
 
     def assess_loan_eligibility(self, applicant_data):
         self.update_context(applicant_data)
@@ -157,35 +498,10 @@ If any required information is missing, ask only for the missing information.
         if missing_fields:
             return f"I still need information about your {', '.join(missing_fields)} before I can assess your loan eligibility."
         
-        prompt = """
-        Based on the applicant's information provided so far, provide a brief conversational assessment of their loan eligibility status (APPROVED, CONDITIONALLY APPROVED, NEEDS MORE INFORMATION, or REJECTED).
-        
-        Keep your response concise and friendly.
-        """
-        
-        response = self.chat.send_message(prompt)
+        response = self.chat.send_message(ASSESSMENT_PROMPT)
         return response.text
     
     @staticmethod
     def extract_json(text):
-        # Remove markdown code block formatting if present
-        json_match = re.search(r'```json\s+(.*?)\s+```', text, re.DOTALL | re.IGNORECASE)
-        
-        if json_match:
-            json_str = json_match.group(1).strip()
-            return json_str
-        
-        # Try plain code block
-        json_match_plain = re.search(r'```\s+(.*?)\s+```', text, re.DOTALL)
-        if json_match_plain:
-            json_str = json_match_plain.group(1).strip()
-            return json_str
-        
-        # Fallback: Try extracting first valid JSON object directly
-        json_match_simple = re.search(r'\{.*\}', text, re.DOTALL)
-        
-        if json_match_simple:
-            return json_match_simple.group(0).strip()
-        
-        # If no JSON found at all
-        raise ValueError("No valid JSON found in Gemini's response.")
\ No newline at end of file
+        """Return the first complete JSON object in the reply as a string"""
+        return json.dumps(find_json_object(text))
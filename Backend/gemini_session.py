@@ -0,0 +1,330 @@
+# gemini_session.py
+from collections import OrderedDict, deque
+
+from gemini_integration import ASSESSMENT_PROMPT, STRUCTURED_OUTPUT_CONFIG, SYSTEM_PROMPT, GeminiAI, create_model
+from streaming import async_split_sentences, split_sentences
+
+# Reply used to close the emulated system turn for SDK models without system instructions
+SYSTEM_ACKNOWLEDGEMENT = "Understood."
+
+
+def flatten_applicant_data(applicant_data):
+    """Map 'category.field' to value for every non-empty field, as build_context reports them"""
+    fields = {}
+    for category, details in (applicant_data or {}).items():
+        if isinstance(details, dict):
+            for key, value in details.items():
+                if value:
+                    fields[f"{category}.{key}"] = value
+    return fields
+
+
+def estimate_tokens(text):
+    """Rough prompt size when the API does not report usage (about 4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def describe_fields(fields):
+    lines = []
+    for path, value in fields.items():
+        category, key = path.split('.', 1)
+        label = f"{category.replace('_', ' ').title()} {key.replace('_', ' ').title()}"
+        lines.append(f"- {label}: {'(removed)' if value is None else value}")
+    return "\n".join(lines)
+
+
+class ConversationWindow:
+    """Bounded conversation state for one applicant.
+
+    Keeps the last `max_turns` exchanges and tells the model only which applicant fields
+    changed since the previous turn. Fields announced in turns that have slid out of the
+    window are folded into a baseline that rides along with the system prompt.
+    """
+
+    def __init__(self, system_prompt=SYSTEM_PROMPT, max_turns=6):
+        self.system_prompt = system_prompt
+        self.max_turns = max_turns
+        self.turns = deque()
+        self.sent_fields = {}
+        self.baseline = {}
+        self.prompt_tokens = []
+
+    def applicant_diff(self, applicant_data):
+        """Fields added or changed since the last recorded turn, with None marking removals"""
+        current = flatten_applicant_data(applicant_data)
+        diff = {path: value for path, value in current.items() if self.sent_fields.get(path) != value}
+        diff.update({path: None for path in self.sent_fields if path not in current})
+        return diff
+
+    def system_text(self):
+        if not self.baseline:
+            return self.system_prompt
+        return f"{self.system_prompt}\nApplicant information from earlier in the conversation:\n{describe_fields(self.baseline)}"
+
+    def build_message(self, prompt, applicant_data=None):
+        """Prefix the prompt with the applicant data diff; returns (message_text, diff)"""
+        diff = self.applicant_diff(applicant_data) if applicant_data is not None else {}
+        if not diff:
+            return prompt, diff
+        return f"[SYSTEM] Updated applicant information:\n{describe_fields(diff)}\n\n{prompt}", diff
+
+    def contents(self, message_text):
+        """Windowed history plus the new user message, in generateContent format"""
+        contents = []
+        for user_text, model_text, _ in self.turns:
+            contents.append({'role': 'user', 'parts': [{'text': user_text}]})
+            contents.append({'role': 'model', 'parts': [{'text': model_text}]})
+        contents.append({'role': 'user', 'parts': [{'text': message_text}]})
+        return contents
+
+    def record(self, message_text, reply, diff, prompt_tokens):
+        """Commit a completed turn; failed turns are never recorded, so their diff is resent"""
+        self._apply(self.sent_fields, diff)
+        self.turns.append((message_text, reply, diff))
+        if len(self.turns) > self.max_turns:
+            _, _, evicted_diff = self.turns.popleft()
+            self._apply(self.baseline, evicted_diff)
+        self.prompt_tokens.append(prompt_tokens)
+
+    def last_reply(self):
+        """The model's most recent reply, which the user's next message answers"""
+        return self.turns[-1][1] if self.turns else ""
+
+    @staticmethod
+    def _apply(fields, diff):
+        for path, value in diff.items():
+            if value is None:
+                fields.pop(path, None)
+            else:
+                fields[path] = value
+
+    def token_stats(self):
+        return {
+            'turns': len(self.prompt_tokens),
+            'prompt_tokens_per_turn': list(self.prompt_tokens),
+            'total_prompt_tokens': sum(self.prompt_tokens)
+        }
+
+
+class GeminiSession:
+    """One applicant's conversation with Gemini; a drop-in replacement for GeminiAI.
+
+    Creating a session makes no API call, and every request carries only the static
+    system prompt, a bounded window of turns and the applicant data that changed.
+    """
+
+    def __init__(self, model=None, max_turns=6, cache=None, fast_path=True):
+        self._model = model
+        self.cache = cache
+        self.fast_path = fast_path
+        self.window = ConversationWindow(max_turns=max_turns)
+
+    @property
+    def model(self):
+        # Created on first request, so building a session imports nothing
+        if self._model is None:
+            self._model = create_model()
+        return self._model
+
+    def warm_up(self):
+        return self.model
+
+    def _request(self, prompt, applicant_data):
+        message_text, diff = self.window.build_message(prompt, applicant_data)
+        # The SDK model has no system instruction, so the system prompt opens every request
+        contents = [
+            {'role': 'user', 'parts': [{'text': self.window.system_text()}]},
+            {'role': 'model', 'parts': [{'text': SYSTEM_ACKNOWLEDGEMENT}]}
+        ] + self.window.contents(message_text)
+        return message_text, diff, contents
+
+    @staticmethod
+    def _prompt_tokens(response, contents):
+        usage = getattr(response, 'usage_metadata', None)
+        return getattr(usage, 'prompt_token_count', 0) or sum(estimate_tokens(part['text']) for content in contents for part in content['parts'])
+
+    def send_message(self, prompt, applicant_data=None):
+        message_text, diff, contents = self._request(prompt, applicant_data)
+
+        response = self.model.generate_content(contents)
+
+        self.window.record(message_text, response.text, diff, self._prompt_tokens(response, contents))
+        return response.text
+
+    def stream_message(self, prompt, applicant_data=None):
+        """Like send_message, but yields reply text as it is generated; the turn is recorded once complete"""
+        message_text, diff, contents = self._request(prompt, applicant_data)
+
+        response = self.model.generate_content(contents, stream=True)
+        reply = []
+        for chunk in response:
+            reply.append(chunk.text)
+            yield chunk.text
+
+        self.window.record(message_text, ''.join(reply), diff, self._prompt_tokens(response, contents))
+
+    generate = GeminiAI.generate
+    check_required_fields = staticmethod(GeminiAI.check_required_fields)
+
+    def get_next_question(self, applicant_data, conversation_history=""):
+        required_fields = self.check_required_fields(applicant_data)
+        if not required_fields:
+            return "All information is complete. I can now proceed with your loan assessment."
+        return self.send_message(GeminiAI.build_next_question_prompt(required_fields, conversation_history), applicant_data)
+
+    def stream_next_question(self, applicant_data, conversation_history=""):
+        """get_next_question as a generator of sentences, available before the reply is complete"""
+        required_fields = self.check_required_fields(applicant_data)
+        if not required_fields:
+            return iter(["All information is complete. I can now proceed with your loan assessment."])
+        return split_sentences(self.stream_message(GeminiAI.build_next_question_prompt(required_fields, conversation_history), applicant_data))
+
+    def handle_user_response(self, user_response, applicant_data):
+        if self.fast_path:
+            response_data = GeminiAI.extract_locally(user_response, applicant_data)
+            if response_data is not None:
+                return response_data
+
+        # Extraction runs outside the window, so identical answers to the same question can be served from the cache.
+        # Structured output needs AsyncGeminiSession; the SDK reply is prose with the JSON inside
+        prompt = GeminiAI.build_extraction_prompt(user_response, applicant_data, self.window.last_reply())
+        response_text = self.generate(prompt, cacheable=True)
+        return GeminiAI.parse_user_response(response_text)
+
+    def assess_loan_eligibility(self, applicant_data):
+        missing_fields = self.check_required_fields(applicant_data)
+        if missing_fields:
+            return f"I still need information about your {', '.join(missing_fields)} before I can assess your loan eligibility."
+        return self.send_message(ASSESSMENT_PROMPT, applicant_data)
+
+    def stream_assessment(self, applicant_data):
+        """assess_loan_eligibility as a generator of sentences"""
+        missing_fields = self.check_required_fields(applicant_data)
+        if missing_fields:
+            return iter([f"I still need information about your {', '.join(missing_fields)} before I can assess your loan eligibility."])
+        return split_sentences(self.stream_message(ASSESSMENT_PROMPT, applicant_data))
+
+    def token_stats(self):
+        return self.window.token_stats()
+
+
+class AsyncGeminiSession:
+    """asyncio GeminiSession over a shared AsyncGeminiClient, using its system instruction field"""
+
+    def __init__(self, client, max_turns=6, fast_path=True, structured_output=False):
+        self.client = client
+        self.fast_path = fast_path
+        # Ask for JSON matching USER_RESPONSE_SCHEMA instead of parsing it out of prose
+        self.structured_output = structured_output
+        self.window = ConversationWindow(max_turns=max_turns)
+
+    @staticmethod
+    def _prompt_tokens(response, system_text, contents):
+        return response.get('usageMetadata', {}).get('promptTokenCount') or \
+            estimate_tokens(system_text) + sum(estimate_tokens(part['text']) for content in contents for part in content['parts'])
+
+    async def send_message(self, prompt, applicant_data=None):
+        message_text, diff = self.window.build_message(prompt, applicant_data)
+        system_text = self.window.system_text()
+        contents = self.window.contents(message_text)
+
+        response = await self.client.generate_content(contents, system_instruction=system_text)
+        reply = self.client.response_text(response)
+
+        self.window.record(message_text, reply, diff, self._prompt_tokens(response, system_text, contents))
+        return reply
+
+    async def stream_message(self, prompt, applicant_data=None):
+        """Like send_message, but yields reply text as it is generated; the turn is recorded once complete"""
+        message_text, diff = self.window.build_message(prompt, applicant_data)
+        system_text = self.window.system_text()
+        contents = self.window.contents(message_text)
+
+        reply = []
+        last_chunk = {}
+        async for chunk in self.client.stream_content(contents, system_instruction=system_text):
+            last_chunk = chunk
+            text = self.client.chunk_text(chunk)
+            if text:
+                reply.append(text)
+                yield text
+
+        self.window.record(message_text, ''.join(reply), diff, self._prompt_tokens(last_chunk, system_text, contents))
+
+    check_required_fields = staticmethod(GeminiAI.check_required_fields)
+
+    async def get_next_question(self, applicant_data, conversation_history=""):
+        required_fields = self.check_required_fields(applicant_data)
+        if not required_fields:
+            return "All information is complete. I can now proceed with your loan assessment."
+        return await self.send_message(GeminiAI.build_next_question_prompt(required_fields, conversation_history), applicant_data)
+
+    async def stream_next_question(self, applicant_data, conversation_history=""):
+        """get_next_question as an async generator of sentences"""
+        required_fields = self.check_required_fields(applicant_data)
+        if not required_fields:
+            yield "All information is complete. I can now proceed with your loan assessment."
+            return
+        prompt = GeminiAI.build_next_question_prompt(required_fields, conversation_history)
+        async for sentence in async_split_sentences(self.stream_message(prompt, applicant_data)):
+            yield sentence
+
+    async def handle_user_response(self, user_response, applicant_data):
+        if self.fast_path:
+            response_data = GeminiAI.extract_locally(user_response, applicant_data)
+            if response_data is not None:
+                return response_data
+
+        prompt = GeminiAI.build_extraction_prompt(user_response, applicant_data, self.window.last_reply())
+        generation_config = STRUCTURED_OUTPUT_CONFIG if self.structured_output else None
+        response_text = await self.client.generate(prompt, cacheable=True, generation_config=generation_config)
+        return GeminiAI.parse_user_response(response_text)
+
+    async def assess_loan_eligibility(self, applicant_data):
+        missing_fields = self.check_required_fields(applicant_data)
+        if missing_fields:
+            return f"I still need information about your {', '.join(missing_fields)} before I can assess your loan eligibility."
+        return await self.send_message(ASSESSMENT_PROMPT, applicant_data)
+
+    async def stream_assessment(self, applicant_data):
+        """assess_loan_eligibility as an async generator of sentences"""
+        missing_fields = self.check_required_fields(applicant_data)
+        if missing_fields:
+            yield f"I still need information about your {', '.join(missing_fields)} before I can assess your loan eligibility."
+            return
+        async for sentence in async_split_sentences(self.stream_message(ASSESSMENT_PROMPT, applicant_data)):
+            yield sentence
+
+    def token_stats(self):
+        return self.window.token_stats()
+
+
+class GeminiSessionManager:
+    """Creates one session per applicant from a shared model or client, evicting the least recently used"""
+
+    def __init__(self, factory=None, max_sessions=1000, cache=None):
+        self._model = None
+        self.cache = cache
+        self.factory = factory or self._default_factory
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+
+    def _default_factory(self):
+        # One SDK model is configured once and shared by every session
+        if self._model is None:
+            self._model = create_model()
+        return GeminiSession(self._model, cache=self.cache)
+
+    def get(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.factory()
+            self.sessions[session_id] = session
+            if len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        else:
+            self.sessions.move_to_end(session_id)
+        return session
+
+    def end(self, session_id):
+        return self.sessions.pop(session_id, None)
@@ -0,0 +1,422 @@
+"""KYC document ingestion: PAN, Aadhaar, salary slips, bank statements and car invoices.
+
+PDF pages are rendered with PyMuPDF (pages with a text layer skip OCR entirely) and OCR runs
+in a process pool where each worker loads the easyocr model once. Recognized words are
+grouped into lines, the document type is recognized from its text, and document-specific
+fields come out as {category: {field: value}} data updates, the same shape
+handle_user_response produces, so they go through the usual update_applicant_data paths.
+
+    python Backend/kyc_documents.py "Dummy Docs" --applicant-id default
+    python Backend/kyc_documents.py statement.pdf --dry-run --workers 4
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+
+from answer_extractor import FIELD_HINTS
+from applicant_schema import APPLICANT_SCHEMA, FIELD_INDEX, compile_parser
+from applicant_store import updates_to_paths
+from dates import parse_date
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.webp', '.tif', '.tiff'}
+PDF_EXTENSIONS = {'.pdf'}
+
+# Scanned PDF pages are rendered at this resolution; photos are downscaled to this longest side
+RENDER_DPI = 200
+MAX_OCR_SIDE = 2000
+
+# Words read with less confidence than this never become applicant fields
+MIN_CONFIDENCE = 0.4
+
+# Per-process state, set once by init_worker
+worker_reader = None
+
+
+def init_worker(languages=('en',), gpu=False):
+    global worker_reader
+    import cv2
+    import easyocr
+    import torch
+    # One core per worker; the pool provides the parallelism
+    torch.set_num_threads(1)
+    cv2.setNumThreads(1)
+    worker_reader = easyocr.Reader(list(languages), gpu=gpu, verbose=False)
+
+
+def render_page(task):
+    """Image of one page, or the words of its text layer when it has one"""
+    import cv2
+    import numpy as np
+    _, source, page_number, data = task
+    if page_number is not None:
+        import fitz
+        document = fitz.open(stream=data, filetype='pdf') if data is not None else fitz.open(source)
+        try:
+            page = document[page_number]
+            words = page.get_text('words')
+            if words:
+                return None, [((x0 + x1) / 2, (y0 + y1) / 2, y1 - y0, text, 1.0) for x0, y0, x1, y1, text, *_ in words]
+            pixmap = page.get_pixmap(dpi=RENDER_DPI, colorspace=fitz.csRGB)
+            image = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.width, pixmap.n)
+        finally:
+            document.close()
+    elif data is not None:
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    else:
+        image = cv2.imread(source)
+    if image is None:
+        raise ValueError("Could not decode image")
+    scale = min(1.0, MAX_OCR_SIDE / max(image.shape[:2]))
+    if scale < 1.0:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return image, None
+
+
+def group_lines(words):
+    """Group (x, y, height, text, confidence) words into lines, top to bottom, each sorted left to right"""
+    lines = []
+    for word in sorted(words, key=lambda word: word[1]):
+        line = lines[-1] if lines else None
+        if line is not None and abs(word[1] - line['y']) < 0.5 * max(word[2], line['height']):
+            line['words'].append(word)
+        else:
+            lines.append({'y': word[1], 'height': word[2], 'words': [word]})
+    return [[(x, text, confidence) for x, _, _, text, confidence in sorted(line['words'])] for line in lines]
+
+
+def ocr_page(task):
+    """Worker task for one page: its lines of (x, text, confidence) words"""
+    document, source, page_number, _ = task
+    start = time.perf_counter()
+    try:
+        image, words = render_page(task)
+    except Exception as e:
+        return {'document': document, 'source': source, 'page': page_number, 'error': str(e)}
+    if words is None:
+        words = []
+        for box, text, confidence in worker_reader.readtext(image):
+            xs = [point[0] for point in box]
+            ys = [point[1] for point in box]
+            words.append(((min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2, max(ys) - min(ys), text, float(confidence)))
+    return {'document': document, 'source': source, 'page': page_number, 'lines': group_lines(words),
+            'seconds': time.perf_counter() - start}
+
+
+def page_tasks(sources):
+    """One task per page: (document index, source name, PDF page number or None, upload bytes or None).
+
+    Sources are a directory, a file, or a list of paths and (name, bytes) uploads. Pages are
+    grouped into documents by index, since two uploads may share a name.
+    """
+    if isinstance(sources, str):
+        if os.path.isdir(sources):
+            sources = sorted(os.path.join(sources, name) for name in os.listdir(sources)
+                             if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS | PDF_EXTENSIONS)
+        else:
+            sources = [sources]
+    tasks = []
+    for document, item in enumerate(sources):
+        name, data = item if isinstance(item, tuple) else (item, None)
+        if os.path.splitext(name)[1].lower() in PDF_EXTENSIONS:
+            import fitz
+            pdf = fitz.open(stream=data, filetype='pdf') if data is not None else fitz.open(name)
+            tasks.extend((document, name, page_number, data) for page_number in range(pdf.page_count))
+            pdf.close()
+        else:
+            tasks.append((document, name, None, data))
+    return tasks
+
+
+def ocr_pages(tasks, workers=None, languages=('en',), gpu=False):
+    """Yield page results in task order"""
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(languages, gpu)) as pool:
+        chunksize = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+        yield from pool.map(ocr_page, tasks, chunksize=chunksize)
+
+
+# --- Parsing ---
+
+PAN_PATTERN = re.compile(r'\b([A-Z]{5}[0-9]{4}[A-Z])\b')
+AADHAAR_PATTERN = re.compile(r'\b(\d{4})\s?(\d{4})\s?(\d{4})\b')
+DATE_PATTERN = re.compile(r'\b(\d{1,2}[/.-](?:\d{1,2}|[A-Za-z]{3})[/.-]\d{2,4})\b')
+AMOUNT_PATTERN = re.compile(r'\d[\d,]*(?:\.\d{1,2})?')
+GENDER_PATTERN = re.compile(r'\b(MALE|FEMALE|TRANSGENDER)\b', re.IGNORECASE)
+ACCOUNT_PATTERN = re.compile(r'\b(?:a/?c|account)\s*(?:no\.?|number)?\s*[:.]?\s*(\d{9,18})\b', re.IGNORECASE)
+
+# Checked in order: PAN cards also say "Govt. of India"
+DOCUMENT_KEYWORDS = (
+    ('pan', ('INCOME TAX DEPARTMENT', 'PERMANENT ACCOUNT NUMBER')),
+    ('aadhaar', ('AADHAAR', 'AADHAR', 'UIDAI', 'GOVERNMENT OF INDIA')),
+    ('salary_slip', ('SALARY SLIP', 'PAYSLIP', 'PAY SLIP', 'NET SALARY', 'NET PAY')),
+    ('bank_statement', ('STATEMENT OF ACCOUNT', 'ACCOUNT STATEMENT', 'BANK STATEMENT', 'WITHDRAWAL')),
+    ('invoice', ('INVOICE',)),
+)
+
+
+def classify(text):
+    upper = text.upper()
+    for document_type, keywords in DOCUMENT_KEYWORDS:
+        if any(keyword in upper for keyword in keywords):
+            return document_type
+    return 'unknown'
+
+
+def parse_amount(text):
+    """Rupee amount in a field value, or None.
+
+    OCR often reads the rupee sign as a 7 or 2 glued to the amount ("₹75,000" as "775,000");
+    such a leading digit is dropped when the amount only has Indian digit grouping without it.
+    """
+    match = AMOUNT_PATTERN.search(text.replace(' ', ''))
+    if match is None:
+        return None
+    number = match.group().rstrip(',')
+    whole = number.split('.')[0]
+    groups = whole.split(',')
+    if (len(groups) > 1 and len(groups[0]) == 3 and groups[0][0] in '72' and groups[0][1] != '0'
+            and all(len(group) == 2 for group in groups[1:-1])):
+        number = number[1:]
+    try:
+        value = float(number.replace(',', ''))
+    except ValueError:
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def key_values(lines):
+    """'Label: value' lines as {normalized label: (value, confidence)}"""
+    pairs = {}
+    for line in lines:
+        text = " ".join(word for _, word, _ in line)
+        if ':' not in text:
+            continue
+        label, value = text.split(':', 1)
+        label = re.sub(r'[^a-z ]', '', label.lower()).strip()
+        if label and value.strip():
+            pairs[label] = (value.strip(), min(confidence for _, _, confidence in line))
+    return pairs
+
+
+def field_value(path):
+    """Value parser for a schema field: OCR noise that does not read as one plausible value
+    for the field ("S years", a lost decimal point in "8,75%") becomes None"""
+    parse = compile_parser(APPLICANT_SCHEMA[FIELD_INDEX[path]])
+    _, _, low, high = FIELD_HINTS[path]
+
+    def parse_field(text):
+        value = parse(text)
+        return value if value is not None and low <= value <= high else None
+    return parse_field
+
+
+# (label prefix, field path, value parser) for 'Label: value' documents
+LABEL_FIELDS = {
+    'pan': (
+        ('fathers name', 'personal_information.father_name', str),
+        ('name', 'personal_information.name', str),
+        ('dob', 'personal_information.date_of_birth', parse_date),
+        ('date of birth', 'personal_information.date_of_birth', parse_date),
+    ),
+    'aadhaar': (
+        ('name', 'personal_information.name', str),
+        ('dob', 'personal_information.date_of_birth', parse_date),
+        ('date of birth', 'personal_information.date_of_birth', parse_date),
+    ),
+    'salary_slip': (
+        ('net salary', 'employment.net_monthly_salary', parse_amount),
+        ('net pay', 'employment.net_monthly_salary', parse_amount),
+        ('basic', 'employment.basic_salary', parse_amount),
+        ('house rent allowance', 'employment.hra', parse_amount),
+        ('hra', 'employment.hra', parse_amount),
+        ('provident fund', 'employment.pf_contribution', parse_amount),
+        ('company name', 'employment.employer_name', str),
+        ('employee id', 'employment.employee_id', str),
+        ('designation', 'employment.job_title', str),
+    ),
+    'invoice': (
+        ('loan amount', 'loan_request.loan_amount', field_value('loan_request.loan_amount')),
+        ('loan term', 'loan_request.loan_term', field_value('loan_request.loan_term')),
+        ('interest rate', 'loan_request.interest_rate', field_value('loan_request.interest_rate')),
+        ('down payment', 'loan_request.down_payment', parse_amount),
+        ('model', 'loan_request.car_model', str),
+        ('exshowroom price', 'loan_request.ex_showroom_price', parse_amount),
+        ('total onroad price', 'loan_request.on_road_price', parse_amount),
+        ('dealer name', 'loan_request.dealer_name', str),
+        ('dealer contact', 'loan_request.dealer_contact', str),
+    ),
+}
+
+
+def parse_labels(document_type, lines):
+    fields = {}
+    for label, (value, confidence) in key_values(lines).items():
+        if confidence < MIN_CONFIDENCE:
+            continue
+        for prefix, path, parse in LABEL_FIELDS.get(document_type, ()):
+            if label.startswith(prefix) and path not in fields:
+                parsed = parse(value)
+                if parsed is not None:
+                    fields[path] = parsed
+                break
+    return fields
+
+
+def statement_transactions(lines):
+    """(date, description, debit, credit) rows of a bank statement's transaction table.
+
+    Amount columns are found from the header row ("Debit"/"Withdrawal", "Credit"/"Deposit"),
+    and each amount goes to the column whose header is nearest to it.
+    """
+    columns = {}
+    transactions = []
+    for line in lines:
+        words = [word.lower() for _, word, _ in line]
+        if not columns:
+            for (x, _, _), word in zip(line, words):
+                if word.startswith(('debit', 'withdrawal', 'dr')):
+                    columns['debit'] = x
+                elif word.startswith(('credit', 'deposit', 'cr')):
+                    columns['credit'] = x
+                elif word.startswith('balance'):
+                    columns['balance'] = x
+            if 'debit' not in columns:
+                columns = {}
+            continue
+        date = parse_date(line[0][1]) if line and DATE_PATTERN.fullmatch(line[0][1]) else None
+        if date is None:
+            continue
+        description = []
+        amounts = {'debit': 0.0, 'credit': 0.0}
+        for x, word, _ in line[1:]:
+            amount = parse_amount(word) if AMOUNT_PATTERN.fullmatch(word.replace(' ', '')) else None
+            if amount is None:
+                description.append(word)
+                continue
+            column = min(columns, key=lambda name: abs(columns[name] - x))
+            if column in amounts:
+                amounts[column] += amount
+        transactions.append((date, " ".join(description), amounts['debit'], amounts['credit']))
+    return transactions
+
+
+def parse_statement(lines):
+    fields = {}
+    text = "\n".join(" ".join(word for _, word, _ in line) for line in lines)
+    account = ACCOUNT_PATTERN.search(text)
+    if account:
+        fields['financial.account_number'] = account.group(1)
+    transactions = statement_transactions(lines)
+    if transactions:
+        from statement_analytics import StatementAnalytics, transaction_chunks
+        analytics = StatementAnalytics()
+        analytics.ingest(transaction_chunks(transactions))
+        fields.update(updates_to_paths(analytics.data_updates()))
+        fields['financial.recent_transactions'] = [
+            {'date': date, 'description': description, 'debit': debit, 'credit': credit}
+            for date, description, debit, credit in transactions[-10:]
+        ]
+    return fields
+
+
+def parse_document(document_type, lines):
+    """Applicant fields, by dotted path, found in one document's lines"""
+    confident = [line for line in lines if min(confidence for _, _, confidence in line) >= MIN_CONFIDENCE]
+    text = "\n".join(" ".join(word for _, word, _ in line) for line in confident)
+    fields = parse_labels(document_type, lines)
+    if document_type == 'pan':
+        pan = PAN_PATTERN.search(text)
+        if pan:
+            fields['identification.pan_number'] = pan.group(1)
+    elif document_type == 'aadhaar':
+        aadhaar = AADHAAR_PATTERN.search(text)
+        if aadhaar:
+            fields['identification.aadhaar_number'] = "-".join(aadhaar.groups())
+        gender = GENDER_PATTERN.search(text)
+        if gender:
+            fields['personal_information.gender'] = gender.group(1).capitalize()
+    elif document_type == 'bank_statement':
+        fields.update(parse_statement(confident))
+    if 'personal_information.date_of_birth' not in fields and document_type in ('pan', 'aadhaar'):
+        date = DATE_PATTERN.search(text)
+        if date and parse_date(date.group(1)):
+            fields['personal_information.date_of_birth'] = parse_date(date.group(1))
+    return fields
+
+
+def to_updates(fields):
+    """Dotted-path fields as handle_user_response's {category: {field: value}} data_updates"""
+    updates = {}
+    for path, value in fields.items():
+        category, key = path.split('.', 1)
+        updates.setdefault(category, {})[key] = value
+    return updates
+
+
+def read_documents(sources, workers=None, languages=('en',), gpu=False):
+    """Yield one result per document, in input order, with its type and data updates"""
+    pages = ocr_pages(page_tasks(sources), workers, languages, gpu)
+    for _, document_pages in groupby(pages, key=lambda page: page['document']):
+        document_pages = list(document_pages)
+        source = document_pages[0]['source']
+        errors = [page['error'] for page in document_pages if 'error' in page]
+        if errors:
+            yield {'source': source, 'error': errors[0]}
+            continue
+        lines = [line for page in document_pages for line in page['lines']]
+        document_type = classify("\n".join(" ".join(word for _, word, _ in line) for line in lines))
+        yield {
+            'source': source,
+            'document_type': document_type,
+            'pages': len(document_pages),
+            'data_updates': to_updates(parse_document(document_type, lines)),
+            'ocr_seconds': round(sum(page['seconds'] for page in document_pages), 3)
+        }
+
+
+def ingest_documents(sources, update_applicant_data, workers=None):
+    """Read documents and hand each one's fields to `update_applicant_data(field, value)`; yields the results"""
+    for document in read_documents(sources, workers):
+        for path, value in updates_to_paths(document.get('data_updates')).items():
+            update_applicant_data(path, value)
+        yield document
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract applicant fields from KYC documents")
+    parser.add_argument('source', help="document directory, image or PDF")
+    parser.add_argument('--applicant-id', default=None, help="write the fields to this applicant's record")
+    parser.add_argument('--dry-run', action='store_true', help="only print what was found")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.dry_run:
+        documents = read_documents(args.source, args.workers)
+    else:
+        from applicant_store import DEFAULT_APPLICANT_ID, create_applicant_store
+        from event_log import open_event_log
+        applicant_id = args.applicant_id or DEFAULT_APPLICANT_ID
+        store = create_applicant_store()
+        events = open_event_log(applicant_id, store.load(applicant_id))
+
+        def update_applicant_data(field, value):
+            store.update(applicant_id, {field: value})
+            events.field_update(field, value)
+
+        documents = ingest_documents(args.source, update_applicant_data, args.workers)
+    try:
+        for document in documents:
+            sys.stdout.write(json.dumps(document) + '\n')
+            sys.stdout.flush()
+    finally:
+        if not args.dry_run:
+            events.close()
+            store.close()
+
+
+if __name__ == '__main__':
+    main()
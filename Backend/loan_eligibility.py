@@ -1,95 +1,408 @@
 # loan_eligibility.py
+import functools
+import math
+import os
+
+import numpy as np
+
+from applicant_schema import APPLICANT_SCHEMA, ELIGIBILITY_FIELDS, PARSERS, ApplicantRecord
+from rule_engine import INVALID_INPUT, OPERATORS, STATUS_LABELS, Field, Metric, RuleSetLoader, status_code
+
+# Rule set used when neither a path nor LOAN_RULES_PATH is given
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules', 'loan_rules.json')
+
+INVALID_INPUT_FACTOR = "Missing or invalid financial information"
+
+# Columns accepted by check_eligibility_batch and where they live in applicant data
+BATCH_FIELDS = ELIGIBILITY_FIELDS
+
+
+class BatchEligibilityResult:
+    """Status codes and rule failure bitmasks for a batch of applicants"""
+
+    def __init__(self, status_codes, failure_masks, values, rule_set):
+        self.status_codes = status_codes
+        self.failure_masks = failure_masks
+        self.values = values
+        self.rule_set = rule_set
+
+    def __len__(self):
+        return len(self.status_codes)
+
+    def statuses(self):
+        """Status labels for every applicant in the batch"""
+        return np.asarray(STATUS_LABELS, dtype=object)[self.status_codes]
+
+    def failed(self, rule_id):
+        """Boolean array of applicants failing the rule with this id, or with unparseable input for INVALID_INPUT"""
+        return (self.failure_masks & self.rule_set.bit(rule_id)) != 0
+
+    def _describe(self, index):
+        mask = int(self.failure_masks[index])
+        if mask & self.rule_set.invalid_bit:
+            return [INVALID_INPUT_FACTOR], []
+        return self.rule_set.describe(mask, lambda name: self.rule_set.fields[name].parse(self.values[name][index]))
+
+    def factors(self, index):
+        """Build the factor text for one applicant"""
+        return self._describe(index)[0]
+
+    def recommendations(self, index):
+        """Build the recommendation text for one applicant"""
+        return self._describe(index)[1]
+
+    def to_result(self, index):
+        """Expand one applicant into the same dict check_eligibility returns"""
+        factors, recommendations = self._describe(index)
+        return {
+            'status': STATUS_LABELS[self.status_codes[index]],
+            'factors': factors,
+            'recommendations': recommendations
+        }
+
+
+def annuity_factor(interest_rate, tenure_years):
+    """EMI per unit of principal for an annual interest rate (percent) and tenure in years"""
+    monthly_interest_rate = interest_rate / (12 * 100)
+    tenure_months = tenure_years * 12
+    if monthly_interest_rate == 0:
+        # Zero-interest loans repay the principal in equal instalments
+        return 1 / tenure_months
+    growth = (1 + monthly_interest_rate) ** tenure_months
+    return monthly_interest_rate * growth / (growth - 1)
+
+
 class LoanEligibilityEngine:
-    def __init__(self):
-        # Define loan eligibility criteria
-        self.criteria = {
-            'minimum_credit_score': 700,
-            'minimum_income': 50000,  # Monthly income in INR
-            'maximum_dti_ratio': 0.5,  # Debt-to-Income ratio
-            'minimum_employment_years': 2,
-            'loan_to_value_ratio': 0.8  # For secured loans
+    def __init__(self, rules_path=None, emi_cache_size=1024):
+        # Products come from a small catalog, so annuity factors are cached per (rate, tenure)
+        self.annuity_factor = functools.lru_cache(maxsize=emi_cache_size)(annuity_factor)
+
+        # Eligibility criteria and rules come from a declarative rule set that is
+        # reloaded whenever its file changes
+        rules_path = rules_path or os.getenv('LOAN_RULES_PATH') or DEFAULT_RULES_PATH
+        self.rule_loader = RuleSetLoader(rules_path, self.fields(), self.metrics())
+
+    @property
+    def rules(self):
+        """The current compiled rule set"""
+        return self.rule_loader.get()
+
+    @property
+    def criteria(self):
+        return self.rules.criteria
+
+    @staticmethod
+    def fields():
+        """Applicant fields rules can test directly, coerced as the applicant schema defines them"""
+        fields = {}
+        for field, parse in zip(APPLICANT_SCHEMA, PARSERS):
+            if field.key in BATCH_FIELDS:
+                fields[field.key] = Field(field.category, float if field.kind == 'float' else int, parse)
+        return fields
+
+    def metrics(self):
+        """Values derived from applicant fields, with their relative evaluation cost"""
+        return {
+            'dti_ratio': Metric(1, ('net_monthly_salary', 'monthly_expenses'), self.calculate_dti_ratio, self.calculate_dti_ratio_batch),
+            'ltv_ratio': Metric(1, ('loan_amount', 'property_value'), self.calculate_ltv_ratio, self.calculate_ltv_ratio_batch),
+            'emi': Metric(5, ('loan_amount', 'interest_rate', 'loan_term'), self.calculate_emi, self.calculate_emi_batch)
         }
-    
+
     def calculate_dti_ratio(self, monthly_income, monthly_expenses):
         """Calculate Debt-to-Income ratio"""
         if monthly_income <= 0:
             return 1.0  # Maximum ratio if income is zero or negative
         return monthly_expenses / monthly_income
-    
+
+    def calculate_ltv_ratio(self, loan_amount, property_value):
+        """Calculate Loan-to-Value ratio for secured loans"""
+        if property_value <= 0:
+            return 1.0
+        return loan_amount / property_value
+
     def calculate_emi(self, loan_amount, interest_rate, tenure_years):
         """Calculate EMI for the loan"""
+        if tenure_years <= 0:
+            # A zero-length term cannot be financed at any EMI
+            return math.inf if loan_amount > 0 else 0.0
+        return loan_amount * self.annuity_factor(interest_rate, tenure_years)
+
+    def emi_cache_stats(self):
+        """Hit/miss counters for the annuity factor cache"""
+        info = self.annuity_factor.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'max_size': info.maxsize,
+            'hit_rate': info.hits / lookups if lookups else 0.0
+        }
+
+    def amortization_schedule(self, loan_amount, interest_rate, tenure_years):
+        """Yield the monthly amortization schedule one row at a time.
+
+        A tenure that is not a whole number of months is rounded to one, and the EMI is that
+        of the rounded tenure, so every instalment including the last is the same.
+        """
+        tenure_months = int(round(tenure_years * 12))
+        if tenure_months <= 0:
+            return
+        emi = self.calculate_emi(loan_amount, interest_rate, tenure_months / 12)
         monthly_interest_rate = interest_rate / (12 * 100)
-        tenure_months = tenure_years * 12
-        emi = loan_amount * monthly_interest_rate * ((1 + monthly_interest_rate) ** tenure_months) / (((1 + monthly_interest_rate) ** tenure_months) - 1)
-        return emi
-    
+        balance = float(loan_amount)
+
+        for month in range(1, tenure_months + 1):
+            interest = balance * monthly_interest_rate
+            # The final instalment clears whatever rounding has left on the balance
+            principal = balance if month == tenure_months else emi - interest
+            balance -= principal
+            yield {
+                'month': month,
+                'payment': principal + interest,
+                'principal': principal,
+                'interest': interest,
+                'balance': max(balance, 0.0)
+            }
+
     def check_eligibility(self, applicant_data):
-        """Check loan eligibility based on applicant data"""
-        results = {
-            'status': None,
-            'factors': [],
-            'recommendations': []
-        }
-        
-        # Extract relevant data
+        """Check loan eligibility based on applicant data (a dict or an ApplicantRecord)"""
+        # A record's values are parsed already; plain data is parsed by the rule set as it reads it
+        if isinstance(applicant_data, ApplicantRecord):
+            applicant_data = applicant_data.eligibility_data()
         try:
-            credit_score = int(applicant_data.get('financial', {}).get('credit_score', 0))
-            monthly_income = int(applicant_data.get('employment', {}).get('net_monthly_salary', 0))
-            monthly_expenses = int(applicant_data.get('financial', {}).get('monthly_expenses', 0))
-            work_experience = int(applicant_data.get('employment', {}).get('work_experience', 0))
-            loan_amount = int(applicant_data.get('loan_request', {}).get('loan_amount', 0))
-            loan_term = int(applicant_data.get('loan_request', {}).get('loan_term', 0))
-            interest_rate = float(applicant_data.get('loan_request', {}).get('interest_rate', 0))
-            property_value = int(applicant_data.get('loan_request', {}).get('property_value', 0))
+            _, failures, factors, recommendations = self.rules.explain(applicant_data)
         except (ValueError, TypeError):
             # Handle conversion errors
-            results['status'] = "REJECTED"
-            results['factors'].append("Missing or invalid financial information")
-            return results
-        
-        # Calculate DTI ratio
-        dti_ratio = self.calculate_dti_ratio(monthly_income, monthly_expenses)
-        
-        # Calculate EMI for the requested loan
-        emi = self.calculate_emi(loan_amount, interest_rate, loan_term)
-        
-        # Calculate Loan-to-Value ratio for secured loans
-        ltv_ratio = loan_amount / property_value if property_value > 0 else 1.0
-        
-        # Check against criteria
-        if credit_score < self.criteria['minimum_credit_score']:
-            results['factors'].append(f"Credit score ({credit_score}) below minimum requirement ({self.criteria['minimum_credit_score']})")
-            results['recommendations'].append("Work on improving your credit score")
-        
-        if monthly_income < self.criteria['minimum_income']:
-            results['factors'].append(f"Monthly income below minimum requirement")
-            results['recommendations'].append("Consider applying for a smaller loan amount")
-        
-        if dti_ratio > self.criteria['maximum_dti_ratio']:
-            results['factors'].append(f"Debt-to-income ratio too high")
-            results['recommendations'].append("Reduce your monthly expenses or debt obligations")
-        
-        if work_experience < self.criteria['minimum_employment_years']:
-            results['factors'].append(f"Work experience below minimum requirement")
-            results['recommendations'].append("Consider providing additional employment stability proof")
-        
-        if ltv_ratio > self.criteria['loan_to_value_ratio']:
-            results['factors'].append(f"Loan amount too high relative to property value")
-            results['recommendations'].append("Consider a smaller loan amount or providing additional collateral")
-        
-        # Check if EMI is affordable (less than 50% of income)
-        if emi > (monthly_income * 0.5):
-            results['factors'].append(f"EMI would be too high relative to income")
-            results['recommendations'].append("Consider a longer loan term or smaller loan amount")
-        
-        # Determine overall status
-        if not results['factors']:
-            results['status'] = "APPROVED"
-        elif len(results['factors']) <= 1:
-            results['status'] = "CONDITIONALLY_APPROVED"
-        elif len(results['factors']) <= 2:
-            results['status'] = "REJECTED_WITH_CONDITIONS"
+            return {
+                'status': "REJECTED",
+                'factors': [INVALID_INPUT_FACTOR],
+                'recommendations': []
+            }
+
+        return {
+            'status': STATUS_LABELS[status_code(failures)],
+            'factors': factors,
+            'recommendations': recommendations
+        }
+
+    def check_status(self, applicant_data):
+        """Return only the status label, stopping as soon as REJECTED is certain"""
+        if isinstance(applicant_data, ApplicantRecord):
+            applicant_data = applicant_data.eligibility_data()
+        try:
+            _, failures = self.rules.evaluate(applicant_data, stop_at_rejection=True)
+        except (ValueError, TypeError):
+            return "REJECTED"
+        return STATUS_LABELS[status_code(failures)]
+
+    @staticmethod
+    def columns_from_applicants(applicants):
+        """Convert a list of applicant data dicts or ApplicantRecords into float columns for check_eligibility_batch"""
+        fields = [(field, parse) for field, parse in zip(APPLICANT_SCHEMA, PARSERS) if field.key in BATCH_FIELDS]
+        columns = {field.key: np.empty(len(applicants), dtype=np.float64) for field, _ in fields}
+        for i, applicant_data in enumerate(applicants):
+            if isinstance(applicant_data, ApplicantRecord):
+                applicant_data = applicant_data.eligibility_data()
+            for field, parse in fields:
+                value = parse(applicant_data.get(field.category, {}).get(field.key, 0))
+                columns[field.key][i] = np.nan if value is None else value
+        return columns
+
+    def check_eligibility_batch(self, columns):
+        """Check loan eligibility for many applicants in one vectorized pass.
+
+        `columns` is a structured/record array or a mapping of column name to array,
+        with the names in BATCH_FIELDS. Missing or non-finite values reject the applicant
+        the same way check_eligibility does for unparseable input.
+        """
+        values = self._batch_values(columns)
+        rule_set = self.rules
+        with np.errstate(invalid='ignore'):
+            failure_masks, failures = rule_set.evaluate_batch(values)
+
+        # Invalid input overrides the individual rules, like the early return in check_eligibility
+        invalid = self._invalid_rows(values)
+        failure_masks[invalid] = rule_set.invalid_bit
+
+        status_codes = np.minimum(failures, len(STATUS_LABELS) - 1).astype(np.int8)
+        status_codes[invalid] = STATUS_LABELS.index("REJECTED")
+
+        return BatchEligibilityResult(status_codes, failure_masks, values, rule_set)
+
+    @staticmethod
+    def _batch_values(columns):
+        """Read batch columns as float arrays, truncated like check_eligibility's int() parsing"""
+        values = {}
+        for name in BATCH_FIELDS:
+            column = np.asarray(columns[name], dtype=np.float64)
+            values[name] = column if name == 'interest_rate' else np.trunc(column)
+        return values
+
+    @staticmethod
+    def _invalid_rows(values):
+        return ~np.logical_and.reduce([np.isfinite(column) for column in values.values()])
+
+    def _loan_slope(self, metric, values):
+        """Per-unit-principal slope of a metric that is linear in loan_amount, or None if it is independent"""
+        if metric == 'loan_amount':
+            return np.ones_like(values['loan_amount'])
+        if metric == 'ltv_ratio':
+            # Without a property value the ratio is a constant 1.0, marked here with NaN
+            with np.errstate(divide='ignore'):
+                return np.where(values['property_value'] > 0, 1 / values['property_value'], np.nan)
+        if metric == 'emi':
+            return self.calculate_emi_batch(1.0, values['interest_rate'], values['loan_term'])
+        return None
+
+    def _rule_limit(self, rule, values):
+        if rule['relative_to'] in ('loan_amount', 'loan_term'):
+            raise ValueError(f"Rule {rule['id']!r} cannot be solved relative to {rule['relative_to']!r}")
+        if rule['relative_to']:
+            return rule['threshold'] * values[rule['relative_to']]
+        return np.full(len(values['loan_amount']), rule['threshold'])
+
+    def _failing_rules(self, rule_set, values, bits):
+        with np.errstate(invalid='ignore'):
+            masks, _ = rule_set.evaluate_batch(values)
+        return (masks & bits) != 0
+
+    def _solve_max_loan(self, rule_set, values):
+        size = len(values['loan_amount'])
+        lower = np.zeros(size)
+        upper = np.full(size, np.inf)
+        dependent_bits = 0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for rule in rule_set.rules:
+                slope = self._loan_slope(rule['metric'], values)
+                if slope is None:
+                    continue
+                dependent_bits |= rule['bit']
+                limit = self._rule_limit(rule, values)
+                bound = limit / slope
+                op = rule['op']
+                # Rules that fail above their limit cap the loan, the others set a floor
+                if op in ('>', '>='):
+                    upper = np.fmin(upper, np.floor(bound) if op == '>' else np.ceil(bound) - 1)
+                else:
+                    lower = np.fmax(lower, np.ceil(bound) if op == '<' else np.floor(bound) + 1)
+                # Metrics that do not vary with the loan either always pass or rule it out
+                constant_failure = np.isnan(slope) & OPERATORS[op](1.0, limit)
+                upper[constant_failure] = -np.inf
+
+        max_loan = np.where(upper >= lower, upper, np.nan)
+
+        # Floating point rounding in the inversion can leave the bound one unit too high
+        finite = np.isfinite(max_loan)
+        for _ in range(2):
+            failing = finite & self._failing_rules(rule_set, dict(values, loan_amount=np.where(finite, max_loan, 0)), dependent_bits)
+            if not failing.any():
+                break
+            max_loan[failing] -= 1
+        else:
+            max_loan[failing] = np.nan
+        max_loan[max_loan < lower] = np.nan
+        return max_loan
+
+    def _solve_min_term(self, rule_set, values):
+        size = len(values['loan_amount'])
+        lower = np.ones(size)
+        upper = np.full(size, np.inf)
+        dependent_bits = 0
+        loan_amount = values['loan_amount']
+        monthly_interest_rate = values['interest_rate'] / (12 * 100)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for rule in rule_set.rules:
+                op = rule['op']
+                if rule['metric'] == 'loan_term':
+                    dependent_bits |= rule['bit']
+                    threshold = rule['threshold']
+                    if op in ('>', '>='):
+                        upper = np.minimum(upper, np.floor(threshold) if op == '>' else np.ceil(threshold) - 1)
+                    else:
+                        lower = np.maximum(lower, np.ceil(threshold) if op == '<' else np.floor(threshold) + 1)
+                elif rule['metric'] == 'emi' and op in ('>', '>='):
+                    dependent_bits |= rule['bit']
+                    # EMI per unit of principal must not exceed k; solve (1 + r)^n >= k / (k - r)
+                    k = self._rule_limit(rule, values) / loan_amount
+                    months = np.where(
+                        monthly_interest_rate > 0,
+                        np.log(k / (k - monthly_interest_rate)) / np.log1p(monthly_interest_rate),
+                        1 / k
+                    )
+                    # The EMI can never fall to the interest on the principal itself
+                    months = np.where(k > monthly_interest_rate, months, np.inf)
+                    months = np.where(loan_amount > 0, months, 0)
+                    lower = np.maximum(lower, np.ceil(months / 12))
+
+        min_term = np.where((lower <= upper) & np.isfinite(lower), lower, np.nan)
+
+        # Bump terms that rounding left just short of passing
+        finite = np.isfinite(min_term)
+        for _ in range(2):
+            failing = finite & self._failing_rules(rule_set, dict(values, loan_term=np.where(finite, min_term, 1)), dependent_bits)
+            if not failing.any():
+                break
+            min_term[failing] += 1
         else:
-            results['status'] = "REJECTED"
-        
-        return results
+            min_term[failing] = np.nan
+        min_term[min_term > upper] = np.nan
+        return min_term
+
+    def solve_affordability_batch(self, columns):
+        """Find the largest approvable loan amount and shortest passing loan term for many applicants.
+
+        Only the rules that depend on the loan amount (or term) are inverted; the others are
+        unaffected by either. The amount is solved at each applicant's requested term, and the
+        term at the requested amount. Returns arrays, with NaN where no amount or term passes.
+        """
+        values = self._batch_values(columns)
+        rule_set = self.rules
+        max_loan_amount = self._solve_max_loan(rule_set, values)
+        min_loan_term = self._solve_min_term(rule_set, values)
+
+        invalid = self._invalid_rows(values)
+        max_loan_amount[invalid] = np.nan
+        min_loan_term[invalid] = np.nan
+        return {
+            'max_loan_amount': max_loan_amount,
+            'min_loan_term': min_loan_term
+        }
+
+    def solve_affordability(self, applicant_data):
+        """Largest approvable loan amount and shortest passing loan term for one applicant"""
+        solution = self.solve_affordability_batch(self.columns_from_applicants([applicant_data]))
+        max_loan_amount = solution['max_loan_amount'][0]
+        min_loan_term = solution['min_loan_term'][0]
+        return {
+            'max_loan_amount': None if np.isnan(max_loan_amount) else (int(max_loan_amount) if np.isfinite(max_loan_amount) else math.inf),
+            'min_loan_term': None if not np.isfinite(min_loan_term) else int(min_loan_term)
+        }
+
+    @staticmethod
+    def calculate_dti_ratio_batch(monthly_income, monthly_expenses):
+        """Calculate Debt-to-Income ratios for arrays of applicants"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(monthly_income > 0, monthly_expenses / monthly_income, 1.0)
+
+    @staticmethod
+    def calculate_ltv_ratio_batch(loan_amount, property_value):
+        """Calculate Loan-to-Value ratios for arrays of loans"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(property_value > 0, loan_amount / property_value, 1.0)
+
+    @staticmethod
+    def calculate_emi_batch(loan_amount, interest_rate, tenure_years):
+        """Calculate EMI for arrays of loans"""
+        monthly_interest_rate = np.asarray(interest_rate, dtype=np.float64) / (12 * 100)
+        tenure_months = np.asarray(tenure_years, dtype=np.float64) * 12
+        loan_amount = np.asarray(loan_amount, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            growth = np.power(1 + monthly_interest_rate, tenure_months)
+            emi = loan_amount * (monthly_interest_rate * growth / (growth - 1))
+            # Zero-interest loans repay the principal in equal instalments
+            emi = np.where(monthly_interest_rate == 0, loan_amount / tenure_months, emi)
+        # A zero-length term cannot be financed at any EMI
+        return np.where(tenure_months > 0, emi, np.where(loan_amount > 0, np.inf, 0.0))
@@ -0,0 +1,121 @@
+# offline_recognition.py
+import json
+import os
+import threading
+import wave
+
+from voice_pipeline import NotUnderstood, RecognitionUnavailable
+
+# Vosk models are trained on 16 kHz audio; the microphone is opened at this rate so no resampling is needed
+SAMPLE_RATE = 16000
+DEFAULT_MODEL_PATH = os.path.join('models', 'vosk-model-small-en-in-0.4')
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def model_path(path=None):
+    return path or os.getenv("VOSK_MODEL_PATH", DEFAULT_MODEL_PATH)
+
+
+def model_available(path=None):
+    return os.path.isdir(model_path(path))
+
+
+def load_model(path=None):
+    """Vosk model at `path` (or VOSK_MODEL_PATH), loaded once per process and shared by every recognizer"""
+    path = model_path(path)
+    with _models_lock:
+        model = _models.get(path)
+        if model is None:
+            if not os.path.isdir(path):
+                raise RecognitionUnavailable(f"No Vosk model at {path}; download one from https://alphacephei.com/vosk/models")
+            from vosk import Model, SetLogLevel
+            SetLogLevel(-1)
+            model = _models[path] = Model(path)
+    return model
+
+
+class RecognitionStream:
+    """One phrase, decoded while its audio is still arriving.
+
+    accept() takes 16-bit mono PCM. Kaldi closes a segment by itself at every pause it
+    detects, so by the time the speaker stops only the last segment is left for finish().
+    """
+
+    def __init__(self, model, sample_rate=SAMPLE_RATE, phrases=None):
+        from vosk import KaldiRecognizer
+        if phrases:
+            # Restricting the vocabulary (yes/no prompts, say) is faster and more accurate
+            self.recognizer = KaldiRecognizer(model, sample_rate, json.dumps(list(phrases) + ["[unk]"]))
+        else:
+            self.recognizer = KaldiRecognizer(model, sample_rate)
+        self.bytes_per_second = sample_rate * 2
+        self.segments = []
+        self.audio_seconds = 0.0
+
+    def accept(self, pcm):
+        self.audio_seconds += len(pcm) / self.bytes_per_second
+        if self.recognizer.AcceptWaveform(pcm):
+            self._keep(self.recognizer.Result())
+
+    def partial(self):
+        """Text so far, including the segment still being decoded"""
+        partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        return " ".join(self.segments + ([partial] if partial else []))
+
+    def finish(self):
+        """Flush the last segment and return the whole transcript"""
+        self._keep(self.recognizer.FinalResult())
+        return " ".join(self.segments)
+
+    def _keep(self, result):
+        text = json.loads(result).get('text', '')
+        if text:
+            self.segments.append(text)
+
+
+class VoskRecognizer:
+    """Speech-to-text on the device with Vosk (Kaldi); works without a network connection.
+
+    recognize() decodes a captured phrase, as GoogleRecognizer does. start_stream() lets
+    VoicePipeline feed audio chunks while the applicant is still talking, so the transcript
+    is ready almost as soon as they stop. The model is loaded on first use.
+    """
+
+    sample_rate = SAMPLE_RATE
+
+    def __init__(self, model_path=None, chunk_bytes=8000):
+        self.model_path = model_path
+        self.chunk_bytes = chunk_bytes
+
+    @property
+    def model(self):
+        return load_model(self.model_path)
+
+    def warm_up(self):
+        return self.model
+
+    def start_stream(self, sample_rate=None, phrases=None):
+        return RecognitionStream(self.model, sample_rate or self.sample_rate, phrases)
+
+    def transcribe(self, pcm, sample_rate=None):
+        """Decode a whole 16-bit mono PCM buffer; returns '' when nothing was recognized"""
+        stream = self.start_stream(sample_rate)
+        for start in range(0, len(pcm), self.chunk_bytes):
+            stream.accept(pcm[start:start + self.chunk_bytes])
+        return stream.finish()
+
+    def recognize(self, audio):
+        text = self.transcribe(audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2))
+        if not text:
+            raise NotUnderstood()
+        return text
+
+
+def read_wav(path):
+    """PCM bytes and sample rate of a 16-bit mono WAV file"""
+    with wave.open(path, 'rb') as file:
+        if file.getnchannels() != 1 or file.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit mono audio")
+        return file.readframes(file.getnframes()), file.getframerate()
@@ -0,0 +1,223 @@
+"""Eligibility reports per applicant, cached until their data or the rule set changes.
+
+A report is keyed by a hash of the applicant's data and the rule set's version and digest.
+The key doubles as the ETag, so a client that already has the current report gets a 304
+without the report being built, and a changed record or rule file invalidates every stale
+report without any bookkeeping. The Gemini assessment is part of the cached report, so it
+is requested once per change of inputs rather than once per page view.
+
+    python Backend/report_service.py --port 5001
+    curl -i localhost:5001/api/report?id=default
+    curl localhost:5001/api/reports/export > reports.jsonl
+"""
+import argparse
+import hashlib
+import json
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+
+from applicant_schema import ApplicantRecord
+from applicant_store import is_valid_applicant_id
+
+DEFAULT_MAX_ENTRIES = 10000
+BUILD_LOCK_STRIPES = 64
+
+
+def build_report(applicant_data, eligibility_result):
+    """The report generate_json_report has always returned"""
+    return {
+        "applicant_data": applicant_data,
+        "eligibility_assessment": {
+            "status": eligibility_result["status"],
+            "factors": eligibility_result.get("factors", []),
+            "recommendations": eligibility_result.get("recommendations", [])
+        },
+        "report_date": datetime.now().strftime("%B %d, %Y, %I:%M %p %Z")
+    }
+
+
+class ReportService:
+    """Builds reports with a LoanEligibilityEngine and keeps the latest one per applicant.
+
+    `assess(applicant_id, applicant_data)`, when given, adds the Gemini assessment to reports
+    requested with it. Concurrent requests for the same stale report build it once.
+    """
+
+    def __init__(self, store, engine, assess=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.store = store
+        self.engine = engine
+        self.assess = assess
+        self.max_entries = max_entries
+        # (applicant id, with assessment) -> (key, report), least recently used first
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._build_locks = [threading.Lock() for _ in range(BUILD_LOCK_STRIPES)]
+        self.hits = 0
+        self.builds = 0
+
+    def _canonical(self, applicant_data):
+        return json.dumps(applicant_data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+    def _key(self, canonical, with_assessment):
+        rules = self.engine.rules
+        digest = hashlib.blake2b(canonical.encode(), digest_size=16)
+        digest.update(f"|{rules.version}|{rules.digest}".encode())
+        return digest.hexdigest() + ('-a' if with_assessment else '')
+
+    def load(self, applicant_id):
+        applicant_data = self.store.load(applicant_id)
+        if applicant_data is None:
+            raise KeyError(applicant_id)
+        return applicant_data
+
+    def etag(self, applicant_id, applicant_data=None, with_assessment=False):
+        """The key the current report has or will have, without building it"""
+        if applicant_data is None:
+            applicant_data = self.load(applicant_id)
+        return self._key(self._canonical(applicant_data), with_assessment and self.assess is not None)
+
+    def _cached(self, entry, key):
+        with self._lock:
+            cached = self._cache.get(entry)
+            if cached is not None and cached[0] == key:
+                self._cache.move_to_end(entry)
+                return cached[1]
+        return None
+
+    def report(self, applicant_id, applicant_data=None, with_assessment=False):
+        """(key, report) for an applicant, rebuilt only if their data or the rule set changed.
+
+        Without `applicant_data` the record is read from the store. Reports are shared
+        between callers and must not be modified.
+        """
+        if applicant_data is None:
+            applicant_data = self.load(applicant_id)
+        canonical = self._canonical(applicant_data)
+        with_assessment = with_assessment and self.assess is not None
+        key = self._key(canonical, with_assessment)
+        entry = (applicant_id, with_assessment)
+        report = self._cached(entry, key)
+        if report is not None:
+            self.hits += 1
+            return key, report
+
+        # Built outside the cache lock, since the Gemini call can take seconds
+        with self._build_locks[zlib.crc32(applicant_id.encode()) % BUILD_LOCK_STRIPES]:
+            report = self._cached(entry, key)
+            if report is not None:
+                self.hits += 1
+                return key, report
+            # A private copy, so the caller changing its data later cannot alter the cached report
+            snapshot = json.loads(canonical)
+            report = build_report(snapshot, self.engine.check_eligibility(ApplicantRecord(snapshot)))
+            if with_assessment:
+                report["ai_assessment"] = self.assess(applicant_id, snapshot)
+            self.builds += 1
+            with self._lock:
+                self._cache[entry] = (key, report)
+                self._cache.move_to_end(entry)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return key, report
+
+    def export_jsonl(self, applicant_ids=None):
+        """Yield one JSON line {"applicant_id", "etag", "report"} per applicant, from the cache where current"""
+        for applicant_id in applicant_ids if applicant_ids is not None else self.store.applicant_ids():
+            try:
+                key, report = self.report(applicant_id)
+            except KeyError:
+                continue
+            yield json.dumps({'applicant_id': applicant_id, 'etag': key, 'report': report}, ensure_ascii=False) + '\n'
+
+    def invalidate(self, applicant_id=None):
+        with self._lock:
+            if applicant_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop((applicant_id, False), None)
+                self._cache.pop((applicant_id, True), None)
+
+    def stats(self):
+        return {'entries': len(self._cache), 'hits': self.hits, 'builds': self.builds}
+
+
+def create_app(service):
+    """Flask app serving /api/report and /api/reports/export from a ReportService"""
+    from flask import Flask, Response, jsonify, request
+
+    app = Flask(__name__)
+    invalid_id = ({'error': "Applicant ids are 1 to 64 letters, digits, '-' or '_'"}, 400)
+
+    @app.route('/api/report')
+    def report():
+        applicant_id = request.args.get('id', 'default')
+        if not is_valid_applicant_id(applicant_id):
+            return invalid_id
+        with_assessment = request.args.get('assessment') in ('1', 'true')
+        try:
+            applicant_data = service.load(applicant_id)
+        except KeyError:
+            return jsonify({'error': f'No applicant {applicant_id}'}), 404
+        # The ETag is known before the report is built, so revalidation never builds one
+        etag = service.etag(applicant_id, applicant_data, with_assessment)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            etag, report = service.report(applicant_id, applicant_data, with_assessment)
+            response = jsonify(report)
+        response.set_etag(etag)
+        # Browsers may keep the report but must check it is still current
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    @app.route('/api/reports/export')
+    def export_reports():
+        ids = request.args.get('ids')
+        applicant_ids = ids.split(',') if ids else None
+        if applicant_ids is not None and not all(map(is_valid_applicant_id, applicant_ids)):
+            return invalid_id
+        return Response(service.export_jsonl(applicant_ids), mimetype='application/x-ndjson')
+
+    @app.route('/api/reports/stats')
+    def report_stats():
+        return jsonify(service.stats())
+
+    return app
+
+
+def create_report_service(store=None, engine=None, with_assessment=True):
+    """Report service over the applicant store, with Gemini assessments from one session per applicant"""
+    from applicant_store import create_applicant_store
+    from loan_eligibility import LoanEligibilityEngine
+
+    assess = None
+    if with_assessment:
+        from gemini_integration import create_response_cache
+        from gemini_session import GeminiSessionManager
+        sessions = GeminiSessionManager(cache=create_response_cache())
+        sessions_lock = threading.Lock()
+
+        def assess(applicant_id, applicant_data):
+            with sessions_lock:
+                session = sessions.get(applicant_id)
+            return session.assess_loan_eligibility(applicant_data)
+    return ReportService(store or create_applicant_store(), engine or LoanEligibilityEngine(), assess)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve cached eligibility reports")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--no-assessment', action='store_true', help="serve reports without Gemini assessments")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    app = create_app(create_report_service(with_assessment=not args.no_assessment))
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
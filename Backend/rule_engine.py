@@ -0,0 +1,322 @@
+# rule_engine.py
+import hashlib
+import json
+import logging
+import operator
+import os
+import string
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Status labels, indexed by the number of failed rules (capped at REJECTED)
+STATUS_LABELS = ("APPROVED", "CONDITIONALLY_APPROVED", "REJECTED_WITH_CONDITIONS", "REJECTED")
+
+# Rule id standing for the failure-mask bit of applicant data that could not be parsed
+INVALID_INPUT = 'invalid_input'
+
+# Once more rules than this have failed, the application is REJECTED whatever else fails
+REJECTION_THRESHOLD = len(STATUS_LABELS) - 2
+
+# An applicant value read from applicant_data[category][name] and coerced with `parse`;
+# values `parse` rejects with ValueError or TypeError are given to `fallback`, if set
+Field = namedtuple('Field', ['category', 'parse', 'fallback'], defaults=(None,))
+
+# A value derived from fields. `cost` orders the evaluation plan; `scalar` and `vector` are
+# called with the values (or arrays) of `inputs` in order.
+Metric = namedtuple('Metric', ['cost', 'inputs', 'scalar', 'vector'])
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge
+}
+
+
+def status_code(failures):
+    """Map a failed-rule count to an index into STATUS_LABELS"""
+    return min(failures, len(STATUS_LABELS) - 1)
+
+
+class CompiledRuleSet:
+    """A rule set compiled into a single evaluation function, cheapest rules first"""
+
+    def __init__(self, definition, fields, metrics):
+        self.fields = fields
+        self.metrics = metrics
+        self.version = str(definition.get('version', ''))
+        # Changes whenever the rules do, even if the version string was not bumped
+        self.digest = hashlib.sha256(json.dumps(definition, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        self.criteria = dict(definition.get('criteria', {}))
+        self.template_fields = set()
+        self.rules = [self._compile_rule(position, rule) for position, rule in enumerate(definition.get('rules', []))]
+        if not self.rules:
+            raise ValueError("Rule set defines no rules")
+
+        # Bits follow the rules' positions in this file, so callers look them up by id; the
+        # invalid-input bit sits above them however many rules there are
+        self.invalid_bit = 1 << len(self.rules)
+        self.bits = {rule['id']: rule['bit'] for rule in self.rules}
+        if len(self.bits) != len(self.rules) or INVALID_INPUT in self.bits:
+            raise ValueError("Rule ids must be unique and must not be 'invalid_input'")
+        self.bits[INVALID_INPUT] = self.invalid_bit
+        self.mask_dtype = np.min_scalar_type(self.invalid_bit | (self.invalid_bit - 1))
+
+        # Stable sort keeps the file order between rules of equal cost
+        self.plan = sorted(self.rules, key=lambda rule: self._cost(rule['metric']) + self._cost(rule['relative_to']))
+        self.evaluate = self._generate()
+        self.explain = self._generate(explain=True)
+        self._descriptions = {}
+
+    def bit(self, rule_id):
+        """Failure-mask bit of a rule, or of INVALID_INPUT"""
+        try:
+            return self.bits[rule_id]
+        except KeyError:
+            raise ValueError(f"Rule set has no rule {rule_id!r}") from None
+
+    def _cost(self, name):
+        return self.metrics[name].cost if name in self.metrics else 0
+
+    def _compile_rule(self, position, rule):
+        rule_id = rule.get('id', f"rule_{position}")
+        for key in ('metric', 'relative_to'):
+            name = rule.get(key)
+            if (name is not None or key == 'metric') and name not in self.fields and name not in self.metrics:
+                raise ValueError(f"Rule {rule_id!r} uses unknown value {name!r}")
+        if rule.get('op') not in OPERATORS:
+            raise ValueError(f"Rule {rule_id!r} has unsupported operator {rule.get('op')!r}")
+
+        # Thresholds are either literal numbers or the name of a criteria entry
+        threshold = rule.get('threshold')
+        if isinstance(threshold, str):
+            if threshold not in self.criteria:
+                raise ValueError(f"Rule {rule_id!r} refers to unknown criterion {threshold!r}")
+            threshold = self.criteria[threshold]
+        try:
+            threshold = float(threshold)
+        except (TypeError, ValueError):
+            raise ValueError(f"Rule {rule_id!r} has a non-numeric threshold")
+        if not np.isfinite(threshold):
+            raise ValueError(f"Rule {rule_id!r} has a non-finite threshold")
+
+        factor, templated = self._bind_criteria(rule_id, rule.get('factor', rule_id))
+        return {
+            'id': rule_id,
+            'bit': 1 << position,
+            'metric': rule['metric'],
+            'op': rule['op'],
+            'threshold': threshold,
+            'relative_to': rule.get('relative_to'),
+            'factor': factor,
+            'templated': templated,
+            'recommendation': rule.get('recommendation')
+        }
+
+    def _bind_criteria(self, rule_id, template):
+        """Substitute criteria into a factor template now, leaving applicant fields to fill in per applicant"""
+        parts = []
+        templated = False
+        for literal, name, spec, conversion in string.Formatter().parse(template):
+            parts.append(literal.replace('{', '{{').replace('}', '}}'))
+            if name is None:
+                continue
+            if name in self.criteria:
+                value = self.criteria[name]
+                value = repr(value) if conversion == 'r' else str(value) if conversion == 's' else value
+                parts.append(format(value, spec).replace('{', '{{').replace('}', '}}'))
+            elif name in self.fields:
+                templated = True
+                self.template_fields.add(name)
+                parts.append('{' + name + ('!' + conversion if conversion else '') + (':' + spec if spec else '') + '}')
+            else:
+                raise ValueError(f"Rule {rule_id!r} factor refers to unknown field {name!r}")
+        factor = ''.join(parts)
+        # Factors without applicant fields are stored ready to use
+        return (factor if templated else factor.format()), templated
+
+    def _generate(self, explain=False):
+        """Generate the evaluation function for this rule set.
+
+        Without `explain` this is evaluate(applicant_data, stop_at_rejection=False) ->
+        (failure_mask, failures). With it, explain(applicant_data) -> (failure_mask, failures,
+        factors, recommendations), always evaluating every rule.
+        """
+        namespace = {}
+        loaded = set()
+        if explain:
+            lines = ["def explain(applicant_data):", "    mask = 0", "    failures = 0"]
+        else:
+            lines = ["def evaluate(applicant_data, stop_at_rejection=False):", "    mask = 0", "    failures = 0"]
+
+        # Fields are read and parsed, and metrics computed, just before the first rule that
+        # needs them, so an early exit skips the remaining work entirely
+        def load(name):
+            if name is None or name in loaded:
+                return
+            loaded.add(name)
+            if name in self.metrics:
+                metric = self.metrics[name]
+                for input_name in metric.inputs:
+                    load(input_name)
+                namespace[f"metric_{name}"] = metric.scalar
+                lines.append(f"    v_{name} = metric_{name}({', '.join('v_' + input_name for input_name in metric.inputs)})")
+                return
+            field = self.fields[name]
+            if ('category', field.category) not in loaded:
+                loaded.add(('category', field.category))
+                lines.append(f"    c_{field.category} = applicant_data.get({field.category!r}, {{}})")
+            namespace[f"parse_{name}"] = field.parse
+            if field.fallback is None:
+                lines.append(f"    v_{name} = parse_{name}(c_{field.category}.get({name!r}, 0))")
+                return
+            # The plain parser handles the common case at C speed; anything else takes the slow path
+            namespace[f"fallback_{name}"] = field.fallback
+            lines.append(f"    v_{name} = c_{field.category}.get({name!r}, 0)")
+            lines.append("    try:")
+            lines.append(f"        v_{name} = parse_{name}(v_{name})")
+            lines.append("    except (ValueError, TypeError):")
+            lines.append(f"        v_{name} = fallback_{name}(v_{name})")
+
+        for position, rule in enumerate(self.plan):
+            load(rule['metric'])
+            load(rule['relative_to'])
+            threshold = repr(rule['threshold'])
+            if rule['relative_to']:
+                threshold = f"(v_{rule['relative_to']} * {threshold})"
+            lines.append(f"    if v_{rule['metric']} {rule['op']} {threshold}:")
+            lines.append(f"        mask |= {rule['bit']}")
+            lines.append("        failures += 1")
+            if not explain and REJECTION_THRESHOLD <= position < len(self.plan) - 1:
+                lines.append(f"        if stop_at_rejection and failures > {REJECTION_THRESHOLD}:")
+                lines.append("            return mask, failures")
+
+        if not explain:
+            lines.append("    return mask, failures")
+        else:
+            # Text is built in rule set order, not plan order
+            for name in sorted(self.template_fields):
+                load(name)
+            lines += ["    factors = []", "    recommendations = []"]
+            for position, rule in enumerate(self.rules):
+                namespace[f"factor_{position}"] = rule['factor']
+                namespace[f"recommendation_{position}"] = rule['recommendation']
+                lines.append(f"    if mask & {rule['bit']}:")
+                if rule['templated']:
+                    arguments = ', '.join(f"{name}=v_{name}" for name in sorted(self.template_fields))
+                    lines.append(f"        factors.append(factor_{position}.format({arguments}))")
+                else:
+                    lines.append(f"        factors.append(factor_{position})")
+                if rule['recommendation']:
+                    lines.append(f"        recommendations.append(recommendation_{position})")
+            lines.append("    return mask, failures, factors, recommendations")
+
+        exec(compile("\n".join(lines), "<rule set>", "exec"), namespace)
+        return namespace['explain' if explain else 'evaluate']
+
+    def evaluate_batch(self, columns):
+        """Evaluate every rule over arrays of parsed field values, returning (failure_masks, failures)"""
+        computed = {}
+
+        def values(name):
+            if name not in computed:
+                if name in self.metrics:
+                    metric = self.metrics[name]
+                    computed[name] = metric.vector(*[values(input_name) for input_name in metric.inputs])
+                else:
+                    computed[name] = columns[name]
+            return computed[name]
+
+        size = len(next(iter(columns.values())))
+        masks = np.zeros(size, dtype=self.mask_dtype)
+        failures = np.zeros(size, dtype=np.uint8)
+        for rule in self.plan:
+            threshold = rule['threshold']
+            if rule['relative_to']:
+                threshold = values(rule['relative_to']) * threshold
+            failed = OPERATORS[rule['op']](values(rule['metric']), threshold)
+            masks |= np.where(failed, rule['bit'], 0).astype(self.mask_dtype)
+            failures += failed
+        return masks, failures
+
+    def describe(self, mask, value_of):
+        """Build factor and recommendation text for a failure mask, in rule set order.
+
+        `value_of(name)` returns a parsed field value, and is only called for fields
+        that appear in the factor templates of failed rules.
+        """
+        if not mask:
+            return [], []
+        # Factor templates and recommendations only depend on the mask, so they are
+        # collected once per distinct mask; only templated factors need formatting
+        description = self._descriptions.get(mask)
+        if description is None:
+            failed = [rule for rule in self.rules if mask & rule['bit']]
+            description = (
+                tuple(rule['factor'] for rule in failed),
+                tuple(rule['recommendation'] for rule in failed if rule['recommendation']),
+                any(rule['templated'] for rule in failed)
+            )
+            self._descriptions[mask] = description
+        factors, recommendations, templated = description
+        if templated:
+            values = {name: value_of(name) for name in self.template_fields}
+            return [factor.format_map(values) for factor in factors], list(recommendations)
+        return list(factors), list(recommendations)
+
+
+def load_rule_set_definition(path):
+    """Read a rule set definition from a JSON or YAML file"""
+    with open(path, 'r', encoding='utf-8') as file:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError(f"PyYAML is required to load {path}")
+            return yaml.safe_load(file)
+        return json.load(file)
+
+
+class RuleSetLoader:
+    """Keeps a compiled rule set in sync with its file, recompiling when the file changes"""
+
+    def __init__(self, path, fields, metrics, check_interval=1.0):
+        self.path = path
+        self.fields = fields
+        self.metrics = metrics
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._signature = self._file_signature()
+        self._rule_set = CompiledRuleSet(load_rule_set_definition(path), fields, metrics)
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self):
+        """Return the current rule set, reloading it if the file changed since the last check"""
+        now = time.monotonic()
+        if now >= self._next_check:
+            with self._lock:
+                if now >= self._next_check:
+                    self._next_check = now + self.check_interval
+                    self._reload_if_changed()
+        return self._rule_set
+
+    def _reload_if_changed(self):
+        try:
+            signature = self._file_signature()
+            if signature == self._signature:
+                return
+            self._signature = signature
+            self._rule_set = CompiledRuleSet(load_rule_set_definition(self.path), self.fields, self.metrics)
+            logger.info("Reloaded rule set %s (version %s)", self.path, self._rule_set.version)
+        except (OSError, ValueError) as e:
+            # Keep serving the last good rule set until the file is fixed
+            logger.error("Error reloading rule set %s: %s", self.path, e)
@@ -0,0 +1,488 @@
+"""Bank-statement analytics: monthly spending, recurring debits (EMIs) and salary credits.
+
+Transactions stream through in fixed-size chunks (a CSV export, or the rows kyc_documents
+reads off a statement). Each chunk is aggregated with numpy into per-month totals and
+per-counterparty monthly amounts, then dropped, so memory is bounded by the chunk size,
+the number of months and a capped, windowed set of counterparties, never by the length
+of the statement. The aggregates persist between runs: feeding next month's statement
+only adds its rows, and rows an overlapping or backfilled statement repeats are skipped.
+
+    python Backend/statement_analytics.py statement.csv --applicant-id default
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+
+from applicant_schema import APPLICANT_SCHEMA, FIELD_INDEX, coerce
+from dates import parse_date
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ROWS = 10000
+
+# Months of per-counterparty history kept for recurrence detection, and of totals averaged into expenses
+WINDOW_MONTHS = 12
+EXPENSE_MONTHS = 6
+MAX_COUNTERPARTIES = 5000
+
+SALARY_WORDS = {'SALARY', 'SAL', 'PAYROLL', 'WAGES'}
+EMI_WORDS = {'EMI', 'LOAN', 'NACH', 'ACH', 'ECS'}
+MIN_SALARY = 10000
+# EMIs are debited to the rupee; salaries move with allowances and deductions
+EMI_TOLERANCE = 0.02
+SALARY_TOLERANCE = 0.2
+# Self-reported income further than this from the credited salary is flagged
+INCOME_TOLERANCE = 0.15
+
+COLUMN_NAMES = {
+    'date': ('date', 'txn date', 'transaction date', 'value date', 'posting date'),
+    'description': ('description', 'narration', 'particulars', 'details', 'remarks'),
+    'debit': ('debit', 'withdrawal', 'withdrawal amt', 'withdrawal amount', 'debit amount', 'dr'),
+    'credit': ('credit', 'deposit', 'deposit amt', 'deposit amount', 'credit amount', 'cr'),
+    'amount': ('amount', 'transaction amount'),
+}
+
+MONTH_WORDS = {'JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'SEPT', 'OCT', 'NOV', 'DEC'}
+NOISE_PATTERN = re.compile(r'[^A-Z ]+')
+
+# Ordinal of 1970-01-01; numpy day and month numbers count from it
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=65536)
+def counterparty(description):
+    """Key for a transaction's other party, stable from month to month.
+
+    Reference numbers, month names and punctuation are dropped, so "NEFT/SAL/TCS/FEB25/8812"
+    and "NEFT/SAL/TCS/MAR25/9310" are the same payer.
+    """
+    words = [word for word in NOISE_PATTERN.sub(' ', description.upper()).split() if word not in MONTH_WORDS]
+    return " ".join(words[:4])
+
+
+@lru_cache(maxsize=8192)
+def parse_day(text):
+    """Ordinal day of an ISO or day-first date, or None"""
+    text = text.strip()
+    try:
+        return date.fromisoformat(text[:10]).toordinal()
+    except ValueError:
+        iso = parse_date(text)
+        return date.fromisoformat(iso).toordinal() if iso else None
+
+
+def to_amount(text):
+    """Amount in a CSV cell: separators, currency and a trailing Dr/Cr stripped; Dr or a minus is negative"""
+    text = text.strip().upper().replace(',', '').replace('₹', '').replace('INR', '').replace('RS', '').strip()
+    sign = -1.0 if text.endswith('DR') or text.startswith('-') else 1.0
+    text = text.rstrip('DRC ').lstrip('-+ ')
+    try:
+        return sign * float(text)
+    except ValueError:
+        return 0.0
+
+
+def month_numbers(days):
+    """Months since 1970-01 of an array of ordinal days"""
+    return (days - EPOCH_ORDINAL).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def month_label(month):
+    year, month = divmod(int(month), 12)
+    return f"{1970 + year:04d}-{month + 1:02d}"
+
+
+def row_key(day, description, debit, credit):
+    return hashlib.blake2b(f"{day}|{description}|{debit:.2f}|{credit:.2f}".encode(), digest_size=8).hexdigest()
+
+
+def recent_run(months, latest):
+    """Amounts of the unbroken monthly run ending in `latest` or the month before it, oldest first"""
+    month = latest if latest in months else latest - 1
+    amounts = []
+    while month in months:
+        amounts.append(months[month])
+        month -= 1
+    return amounts[::-1]
+
+
+def is_stable(amounts, tolerance):
+    median = float(np.median(amounts))
+    return median > 0 and all(abs(amount - median) <= tolerance * median for amount in amounts)
+
+
+class StatementAnalytics:
+    """Running aggregates over one applicant's bank transactions"""
+
+    def __init__(self, window_months=WINDOW_MONTHS, expense_months=EXPENSE_MONTHS, max_counterparties=MAX_COUNTERPARTIES):
+        self.window_months = window_months
+        self.expense_months = expense_months
+        self.max_counterparties = max_counterparties
+        # Month number (months since 1970-01) -> [debits, credits, debit count, credit count]
+        self.months = {}
+        # Counterparty -> {'debit': {month: amount}, 'credit': {month: amount}}, least recently seen first
+        self.counterparties = OrderedDict()
+        # Month number -> {row key: times seen} for the months in the window, so rows an
+        # overlapping or backfilled statement repeats are not counted twice
+        self.row_keys = {}
+        self.last_day = 0
+        self.rows = 0
+
+    def ingest(self, chunks):
+        """Add (days, descriptions, debits, credits) chunks from one statement; rows may come in any order.
+
+        Rows are told apart by their day, description and amounts. A row earlier statements
+        already had is skipped, in any month of the window, while identical rows within one
+        statement all count. Rows in months before the window can no longer be checked and
+        are skipped with a warning. Returns the number of rows added.
+        """
+        latest = self.latest_month()
+        edge = latest - self.window_months if latest is not None else None
+        seen, counts = self.row_keys, {}
+        last_day = self.last_day
+        added = repeated = too_old = 0
+        for days, descriptions, debits, credits in chunks:
+            days = np.asarray(days, dtype=np.int64)
+            debits = np.abs(np.asarray(debits, dtype=np.float64))
+            credits = np.abs(np.asarray(credits, dtype=np.float64))
+            if not len(days):
+                continue
+            months = month_numbers(days)
+            keep = months > edge if edge is not None else np.ones(len(days), dtype=bool)
+            too_old += len(days) - int(keep.sum())
+            for index in np.flatnonzero(keep).tolist():
+                month = int(months[index])
+                keys = counts.setdefault(month, {})
+                key = row_key(int(days[index]), descriptions[index], debits[index], credits[index])
+                count = keys[key] = keys.get(key, 0) + 1
+                if count <= seen.get(month, {}).get(key, 0):
+                    keep[index] = False
+                    repeated += 1
+            if not keep.all():
+                days, months, debits, credits = days[keep], months[keep], debits[keep], credits[keep]
+                descriptions = [description for description, kept in zip(descriptions, keep) if kept]
+            if not len(days):
+                continue
+
+            latest = max(latest, int(months.max())) if latest is not None else int(months.max())
+            last_day = max(last_day, int(days.max()))
+            self._aggregate(days, months, descriptions, debits, credits)
+            added += len(days)
+            # Keys of months that have left the window are never looked up again
+            for month in [month for month in counts if month <= latest - self.window_months]:
+                del counts[month]
+
+        for month, keys in counts.items():
+            known = seen.setdefault(month, {})
+            for key, count in keys.items():
+                if count > known.get(key, 0):
+                    known[key] = count
+        self.last_day = last_day
+        self.rows += added
+        if repeated:
+            logger.info("Skipped %d rows already ingested", repeated)
+        if too_old:
+            logger.warning("Skipped %d rows from before %s, older than the %d months kept to match repeated rows",
+                           too_old, month_label(edge + 1), self.window_months)
+        self._trim()
+        return added
+
+    def _aggregate(self, days, months, descriptions, debits, credits):
+        base = int(months.min())
+        offsets = months - base
+        span = int(offsets.max()) + 1
+
+        month_debits = np.bincount(offsets, weights=debits, minlength=span)
+        month_credits = np.bincount(offsets, weights=credits, minlength=span)
+        debit_counts = np.bincount(offsets, weights=debits > 0, minlength=span)
+        credit_counts = np.bincount(offsets, weights=credits > 0, minlength=span)
+        for offset in np.flatnonzero(debit_counts + credit_counts):
+            totals = self.months.setdefault(base + int(offset), [0.0, 0.0, 0, 0])
+            totals[0] += float(month_debits[offset])
+            totals[1] += float(month_credits[offset])
+            totals[2] += int(debit_counts[offset])
+            totals[3] += int(credit_counts[offset])
+
+        # One group per (counterparty, month); a chunk has far fewer groups than rows
+        key_ids = {}
+        codes = np.fromiter((key_ids.setdefault(counterparty(description), len(key_ids)) for description in descriptions),
+                            dtype=np.int64, count=len(descriptions))
+        keys = list(key_ids)
+        groups, inverse = np.unique(codes * span + offsets, return_inverse=True)
+        group_debits = np.bincount(inverse, weights=debits)
+        group_credits = np.bincount(inverse, weights=credits)
+        for group, debit, credit in zip(groups.tolist(), group_debits.tolist(), group_credits.tolist()):
+            key = keys[group // span]
+            month = base + group % span
+            entry = self.counterparties.get(key)
+            if entry is None:
+                entry = self.counterparties[key] = {'debit': {}, 'credit': {}}
+            else:
+                self.counterparties.move_to_end(key)
+            if debit:
+                entry['debit'][month] = entry['debit'].get(month, 0.0) + debit
+            if credit:
+                entry['credit'][month] = entry['credit'].get(month, 0.0) + credit
+
+    def _trim(self):
+        """Forget counterparty months and row keys outside the window, then the least recently seen counterparties"""
+        if not self.months:
+            return
+        oldest = max(self.months) - self.window_months
+        for month in [month for month in self.row_keys if month <= oldest]:
+            del self.row_keys[month]
+        for key in list(self.counterparties):
+            entry = self.counterparties[key]
+            for side in ('debit', 'credit'):
+                for month in [month for month in entry[side] if month <= oldest]:
+                    del entry[side][month]
+            if not entry['debit'] and not entry['credit']:
+                del self.counterparties[key]
+        while len(self.counterparties) > self.max_counterparties:
+            self.counterparties.popitem(last=False)
+
+    def latest_month(self):
+        return max(self.months) if self.months else None
+
+    def complete_months(self):
+        """Months with transactions, oldest first, leaving out the latest one if the statement stops before its end"""
+        months = sorted(self.months)
+        if months and date.fromordinal(self.last_day).day < 28 and len(months) > 1:
+            months.pop()
+        return months
+
+    def monthly_expenses(self):
+        """Mean monthly debits over the most recent complete months"""
+        months = self.complete_months()[-self.expense_months:]
+        if not months:
+            return None
+        return round(sum(self.months[month][0] for month in months) / len(months))
+
+    def recurring_debits(self):
+        """Debits of a steady amount every month: rent, standing instructions and, when the
+        narration says so (EMI, loan, NACH/ACH/ECS mandates), loan EMIs"""
+        latest = self.latest_month()
+        if latest is None:
+            return []
+        recurring = []
+        for key, entry in self.counterparties.items():
+            amounts = recent_run(entry['debit'], latest)
+            emi = bool(EMI_WORDS & set(key.split()))
+            if len(amounts) >= (2 if emi else 3) and is_stable(amounts, EMI_TOLERANCE):
+                recurring.append({'counterparty': key, 'amount': round(float(np.median(amounts)), 2),
+                                  'months': len(amounts), 'emi': emi})
+        return sorted(recurring, key=lambda debit: -debit['amount'])
+
+    def existing_emi(self):
+        return round(sum(debit['amount'] for debit in self.recurring_debits() if debit['emi']), 2)
+
+    def salary(self):
+        """The monthly salary credit: a credit labelled as salary, or a steady large one every month"""
+        latest = self.latest_month()
+        if latest is None:
+            return None
+        candidates = []
+        for key, entry in self.counterparties.items():
+            amounts = recent_run(entry['credit'], latest)
+            if not amounts:
+                continue
+            labelled = bool(SALARY_WORDS & set(key.split()))
+            recent = amounts[-3:]
+            if float(np.median(recent)) < MIN_SALARY or not (labelled or len(amounts) >= 3):
+                continue
+            if len(amounts) > 1 and not is_stable(recent, SALARY_TOLERANCE):
+                continue
+            candidates.append((labelled, len(amounts), float(np.median(recent)), key))
+        if not candidates:
+            return None
+        labelled, months, amount, key = max(candidates)
+        return {'counterparty': key, 'amount': round(amount), 'months': months, 'labelled': labelled}
+
+    def verify_income(self, reported):
+        """Compare a self-reported monthly income with the salary credited to the account"""
+        salary = self.salary()
+        reported = coerce(APPLICANT_SCHEMA[FIELD_INDEX['employment.net_monthly_salary']], reported)
+        if salary is None or not reported:
+            return {'reported': reported, 'observed': salary and salary['amount'], 'verified': False}
+        ratio = reported / salary['amount']
+        return {'reported': reported, 'observed': salary['amount'], 'ratio': round(ratio, 3),
+                'verified': abs(ratio - 1) <= INCOME_TOLERANCE}
+
+    def summary(self):
+        return {
+            'rows': self.rows,
+            'months': [month_label(month) for month in sorted(self.months)],
+            'monthly_expenses': self.monthly_expenses(),
+            'existing_emi': self.existing_emi(),
+            'recurring_debits': self.recurring_debits(),
+            'salary': self.salary(),
+        }
+
+    def data_updates(self):
+        """Derived fields as {category: {field: value}} data updates"""
+        updates = {}
+        expenses = self.monthly_expenses()
+        if expenses is not None:
+            updates.setdefault('financial', {})['monthly_expenses'] = expenses
+            updates['financial']['existing_emi'] = self.existing_emi()
+        salary = self.salary()
+        if salary is not None:
+            updates.setdefault('employment', {})['net_monthly_salary'] = salary['amount']
+        return updates
+
+    def to_state(self):
+        return {
+            'months': {str(month): totals for month, totals in self.months.items()},
+            'counterparties': [[key, {side: {str(month): amount for month, amount in amounts.items()}
+                                      for side, amounts in entry.items()}]
+                               for key, entry in self.counterparties.items()],
+            'row_keys': {str(month): keys for month, keys in self.row_keys.items()},
+            'last_day': self.last_day,
+            'rows': self.rows,
+        }
+
+    @classmethod
+    def from_state(cls, state, **options):
+        analytics = cls(**options)
+        analytics.months = {int(month): totals for month, totals in state['months'].items()}
+        for key, entry in state['counterparties']:
+            analytics.counterparties[key] = {side: {int(month): amount for month, amount in amounts.items()}
+                                             for side, amounts in entry.items()}
+        analytics.row_keys = {int(month): keys for month, keys in state.get('row_keys', {}).items()}
+        analytics.last_day = state['last_day']
+        analytics.rows = state['rows']
+        return analytics
+
+    def save(self, path):
+        # Write a temporary file and rename it over the old one, so a crash never leaves partial state
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+            json.dump(self.to_state(), file)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, **options):
+        """Saved aggregates at `path`, or empty ones if there are none yet"""
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                return cls.from_state(json.load(file), **options)
+        except FileNotFoundError:
+            return cls(**options)
+
+
+def find_columns(header):
+    columns = {}
+    names = [re.sub(r'[^a-z ]', '', name.lower()).strip() for name in header]
+    for column, candidates in COLUMN_NAMES.items():
+        for index, name in enumerate(names):
+            if name in candidates or any(name.startswith(candidate + ' ') for candidate in candidates):
+                columns.setdefault(column, index)
+    return columns
+
+
+def read_csv_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Yield (days, descriptions, debits, credits) chunks from a statement CSV.
+
+    Preamble lines before the header row are skipped. Either separate debit and credit
+    columns or one signed amount column are understood; rows without a date are ignored.
+    """
+    with open(path, 'r', newline='', encoding='utf-8-sig') as file:
+        reader = csv.reader(file)
+        columns = {}
+        for header in reader:
+            columns = find_columns(header)
+            if 'date' in columns and ('debit' in columns or 'amount' in columns):
+                break
+        else:
+            raise ValueError(f"{path}: no header row with a date and an amount column")
+
+        date_column, description_column = columns['date'], columns.get('description')
+        chunk = ([], [], [], [])
+        for row in reader:
+            if len(row) <= date_column:
+                continue
+            day = parse_day(row[date_column])
+            if day is None:
+                continue
+            if 'debit' in columns:
+                debit = abs(to_amount(row[columns['debit']])) if len(row) > columns['debit'] else 0.0
+                credit = abs(to_amount(row[columns['credit']])) if 'credit' in columns and len(row) > columns['credit'] else 0.0
+            else:
+                amount = to_amount(row[columns['amount']])
+                debit, credit = max(-amount, 0.0), max(amount, 0.0)
+            chunk[0].append(day)
+            chunk[1].append(row[description_column] if description_column is not None else '')
+            chunk[2].append(debit)
+            chunk[3].append(credit)
+            if len(chunk[0]) == chunk_rows:
+                yield chunk
+                chunk = ([], [], [], [])
+        if chunk[0]:
+            yield chunk
+
+
+def transaction_chunks(transactions, chunk_rows=CHUNK_ROWS):
+    """Chunks from (ISO date, description, debit, credit) rows, as kyc_documents parses them"""
+    chunk = ([], [], [], [])
+    for iso_date, description, debit, credit in transactions:
+        chunk[0].append(date.fromisoformat(iso_date).toordinal())
+        chunk[1].append(description)
+        chunk[2].append(debit)
+        chunk[3].append(credit)
+        if len(chunk[0]) == chunk_rows:
+            yield chunk
+            chunk = ([], [], [], [])
+    if chunk[0]:
+        yield chunk
+
+
+def state_path(applicant_id, directory=None):
+    directory = directory or os.getenv("STATEMENT_STATE_DIR", "statement_analytics")
+    return os.path.join(directory, f"{applicant_id}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Derive monthly expenses and salary from bank statements")
+    parser.add_argument('statements', nargs='+', help="statement CSV files, oldest first")
+    parser.add_argument('--applicant-id', default=None, help="keep aggregates for and write fields to this applicant")
+    parser.add_argument('--dry-run', action='store_true', help="only print the summary")
+    args = parser.parse_args()
+
+    from applicant_store import DEFAULT_APPLICANT_ID, create_applicant_store, updates_to_paths
+    applicant_id = args.applicant_id or DEFAULT_APPLICANT_ID
+    path = state_path(applicant_id)
+    analytics = StatementAnalytics.load(path)
+    for statement in args.statements:
+        print(f"{statement}: {analytics.ingest(read_csv_chunks(statement))} new rows")
+    summary = analytics.summary()
+
+    if not args.dry_run:
+        analytics.save(path)
+        store = create_applicant_store()
+        try:
+            # The self-reported figure is kept in the verification, since the salary field is replaced
+            employment = (store.load(applicant_id) or {}).get('employment', {})
+            reported = (employment.get('income_verification') or {}).get('reported', employment.get('net_monthly_salary'))
+            paths = updates_to_paths(analytics.data_updates())
+            if reported not in (None, ''):
+                summary['income_verification'] = paths['employment.income_verification'] = analytics.verify_income(reported)
+            store.update(applicant_id, paths)
+        finally:
+            store.close()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
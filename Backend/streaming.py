@@ -0,0 +1,88 @@
+# streaming.py
+import json
+import re
+
+# Sentence ends: terminal punctuation (with closing quotes or brackets) followed by whitespace,
+# or a line break. Punctuation at the very end of the buffer is not a boundary yet, since the
+# next chunk may continue it ("8." + "5%").
+SENTENCE_BOUNDARY = re.compile(r'[.!?]+["\')\]]*(?=\s)|\n+')
+
+# Words whose trailing period does not end a sentence
+ABBREVIATIONS = {'mr', 'mrs', 'ms', 'dr', 'rs', 'vs', 'etc', 'e.g', 'i.e', 'approx', 'inr', 'st', 'sr', 'jr'}
+# Abbreviations only when a number follows: "Account no. 1234", but "The answer is no. Sorry"
+NUMBER_ABBREVIATIONS = {'no'}
+
+
+class SentenceSplitter:
+    """Incrementally cuts streamed text into complete sentences"""
+
+    def __init__(self):
+        self.buffer = ''
+
+    def feed(self, text):
+        """Add a chunk of text and return the sentences it completed"""
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(self.buffer):
+            if match.group().startswith('.'):
+                word = self._last_word(self.buffer[start:match.start()])
+                if word in NUMBER_ABBREVIATIONS:
+                    following = self.buffer[match.end():].lstrip()
+                    if not following:
+                        # Whether a number follows is up to the next chunk
+                        break
+                    if following[0].isdigit():
+                        continue
+                elif word in ABBREVIATIONS:
+                    continue
+            sentence = self.buffer[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self):
+        """Return whatever is left once the stream has ended"""
+        sentence, self.buffer = self.buffer.strip(), ''
+        return [sentence] if sentence else []
+
+    @staticmethod
+    def _last_word(text):
+        words = text.split()
+        return words[-1].lower().lstrip('(') if words else ''
+
+
+def split_sentences(chunks):
+    """Turn an iterable of text chunks into a generator of sentences"""
+    splitter = SentenceSplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.flush()
+
+
+async def async_split_sentences(chunks):
+    """Turn an async iterable of text chunks into an async generator of sentences"""
+    splitter = SentenceSplitter()
+    async for chunk in chunks:
+        for sentence in splitter.feed(chunk):
+            yield sentence
+    for sentence in splitter.flush():
+        yield sentence
+
+
+def format_sse(data, event=None):
+    """Frame one Server-Sent Event carrying `data` as JSON"""
+    frame = f"event: {event}\n" if event else ""
+    return f"{frame}data: {json.dumps(data)}\n\n"
+
+
+async def async_sse_sentences(sentences, done=None):
+    """SSE frames for the chat UI: one 'sentence' event per sentence, then 'done' with the full text
+    and whatever `done` holds by the time the sentences have run out"""
+    spoken = []
+    async for sentence in sentences:
+        spoken.append(sentence)
+        yield format_sse({'text': sentence}, 'sentence')
+    yield format_sse({**(done or {}), 'text': ' '.join(spoken)}, 'done')
@@ -1,128 +1,90 @@
 # voice_based_chatbot.py
-import pyttsx3
 import json
 import os
-import speech_recognition as sr
 import time
-import winsound  # For Windows sound
-from gemini_integration import GeminiAI
+from applicant_schema import ApplicantRecord
+from applicant_store import DEFAULT_APPLICANT_ID, create_applicant_store, load_or_migrate, updates_to_paths
+from event_log import open_event_log
+from gemini_integration import create_response_cache
+from gemini_session import GeminiSession
 from loan_eligibility import LoanEligibilityEngine
+from voice_pipeline import (ListenTimeout, NotUnderstood, Pyttsx3Speaker, RecognitionUnavailable,
+                            SpeechRecognitionMicrophone, VoicePipeline, create_recognizer)
 from dotenv import load_dotenv
 
 class VoiceBasedChatbot:
-    def __init__(self):
+    def __init__(self, applicant_id=DEFAULT_APPLICANT_ID, store=None, event_log=None,
+                 microphone=None, recognizer=None, speaker=None, ai=None):
         load_dotenv()
-        
-        # Initialize text-to-speech engine
-        self.tts_engine = pyttsx3.init()
-        self.tts_engine.setProperty('rate', 200)  # Slowed down for better clarity
-        self.tts_engine.setProperty('volume', 0.9)
-        voices = self.tts_engine.getProperty('voices')
-        self.tts_engine.setProperty('voice', voices[0].id)
-
-        # Initialize speech recognizer
-        self.recognizer = sr.Recognizer()
-        
+
+        # Microphone, speech recognition and text-to-speech backends; the pipeline overlaps their stages.
+        # The microphone opens at the recognizer's sample rate so streamed chunks need no resampling
+        recognizer = recognizer or create_recognizer()
+        self.voice = VoicePipeline(
+            microphone or SpeechRecognitionMicrophone(sample_rate=getattr(recognizer, 'sample_rate', None)),
+            recognizer,
+            speaker or Pyttsx3Speaker(rate=200, volume=0.9)
+        )
+
         # Initialize Gemini AI and loan eligibility engine
-        self.ai = GeminiAI()
+        self.ai = ai or GeminiSession(cache=create_response_cache())
         self.eligibility_engine = LoanEligibilityEngine()
 
         # Load applicant data
-        self.applicant_data = self.load_applicant_data()
+        self.applicant_id = applicant_id
+        self.store = store or create_applicant_store()
+        self.record = ApplicantRecord(self.load_applicant_data())
+        self.applicant_data = self.record.data
 
-        # Conversation history
-        self.conversation_history = []
-        
-        # Status indicators
-        self.listening_sound_enabled = True
+        # Conversation events go to a durable per-session log; the history keeps the last few lines for prompts
+        self.events = event_log or open_event_log(applicant_id, self.applicant_data)
+        self.conversation_history = self.events.history
 
     def speak(self, text):
         """Convert text to speech and play it"""
-        print(f"AI: {text}")
-        self.tts_engine.say(text)
-        self.tts_engine.runAndWait()
+        self.voice.speak(text)
 
-    def play_listening_sound(self):
-        """Play a sound to indicate listening has started"""
-        try:
-            # Play a beep sound (frequency, duration)
-            # First beep: higher pitch
-            winsound.Beep(1000, 150)
-            time.sleep(0.05)
-            # Second beep: higher pitch
-            winsound.Beep(1200, 150)
-            
-            # Say "Listening" with TTS
-            self.tts_engine.say("Listening")
-            self.tts_engine.runAndWait()
-            
-        except Exception as e:
-            print(f"Could not play listening sound: {e}")
+    def speak_stream(self, sentences):
+        """Speak each sentence as soon as it is complete while later ones are still being generated.
+
+        Returns the full text spoken.
+        """
+        return self.voice.speak_stream(sentences)
 
     def listen(self):
         """Listen to user's voice input and convert to text"""
-        with sr.Microphone() as source:
-            # Adjust for ambient noise
-            print("Adjusting for ambient noise, please wait...")
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
-            
-            # Play sound and visual indicator that we're listening
-            print("\n=== LISTENING NOW ===")
-            
-            # Play the listening sound
-            if self.listening_sound_enabled:
-                self.play_listening_sound()
-            
-            try:
-                # Listen for audio
-                audio = self.recognizer.listen(source, timeout=10, phrase_time_limit=30)
-                
-                # Play a sound to indicate listening has stopped
-                try:
-                    winsound.Beep(800, 150)  # Lower pitch for end
-                except:
-                    pass
-                    
-                print("Processing audio...")
-                text = self.recognizer.recognize_google(audio)
-                print(f"You said: {text}")
-                return text
-                
-            except sr.WaitTimeoutError:
-                print("Listening timed out while waiting for speech.")
-                self.speak("I didn't hear anything. Let me ask again.")
-                return None
-            except sr.UnknownValueError:
-                print("Could not understand audio.")
-                self.speak("I couldn't understand what you said. Could you please repeat?")
-                return None
-            except sr.RequestError as e:
-                print(f"Could not request results; {e}")
-                self.speak("I'm having trouble connecting to the speech recognition service.")
-                return None
-            finally:
-                print("=== LISTENING ENDED ===\n")
-
-    def load_applicant_data(self, file_path='applicant_data_structured.json'):
-        """Load applicant data from JSON file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return json.load(file)
-        except FileNotFoundError:
-            return {
-                "personal_information": {},
-                "identification": {},
-                "employment": {},
-                "financial": {},
-                "loan_request": {}
-            }
-
-    def save_applicant_data(self, file_path='applicant_data_structured.json'):
-        """Save updated applicant data to JSON file"""
+            return self.voice.listen(timeout=10, phrase_time_limit=30)
+        except ListenTimeout:
+            print("Listening timed out while waiting for speech.")
+            self.speak("I didn't hear anything. Let me ask again.")
+        except NotUnderstood:
+            print("Could not understand audio.")
+            self.speak("I couldn't understand what you said. Could you please repeat?")
+        except RecognitionUnavailable as e:
+            print(f"Could not request results; {e}")
+            self.speak("I'm having trouble connecting to the speech recognition service.")
+        return None
+
+    def think(self, user_input):
+        """Extract data from an answer on a worker thread, timed as the turn's 'think' stage"""
+        return self.voice.run('think', self.ai.handle_user_response, user_input, self.applicant_data)
+
+    def end_turn(self):
+        """Close the turn's timings and log each stage"""
+        turn = self.voice.timings.end_turn()
+        for stage, seconds in (turn or {}).items():
+            self.events.timing(stage, seconds)
+
+    def load_applicant_data(self):
+        """Load this applicant's data from the store"""
+        return load_or_migrate(self.store, self.applicant_id)
+
+    def save_applicant_data(self):
+        """Save the whole applicant record to the store in one transaction"""
         try:
-            with open(file_path, 'w', encoding='utf-8') as file:
-                json.dump(self.applicant_data, file, indent=2, ensure_ascii=False)
-            print(f"Applicant data saved to {file_path}")
+            self.store.save(self.applicant_id, self.applicant_data)
+            print(f"Applicant data saved for {self.applicant_id}")
         except Exception as e:
             print(f"Error saving applicant data: {e}")
 
@@ -131,17 +93,27 @@ class VoiceBasedChatbot:
         if not updates:
             return
 
-        for category, details in updates.items():
-            if category not in self.applicant_data:
-                self.applicant_data[category] = {}
+        # The record re-parses only the updated fields and keeps the missing-field mask current
+        self.record.update(updates)
 
-            if isinstance(details, dict):
-                for key, value in details.items():
-                    self.applicant_data[category][key] = value
+        # Persist just the answered fields every turn instead of rewriting the whole record
+        paths = updates_to_paths(updates)
+        for path, value in paths.items():
+            self.events.field_update(path, value)
+        try:
+            self.store.update(self.applicant_id, paths)
+        except Exception as e:
+            print(f"Error saving applicant data: {e}")
+
+    def warm_up(self):
+        """Start loading the Gemini SDK and the speech model on the voice workers; returns at once"""
+        self.voice.warm_up(getattr(self.ai, 'warm_up', None))
 
     def start_conversation(self):
         """Start the voice-based conversation"""
-        greeting = "Hello! I'm your AI loan assistant. Let's start your loan application using voice interaction. I'll make a sound and say 'Listening' when it's your turn to speak."
+        # Slow setup happens while the greeting is spoken
+        self.warm_up()
+        greeting = "Hello! I'm your AI loan assistant. Let's start your loan application using voice interaction. I'll beep when it's your turn to speak."
         self.speak(greeting)
 
         conversation_active = True
@@ -150,17 +122,19 @@ class VoiceBasedChatbot:
 
         while conversation_active and current_turn < max_turns:
             current_turn += 1
+            self.end_turn()
+            self.voice.timings.start_turn()
 
-            recent_history = "\n".join(self.conversation_history[-6:]) if self.conversation_history else ""
-            next_question = self.ai.get_next_question(self.applicant_data, recent_history)
+            recent_history = "\n".join(self.conversation_history)
 
-            # Ask the question via TTS
-            self.speak(next_question)
-            self.conversation_history.append(f"AI: {next_question}")
+            # Ask the question via TTS, starting with the first sentence while the rest streams in;
+            # the microphone is prepared in the background meanwhile
+            next_question = self.speak_stream(self.ai.stream_next_question(self.applicant_data, recent_history))
+            self.events.utterance("AI", next_question)
 
             # Get user's voice response
             user_input = self.listen()
-            
+
             if not user_input:
                 # Already handled in listen() method with appropriate messages
                 current_turn -= 1  # Retry this turn again without incrementing count
@@ -170,20 +144,24 @@ class VoiceBasedChatbot:
                 conversation_active = False
                 break
 
-            self.conversation_history.append(f"User: {user_input}")
+            self.events.utterance("User", user_input)
 
             try:
-                response_data = self.ai.handle_user_response(user_input, self.applicant_data)
+                start = time.perf_counter()
+                response_data = self.think(user_input)
+                self.events.model_reply("extraction", json.dumps(response_data), time.perf_counter() - start)
 
                 if response_data.get("needs_clarification", False):
                     clarification_question = response_data.get("clarification_question", "Could you please clarify?")
                     self.speak(clarification_question)
+                    self.events.utterance("AI", clarification_question)
                     
                     # Get clarification with audio cue
                     clarification_response = self.listen()
 
                     if clarification_response:
-                        clarification_data = self.ai.handle_user_response(clarification_response, self.applicant_data)
+                        self.events.utterance("User", clarification_response, clarification=True)
+                        clarification_data = self.think(clarification_response)
                         if "data_updates" in clarification_data:
                             self.update_applicant_data(clarification_data["data_updates"])
 
@@ -196,21 +174,16 @@ class VoiceBasedChatbot:
 
             # Periodically check eligibility after every 5 turns
             if current_turn % 5 == 0:
-                loan_info = self.applicant_data.get("loan_request", {})
-                financial_info = self.applicant_data.get("financial", {})
-
-                if loan_info.get("loan_amount") and financial_info.get("monthly_income"):
+                if self.record.get("loan_request.loan_amount") and self.record.get("employment.net_monthly_salary"):
                     self.speak("I have enough information to assess your loan eligibility now. Would you like to hear it?")
                     
                     # Listen for response with audio cue
                     eligibility_response = self.listen()
 
                     if eligibility_response and any(word in eligibility_response.lower() for word in ["yes", "sure", "okay"]):
-                        gemini_assessment = self.ai.assess_loan_eligibility(self.applicant_data)
-                        eligibility_result = self.eligibility_engine.check_eligibility(self.applicant_data)
-
-                        # Provide assessment via TTS
-                        self.speak(gemini_assessment)
+                        # Provide assessment via TTS as it is generated
+                        gemini_assessment = self.speak_stream(self.ai.stream_assessment(self.applicant_data))
+                        eligibility_result = self.eligibility_engine.check_eligibility(self.record)
 
                         # Ask to continue or end session
                         self.speak("Would you like to continue or end our session?")
@@ -221,14 +194,13 @@ class VoiceBasedChatbot:
                         if continue_response and any(word in continue_response.lower() for word in ["end", "stop", "finish"]):
                             conversation_active = False
 
-            # Save data periodically every 2 turns
-            if current_turn % 2 == 0:
-                self.save_applicant_data()
-
         # End of conversation handling
         closing_message = "Thank you for using our loan application service. Your details have been saved. Goodbye!"
         self.speak(closing_message)
         self.save_applicant_data()
+        self.end_turn()
+        self.voice.close()
+        self.events.close()
 
 if __name__ == "__main__":
     chatbot = VoiceBasedChatbot()
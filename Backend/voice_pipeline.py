@@ -0,0 +1,339 @@
+# voice_pipeline.py
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class ListenTimeout(Exception):
+    """No speech started before the listen timeout"""
+
+
+class NotUnderstood(Exception):
+    """Speech was captured but could not be turned into text"""
+
+
+class RecognitionUnavailable(Exception):
+    """The speech recognition service could not be reached"""
+
+
+class SpeechRecognitionMicrophone:
+    """Microphone backend over speech_recognition, kept open for the whole conversation.
+
+    Ambient noise is measured once, on the first prepare(); after that the recognizer's
+    dynamic energy threshold keeps adapting from the quiet frames of every listen.
+    """
+
+    def __init__(self, recognizer=None, calibration_seconds=1.0, device_index=None, sample_rate=None):
+        import speech_recognition as sr
+        self.recognizer = recognizer or sr.Recognizer()
+        self.recognizer.dynamic_energy_threshold = True
+        self.calibration_seconds = calibration_seconds
+        self.device_index = device_index
+        self.sample_rate = sample_rate
+        self.source = None
+        self.calibrated = False
+
+    def prepare(self):
+        """Open the input stream and calibrate, if not done already"""
+        if self.source is None:
+            import speech_recognition as sr
+            self.source = sr.Microphone(device_index=self.device_index, sample_rate=self.sample_rate).__enter__()
+        if not self.calibrated:
+            print("Adjusting for ambient noise, please wait...")
+            self.recognizer.adjust_for_ambient_noise(self.source, duration=self.calibration_seconds)
+            self.calibrated = True
+
+    def capture(self, timeout=10, phrase_time_limit=30):
+        import speech_recognition as sr
+        self.prepare()
+        try:
+            return self.recognizer.listen(self.source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+        except sr.WaitTimeoutError:
+            raise ListenTimeout()
+
+    def capture_stream(self, timeout=10, phrase_time_limit=30):
+        """Yield the phrase as 16-bit PCM chunks while it is being spoken, starting with the lead-in before speech"""
+        import speech_recognition as sr
+        self.prepare()
+        sample_rate = self.sample_rate or self.source.SAMPLE_RATE
+        try:
+            for chunk in self.recognizer.listen(self.source, timeout=timeout, phrase_time_limit=phrase_time_limit,
+                                                stream=True):
+                yield chunk.get_raw_data(convert_rate=sample_rate, convert_width=2)
+        except sr.WaitTimeoutError:
+            raise ListenTimeout()
+
+    def close(self):
+        if self.source is not None:
+            self.source.__exit__(None, None, None)
+            self.source = None
+
+
+class GoogleRecognizer:
+    """Speech-to-text backend using the Google Web Speech API"""
+
+    def __init__(self, recognizer=None):
+        import speech_recognition as sr
+        self.recognizer = recognizer or sr.Recognizer()
+
+    def recognize(self, audio):
+        import speech_recognition as sr
+        try:
+            return self.recognizer.recognize_google(audio)
+        except sr.UnknownValueError:
+            raise NotUnderstood()
+        except sr.RequestError as e:
+            raise RecognitionUnavailable(str(e))
+
+
+def create_recognizer(backend=None):
+    """Speech-to-text backend named by `backend` (or SPEECH_RECOGNIZER): 'vosk' or 'google'.
+
+    Unset, the on-device Vosk backend is used when its model is installed, Google otherwise.
+    """
+    backend = (backend or os.getenv("SPEECH_RECOGNIZER", "")).lower()
+    if backend in ('', 'vosk'):
+        from offline_recognition import VoskRecognizer, model_available
+        if backend == 'vosk' or model_available():
+            return VoskRecognizer()
+    return GoogleRecognizer()
+
+
+class Pyttsx3Speaker:
+    """Text-to-speech backend using pyttsx3, with winsound beeps on Windows"""
+
+    def __init__(self, rate=200, volume=0.9):
+        self.rate = rate
+        self.volume = volume
+        self._engine = None
+
+    @property
+    def engine(self):
+        # The driver and its voice list load on the first sentence spoken, not when the chatbot is built
+        if self._engine is None:
+            import pyttsx3
+            engine = pyttsx3.init()
+            engine.setProperty('rate', self.rate)
+            engine.setProperty('volume', self.volume)
+            voices = engine.getProperty('voices')
+            engine.setProperty('voice', voices[0].id)
+            self._engine = engine
+        return self._engine
+
+    def warm_up(self):
+        return self.engine
+
+    def say(self, text):
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def beep(self, frequency, milliseconds):
+        try:
+            import winsound
+            winsound.Beep(frequency, milliseconds)
+        except (ImportError, RuntimeError):
+            pass
+
+
+class TurnTimings:
+    """Wall time of each stage, per conversation turn"""
+
+    def __init__(self):
+        self.turns = []
+        self.current = None
+        self.turn_start = None
+        self.lock = threading.Lock()
+
+    def start_turn(self):
+        self.end_turn()
+        self.current = defaultdict(float)
+        self.turn_start = time.perf_counter()
+
+    def end_turn(self):
+        """Close the current turn and return its stage times, or None if no turn was open"""
+        if self.current is None:
+            return None
+        self.current['total'] = time.perf_counter() - self.turn_start
+        turn = dict(self.current)
+        self.turns.append(turn)
+        self.current = None
+        return turn
+
+    def add(self, stage, seconds):
+        if self.current is not None:
+            with self.lock:
+                self.current[stage] += seconds
+
+    def mark(self, stage):
+        """Record the time since the turn started, once per turn"""
+        if self.current is not None and stage not in self.current:
+            self.current[stage] = time.perf_counter() - self.turn_start
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def report(self):
+        """Mean and 95th percentile per stage, in milliseconds"""
+        stages = defaultdict(list)
+        for turn in self.turns:
+            for stage, seconds in turn.items():
+                stages[stage].append(seconds)
+        report = {}
+        for stage, values in stages.items():
+            values.sort()
+            report[stage] = {
+                'mean_ms': round(sum(values) / len(values) * 1000, 1),
+                'p95_ms': round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 1)
+            }
+        return report
+
+
+class VoicePipeline:
+    """Speaks, listens and recognizes with the stages overlapped on worker threads.
+
+    While a question is spoken, the microphone is prepared (opened and, the first time,
+    calibrated) on a worker, and later sentences of the question are still being generated.
+    Recognition runs on a worker while the end-of-speech cue plays, and blocking model
+    calls can be handed to run(). Cues are short beeps; the spoken "Listening" is optional.
+
+    When the recognizer can decode a stream (start_stream()) and the microphone can
+    deliver one (capture_stream()), chunks are decoded on a worker as they are captured,
+    leaving only the last few hundred milliseconds to decode after the applicant stops.
+    """
+
+    def __init__(self, microphone, recognizer, speaker, spoken_cue=False, workers=3):
+        self.microphone = microphone
+        self.recognizer = recognizer
+        self.speaker = speaker
+        self.spoken_cue = spoken_cue
+        self.streaming = hasattr(recognizer, 'start_stream') and hasattr(microphone, 'capture_stream')
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='voice')
+        self.timings = TurnTimings()
+        self._prepared = None
+
+    def _prepare_microphone(self):
+        if self._prepared is None:
+            self._prepared = self.executor.submit(self.microphone.prepare)
+
+    def speak(self, text):
+        print(f"AI: {text}")
+        self._prepare_microphone()
+        self.timings.mark('first_audio')
+        with self.timings.stage('speak'):
+            self.speaker.say(text)
+
+    def speak_stream(self, sentences):
+        """Speak each sentence as soon as it is complete while later ones are still being generated.
+
+        Returns the full text spoken.
+        """
+        pending = queue.Queue()
+
+        def produce():
+            try:
+                for sentence in sentences:
+                    pending.put(sentence)
+            except Exception as e:
+                pending.put(e)
+            finally:
+                pending.put(None)
+
+        threading.Thread(target=produce, daemon=True).start()
+
+        spoken = []
+        while True:
+            with self.timings.stage('generate_wait'):
+                sentence = pending.get()
+            if sentence is None:
+                break
+            if isinstance(sentence, Exception):
+                raise sentence
+            self.speak(sentence)
+            spoken.append(sentence)
+        return " ".join(spoken)
+
+    def cue(self, frequency=1000, milliseconds=150):
+        """Play a cue without holding up the caller"""
+        self.executor.submit(self.speaker.beep, frequency, milliseconds)
+
+    def listen(self, timeout=10, phrase_time_limit=30):
+        """Capture one answer and return its text; raises ListenTimeout, NotUnderstood or RecognitionUnavailable"""
+        self._prepare_microphone()
+        with self.timings.stage('prepare_wait'):
+            prepared, self._prepared = self._prepared, None
+            prepared.result()
+
+        print("\n=== LISTENING NOW ===")
+        if self.spoken_cue:
+            self.speaker.beep(1000, 150)
+            self.speaker.say("Listening")
+        else:
+            self.cue(1000, 150)
+        try:
+            if self.streaming:
+                text = self._listen_streaming(timeout, phrase_time_limit)
+            else:
+                with self.timings.stage('listen'):
+                    audio = self.microphone.capture(timeout=timeout, phrase_time_limit=phrase_time_limit)
+                self.cue(800, 150)
+                print("Processing audio...")
+                with self.timings.stage('recognize'):
+                    text = self.executor.submit(self.recognizer.recognize, audio).result()
+            print(f"You said: {text}")
+            return text
+        finally:
+            print("=== LISTENING ENDED ===\n")
+
+    def _listen_streaming(self, timeout, phrase_time_limit):
+        stream = self.recognizer.start_stream()
+        chunks = queue.Queue()
+
+        def decode():
+            # Decoding off the capture thread, so a slow chunk never makes the microphone drop audio
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    return stream.finish()
+                stream.accept(chunk)
+
+        decoded = self.executor.submit(decode)
+        try:
+            with self.timings.stage('listen'):
+                for chunk in self.microphone.capture_stream(timeout=timeout, phrase_time_limit=phrase_time_limit):
+                    chunks.put(chunk)
+        finally:
+            chunks.put(None)
+        self.cue(800, 150)
+        with self.timings.stage('recognize'):
+            text = decoded.result()
+        if not text:
+            raise NotUnderstood()
+        return text
+
+    def warm_up(self, *functions):
+        """Open the microphone, and load the recognizer and anything else in `functions`, on workers without waiting"""
+        self._prepare_microphone()
+        for function in (getattr(self.recognizer, 'warm_up', None),) + functions:
+            if function is not None:
+                self.executor.submit(function)
+
+    def run(self, stage, function, *args, **kwargs):
+        """Run a blocking call (a model request, say) on a worker, timed as `stage`"""
+        with self.timings.stage(stage):
+            return self.executor.submit(function, *args, **kwargs).result()
+
+    def close(self):
+        self.timings.end_turn()
+        self.executor.shutdown(wait=True)
+        close = getattr(self.microphone, 'close', None)
+        if close is not None:
+            close()
@@ -0,0 +1,63 @@
+# bench_affordability.py
+# Times solve_affordability_batch over a synthetic customer base and checks a sample
+# of the solutions against check_eligibility.
+# Run from the repository root: python benchmarks/bench_affordability.py [customers]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from bench_batch_eligibility import as_applicant, random_book
+from loan_eligibility import LoanEligibilityEngine
+
+# Factors of the default rules that depend on the loan amount, and on the loan term
+AMOUNT_FACTORS = ("Loan amount too high relative to property value", "EMI would be too high relative to income")
+TERM_FACTORS = ("EMI would be too high relative to income",)
+
+
+def passes(engine, applicant, factors):
+    return not any(factor in factors for factor in engine.check_eligibility(applicant)['factors'])
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    engine = LoanEligibilityEngine()
+    columns = random_book(size)
+
+    start = time.perf_counter()
+    solution = engine.solve_affordability_batch(columns)
+    seconds = time.perf_counter() - start
+
+    max_loan = solution['max_loan_amount']
+    min_term = solution['min_loan_term']
+    print(f"customers:             {size:,}")
+    print(f"solve time:            {seconds:.3f}s ({size / seconds:,.0f}/s)")
+    print(f"with a passing amount: {np.isfinite(max_loan).mean():.1%}")
+    print(f"with a passing term:   {np.isfinite(min_term).mean():.1%}")
+
+    # The solved amount and term must pass the rules that depend on them, and one unit
+    # more (or one year less) must not
+    errors = 0
+    sample = np.random.default_rng(1).choice(size, min(size, 2000), replace=False)
+    for i in sample:
+        applicant = as_applicant(columns, i)
+        if np.isfinite(max_loan[i]):
+            applicant['loan_request']['loan_amount'] = int(max_loan[i])
+            errors += not passes(engine, applicant, AMOUNT_FACTORS)
+            applicant['loan_request']['loan_amount'] = int(max_loan[i]) + 1
+            errors += passes(engine, applicant, AMOUNT_FACTORS)
+        applicant = as_applicant(columns, i)
+        if np.isfinite(min_term[i]):
+            applicant['loan_request']['loan_term'] = int(min_term[i])
+            errors += not passes(engine, applicant, TERM_FACTORS)
+            if min_term[i] > 1:
+                applicant['loan_request']['loan_term'] = int(min_term[i]) - 1
+                errors += passes(engine, applicant, TERM_FACTORS)
+    print(f"sample errors:         {errors} of {len(sample)} checked")
+
+
+if __name__ == '__main__':
+    main()
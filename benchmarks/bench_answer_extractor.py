@@ -0,0 +1,88 @@
+# bench_answer_extractor.py
+# Runs the local answer extractor over a corpus of recorded answers and reports the
+# fast-path hit rate, accuracy against the labelled updates and the Gemini latency saved
+# by replaying the corpus through AsyncGeminiSession against the fake server.
+# Run from the repository root: python benchmarks/bench_answer_extractor.py [latency]
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from async_gemini import AsyncGeminiClient
+from fake_gemini_server import FakeGeminiServer
+from gemini_integration import GeminiAI
+from gemini_session import AsyncGeminiSession
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'utterances.jsonl')
+
+
+def load_corpus(path=CORPUS_PATH):
+    """Each entry is an answer, the fields already filled when it was given and the expected updates"""
+    corpus = []
+    with open(path) as f:
+        for line in f:
+            entry = json.loads(line)
+            applicant_data = {}
+            for field_path in entry['filled']:
+                category, field = field_path.split('.')
+                applicant_data.setdefault(category, {})[field] = 1
+            corpus.append((entry['utterance'], applicant_data, entry['expected']))
+    return corpus
+
+
+async def replay(server, corpus, fast_path):
+    async with AsyncGeminiClient(api_key='fake', base_url=server.base_url) as client:
+        session = AsyncGeminiSession(client, fast_path=fast_path)
+        requests_before = server.requests
+        start = time.perf_counter()
+        for utterance, applicant_data, _ in corpus:
+            await session.handle_user_response(utterance, applicant_data)
+        return time.perf_counter() - start, server.requests - requests_before
+
+
+async def run(latency):
+    corpus = load_corpus()
+
+    hits = correct = wrong = 0
+    for utterance, applicant_data, expected in corpus:
+        result = GeminiAI.extract_locally(utterance, applicant_data)
+        if result is None:
+            continue
+        hits += 1
+        if result['data_updates'] == expected:
+            correct += 1
+        else:
+            wrong += 1
+            print(f"  wrong: {utterance!r} -> {result['data_updates']}, expected {expected}")
+    labelled = sum(expected is not None for _, _, expected in corpus)
+
+    rounds = 200
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for utterance, applicant_data, _ in corpus:
+            GeminiAI.extract_locally(utterance, applicant_data)
+    per_answer = (time.perf_counter() - start) / (rounds * len(corpus))
+
+    print(f"answers:               {len(corpus)} ({labelled} answerable locally by label)")
+    print(f"fast-path hits:        {hits} ({hits / len(corpus):.0%}), {correct} correct, {wrong} wrong")
+    print(f"local extraction:      {per_answer * 1e6:.1f} us per answer")
+
+    async with FakeGeminiServer(latency=latency) as server:
+        gemini_seconds, gemini_requests = await replay(server, corpus, fast_path=False)
+        fast_seconds, fast_requests = await replay(server, corpus, fast_path=True)
+    print(f"Gemini only:           {gemini_seconds:.2f}s, {gemini_requests} requests at {latency * 1000:.0f} ms")
+    print(f"with fast path:        {fast_seconds:.2f}s, {fast_requests} requests ({gemini_seconds - fast_seconds:.2f}s saved)")
+    return wrong
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    # A wrong local answer is worse than none, so any fails the run
+    sys.exit(1 if asyncio.run(run(latency)) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# bench_applicant_schema.py
+# Times the per-turn applicant data work the conversation does: an update followed by a
+# completeness check and the list of missing fields, with the original string-splitting
+# dict walks against ApplicantRecord's compiled accessors and incremental bitmask. Also
+# times check_eligibility on plain data against a record's parsed values, and fuzzes
+# random update sequences to check the bitmask never drifts from a full re-scan.
+# Run from the repository root: python benchmarks/bench_applicant_schema.py [turns]
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from applicant_schema import APPLICANT_SCHEMA, REQUIRED_FIELDS, ApplicantRecord, missing_mask
+from applicant_store import empty_applicant_data
+from loan_eligibility import LoanEligibilityEngine
+
+SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend', 'applicant_data_structured.json')
+
+
+class LegacyManager:
+    """DynamicConversationManager's original field handling"""
+
+    def __init__(self, applicant_data):
+        self.applicant_data = applicant_data
+        self.required_fields = list(REQUIRED_FIELDS)
+
+    def is_data_complete(self):
+        for field in self.required_fields:
+            keys = field.split('.')
+            data = self.applicant_data
+            for key in keys:
+                data = data.get(key, None)
+                if data is None:
+                    return False
+        return True
+
+    def get_missing_fields(self):
+        missing_fields = []
+        for field in self.required_fields:
+            keys = field.split('.')
+            data = self.applicant_data
+            for key in keys:
+                data = data.get(key, None)
+                if data is None:
+                    missing_fields.append(field)
+                    break
+        return missing_fields
+
+    def update_applicant_data(self, field, value):
+        keys = field.split('.')
+        data = self.applicant_data
+        for key in keys[:-1]:
+            if key not in data:
+                data[key] = {}
+            data = data[key]
+        data[keys[-1]] = value
+
+
+def answers(count, seed=0):
+    rng = random.Random(seed)
+    values = {'int': lambda: str(rng.randrange(1, 10 ** 6)), 'years': lambda: f"{rng.randrange(1, 30)} years",
+              'float': lambda: f"{rng.uniform(6, 14):.2f}%", 'text': lambda: rng.choice(["Male", "Female", "1990-01-01"])}
+    for _ in range(count):
+        field = rng.choice(APPLICANT_SCHEMA)
+        # Now and then an answer is retracted
+        yield field.path, (None if rng.random() < 0.1 else values[field.kind]())
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    updates = list(answers(turns))
+
+    legacy = LegacyManager(empty_applicant_data())
+    start = time.perf_counter()
+    for path, value in updates:
+        legacy.update_applicant_data(path, value)
+        if not legacy.is_data_complete():
+            legacy.get_missing_fields()
+    legacy_seconds = time.perf_counter() - start
+
+    record = ApplicantRecord()
+    start = time.perf_counter()
+    for path, value in updates:
+        record.set(path, value)
+        if not record.is_complete():
+            record.missing_fields()
+    record_seconds = time.perf_counter() - start
+    print(f"turns:                 {turns:,} (update, completeness check, missing fields)")
+    print(f"dict walks:            {legacy_seconds / turns * 1e6:.2f} us per turn")
+    print(f"ApplicantRecord:       {record_seconds / turns * 1e6:.2f} us per turn ({legacy_seconds / record_seconds:.1f}x)")
+
+    # The incremental mask must always equal a full re-scan of the data
+    drift = 0
+    for seed in range(200):
+        record = ApplicantRecord()
+        for path, value in answers(50, seed):
+            record.set(path, value)
+            drift += record.missing_mask != missing_mask(record.data)
+    print(f"bitmask drift:         {drift} of 10,000 fuzzed updates")
+
+    engine = LoanEligibilityEngine()
+    with open(SEED_PATH, encoding='utf-8') as file:
+        seed_data = json.load(file)
+    seed_data['financial'].update(credit_score=760, monthly_expenses=40000)
+    record = ApplicantRecord(seed_data)
+    count = 20000
+    start = time.perf_counter()
+    for _ in range(count):
+        plain = engine.check_eligibility(seed_data)
+    plain_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(count):
+        parsed = engine.check_eligibility(record)
+    record_seconds = time.perf_counter() - start
+    print(f"check_eligibility:     plain data {plain_seconds / count * 1e6:.1f} us, record {record_seconds / count * 1e6:.1f} us, "
+          f"same result: {plain == parsed} ({parsed['status']})")
+
+
+if __name__ == '__main__':
+    main()
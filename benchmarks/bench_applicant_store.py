@@ -0,0 +1,162 @@
+# bench_applicant_store.py
+# Runs 1,000 concurrent applicant sessions that each answer a series of questions and save
+# after every turn, as the voice bot does. Compares the original save (every session
+# rewrites one shared applicant_data_structured.json with indent=2) with the JSON-file and
+# SQLite applicant stores, and reports saves per second, save latency, torn reads seen by
+# concurrent readers and how many sessions' data survived intact.
+# Run from the repository root: python benchmarks/bench_applicant_store.py [sessions] [turns] [threads]
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from applicant_store import JSONFileApplicantStore, SQLiteApplicantStore, set_path
+
+SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend', 'applicant_data_structured.json')
+
+ANSWER_FIELDS = [
+    ('financial.credit_score', lambda rng: rng.randrange(300, 900)),
+    ('employment.net_monthly_salary', lambda rng: rng.randrange(20000, 300000)),
+    ('financial.monthly_expenses', lambda rng: rng.randrange(5000, 100000)),
+    ('employment.work_experience', lambda rng: rng.randrange(0, 30)),
+    ('loan_request.loan_amount', lambda rng: rng.randrange(100000, 10000000)),
+    ('loan_request.loan_term', lambda rng: rng.randrange(1, 30)),
+    ('loan_request.interest_rate', lambda rng: round(rng.uniform(7, 14), 2)),
+    ('loan_request.property_value', lambda rng: rng.randrange(500000, 50000000)),
+]
+
+
+def session_answers(session, turns):
+    rng = random.Random(session)
+    return [(path, make(rng)) for path, make in (ANSWER_FIELDS[i % len(ANSWER_FIELDS)] for i in range(turns))]
+
+
+def seed_record(session):
+    with open(SEED_PATH, encoding='utf-8') as file:
+        data = json.load(file)
+    data['personal_information']['applicant_name'] = f"Applicant {session}"
+    return data
+
+
+def legacy_session(path, session, turns, latencies):
+    """The original save: the whole record rewritten in place to the one shared file every turn"""
+    data = seed_record(session)
+    for field, value in session_answers(session, turns):
+        set_path(data, field, value)
+        start = time.perf_counter()
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=2, ensure_ascii=False)
+        latencies.append(time.perf_counter() - start)
+
+
+def store_session(store, session, turns, latencies):
+    """Field-level write-through, as the managers now save"""
+    applicant_id = f"applicant-{session}"
+    store.save(applicant_id, seed_record(session))
+    for field, value in session_answers(session, turns):
+        start = time.perf_counter()
+        store.update(applicant_id, {field: value})
+        latencies.append(time.perf_counter() - start)
+
+
+def expected_record(session, turns):
+    data = seed_record(session)
+    for field, value in session_answers(session, turns):
+        set_path(data, field, value)
+    return data
+
+
+def watch(read, stop, counts):
+    """Reader thread: count reads that fail to parse while writers are busy"""
+    while not stop.is_set():
+        try:
+            read()
+            counts['reads'] += 1
+        except (ValueError, FileNotFoundError):
+            counts['torn'] += 1
+        time.sleep(0.001)
+
+
+def run(label, session_task, read, sessions, turns, threads, verify):
+    latencies = []
+    counts = {'reads': 0, 'torn': 0}
+    stop = threading.Event()
+    reader = threading.Thread(target=watch, args=(read, stop, counts), daemon=True)
+    reader.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for future in [pool.submit(session_task, session, turns, latencies) for session in range(sessions)]:
+            future.result()
+    seconds = time.perf_counter() - start
+    stop.set()
+    reader.join()
+
+    latencies.sort()
+    intact = verify()
+    print(f"{label:<14} {len(latencies) / seconds:>9.0f} {latencies[len(latencies) // 2] * 1000:>8.2f} "
+          f"{latencies[int(len(latencies) * 0.99)] * 1000:>8.2f} {counts['torn']:>6}/{counts['reads'] + counts['torn']:<6} "
+          f"{intact:>6}/{sessions}")
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    turns = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 64
+    print(f"{sessions} sessions x {turns} saves, {threads} threads, {os.cpu_count()} cores")
+    print(f"{'store':<14} {'saves/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'torn reads':>13} {'intact':>13}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        shared = os.path.join(directory, 'applicant_data_structured.json')
+
+        def read_shared():
+            with open(shared, encoding='utf-8') as file:
+                json.load(file)
+
+        def verify_shared():
+            # Every session wrote the same file, so at most the last writer's data is left
+            try:
+                with open(shared, encoding='utf-8') as file:
+                    data = json.load(file)
+            except ValueError:
+                return 0
+            return sum(data == expected_record(session, turns) for session in range(sessions))
+
+        run('shared file', lambda session, turns, latencies: legacy_session(shared, session, turns, latencies),
+            read_shared, sessions, turns, threads, verify_shared)
+
+        for label, store in (('JSON files', JSONFileApplicantStore(os.path.join(directory, 'applicants'))),
+                             ('SQLite WAL', SQLiteApplicantStore(os.path.join(directory, 'applicants.db')))):
+            def read_store(store=store):
+                store.load(f"applicant-{random.randrange(sessions)}")
+
+            def verify_store(store=store):
+                return sum(store.load(f"applicant-{session}") == expected_record(session, turns) for session in range(sessions))
+
+            run(label, lambda session, turns, latencies, store=store: store_session(store, session, turns, latencies),
+                read_store, sessions, turns, threads, verify_store)
+
+        # Bulk export and re-import of every record
+        store = SQLiteApplicantStore(os.path.join(directory, 'applicants.db'))
+        buffer = io.StringIO()
+        start = time.perf_counter()
+        exported = store.export_jsonl(buffer)
+        export_seconds = time.perf_counter() - start
+        buffer.seek(0)
+        imported_store = SQLiteApplicantStore(os.path.join(directory, 'imported.db'))
+        start = time.perf_counter()
+        imported = imported_store.import_jsonl(buffer)
+        import_seconds = time.perf_counter() - start
+        same = all(imported_store.load(f"applicant-{session}") == store.load(f"applicant-{session}") for session in range(sessions))
+        print(f"bulk export:   {exported} records in {export_seconds * 1000:.0f} ms ({len(buffer.getvalue()) / 2 ** 20:.1f} MB JSON lines)")
+        print(f"bulk import:   {imported} records in {import_seconds * 1000:.0f} ms, identical: {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# bench_async_gemini.py
+# Runs the async Gemini client against the local fake server: blocking requests one at a
+# time versus concurrent fan-out over the pooled session, retries on injected 503s, and the
+# concurrent final assessment.
+# Run from the repository root: python benchmarks/bench_async_gemini.py [requests] [latency]
+import asyncio
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from applicant_schema import ApplicantRecord
+from async_gemini import AsyncGeminiAI, AsyncGeminiClient
+from conversation_manager import DynamicConversationManager
+from fake_gemini_server import FakeGeminiServer
+from loan_eligibility import LoanEligibilityEngine
+
+SAMPLE_APPLICANT = {
+    'financial': {'credit_score': 750, 'monthly_expenses': 40000},
+    'employment': {'net_monthly_salary': 150000, 'work_experience': 8},
+    'loan_request': {'loan_amount': 1000000, 'loan_term': 5, 'interest_rate': 9.2, 'property_value': 1500000}
+}
+
+
+def blocking_requests(base_url, count):
+    """One synchronous round trip after another, like a web worker calling chat.send_message"""
+    with requests.Session() as session:
+        for i in range(count):
+            response = session.post(
+                f"{base_url}/models/gemini-2.0-flash:generateContent",
+                params={'key': 'fake'},
+                json={'contents': [{'role': 'user', 'parts': [{'text': f"question {i}"}]}]}
+            )
+            response.raise_for_status()
+
+
+async def run(count, latency):
+    async with FakeGeminiServer(latency=latency) as server:
+        start = time.perf_counter()
+        await asyncio.to_thread(blocking_requests, server.base_url, count)
+        blocking = time.perf_counter() - start
+
+        async with AsyncGeminiClient(api_key='fake', base_url=server.base_url, max_concurrency=32) as client:
+            server.max_in_flight = 0
+            start = time.perf_counter()
+            replies = await client.generate_many([f"question {i}" for i in range(count)])
+            concurrent = time.perf_counter() - start
+            assert len(replies) == count and all(replies)
+            max_in_flight = server.max_in_flight
+
+        print(f"requests:              {count} at {latency * 1000:.0f} ms simulated latency")
+        print(f"blocking, sequential:  {blocking:.2f}s")
+        print(f"async fan-out:         {concurrent:.2f}s ({blocking / concurrent:.1f}x, peak {max_in_flight} in flight)")
+
+    # Every third request fails with 503 and must be retried transparently
+    async with FakeGeminiServer(latency=0.01, fail_every=3) as server:
+        async with AsyncGeminiClient(api_key='fake', base_url=server.base_url, backoff_base=0.01, max_retries=5) as client:
+            replies = await client.generate_many([f"question {i}" for i in range(30)])
+            assert len(replies) == 30
+        print(f"retries:               30 requests succeeded with {server.failures} injected 503s")
+
+    # The Gemini assessment overlaps the local eligibility check
+    async with FakeGeminiServer(latency=latency) as server:
+        async with AsyncGeminiClient(api_key='fake', base_url=server.base_url) as client:
+            manager = DynamicConversationManager.__new__(DynamicConversationManager)
+            manager.eligibility_engine = LoanEligibilityEngine()
+            manager.record = ApplicantRecord(SAMPLE_APPLICANT)
+            manager.applicant_data = manager.record.data
+            start = time.perf_counter()
+            report = await manager.provide_final_assessment_async(AsyncGeminiAI(client))
+            assert report.startswith("Loan Eligibility Report")
+            print(f"final assessment:      {time.perf_counter() - start:.2f}s over {server.requests} Gemini requests")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    asyncio.run(run(count, latency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# bench_batch_eligibility.py
+# Compares the per-applicant check_eligibility loop with check_eligibility_batch.
+# Run from the repository root: python benchmarks/bench_batch_eligibility.py [applicants]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from loan_eligibility import LoanEligibilityEngine
+
+
+def random_book(size, seed=7):
+    """Generate a synthetic loan book as float columns"""
+    rng = np.random.default_rng(seed)
+    return {
+        'credit_score': rng.integers(550, 850, size).astype(np.float64),
+        'net_monthly_salary': rng.integers(20000, 300000, size).astype(np.float64),
+        'monthly_expenses': rng.integers(5000, 150000, size).astype(np.float64),
+        'work_experience': rng.integers(0, 30, size).astype(np.float64),
+        'loan_amount': rng.integers(100000, 10000000, size).astype(np.float64),
+        'loan_term': rng.integers(1, 30, size).astype(np.float64),
+        'interest_rate': rng.choice([7.5, 8.25, 8.75, 9.2, 10.5, 12.0], size),
+        'property_value': rng.integers(200000, 15000000, size).astype(np.float64)
+    }
+
+
+def as_applicant(columns, i):
+    """Rebuild a nested applicant dict for the scalar path"""
+    def value(name):
+        return columns[name][i] if name == 'interest_rate' else int(columns[name][i])
+    return {
+        'financial': {'credit_score': value('credit_score'), 'monthly_expenses': value('monthly_expenses')},
+        'employment': {'net_monthly_salary': value('net_monthly_salary'), 'work_experience': value('work_experience')},
+        'loan_request': {name: value(name) for name in ('loan_amount', 'loan_term', 'interest_rate', 'property_value')}
+    }
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    engine = LoanEligibilityEngine()
+    columns = random_book(size)
+    applicants = [as_applicant(columns, i) for i in range(size)]
+
+    start = time.perf_counter()
+    scalar_results = [engine.check_eligibility(applicant) for applicant in applicants]
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = engine.check_eligibility_batch(columns)
+    batch_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for i, result in enumerate(scalar_results) if batch.to_result(i) != result)
+
+    print(f"applicants:          {size}")
+    print(f"check_eligibility:   {scalar_seconds:.3f}s ({size / scalar_seconds:,.0f}/s)")
+    print(f"batch:               {batch_seconds:.3f}s ({size / batch_seconds:,.0f}/s)")
+    print(f"speedup:             {scalar_seconds / batch_seconds:.1f}x")
+    print(f"mismatched results:  {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+# bench_camera_stream.py
+# Streams a synthetic 30 fps camera to 1, 5 and 20 simulated /video_feed viewers, with the
+# original per-viewer generate_frames loop and with the shared FrameBroadcaster, and
+# reports per-viewer fps and CPU use. Then splits 20 viewers across the high, medium and low
+# stream tiers and reports per-tier fps, encode time and bandwidth.
+# Run from the repository root: python benchmarks/bench_camera_stream.py [seconds]
+import os
+import sys
+import threading
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import camera
+from synthetic_camera import SyntheticCamera
+
+VIEWER_COUNTS = (1, 5, 20)
+
+
+def legacy_generate_frames(cap, lock):
+    """camera.generate_frames before the capture thread: every viewer reads, detects and encodes"""
+    tracker = camera.FaceTracker(camera.get_detector())
+    while True:
+        with lock:
+            ret, frame = cap.read()
+        if not ret:
+            continue
+        yield camera.process_frame(frame, tracker)
+
+
+def measure(streams, seconds, snapshot=None):
+    """Consume each stream on its own thread; returns (frames per viewer, CPU cores used) and,
+    with `snapshot`, what it returned while the streams were still being watched"""
+    counts = [0] * len(streams)
+    stop = threading.Event()
+
+    def view(i, stream):
+        for _ in stream:
+            counts[i] += 1
+            if stop.is_set():
+                break
+        stream.close()
+
+    threads = [threading.Thread(target=view, args=(i, stream), daemon=True) for i, stream in enumerate(streams)]
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    watched = snapshot() if snapshot else None
+    stop.set()
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    for thread in threads:
+        thread.join(timeout=2)
+    if snapshot:
+        return [count / wall for count in counts], cpu / wall, watched
+    return [count / wall for count in counts], cpu / wall
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    print(f"synthetic camera:      640x480 at 30 fps, {seconds:.0f}s per run, {os.cpu_count()} cores")
+    print(f"{'viewers':>7} {'mode':>12} {'fps/viewer':>11} {'min fps':>8} {'CPU cores':>10}")
+    for viewers in VIEWER_COUNTS:
+        source, lock = SyntheticCamera(), threading.Lock()
+        fps, cpu = measure([legacy_generate_frames(source, lock) for _ in range(viewers)], seconds)
+        print(f"{viewers:>7} {'per-viewer':>12} {sum(fps) / viewers:>11.1f} {min(fps):>8.1f} {cpu:>10.2f}")
+
+        broadcaster = camera.FrameBroadcaster(SyntheticCamera())
+        fps, cpu = measure([broadcaster.frames() for _ in range(viewers)], seconds)
+        broadcaster.stop()
+        print(f"{viewers:>7} {'broadcaster':>12} {sum(fps) / viewers:>11.1f} {min(fps):>8.1f} {cpu:>10.2f}")
+
+    # Mixed tiers: each tier is encoded once per frame at its own rate, whatever its viewer count
+    broadcaster = camera.FrameBroadcaster(SyntheticCamera())
+    tiers = list(camera.STREAM_TIERS.values())
+    streams = [broadcaster.frames(tiers[i % len(tiers)]) for i in range(20)]
+    # Tier stats are dropped with their last viewer, so they are read while the streams run
+    fps, cpu, tier_reports = measure(streams, seconds, broadcaster.tier_stats)
+    broadcaster.stop()
+    print(f"20 viewers across {len(tiers)} tiers: {cpu:.2f} CPU cores")
+    print(f"{'tier':>20} {'viewers':>8} {'fps/viewer':>11} {'encodes/s':>10} {'encode ms':>10} {'KB/frame':>9}")
+    for name, tier in camera.STREAM_TIERS.items():
+        report = tier_reports[camera.tier_name(tier)]
+        tier_fps = [f for i, f in enumerate(fps) if tiers[i % len(tiers)] == tier]
+        print(f"{name + ' ' + camera.tier_name(tier):>20} {len(tier_fps):>8} {sum(tier_fps) / len(tier_fps):>11.1f} "
+              f"{report['encoded_fps']:>10.1f} {report['avg_encode_ms']:>10.2f} {report['avg_frame_kb']:>9.1f}")
+
+    # A camera that stops delivering must not spin a core
+    broadcaster = camera.FrameBroadcaster(SyntheticCamera(fail_after=0))
+    cpu_start = time.process_time()
+    broadcaster.start()
+    time.sleep(2)
+    broadcaster.stop()
+    print(f"failed camera:         {broadcaster.read_failures} reads in 2s, {(time.process_time() - cpu_start) / 2:.3f} CPU cores")
+
+    # With nobody watching, the capture thread stops and lets go of the camera
+    opened = []
+
+    def open_synthetic_camera():
+        opened.append(SyntheticCamera())
+        return opened[-1]
+
+    broadcaster = camera.FrameBroadcaster(open_capture=open_synthetic_camera, idle_timeout=1.0)
+    broadcaster.latest_frame()
+    start = time.perf_counter()
+    while broadcaster.capturing:
+        time.sleep(0.01)
+    idle_seconds = time.perf_counter() - start
+    cpu_start = time.process_time()
+    time.sleep(1)
+    print(f"idle camera:           released after {idle_seconds:.1f}s, then {time.process_time() - cpu_start:.3f} CPU cores; "
+          f"next frame request reopens it: {broadcaster.latest_frame() is not None and len(opened) == 2}")
+    broadcaster.stop()
+
+    # Viewers of a camera that never delivers, or whose frames all fail to encode, are let go
+    # after the frame timeout instead of holding their worker threads forever
+    for label, broadcaster in (("silent camera", camera.FrameBroadcaster(SyntheticCamera(fail_after=0), frame_timeout=1.0)),
+                               ("failing annotate", camera.FrameBroadcaster(SyntheticCamera(), annotate=lambda frame: 1 / 0,
+                                                                            frame_timeout=1.0))):
+        start = time.perf_counter()
+        sent = sum(1 for _ in broadcaster.frames())
+        broadcaster.stop()
+        print(f"{label + ':':<22} viewer released after {time.perf_counter() - start:.1f}s, {sent} frames, "
+              f"{broadcaster.frame_errors} frame errors")
+
+
+if __name__ == '__main__':
+    cv2.setNumThreads(1)
+    main()
@@ -0,0 +1,155 @@
+# bench_chat_server.py
+# Runs Backend/chat_server.py in its own process against the fake Gemini server, then holds
+# N concurrent applicant sessions open over WebSockets. Each simulated applicant waits a
+# think time, answers (cycling through bench_gemini_session's answers, some parsed locally
+# and some by the model) and times the turn until its "done" event, and until its first
+# sentence. Per level it reports turns/s, p50/p99 turn latency, the chat server's CPU use
+# and peak RSS, and sessions per core: the sessions held divided by the cores the server
+# process used while holding them. Sessions left idle are then checked to be evicted.
+# The load generator and fake model share the machine with the server, so on few cores
+# the latencies include their scheduling too.
+# Run from the repository root: python benchmarks/bench_chat_server.py [sessions,...] [think_seconds] [seconds]
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'Backend'))
+
+from bench_gemini_session import ANSWERS
+from fake_gemini_server import FakeGeminiServer
+
+MODEL_LATENCY = 0.2
+TOKEN_INTERVAL = 0.01
+IDLE_TIMEOUT = 10.0
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_chat_server(port, store_path, gemini_base):
+    env = dict(os.environ, GEMINI_API_KEY='fake', GEMINI_API_BASE=gemini_base)
+    env.pop('GEMINI_CACHE_PATH', None)
+    return subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, '..', 'Backend', 'chat_server.py'),
+                             '--host', '127.0.0.1', '--port', str(port), '--store', store_path,
+                             '--idle-timeout', str(IDLE_TIMEOUT), '--max-concurrency', '1024'], env=env)
+
+
+async def stats(http, base):
+    async with http.get(f"{base}/api/chat/stats") as response:
+        return await response.json()
+
+
+async def wait_ready(http, base, timeout=60.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            return await stats(http, base)
+        except aiohttp.ClientConnectionError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+async def read_turn(ws, started):
+    """(seconds to the first sentence, seconds to done)"""
+    first = None
+    while True:
+        event = json.loads((await ws.receive()).data)
+        if event['type'] == 'sentence' and first is None:
+            first = time.perf_counter() - started
+        if event['type'] == 'done':
+            return first, time.perf_counter() - started
+
+
+async def applicant(http, base, session_id, think, window, results, seed):
+    rng = random.Random(seed)
+    # Staggered arrivals, so turns are spread over the think time rather than in lockstep
+    await asyncio.sleep(rng.uniform(0, think))
+    async with http.ws_connect(f"{base}/api/sessions/{session_id}/ws") as ws:
+        await read_turn(ws, time.perf_counter())
+        turn = rng.randrange(len(ANSWERS))
+        while time.perf_counter() < window[1]:
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * think)
+            _, field, value = ANSWERS[turn % len(ANSWERS)]
+            turn += 1
+            started = time.perf_counter()
+            await ws.send_json({'text': f"My {field.replace('_', ' ')} is {value}"})
+            first, total = await read_turn(ws, started)
+            if window[0] <= started < window[1]:
+                results.append((first if first is not None else total, total))
+
+
+async def level(http, base, sessions, think, seconds, prefix):
+    results = []
+    # Measured once every session has connected and is taking turns
+    start = time.perf_counter() + think * 2
+    window = (start, start + seconds)
+    tasks = [asyncio.create_task(applicant(http, base, f"{prefix}{i:05d}", think, window, results, i))
+             for i in range(sessions)]
+    await asyncio.sleep(start - time.perf_counter())
+    before = await stats(http, base)
+    await asyncio.sleep(seconds)
+    after = await stats(http, base)
+    await asyncio.gather(*tasks)
+
+    cores = (after['cpu_seconds'] - before['cpu_seconds']) / seconds
+    firsts = sorted(first for first, _ in results)
+    totals = sorted(total for _, total in results)
+
+    def percentile(values, fraction):
+        return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else float('nan')
+
+    print(f"{sessions:6d} sessions  {len(results) / seconds:7.1f} turns/s  turn p50 {percentile(totals, 0.5):6.0f} ms  "
+          f"p99 {percentile(totals, 0.99):6.0f} ms  first sentence p99 {percentile(firsts, 0.99):6.0f} ms  "
+          f"server {cores:4.2f} cores, {sessions / max(cores, 1e-9):8,.0f} sessions/core, "
+          f"peak RSS {after['max_rss_kib'] / 1024:6.1f} MiB")
+
+
+async def run(levels, think, seconds):
+    async with FakeGeminiServer(latency=MODEL_LATENCY, token_interval=TOKEN_INTERVAL) as gemini:
+        with tempfile.TemporaryDirectory() as directory:
+            port = free_port()
+            process = start_chat_server(port, os.path.join(directory, 'applicants.db'), gemini.base_url)
+            base = f"http://127.0.0.1:{port}"
+            connector = aiohttp.TCPConnector(limit=0)
+            try:
+                async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=None)) as http:
+                    idle = await wait_ready(http, base)
+                    print(f"cpu cores: {os.cpu_count()}, model latency {MODEL_LATENCY * 1000:.0f} ms + "
+                          f"{TOKEN_INTERVAL * 1000:.0f} ms/word, think time {think:.1f} s, {seconds:.0f} s per level, "
+                          f"idle server RSS {idle['max_rss_kib'] / 1024:.1f} MiB")
+                    for i, sessions in enumerate(levels):
+                        await level(http, base, sessions, think, seconds, f"L{i}-")
+
+                    held = (await stats(http, base))['sessions']
+                    await asyncio.sleep(IDLE_TIMEOUT * 1.5)
+                    after = await stats(http, base)
+                    print(f"idle eviction: {held} sessions held, {after['sessions']} left {IDLE_TIMEOUT * 1.5:.0f} s "
+                          f"after the last turn ({after['evicted']} evicted), {after['turns']} turns, "
+                          f"{gemini.requests} model requests")
+            finally:
+                process.terminate()
+                process.wait()
+
+
+def main():
+    levels = [int(n) for n in sys.argv[1].split(',')] if len(sys.argv) > 1 else [250, 1000, 4000]
+    think = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 20.0
+    asyncio.run(run(levels, think, seconds))
+
+
+if __name__ == '__main__':
+    main()
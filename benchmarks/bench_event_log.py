@@ -0,0 +1,116 @@
+# bench_event_log.py
+# Measures the conversation event log: append throughput with an fsync per event against
+# batched fsyncs (and the old in-memory history list, which survives nothing), resume time
+# for a long session with and without snapshots, and an offline regression replay that
+# records sessions from the labelled answer corpus and re-runs the local answer extractor
+# over every logged user answer, checking it reproduces the logged extraction.
+# Run from the repository root: python benchmarks/bench_event_log.py [events]
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from applicant_store import empty_applicant_data
+from event_log import SessionEventLog, SessionState, iter_sessions, open_event_log
+from gemini_integration import GeminiAI
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'utterances.jsonl')
+
+
+def append_turns(log, count):
+    for i in range(count // 2):
+        log.utterance("User", f"my credit score is {600 + i % 300}")
+        log.field_update("financial.credit_score", 600 + i % 300)
+
+
+def time_appends(label, count, make_log):
+    log = make_log()
+    start = time.perf_counter()
+    append_turns(log, count)
+    log.close()
+    seconds = time.perf_counter() - start
+    print(f"{label:<26} {count / seconds:>10,.0f} events/s  {log.syncs:>6} fsyncs")
+
+
+def legacy_appends(count):
+    """The original history: a growing list of dicts, gone if the process dies"""
+    history = []
+    start = time.perf_counter()
+    for i in range(count // 2):
+        history.append({"field": "financial.credit_score", "user_response": f"my credit score is {600 + i % 300}",
+                        "timestamp": datetime.now().isoformat()})
+    seconds = time.perf_counter() - start
+    print(f"{'in-memory list (legacy)':<26} {count / seconds:>10,.0f} events/s  {0:>6} fsyncs (not durable)")
+
+
+def record_corpus(directory, sessions):
+    """Log sessions answering the corpus questions in turn, with the extraction each answer produced"""
+    with open(CORPUS_PATH) as f:
+        answers = [json.loads(line)['utterance'] for line in f]
+    for session in range(sessions):
+        log = open_event_log(f"session-{session:04d}", empty_applicant_data(), directory)
+        for turn in range(12):
+            answer = answers[(session * 7 + turn) % len(answers)]
+            log.utterance("AI", "Could you tell me more?")
+            log.utterance("User", answer)
+            result = GeminiAI.extract_locally(answer, log.applicant_data)
+            log.model_reply("extraction", json.dumps(result), 0.0)
+            for category, details in ((result or {}).get('data_updates') or {}).items():
+                for field, value in details.items():
+                    log.field_update(f"{category}.{field}", value)
+        log.close()
+
+
+def replay_corpus(directory):
+    """Re-run the extractor on every logged answer against the applicant data at that point; returns (answers, regressions, events)"""
+    answers = regressions = events = 0
+    for _, session_events in iter_sessions(directory):
+        state = SessionState()
+        pending = None
+        for event in session_events:
+            events += 1
+            if event['type'] == 'utterance' and event['role'] == 'User':
+                pending = GeminiAI.extract_locally(event['text'], state.applicant_data)
+            elif event['type'] == 'model_reply' and event['kind'] == 'extraction':
+                answers += 1
+                regressions += json.loads(event['text']) != pending
+            state.apply(event)
+    return answers, regressions, events
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"appending {count:,} events")
+        legacy_appends(count)
+        time_appends("fsync every event", min(count, 2000),
+                     lambda: SessionEventLog(os.path.join(directory, 'per-event'), flush_every=1, snapshot_every=10 ** 9))
+        time_appends("batched fsync (32 / 1s)", count,
+                     lambda: SessionEventLog(os.path.join(directory, 'batched'), snapshot_every=10 ** 9))
+        time_appends("batched + snapshots/200", count,
+                     lambda: SessionEventLog(os.path.join(directory, 'snapshots')))
+
+        print(f"\nresuming a {count:,}-event session")
+        for label, name in (("no snapshot", 'batched'), ("snapshot every 200", 'snapshots')):
+            start = time.perf_counter()
+            log = SessionEventLog(os.path.join(directory, name))
+            seconds = time.perf_counter() - start
+            print(f"{label:<26} {seconds * 1000:>8.1f} ms, {log.state.events_replayed:>6} events replayed, "
+                  f"credit score {log.applicant_data['financial']['credit_score']}")
+            log.close()
+
+        corpus_dir = os.path.join(directory, 'corpus')
+        record_corpus(corpus_dir, 200)
+        start = time.perf_counter()
+        answers, regressions, events = replay_corpus(corpus_dir)
+        seconds = time.perf_counter() - start
+        print(f"\noffline replay:             {answers} answers in 200 sessions, {regressions} regressions, "
+              f"{events / seconds:,.0f} events/s")
+
+
+if __name__ == '__main__':
+    main()
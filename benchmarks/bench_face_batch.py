@@ -0,0 +1,100 @@
+# bench_face_batch.py
+# Times face_batch.verify_batch over a directory of copies of the Dummy Docs images and over
+# a recorded synthetic webcam video, for 1..N worker processes, and reports images (or
+# frames) per second per core. The baseline is the sequential loop the batch API replaces:
+# imread, detect on the full image, extract and compare, one file at a time.
+# Run from the repository root: python benchmarks/bench_face_batch.py [copies] [max_workers]
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from face_batch import create_pool, verify_batch
+from face_features import detect_face, extract_face_features, load_detector
+from face_registry import FaceRegistry
+from synthetic_camera import AADHAAR_PATH, DOCS_DIR, SyntheticCamera
+
+
+def build_image_dir(directory, copies):
+    names = [name for name in sorted(os.listdir(DOCS_DIR)) if name.lower().endswith('.png')]
+    for i in range(copies):
+        for name in names:
+            shutil.copy(os.path.join(DOCS_DIR, name), os.path.join(directory, f"{i:04d}_{name}"))
+    return len(names) * copies
+
+
+def build_video(path, frames):
+    camera = SyntheticCamera()
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (camera.width, camera.height))
+    for index in range(frames):
+        writer.write(camera.frame_at(index))
+    writer.release()
+
+
+def sequential(paths, registry, applicant_id):
+    detector = load_detector()
+    for path in paths:
+        frame = cv2.imread(path)
+        face_rect = detect_face(detector, frame)
+        if face_rect is not None:
+            features, _ = extract_face_features(frame, face_rect)
+            registry.verify(applicant_id, features)
+
+
+def timed(label, count, cores, run):
+    start = time.perf_counter()
+    results = run()
+    seconds = time.perf_counter() - start
+    print(f"{label:<28} {count / seconds:7.1f} /s  {count / seconds / cores:7.1f} /s per core")
+    return results
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else max(2, os.cpu_count() or 1)
+    print(f"cpu cores: {os.cpu_count()}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        registry = FaceRegistry(os.path.join(workdir, 'registry'))
+        card = cv2.imread(AADHAAR_PATH)
+        features, _ = extract_face_features(card, detect_face(load_detector(), card))
+        registry.enroll('A1', features)
+
+        image_dir = os.path.join(workdir, 'images')
+        os.makedirs(image_dir)
+        count = build_image_dir(image_dir, copies)
+        paths = sorted(os.path.join(image_dir, name) for name in os.listdir(image_dir))
+        print(f"\n{count} document images")
+        timed("sequential loop", count, 1, lambda: sequential(paths, registry, 'A1'))
+        for workers in range(1, max_workers + 1):
+            results = timed(f"verify_batch, {workers} worker(s)", count, min(workers, os.cpu_count() or 1),
+                            lambda: list(verify_batch(image_dir, registry, applicant_id='A1', workers=workers)))
+        # The server spawns its pool once; later batches skip worker start-up
+        with create_pool(max_workers) as pool:
+            list(verify_batch(image_dir, registry, applicant_id='A1', pool=pool))
+            timed("verify_batch, reused pool", count, min(max_workers, os.cpu_count() or 1),
+                  lambda: list(verify_batch(image_dir, registry, applicant_id='A1', workers=max_workers, pool=pool)))
+        matched = sum(1 for result in results if result['is_same_person'])
+        print(f"faces matched: {matched} (expected {copies}, one per Aadhaar copy)")
+
+        video_path = os.path.join(workdir, 'recording.avi')
+        frames = 600
+        build_video(video_path, frames)
+        print(f"\n{frames}-frame 640x480 video")
+        for workers in range(1, max_workers + 1):
+            results = timed(f"verify_batch, {workers} worker(s)", frames, min(workers, os.cpu_count() or 1),
+                            lambda: list(verify_batch(video_path, registry, applicant_id='A1', workers=workers)))
+        print(f"frames with a face: {sum(result['face'] is not None for result in results)}, "
+              f"matched: {sum(bool(result['is_same_person']) for result in results)}")
+        results = timed("stride 5, all workers", frames, min(max_workers, os.cpu_count() or 1),
+                        lambda: list(verify_batch(video_path, registry, applicant_id='A1', workers=max_workers, stride=5)))
+        print(f"frames verified at stride 5: {len(results)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# bench_face_tracking.py
+# Processes synthetic camera frames as fast as one core allows, once with full-resolution
+# Haar detection on every frame (the original generate_frames) and once with FaceTracker,
+# and reports achievable fps, per-stage timings and how closely the box follows the face.
+# Run from the repository root: python benchmarks/bench_face_tracking.py [frames]
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import camera
+from synthetic_camera import SyntheticCamera
+
+
+def legacy_process_frame(frame):
+    """The original per-frame work: full-resolution detection, verification and encoding"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    faces = camera.get_detector().detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+    if len(faces) > 0:
+        x, y, w, h = faces[0]
+        camera.extract_face_features(frame, (x, y, w, h))
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+    _, buffer = cv2.imencode('.jpg', frame)
+    return buffer.tobytes()
+
+
+def box_offset(box, reference):
+    """Distance between box centres, in pixels"""
+    (x, y, w, h), (rx, ry, rw, rh) = box, reference
+    return (((x + w / 2) - (rx + rw / 2)) ** 2 + ((y + h / 2) - (ry + rh / 2)) ** 2) ** 0.5
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    source = SyntheticCamera()
+    frames = [source.frame_at(i) for i in range(count)]
+
+    start = time.perf_counter()
+    for frame in frames:
+        legacy_process_frame(frame.copy())
+    legacy_fps = count / (time.perf_counter() - start)
+
+    timed_tracker = camera.FaceTracker(camera.get_detector())
+    start = time.perf_counter()
+    for frame in frames:
+        camera.process_frame(frame.copy(), timed_tracker)
+    tracker_fps = count / (time.perf_counter() - start)
+
+    # Box quality: a second pass comparing each reported box with full detection on the same frame
+    tracker = camera.FaceTracker(camera.get_detector())
+    offsets = []
+    found = reference_found = 0
+    for frame in frames:
+        box, _ = tracker.update(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        reference = camera.get_detector().detectMultiScale(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), 1.1, 5, minSize=(30, 30))
+        found += box is not None
+        reference_found += len(reference) > 0
+        if box is not None and len(reference) > 0:
+            offsets.append(box_offset(box, reference[0]))
+
+    print(f"frames:                {count} at {source.width}x{source.height}, one thread")
+    print(f"detect every frame:    {legacy_fps:.1f} fps")
+    print(f"FaceTracker:           {tracker_fps:.1f} fps ({tracker_fps / legacy_fps:.1f}x)")
+    stats = timed_tracker.stats()
+    print(f"final interval:        every {stats['interval']} frames")
+    for name, stage in sorted(stats['stages'].items()):
+        print(f"  {name:<19} {stage['avg_ms']:>7.2f} ms x {stage['calls']}")
+    offsets.sort()
+    print(f"face boxes:            {found} frames with a box, {reference_found} with full detection")
+    print(f"centre offset:         median {offsets[len(offsets) // 2]:.1f} px, p95 {offsets[int(len(offsets) * 0.95)]:.1f} px")
+
+
+if __name__ == '__main__':
+    cv2.setNumThreads(1)
+    main()
@@ -0,0 +1,77 @@
+# bench_gemini_session.py
+# Replays a long voice conversation against the fake Gemini server twice: once through the
+# original flow (one unbounded chat, full applicant context resent before every question)
+# and once through AsyncGeminiSession, and reports prompt tokens per turn.
+# Run from the repository root: python benchmarks/bench_gemini_session.py [turns] [window]
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from async_gemini import AsyncGeminiAI, AsyncGeminiClient
+from fake_gemini_server import FakeGeminiServer
+from gemini_session import AsyncGeminiSession
+
+# Answers given one per turn; later ones correct earlier answers, as real applicants do
+ANSWERS = [
+    ('personal', 'name', 'Asha Verma'), ('personal', 'age', 34), ('personal', 'city', 'Pune'),
+    ('employment', 'employer', 'Infosys'), ('employment', 'net_monthly_salary', 120000),
+    ('employment', 'work_experience', 6), ('financial', 'credit_score', 742),
+    ('financial', 'monthly_expenses', 35000), ('financial', 'existing_loans', 1),
+    ('loan_request', 'loan_purpose', 'home renovation'), ('loan_request', 'loan_amount', 800000),
+    ('loan_request', 'loan_term', 5), ('loan_request', 'interest_rate', 9.5),
+    ('employment', 'net_monthly_salary', 125000), ('loan_request', 'loan_amount', 900000),
+]
+
+
+def conversation(turns):
+    """Applicant data after each turn, plus the user's utterance for that turn"""
+    applicant_data = {}
+    for turn in range(turns):
+        category, field, value = ANSWERS[turn % len(ANSWERS)]
+        applicant_data.setdefault(category, {})[field] = value
+        yield {category: dict(fields) for category, fields in applicant_data.items()}, f"My {field.replace('_', ' ')} is {value}"
+
+
+async def replay(ai, server, turns):
+    history = []
+    tokens = []
+    for applicant_data, utterance in conversation(turns):
+        before = server.prompt_characters
+        question = await ai.get_next_question(applicant_data, "\n".join(history[-6:]))
+        await ai.handle_user_response(utterance, applicant_data)
+        history += [f"AI: {question}", f"User: {utterance}"]
+        tokens.append((server.prompt_characters - before) // 4)
+    return tokens
+
+
+async def run(turns, window):
+    async with FakeGeminiServer() as server:
+        async with AsyncGeminiClient(api_key='fake', base_url=server.base_url) as client:
+            legacy = await replay(AsyncGeminiAI(client), server, turns)
+            legacy_requests = server.requests
+            session = AsyncGeminiSession(client, max_turns=window)
+            windowed = await replay(session, server, turns)
+            session_requests = server.requests - legacy_requests
+
+    print(f"turns:                 {turns} (window of {window} exchanges)")
+    print(f"{'turn':>4} {'unbounded chat':>15} {'session':>8}")
+    for turn in range(0, turns, max(1, turns // 10)):
+        print(f"{turn + 1:>4} {legacy[turn]:>15,} {windowed[turn]:>8,}")
+    print(f"requests:              {legacy_requests} unbounded, {session_requests} session")
+    print(f"prompt tokens:         {sum(legacy):,} unbounded, {sum(windowed):,} session "
+          f"({1 - sum(windowed) / sum(legacy):.0%} saved)")
+    print(f"final turn:            {legacy[-1]:,} unbounded, {windowed[-1]:,} session")
+    # Windowed turns only; answer extraction runs as stand-alone requests outside the window
+    print(f"window tracked:        {session.token_stats()['total_prompt_tokens']:,} prompt tokens")
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    window = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    asyncio.run(run(turns, window))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+# bench_json_extraction.py
+# Fuzzes find_json_object against the regex-based extract_json it replaced, with JSON
+# objects wrapped in prose that contains braces, quotes and code fences, then times both
+# on large replies.
+# Run from the repository root: python benchmarks/bench_json_extraction.py [cases] [reply_kb]
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from gemini_integration import find_json_object, validate_user_response
+
+ALPHABET = 'abc xyz{}[]"\\:,.\'\n\té€😀'
+PROSE = [
+    "Sure, here is the update.", "I set {field} from your answer.", 'You said "maybe {later}".',
+    "Note: use {} for empty objects.", "Here's the JSON:", "```json", "```", "Done } really.", "{oops",
+]
+
+
+def legacy_extract_json(text):
+    """GeminiAI.extract_json before the scanner: fenced blocks, then first { to last }"""
+    json_match = re.search(r'```json\s+(.*?)\s+```', text, re.DOTALL | re.IGNORECASE)
+    if json_match:
+        return json_match.group(1).strip()
+    json_match_plain = re.search(r'```\s+(.*?)\s+```', text, re.DOTALL)
+    if json_match_plain:
+        return json_match_plain.group(1).strip()
+    json_match_simple = re.search(r'\{.*\}', text, re.DOTALL)
+    if json_match_simple:
+        return json_match_simple.group(0).strip()
+    raise ValueError("No valid JSON found in Gemini's response.")
+
+
+def random_string(rng):
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randrange(0, 12)))
+
+
+def random_value(rng, depth=0):
+    kind = rng.randrange(6 if depth < 3 else 4)
+    if kind == 0:
+        return random_string(rng)
+    if kind == 1:
+        return rng.choice([rng.randrange(-10 ** 6, 10 ** 6), round(rng.uniform(-1e4, 1e4), 3)])
+    if kind == 2:
+        return rng.choice([True, False, None])
+    if kind == 3:
+        return random_string(rng)
+    if kind == 4:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+    return random_object(rng, depth + 1)
+
+
+def random_object(rng, depth=0):
+    return {random_string(rng): random_value(rng, depth) for _ in range(rng.randrange(1, 5))}
+
+
+def random_reply(rng, obj):
+    """The object, pretty-printed or not, between random prose containing braces and quotes.
+
+    Prose before the object never contains a valid JSON object of its own ("{}" would be one).
+    """
+    body = json.dumps(obj, indent=rng.choice([None, 2]), ensure_ascii=rng.random() < 0.5)
+    before = ' '.join(rng.choice(PROSE[:3] + PROSE[4:]) for _ in range(rng.randrange(3)))
+    after = ' '.join(rng.choice(PROSE) for _ in range(rng.randrange(4)))
+    return f"{before}\n{body}\n{after}"
+
+
+def fuzz(cases):
+    rng = random.Random(7)
+    legacy_failures = failures = 0
+    for _ in range(cases):
+        obj = random_object(rng)
+        reply = random_reply(rng, obj)
+        try:
+            failures += find_json_object(reply) != obj
+        except ValueError:
+            failures += 1
+        try:
+            legacy_failures += json.loads(legacy_extract_json(reply)) != obj
+        except ValueError:
+            legacy_failures += 1
+    return failures, legacy_failures
+
+
+def check_schema():
+    good = {"data_updates": {"employment": {"net_monthly_salary": 80000}}, "needs_clarification": False, "clarification_question": ""}
+    bad = [
+        [], {"data_updates": []}, {"data_updates": {"employment": 80000}},
+        {"data_updates": {"employment": {"net_monthly_salary": {"value": 1}}}}, {"needs_clarification": "no"},
+    ]
+    validate_user_response(good)
+    rejected = 0
+    for data in bad:
+        try:
+            validate_user_response(data)
+        except ValueError:
+            rejected += 1
+    return rejected, len(bad)
+
+
+def timed(function, reply, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        function(reply)
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    cases = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    reply_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+
+    failures, legacy_failures = fuzz(cases)
+    print(f"fuzz cases:            {cases}")
+    print(f"scanner failures:      {failures}")
+    print(f"legacy failures:       {legacy_failures} ({legacy_failures / cases:.1%})")
+    rejected, total = check_schema()
+    print(f"schema:                {rejected} of {total} malformed replies rejected")
+
+    # A large reply: the data_updates object late in long prose, with stray braces after it
+    update = {"data_updates": {"loan_request": {"loan_amount": 1500000, "note": "{not a brace}"}},
+              "needs_clarification": False, "clarification_question": ""}
+    filler = "The applicant discussed their plans at length. " * (reply_kb * 512 // 48)
+    reply = f"{filler}\n{json.dumps(update)}\nLet me know if {{anything}} else is needed. {filler}"
+    rounds = 20
+    scanner = timed(find_json_object, reply, rounds)
+    legacy = timed(legacy_extract_json, reply, rounds)
+    try:
+        legacy_parsed = json.loads(legacy_extract_json(reply)) == update
+    except ValueError:
+        legacy_parsed = False
+    print(f"large reply:           {len(reply) / 1024:.0f} KB")
+    print(f"scanner:               {scanner * 1000:.2f} ms, parsed: {find_json_object(reply) == update}")
+    print(f"legacy regexes:        {legacy * 1000:.2f} ms (before json.loads), parsed: {legacy_parsed}")
+
+
+if __name__ == '__main__':
+    main()
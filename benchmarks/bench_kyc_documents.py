@@ -0,0 +1,76 @@
+# bench_kyc_documents.py
+# Pages per second, and per core, of kyc_documents.read_documents over copies of the Dummy
+# Docs images plus a scanned PDF built from them (one image per page, so PyMuPDF renders
+# every page), for 1..N worker processes. The baseline is one easyocr reader in this process
+# reading every page in turn, with torch free to use every core. The fields found in each
+# dummy document are printed once, as a check on the parsers.
+# Run from the repository root: python benchmarks/bench_kyc_documents.py [copies] [max_workers]
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import fitz
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'Backend'))
+
+import kyc_documents
+from kyc_documents import init_worker, ocr_page, page_tasks, read_documents
+
+DOCS_DIR = os.path.join(BENCH_DIR, '..', 'Dummy Docs')
+
+
+def build_fixtures(directory, copies):
+    names = sorted(name for name in os.listdir(DOCS_DIR) if name.lower().endswith('.png'))
+    for i in range(copies):
+        for name in names:
+            shutil.copy(os.path.join(DOCS_DIR, name), os.path.join(directory, f"{i:04d}_{name}"))
+    pdf = fitz.open()
+    for name in names:
+        image = fitz.open(os.path.join(DOCS_DIR, name))
+        rect = image[0].rect
+        page = pdf.new_page(width=rect.width, height=rect.height)
+        page.insert_image(rect, filename=os.path.join(DOCS_DIR, name))
+        image.close()
+    pdf.save(os.path.join(directory, 'scanned_documents.pdf'))
+    pdf.close()
+    return len(page_tasks(directory))
+
+
+def sequential(directory):
+    init_worker()
+    for task in page_tasks(directory):
+        ocr_page(task)
+
+
+def timed(label, count, cores, run):
+    start = time.perf_counter()
+    results = run()
+    seconds = time.perf_counter() - start
+    print(f"{label:<32} {count / seconds:7.2f} pages/s  {count / seconds / cores:7.2f} pages/s per core")
+    return results
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else max(2, os.cpu_count() or 1)
+    print(f"cpu cores: {os.cpu_count()}")
+
+    for document in read_documents(DOCS_DIR, workers=2):
+        print(json.dumps(document))
+
+    with tempfile.TemporaryDirectory() as directory:
+        pages = build_fixtures(directory, copies)
+        print(f"\n{pages} pages")
+        timed("one reader, in process", pages, os.cpu_count() or 1, lambda: sequential(directory))
+        kyc_documents.worker_reader = None
+        for workers in range(1, max_workers + 1):
+            timed(f"read_documents, {workers} worker(s)", pages, min(workers, os.cpu_count() or 1),
+                  lambda: list(read_documents(directory, workers=workers)))
+
+
+if __name__ == '__main__':
+    main()
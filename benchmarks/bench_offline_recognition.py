@@ -0,0 +1,122 @@
+# bench_offline_recognition.py
+# Real-time factor of the on-device Vosk recognizer on recorded WAV fixtures: decode time
+# divided by audio duration, both for a whole captured phrase (what recognize() does after
+# the applicant stops) and streamed in 100 ms chunks as VoicePipeline feeds it, where only
+# finish() is left once speech ends. Word error rate is reported against the transcripts.
+# Fixtures are benchmarks/data/speech/*.wav with the reference text in a matching .txt; when
+# that directory does not exist they are synthesized with pyttsx3 from the utterance corpus.
+# Needs a Vosk model (VOSK_MODEL_PATH). Run from the repository root:
+# python benchmarks/bench_offline_recognition.py [fixture_dir]
+import json
+import os
+import sys
+import tempfile
+import time
+
+import speech_recognition as sr
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'Backend'))
+
+from offline_recognition import SAMPLE_RATE, VoskRecognizer, load_model, read_wav
+
+FIXTURE_DIR = os.path.join(BENCH_DIR, 'data', 'speech')
+UTTERANCES_PATH = os.path.join(BENCH_DIR, 'data', 'utterances.jsonl')
+CHUNK_SECONDS = 0.1
+
+
+def synthesize_fixtures(directory, count=40):
+    """Speak the first `count` distinct utterances to WAV files with pyttsx3"""
+    import pyttsx3
+    engine = pyttsx3.init()
+    texts = []
+    with open(UTTERANCES_PATH, 'r', encoding='utf-8') as file:
+        for line in file:
+            text = json.loads(line)['utterance']
+            if text and text not in texts:
+                texts.append(text)
+    for i, text in enumerate(texts[:count]):
+        engine.save_to_file(text, os.path.join(directory, f"{i:03d}.wav"))
+        with open(os.path.join(directory, f"{i:03d}.txt"), 'w', encoding='utf-8') as file:
+            file.write(text)
+    engine.runAndWait()
+
+
+def load_fixtures(directory):
+    fixtures = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.wav'):
+            continue
+        pcm, rate = read_wav(os.path.join(directory, name))
+        if rate != SAMPLE_RATE:
+            pcm = sr.AudioData(pcm, rate, 2).get_raw_data(convert_rate=SAMPLE_RATE)
+        with open(os.path.join(directory, name[:-4] + '.txt'), 'r', encoding='utf-8') as file:
+            fixtures.append((name, pcm, file.read().strip()))
+    return fixtures
+
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance"""
+    reference, hypothesis = reference.lower().split(), hypothesis.lower().split()
+    previous = list(range(len(hypothesis) + 1))
+    for i, word in enumerate(reference, 1):
+        current = [i]
+        for j, other in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (word != other)))
+        previous = current
+    return previous[-1]
+
+
+def run(fixtures, recognizer):
+    chunk_bytes = int(SAMPLE_RATE * CHUNK_SECONDS) * 2
+    audio_seconds = batch_seconds = stream_seconds = 0.0
+    finish_latencies = []
+    errors = words = 0
+    for name, pcm, reference in fixtures:
+        audio_seconds += len(pcm) / (SAMPLE_RATE * 2)
+
+        start = time.perf_counter()
+        text = recognizer.transcribe(pcm)
+        batch_seconds += time.perf_counter() - start
+
+        stream = recognizer.start_stream()
+        start = time.perf_counter()
+        for offset in range(0, len(pcm), chunk_bytes):
+            stream.accept(pcm[offset:offset + chunk_bytes])
+        finish_start = time.perf_counter()
+        streamed = stream.finish()
+        finish_latencies.append(time.perf_counter() - finish_start)
+        stream_seconds += time.perf_counter() - start
+
+        if streamed != text:
+            print(f"  {name}: streamed {streamed!r} != batch {text!r}")
+        errors += word_errors(reference, text)
+        words += len(reference.split())
+
+    finish_latencies.sort()
+    print(f"{len(fixtures)} fixtures, {audio_seconds:.1f} s of audio, word error rate {errors / max(words, 1):.1%}")
+    print(f"  whole phrase:  {batch_seconds:.2f} s decode, real-time factor {batch_seconds / audio_seconds:.3f}")
+    print(f"  streamed:      {stream_seconds:.2f} s decode, real-time factor {stream_seconds / audio_seconds:.3f}")
+    print(f"  after speech:  finish() mean {sum(finish_latencies) / len(finish_latencies) * 1000:.0f} ms, "
+          f"p95 {finish_latencies[min(len(finish_latencies) - 1, int(len(finish_latencies) * 0.95))] * 1000:.0f} ms "
+          f"(whole phrase: {batch_seconds / len(fixtures) * 1000:.0f} ms mean)")
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else FIXTURE_DIR
+
+    start = time.perf_counter()
+    load_model()
+    print(f"model load: {time.perf_counter() - start:.2f} s (once per process)")
+
+    recognizer = VoskRecognizer()
+    if os.path.isdir(directory):
+        run(load_fixtures(directory), recognizer)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            synthesize_fixtures(directory)
+            run(load_fixtures(directory), recognizer)
+
+
+if __name__ == '__main__':
+    main()
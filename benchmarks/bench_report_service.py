@@ -0,0 +1,134 @@
+# bench_report_service.py
+# Load test for /api/report. Serves report_service's Flask app from a threaded local server
+# over a SQLite applicant store of N applicants, with a stand-in Gemini assessment that
+# sleeps like a model call. Client threads keep connections open and poll reports as the
+# Status page does, sending If-None-Match with the ETag they hold, while a writer changes a
+# field of a random applicant every few milliseconds. The same load runs against an
+# uncached service (every request rebuilds the report and asks the model again, as
+# generate_json_report plus provide_final_assessment did). Reports requests/s, p50/p99
+# latency, 304s and model calls, then the time to export every report as JSON lines.
+# Run from the repository root: python benchmarks/bench_report_service.py [applicants] [clients] [seconds]
+import http.client
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from applicant_store import SQLiteApplicantStore
+from bench_applicant_store import ANSWER_FIELDS, seed_record
+from loan_eligibility import LoanEligibilityEngine
+from report_service import ReportService, create_app
+
+ASSESSMENT_SECONDS = 0.3
+
+
+class FakeAssessment:
+    def __init__(self, seconds=ASSESSMENT_SECONDS):
+        self.seconds = seconds
+        self.calls = 0
+
+    def __call__(self, applicant_id, applicant_data):
+        self.calls += 1
+        time.sleep(self.seconds)
+        return f"Assessment for {applicant_id}: eligible subject to verification."
+
+
+def populate(store, applicants):
+    rng = random.Random(1)
+    for applicant in range(applicants):
+        data = seed_record(applicant)
+        for path, make in ANSWER_FIELDS:
+            category, key = path.split('.')
+            data[category][key] = make(rng)
+        store.save(f"A{applicant:05d}", data)
+
+
+def client(port, applicants, deadline, latencies, counts, seed):
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    etags = {}
+    while time.perf_counter() < deadline:
+        applicant_id = f"A{rng.randrange(applicants):05d}"
+        headers = {'If-None-Match': etags[applicant_id]} if applicant_id in etags else {}
+        start = time.perf_counter()
+        connection.request('GET', f"/api/report?id={applicant_id}&assessment=1", headers=headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        counts[response.status] = counts.get(response.status, 0) + 1
+        if response.status == 200:
+            etags[applicant_id] = response.getheader('ETag')
+    connection.close()
+
+
+def writer(store, applicants, deadline, interval, counter):
+    rng = random.Random(2)
+    while time.perf_counter() < deadline:
+        path, make = rng.choice(ANSWER_FIELDS)
+        store.update(f"A{rng.randrange(applicants):05d}", {path: make(rng)})
+        counter[0] += 1
+        time.sleep(interval)
+
+
+def load_test(label, service, store, assessment, applicants, clients, seconds):
+    server = make_server('127.0.0.1', 0, create_app(service), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    latencies, counts, writes = [], {}, [0]
+    deadline = time.perf_counter() + seconds
+    threads = [threading.Thread(target=client, args=(server.server_port, applicants, deadline, latencies, counts, i))
+               for i in range(clients)]
+    threads.append(threading.Thread(target=writer, args=(store, applicants, deadline, 0.01, writes)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    server.shutdown()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{label:<10} {len(latencies) / seconds:8.0f} req/s  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  "
+          f"200: {counts.get(200, 0):6d}  304: {counts.get(304, 0):6d}  model calls {assessment.calls:5d}  writes {writes[0]}")
+
+
+def main():
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    applicants = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 10.0
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteApplicantStore(os.path.join(directory, 'applicants.db'))
+        populate(store, applicants)
+        engine = LoanEligibilityEngine()
+        print(f"{applicants} applicants, {clients} clients polling with ETags, {seconds:.0f} s per run, "
+              f"model call {ASSESSMENT_SECONDS * 1000:.0f} ms")
+
+        assessment = FakeAssessment()
+        load_test("uncached", ReportService(store, engine, assessment, max_entries=0), store, assessment,
+                  applicants, clients, seconds)
+        assessment = FakeAssessment()
+        service = ReportService(store, engine, assessment)
+        load_test("cached", service, store, assessment, applicants, clients, seconds)
+        print(f"cache: {service.stats()}")
+
+        # Bulk export without assessments: a cold pass builds every report, a warm one serves the cache
+        service = ReportService(store, engine)
+        for label in ('cold', 'warm'):
+            start = time.perf_counter()
+            lines = sum(1 for _ in service.export_jsonl())
+            elapsed = time.perf_counter() - start
+            print(f"export ({label}): {lines} reports in {elapsed * 1000:.0f} ms, {lines / elapsed:,.0f} reports/s")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# bench_response_cache.py
+# Replays a log-like stream of user answers through handle_user_response against the fake
+# Gemini server, with no cache, the in-memory cache and the SQLite cache, and reports hit
+# rates and time saved.
+# Run from the repository root: python benchmarks/bench_response_cache.py [answers] [latency]
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from async_gemini import AsyncGeminiClient
+from fake_gemini_server import FakeGeminiServer
+from gemini_integration import MemoryCacheBackend, ResponseCache, SQLiteCacheBackend
+from gemini_session import AsyncGeminiSession
+
+# Common answers dominate real logs; the long tail is unique
+COMMON_ANSWERS = [
+    "yes", "no", "my salary is 80000", "20 years", "5 years", "750", "10 lakh", "8.5 percent",
+    "about 25000 a month", "I have been working for 6 years", "my credit score is 720", "15 years"
+]
+PARTIAL_APPLICANTS = [
+    {},
+    {'financial': {'credit_score': 750}},
+    {'financial': {'credit_score': 750}, 'employment': {'net_monthly_salary': 80000}},
+    {'financial': {'credit_score': 750, 'monthly_expenses': 25000}, 'employment': {'net_monthly_salary': 80000}},
+]
+
+
+def answer_log(count, seed=0):
+    rng = random.Random(seed)
+    for i in range(count):
+        if rng.random() < 0.75:
+            answer = COMMON_ANSWERS[min(int(rng.expovariate(0.35)), len(COMMON_ANSWERS) - 1)]
+        else:
+            answer = f"my loan amount is {rng.randrange(100000, 10000000)}"
+        # ASR output varies in spacing, which normalization absorbs
+        yield answer if rng.random() < 0.8 else f" {answer}  ", rng.choice(PARTIAL_APPLICANTS)
+
+
+async def replay(server, count, cache):
+    async with AsyncGeminiClient(api_key='fake', base_url=server.base_url, cache=cache) as client:
+        # The local fast path would answer many of these before the cache is consulted
+        session = AsyncGeminiSession(client, fast_path=False)
+        requests_before = server.requests
+        start = time.perf_counter()
+        for answer, applicant_data in answer_log(count):
+            await session.handle_user_response(answer, applicant_data)
+        return time.perf_counter() - start, server.requests - requests_before
+
+
+async def run(count, latency):
+    with tempfile.TemporaryDirectory() as directory:
+        backends = [
+            ('none', None),
+            ('memory', ResponseCache(MemoryCacheBackend())),
+            ('sqlite', ResponseCache(SQLiteCacheBackend(os.path.join(directory, 'responses.db'))))
+        ]
+        print(f"answers:               {count} at {latency * 1000:.0f} ms simulated latency")
+        async with FakeGeminiServer(latency=latency) as server:
+            baseline = None
+            for name, cache in backends:
+                seconds, requests = await replay(server, count, cache)
+                baseline = baseline or seconds
+                hit_rate = f"{cache.stats()['hit_rate']:.1%} hit rate" if cache else "no cache"
+                print(f"{name + ':':<22} {seconds:.2f}s, {requests} Gemini requests, {hit_rate}, "
+                      f"{baseline - seconds:.2f}s saved")
+        backends[2][1].backend.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    asyncio.run(run(count, latency))
+
+
+if __name__ == '__main__':
+    main()
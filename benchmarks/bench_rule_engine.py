@@ -0,0 +1,102 @@
+# bench_rule_engine.py
+# Compares the compiled rule set plan with the original hard-coded if-chain.
+# Run from the repository root: python benchmarks/bench_rule_engine.py [evaluations]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from bench_batch_eligibility import as_applicant, random_book
+from loan_eligibility import LoanEligibilityEngine
+
+LEGACY_CRITERIA = {
+    'minimum_credit_score': 700,
+    'minimum_income': 50000,
+    'maximum_dti_ratio': 0.5,
+    'minimum_employment_years': 2,
+    'loan_to_value_ratio': 0.8
+}
+
+
+def legacy_check_eligibility(engine, applicant_data):
+    """The if-chain check_eligibility used before rule sets were introduced"""
+    criteria = LEGACY_CRITERIA
+    results = {'status': None, 'factors': [], 'recommendations': []}
+    try:
+        credit_score = int(applicant_data.get('financial', {}).get('credit_score', 0))
+        monthly_income = int(applicant_data.get('employment', {}).get('net_monthly_salary', 0))
+        monthly_expenses = int(applicant_data.get('financial', {}).get('monthly_expenses', 0))
+        work_experience = int(applicant_data.get('employment', {}).get('work_experience', 0))
+        loan_amount = int(applicant_data.get('loan_request', {}).get('loan_amount', 0))
+        loan_term = int(applicant_data.get('loan_request', {}).get('loan_term', 0))
+        interest_rate = float(applicant_data.get('loan_request', {}).get('interest_rate', 0))
+        property_value = int(applicant_data.get('loan_request', {}).get('property_value', 0))
+    except (ValueError, TypeError):
+        results['status'] = "REJECTED"
+        results['factors'].append("Missing or invalid financial information")
+        return results
+
+    dti_ratio = engine.calculate_dti_ratio(monthly_income, monthly_expenses)
+    emi = engine.calculate_emi(loan_amount, interest_rate, loan_term)
+    ltv_ratio = loan_amount / property_value if property_value > 0 else 1.0
+
+    if credit_score < criteria['minimum_credit_score']:
+        results['factors'].append(f"Credit score ({credit_score}) below minimum requirement ({criteria['minimum_credit_score']})")
+        results['recommendations'].append("Work on improving your credit score")
+    if monthly_income < criteria['minimum_income']:
+        results['factors'].append("Monthly income below minimum requirement")
+        results['recommendations'].append("Consider applying for a smaller loan amount")
+    if dti_ratio > criteria['maximum_dti_ratio']:
+        results['factors'].append("Debt-to-income ratio too high")
+        results['recommendations'].append("Reduce your monthly expenses or debt obligations")
+    if work_experience < criteria['minimum_employment_years']:
+        results['factors'].append("Work experience below minimum requirement")
+        results['recommendations'].append("Consider providing additional employment stability proof")
+    if ltv_ratio > criteria['loan_to_value_ratio']:
+        results['factors'].append("Loan amount too high relative to property value")
+        results['recommendations'].append("Consider a smaller loan amount or providing additional collateral")
+    if emi > (monthly_income * 0.5):
+        results['factors'].append("EMI would be too high relative to income")
+        results['recommendations'].append("Consider a longer loan term or smaller loan amount")
+
+    if not results['factors']:
+        results['status'] = "APPROVED"
+    elif len(results['factors']) <= 1:
+        results['status'] = "CONDITIONALLY_APPROVED"
+    elif len(results['factors']) <= 2:
+        results['status'] = "REJECTED_WITH_CONDITIONS"
+    else:
+        results['status'] = "REJECTED"
+    return results
+
+
+def timed(label, evaluations, function, applicants):
+    start = time.perf_counter()
+    for i in range(evaluations):
+        function(applicants[i % len(applicants)])
+    seconds = time.perf_counter() - start
+    print(f"{label:<34}{seconds:7.3f}s  {evaluations / seconds:>12,.0f}/s")
+    return seconds
+
+
+def main():
+    evaluations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    engine = LoanEligibilityEngine()
+    columns = random_book(min(evaluations, 100000))
+    applicants = [as_applicant(columns, i) for i in range(len(columns['credit_score']))]
+    rule_set = engine.rules
+
+    mismatches = sum(1 for applicant in applicants if engine.check_eligibility(applicant) != legacy_check_eligibility(engine, applicant))
+    print(f"evaluations: {evaluations:,}  plan: {[rule['id'] for rule in rule_set.plan]}  mismatches: {mismatches}")
+
+    legacy = timed("legacy if-chain", evaluations, lambda a: legacy_check_eligibility(engine, a), applicants)
+    timed("check_eligibility (rule set)", evaluations, engine.check_eligibility, applicants)
+    timed("check_status (early exit)", evaluations, engine.check_status, applicants)
+    full = timed("compiled plan only", evaluations, rule_set.evaluate, applicants)
+    early = timed("compiled plan only, early exit", evaluations, lambda a: rule_set.evaluate(a, True), applicants)
+    print(f"plan speedup over if-chain: {legacy / full:.1f}x full, {legacy / early:.1f}x with early exit")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+# bench_startup.py
+# Cold start of the backend. Each module is imported in a fresh interpreter, several times,
+# reporting the median import time and which heavy dependencies (Gemini SDK, OpenCV, speech,
+# OCR, PDF) the import loaded. Then the time from launching a process to its first response:
+# a JSON report from DynamicConversationManager, /api/report and camera.py's /video_stats
+# through their Flask test clients, and a new chat_server session over HTTP against the fake
+# Gemini server. CI runs this with --json to keep the numbers per commit and --check to fail
+# when a module loads a heavy dependency it does not need, or imports slower than --max-import-ms.
+# Run from the repository root: python benchmarks/bench_startup.py [--runs 5] [--json startup.json] [--check]
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+BACKEND_DIR = os.path.join(ROOT_DIR, 'Backend')
+sys.path.insert(0, BACKEND_DIR)
+
+from fake_gemini_server import FakeGeminiServer
+
+HEAVY_MODULES = ('google.generativeai', 'cv2', 'pyttsx3', 'speech_recognition', 'vosk', 'easyocr', 'torch', 'fitz')
+# Module, directory it is imported from, heavy modules it may load at import
+MODULES = [
+    ('loan_eligibility', BACKEND_DIR, ()),
+    ('report_service', BACKEND_DIR, ()),
+    ('gemini_integration', BACKEND_DIR, ()),
+    ('gemini_session', BACKEND_DIR, ()),
+    ('conversation_manager', BACKEND_DIR, ()),
+    ('chat_server', BACKEND_DIR, ()),
+    ('voice_interaction', BACKEND_DIR, ()),
+    ('kyc_documents', BACKEND_DIR, ()),
+    ('statement_analytics', BACKEND_DIR, ()),
+    ('camera', ROOT_DIR, ('cv2',)),
+]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+# Each prints once it has answered; the parent times it from launch
+FIRST_RESPONSE_SCRIPTS = {
+    'conversation_manager report': (BACKEND_DIR, """
+from conversation_manager import DynamicConversationManager
+report = DynamicConversationManager('startup').generate_json_report()
+print(report['eligibility_assessment']['status'])
+"""),
+    'report_service /api/report': (BACKEND_DIR, """
+from applicant_store import create_applicant_store
+from loan_eligibility import LoanEligibilityEngine
+from report_service import ReportService, create_app
+store = create_applicant_store()
+store.save('startup', {'personal_information': {'age': 30}})
+print(create_app(ReportService(store, LoanEligibilityEngine())).test_client().get('/api/report?id=startup').status_code)
+"""),
+    'camera /video_stats': (ROOT_DIR, """
+import camera
+print(camera.app.test_client().get('/video_stats').status_code)
+"""),
+}
+
+
+def child_env(directory, **extra):
+    env = dict(os.environ, GEMINI_API_KEY='fake', APPLICANT_STORE_PATH=os.path.join(directory, 'applicants.db'),
+               CONVERSATION_LOG_DIR=os.path.join(directory, 'logs'), PYTHONWARNINGS='ignore', **extra)
+    env.pop('GEMINI_CACHE_PATH', None)
+    return env
+
+
+def run_script(script, cwd, env):
+    result = subprocess.run([sys.executable, '-c', script], cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exit {result.returncode}")
+    return result.stdout.strip().splitlines()[-1]
+
+
+def measure_imports(runs, directory):
+    results = {}
+    for module, cwd, allowed in MODULES:
+        try:
+            samples = [json.loads(run_script(IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES), cwd, child_env(directory)))
+                       for _ in range(runs)]
+        except RuntimeError as e:
+            results[module] = {'error': str(e)}
+            continue
+        heavy = samples[-1]['heavy']
+        results[module] = {
+            'import_ms': round(statistics.median(sample['seconds'] for sample in samples) * 1000, 1),
+            'heavy': heavy,
+            'unexpected': [name for name in heavy if name not in allowed]
+        }
+    return results
+
+
+def measure_first_responses(runs, directory):
+    results = {}
+    for name, (cwd, script) in FIRST_RESPONSE_SCRIPTS.items():
+        samples = []
+        try:
+            for _ in range(runs):
+                start = time.perf_counter()
+                run_script(script, cwd, child_env(directory))
+                samples.append(time.perf_counter() - start)
+        except RuntimeError as e:
+            results[name] = {'error': str(e)}
+            continue
+        results[name] = {'first_response_ms': round(statistics.median(samples) * 1000, 1)}
+    return results
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def chat_server_first_response(runs, directory):
+    """Launch to the opening question of a new session, polling until the server answers"""
+    samples = []
+    async with FakeGeminiServer() as gemini, aiohttp.ClientSession() as http:
+        for _ in range(runs):
+            port = free_port()
+            start = time.perf_counter()
+            process = subprocess.Popen([sys.executable, os.path.join(BACKEND_DIR, 'chat_server.py'), '--host', '127.0.0.1',
+                                        '--port', str(port)], cwd=BACKEND_DIR,
+                                       env=child_env(directory, GEMINI_API_BASE=gemini.base_url))
+            try:
+                while True:
+                    try:
+                        async with http.post(f"http://127.0.0.1:{port}/api/sessions", json={}) as response:
+                            await response.json()
+                            break
+                    except aiohttp.ClientConnectionError:
+                        if process.poll() is not None:
+                            return {'error': f"chat_server exited with {process.returncode}"}
+                        await asyncio.sleep(0.01)
+                samples.append(time.perf_counter() - start)
+            finally:
+                process.terminate()
+                process.wait()
+    return {'first_response_ms': round(statistics.median(samples) * 1000, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and first-response times of the backend")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--check', action='store_true', help="exit non-zero on unexpected heavy imports or slow imports")
+    parser.add_argument('--max-import-ms', type=float, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        imports = measure_imports(args.runs, directory)
+        first_responses = measure_first_responses(args.runs, directory)
+        first_responses['chat_server new session'] = asyncio.run(chat_server_first_response(args.runs, directory))
+
+    print(f"{'module':<22} {'import':>9}  heavy dependencies loaded")
+    for module, result in imports.items():
+        if 'error' in result:
+            print(f"{module:<22} {'failed':>9}  {result['error']}")
+        else:
+            print(f"{module:<22} {result['import_ms']:7.1f} ms  {', '.join(result['heavy']) or '-'}")
+    print(f"\n{'first response':<30} {'from launch':>12}")
+    for name, result in first_responses.items():
+        print(f"{name:<30} {result['first_response_ms']:9.1f} ms" if 'error' not in result else f"{name:<30} failed: {result['error']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'python': sys.version.split()[0], 'imports': imports, 'first_responses': first_responses}, file, indent=2)
+
+    if args.check:
+        problems = [f"{module} failed to import: {result['error']}" for module, result in imports.items() if 'error' in result]
+        problems += [f"{module} imports {', '.join(result['unexpected'])}" for module, result in imports.items()
+                     if result.get('unexpected')]
+        if args.max_import_ms is not None:
+            problems += [f"{module} takes {result['import_ms']} ms to import" for module, result in imports.items()
+                         if result.get('import_ms', 0) > args.max_import_ms]
+        problems += [f"{name} failed: {result['error']}" for name, result in first_responses.items() if 'error' in result]
+        for problem in problems:
+            print(f"FAIL: {problem}")
+        sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# bench_statement_analytics.py
+# Streams a synthetic multi-year bank statement CSV (salary, two EMIs, rent, utilities and
+# card spends, with reference numbers in every narration) through StatementAnalytics and
+# reports rows per second and peak traced memory, then the time to add one more month's
+# statement to the saved aggregates against rescanning the whole history with it. The
+# derived monthly expenses, EMIs and salary are checked against what the generator put in.
+# Run from the repository root: python benchmarks/bench_statement_analytics.py [years] [spends_per_month]
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from statement_analytics import StatementAnalytics, read_csv_chunks
+
+SALARY = 130000
+EMIS = (20855.56, 12400.0)
+RENT = 30000
+MERCHANTS = ['AMAZON', 'SWIGGY', 'ZOMATO', 'BIGBASKET', 'UBER', 'IRCTC', 'DMART', 'APOLLO PHARMACY', 'PVR', 'CROMA']
+
+
+def month_rows(year, month, spends, rng):
+    """One month of transactions; the month's total debits are returned alongside"""
+    first = date(year, month, 1)
+    days = (date(year + month // 12, month % 12 + 1, 1) - first).days
+    tag = first.strftime('%b%y').upper()
+    rows = [
+        (first + timedelta(days=0), f"NEFT/SAL/TCS/{tag}/{rng.randrange(10 ** 6)}", 0.0, SALARY + rng.randrange(-2000, 2000)),
+        (first + timedelta(days=4), f"ACH/HDFC CAR LOAN EMI/{rng.randrange(10 ** 8)}", EMIS[0], 0.0),
+        (first + timedelta(days=6), f"NACH/BAJAJ FIN/{rng.randrange(10 ** 8)}", EMIS[1], 0.0),
+        (first + timedelta(days=2), f"IMPS/RENT/LANDLORD/{rng.randrange(10 ** 6)}", RENT, 0.0),
+        (first + timedelta(days=9), f"BILLPAY/MSEDCL/{rng.randrange(10 ** 9)}", round(rng.uniform(1500, 4000), 2), 0.0),
+    ]
+    for _ in range(spends):
+        rows.append((first + timedelta(days=rng.randrange(days)), f"UPI/{rng.choice(MERCHANTS)}/{rng.randrange(10 ** 10)}",
+                     round(rng.uniform(80, 3000), 2), 0.0))
+    rows.sort(key=lambda row: row[0])
+    return rows, sum(row[2] for row in rows)
+
+
+def write_statement(path, months, spends, rng):
+    totals = []
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(["ACME BANK - STATEMENT OF ACCOUNT"])
+        writer.writerow(["Date", "Narration", "Withdrawal Amt", "Deposit Amt"])
+        for year, month in months:
+            rows, total = month_rows(year, month, spends, rng)
+            totals.append(total)
+            for day, narration, debit, credit in rows:
+                writer.writerow([day.strftime('%d/%m/%Y'), narration, f"{debit:,.2f}" if debit else "",
+                                 f"{credit:,.2f}" if credit else ""])
+    return totals
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    spends = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    rng = random.Random(7)
+    months = [(2015 + i // 12, i % 12 + 1) for i in range(years * 12 + 1)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        history_path = os.path.join(directory, 'history.csv')
+        latest_path = os.path.join(directory, 'latest.csv')
+        state_path = os.path.join(directory, 'state.json')
+        totals = write_statement(history_path, months[:-1], spends, rng)
+        totals += write_statement(latest_path, months[-1:], spends, rng)
+        rows = sum(1 for _ in open(history_path)) - 2
+
+        start = time.perf_counter()
+        analytics = StatementAnalytics()
+        analytics.ingest(read_csv_chunks(history_path))
+        seconds = time.perf_counter() - start
+        analytics.save(state_path)
+
+        # Traced separately, since tracing slows every allocation down
+        tracemalloc.start()
+        StatementAnalytics().ingest(read_csv_chunks(history_path))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{rows} rows over {years} years: {seconds:.2f} s, {rows / seconds:,.0f} rows/s, "
+              f"peak traced memory {peak / 2 ** 20:.1f} MiB, state file {os.path.getsize(state_path) / 1024:.0f} KiB")
+
+        start = time.perf_counter()
+        analytics = StatementAnalytics.load(state_path)
+        added = analytics.ingest(read_csv_chunks(latest_path))
+        # An overlapping re-download of the same month adds nothing
+        repeated = analytics.ingest(read_csv_chunks(latest_path))
+        analytics.save(state_path)
+        incremental = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rescan = StatementAnalytics()
+        rescan.ingest(read_csv_chunks(history_path))
+        rescan.ingest(read_csv_chunks(latest_path))
+        rescanned = time.perf_counter() - start
+        print(f"add one month ({added} rows, {repeated} on re-ingest): {incremental * 1000:.1f} ms incremental, "
+              f"{rescanned * 1000:.0f} ms rescanning everything")
+
+        summary = analytics.summary()
+        expected = round(sum(totals[-6:]) / 6)
+        print(f"monthly expenses {summary['monthly_expenses']} (expected {expected}), same as rescan: "
+              f"{summary['monthly_expenses'] == rescan.monthly_expenses()}")
+        print(f"recurring debits {[(debit['amount'], debit['emi']) for debit in summary['recurring_debits']]} "
+              f"(expected EMIs {sorted(EMIS, reverse=True)} and rent {RENT}), "
+              f"salary {summary['salary']['amount']} (expected about {SALARY}) from {summary['salary']['counterparty']!r}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# bench_streaming.py
+# Measures time-to-first-audio for a spoken question against the fake Gemini server with
+# streamed tokens: waiting for the whole reply before synthesizing it, versus streaming
+# tokens, cutting sentences and synthesizing the first one while the rest arrives. Also
+# times the first SSE frame the chat UI would receive.
+# Run from the repository root: python benchmarks/bench_streaming.py [first_token_latency] [token_interval]
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from async_gemini import AsyncGeminiClient
+from fake_gemini_server import FakeGeminiServer
+from gemini_session import AsyncGeminiSession
+from streaming import async_sse_sentences
+
+REPLY = ("Thanks, that helps. Based on what you've shared, your credit profile looks healthy. "
+         "Could you tell me your net monthly salary after taxes, so I can work out an affordable EMI for you?")
+
+APPLICANT = {'financial': {'credit_score': 750}}
+
+
+class MockTTS:
+    """Offline TTS stand-in: synthesis takes a fixed start-up cost plus time per character"""
+
+    def __init__(self, startup=0.08, per_character=0.002):
+        self.startup = startup
+        self.per_character = per_character
+
+    async def synthesize(self, text):
+        await asyncio.sleep(self.startup + self.per_character * len(text))
+
+
+async def first_audio_blocking(session, tts):
+    start = time.perf_counter()
+    question = await session.get_next_question(APPLICANT)
+    await tts.synthesize(question)
+    return time.perf_counter() - start
+
+
+async def first_audio_streaming(session, tts):
+    start = time.perf_counter()
+    first_audio = None
+    async for sentence in session.stream_next_question(APPLICANT):
+        await tts.synthesize(sentence)
+        if first_audio is None:
+            first_audio = time.perf_counter() - start
+    return first_audio
+
+
+async def first_sse_frame(session):
+    start = time.perf_counter()
+    first = None
+    async for _ in async_sse_sentences(session.stream_next_question(APPLICANT)):
+        first = first if first is not None else time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def run(first_token, token_interval, rounds=5):
+    tts = MockTTS()
+    async with FakeGeminiServer(latency=first_token, token_interval=token_interval, reply=lambda prompt: REPLY) as server:
+        async with AsyncGeminiClient(api_key='fake', base_url=server.base_url) as client:
+            blocking = [await first_audio_blocking(AsyncGeminiSession(client), tts) for _ in range(rounds)]
+            streaming = [await first_audio_streaming(AsyncGeminiSession(client), tts) for _ in range(rounds)]
+            frames = [await first_sse_frame(AsyncGeminiSession(client)) for _ in range(rounds)]
+
+    print(f"reply:                 {len(REPLY.split())} words, first token after {first_token * 1000:.0f} ms, "
+          f"then {token_interval * 1000:.0f} ms per word")
+    print(f"first audio, blocking: {statistics.median(blocking) * 1000:.0f} ms")
+    print(f"first audio, streamed: {statistics.median(streaming) * 1000:.0f} ms "
+          f"({statistics.median(blocking) / statistics.median(streaming):.1f}x sooner)")
+    print(f"first SSE sentence:    {statistics.median(first for first, _ in frames) * 1000:.0f} ms "
+          f"(stream complete at {statistics.median(total for _, total in frames) * 1000:.0f} ms)")
+
+
+def main():
+    first_token = float(sys.argv[1]) if len(sys.argv) > 1 else 0.4
+    token_interval = float(sys.argv[2]) if len(sys.argv) > 2 else 0.03
+    asyncio.run(run(first_token, token_interval))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+# bench_voice_pipeline.py
+# Runs the voice conversation end to end on fake microphone, recognizer, speaker and
+# Gemini backends (benchmarks/fake_voice.py), once with the original serial listen (open
+# the microphone and calibrate for a second every turn, blocking beeps and a spoken
+# "Listening", recognition inline), once with VoicePipeline and once with VoicePipeline
+# decoding the answer on the device while it is spoken, and reports per-turn latency by
+# stage. "dead air" is each turn's time spent neither speaking nor capturing the answer:
+# what the applicant sits through waiting for the assistant.
+# Run from the repository root: python benchmarks/bench_voice_pipeline.py [scale]
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+
+from applicant_store import JSONFileApplicantStore
+from event_log import SessionEventLog
+from fake_voice import FakeAI, FakeMicrophone, FakeRecognizer, FakeSpeaker, FakeStreamingRecognizer
+from voice_interaction import VoiceBasedChatbot
+from voice_pipeline import TurnTimings
+
+# One applicant's answers in order; '' is not understood, "yes please" and the two after it
+# answer the eligibility offers on turns 5 and 10
+ANSWERS = [
+    "my credit score is 760",
+    "I earn 85000 a month",
+    "my expenses are about 30000 a month",
+    "I have worked for 6 years",
+    "I need a loan of 2500000",
+    "yes please", "let's continue",
+    "20 years",
+    "8.5 percent",
+    "the property is worth 4000000",
+    "",
+    "14 May 1990",
+    "male",
+    "yes", "we can end here",
+]
+
+
+class LegacyPipeline:
+    """The original VoiceBasedChatbot speak/listen behaviour, run serially on the fake backends"""
+
+    def __init__(self, microphone, recognizer, speaker):
+        self.microphone = microphone
+        self.recognizer = recognizer
+        self.speaker = speaker
+        self.timings = TurnTimings()
+
+    def warm_up(self, *functions):
+        # The original chatbot set everything up before the greeting, one step after another
+        for function in functions:
+            if function is not None:
+                function()
+
+    def speak(self, text):
+        print(f"AI: {text}")
+        with self.timings.stage('speak'):
+            self.speaker.say(text)
+
+    def speak_stream(self, sentences):
+        spoken = []
+        iterator = iter(sentences)
+        while True:
+            with self.timings.stage('generate_wait'):
+                sentence = next(iterator, None)
+            if sentence is None:
+                return " ".join(spoken)
+            self.speak(sentence)
+            spoken.append(sentence)
+
+    def listen(self, timeout=10, phrase_time_limit=30):
+        with self.timings.stage('prepare_wait'):
+            self.microphone.open()
+            self.microphone.calibrate()
+        try:
+            with self.timings.stage('cue'):
+                self.speaker.beep(1000, 150)
+                time.sleep(0.05 * self.speaker.scale)
+                self.speaker.beep(1200, 150)
+                self.speaker.say("Listening")
+            with self.timings.stage('listen'):
+                audio = self.microphone.capture(timeout=timeout, phrase_time_limit=phrase_time_limit)
+            with self.timings.stage('cue'):
+                self.speaker.beep(800, 150)
+            with self.timings.stage('recognize'):
+                return self.recognizer.recognize(audio)
+        finally:
+            self.microphone.close()
+
+    def run(self, stage, function, *args, **kwargs):
+        with self.timings.stage(stage):
+            return function(*args, **kwargs)
+
+    def close(self):
+        self.timings.end_turn()
+
+
+def converse(label, directory, scale, legacy=False, streaming=False):
+    microphone = FakeMicrophone(ANSWERS, scale=scale)
+    recognizer = FakeStreamingRecognizer(scale=scale) if streaming else FakeRecognizer(scale=scale)
+    speaker = FakeSpeaker(scale=scale)
+    applicant_id = 'legacy' if legacy else 'streaming' if streaming else 'pipeline'
+    chatbot = VoiceBasedChatbot(applicant_id, JSONFileApplicantStore(directory), SessionEventLog(os.path.join(directory, applicant_id)),
+                                microphone=microphone, recognizer=recognizer, speaker=speaker, ai=FakeAI(scale=scale))
+    if legacy:
+        chatbot.voice.close()
+        chatbot.voice = LegacyPipeline(microphone, recognizer, speaker)
+    timings = chatbot.voice.timings
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        chatbot.start_conversation()
+    seconds = time.perf_counter() - start
+
+    for turn in timings.turns:
+        turn['dead_air'] = turn['total'] - turn.get('speak', 0) - turn.get('listen', 0)
+    report = timings.report()
+    complete = chatbot.record.is_complete()
+    print(f"\n{label}: {seconds / scale:.1f} s for {len(timings.turns)} turns (unscaled), {microphone.opens} microphone opens, "
+          f"{microphone.calibrations} calibrations, application complete: {complete}")
+    print(f"  {'stage':<14} {'mean ms':>9} {'p95 ms':>9}")
+    for stage in ('speak', 'generate_wait', 'first_audio', 'prepare_wait', 'cue', 'listen', 'recognize', 'think',
+                  'dead_air', 'total'):
+        if stage in report:
+            print(f"  {stage:<14} {report[stage]['mean_ms'] / scale:>9.0f} {report[stage]['p95_ms'] / scale:>9.0f}")
+    return report
+
+
+def main():
+    # Every fake delay is multiplied by `scale`; times are reported divided by it again
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+    with tempfile.TemporaryDirectory() as directory:
+        legacy = converse("serial (legacy)", directory, scale, legacy=True)
+        pipeline = converse("VoicePipeline", directory, scale)
+        streaming = converse("VoicePipeline, streaming recognition", directory, scale, streaming=True)
+    print(f"\ndead air per turn: {legacy['dead_air']['mean_ms'] / scale:.0f} ms -> {pipeline['dead_air']['mean_ms'] / scale:.0f} ms "
+          f"-> {streaming['dead_air']['mean_ms'] / scale:.0f} ms, turn time {legacy['total']['mean_ms'] / scale:.0f} ms -> "
+          f"{pipeline['total']['mean_ms'] / scale:.0f} ms -> {streaming['total']['mean_ms'] / scale:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+# fake_gemini_server.py
+# A local stand-in for the Gemini generateContent REST endpoint, with configurable
+# latency, streamed token pacing and injected failures (every Nth request, or the first N, with a
+# chosen status and Retry-After). Point clients at it with GEMINI_API_BASE=http://host:port/v1beta
+# Run standalone: python benchmarks/fake_gemini_server.py [--port 8089] [--latency 0.5] [--fail-every 0] [--token-interval 0.03]
+import argparse
+import asyncio
+import json
+
+from aiohttp import web
+
+
+def default_reply(prompt):
+    """Answer like the loan assistant would, well enough for the backend's parsers"""
+    if 'The user responded' in prompt:
+        return json.dumps({"data_updates": {}, "needs_clarification": False, "clarification_question": ""})
+    if "what's the next question" in prompt:
+        return "Could you tell me your monthly salary?"
+    return "Based on the information provided, you look eligible for this loan."
+
+
+class FakeGeminiServer:
+    """Serves /v1beta/models/{model}:generateContent on localhost"""
+
+    def __init__(self, latency=0.0, fail_every=0, reply=default_reply, port=0, token_interval=0.0,
+                 fail_first=0, fail_status=503, retry_after=None):
+        self.latency = latency
+        # Delay between streamed chunks; `latency` is then the time to the first token
+        self.token_interval = token_interval
+        self.fail_every = fail_every
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        # Sent as the Retry-After header of injected failures
+        self.retry_after = retry_after
+        self.reply = reply
+        self.port = port
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompt_characters = 0
+        self._runner = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}/v1beta"
+
+    def _prompt(self, payload):
+        """Returns (last prompt text, prompt characters billed)"""
+        texts = [part.get('text', '') for content in payload.get('contents', []) for part in content.get('parts', [])]
+        # The system instruction is billed as prompt tokens too
+        system_characters = sum(len(part.get('text', '')) for part in payload.get('systemInstruction', {}).get('parts', []))
+        prompt_characters = system_characters + sum(len(text) for text in texts)
+        self.prompt_characters += prompt_characters
+        return (texts[-1] if texts else ''), prompt_characters
+
+    def _start_request(self):
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if self.requests <= self.fail_first or (self.fail_every and self.requests % self.fail_every == 0):
+            self.failures += 1
+            headers = {'Retry-After': str(self.retry_after)} if self.retry_after is not None else None
+            return web.json_response({"error": {"code": self.fail_status, "message": "overloaded"}},
+                                     status=self.fail_status, headers=headers)
+        return None
+
+    async def handle_generate(self, request):
+        failure = self._start_request()
+        try:
+            payload = await request.json()
+            await asyncio.sleep(self.latency)
+            if failure is not None:
+                return failure
+
+            prompt, prompt_characters = self._prompt(payload)
+            reply = self.reply(prompt)
+            # A full reply takes as long to generate as its streamed equivalent
+            await asyncio.sleep(self.token_interval * (len(reply.split(' ')) - 1))
+            return web.json_response({
+                "candidates": [{"content": {"role": "model", "parts": [{"text": reply}]}, "finishReason": "STOP"}],
+                "usageMetadata": {"promptTokenCount": prompt_characters // 4, "candidatesTokenCount": len(reply) // 4}
+            })
+        finally:
+            self.in_flight -= 1
+
+    async def handle_stream(self, request):
+        """streamGenerateContent with alt=sse: one data event per word-sized chunk"""
+        failure = self._start_request()
+        try:
+            payload = await request.json()
+            await asyncio.sleep(self.latency)
+            if failure is not None:
+                return failure
+
+            prompt, prompt_characters = self._prompt(payload)
+            reply = self.reply(prompt)
+            response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+            await response.prepare(request)
+            words = reply.split(' ')
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(self.token_interval)
+                text = word if i == len(words) - 1 else word + ' '
+                chunk = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+                if i == len(words) - 1:
+                    chunk["candidates"][0]["finishReason"] = "STOP"
+                    chunk["usageMetadata"] = {"promptTokenCount": prompt_characters // 4, "candidatesTokenCount": len(reply) // 4}
+                await response.write(f"data: {json.dumps(chunk)}\r\n\r\n".encode('utf-8'))
+            await response.write_eof()
+            return response
+        finally:
+            self.in_flight -= 1
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post('/v1beta/models/{model}:generateContent', self.handle_generate)
+        app.router.add_post('/v1beta/models/{model}:streamGenerateContent', self.handle_stream)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        await self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Gemini generateContent server")
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--fail-every', type=int, default=0)
+    parser.add_argument('--token-interval', type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeGeminiServer(latency=args.latency, fail_every=args.fail_every, port=args.port, token_interval=args.token_interval)
+    web.run_app(server.app(), host='127.0.0.1', port=args.port)
+
+
+if __name__ == '__main__':
+    main()
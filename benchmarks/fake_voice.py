@@ -0,0 +1,193 @@
+# fake_voice.py
+# Microphone, speech recognition, text-to-speech and Gemini stand-ins for benchmarking the
+# voice conversation without audio devices or network access. Each sleeps for roughly as
+# long as the real thing takes (scaled by `scale`), and the "audio" a microphone captures
+# is simply the text the recognizer will return.
+import threading
+import time
+
+from applicant_schema import missing_fields
+from gemini_integration import GeminiAI
+from voice_pipeline import ListenTimeout, NotUnderstood
+
+
+class FakeMicrophone:
+    """Opening the input stream takes `open_seconds`, ambient calibration `calibration_seconds`.
+
+    Each capture waits `reaction_seconds` for the speaker to start, then the answer's
+    duration at `words_per_second`, plus the trailing silence that ends a phrase. An
+    answer of None times out instead; '' is captured but cannot be understood.
+    """
+
+    def __init__(self, answers, open_seconds=0.15, calibration_seconds=1.0, reaction_seconds=0.4,
+                 words_per_second=2.5, pause_seconds=0.8, scale=1.0):
+        self.answers = list(answers)
+        self.open_seconds = open_seconds * scale
+        self.calibration_seconds = calibration_seconds * scale
+        self.reaction_seconds = reaction_seconds * scale
+        self.words_per_second = words_per_second / scale
+        self.pause_seconds = pause_seconds * scale
+        self.timeout_seconds = 10 * scale
+        self.is_open = False
+        self.calibrated = False
+        self.opens = 0
+        self.calibrations = 0
+        self.lock = threading.Lock()
+
+    def open(self):
+        time.sleep(self.open_seconds)
+        self.is_open = True
+        self.opens += 1
+
+    def calibrate(self):
+        time.sleep(self.calibration_seconds)
+        self.calibrated = True
+        self.calibrations += 1
+
+    def prepare(self):
+        with self.lock:
+            if not self.is_open:
+                self.open()
+            if not self.calibrated:
+                self.calibrate()
+
+    def capture(self, timeout=10, phrase_time_limit=30):
+        if not self.is_open:
+            raise RuntimeError("capture() before the microphone was opened")
+        answer = self.answers.pop(0) if self.answers else "bye"
+        if answer is None:
+            time.sleep(self.timeout_seconds)
+            raise ListenTimeout()
+        time.sleep(self.reaction_seconds + len(answer.split()) / self.words_per_second + self.pause_seconds)
+        return answer
+
+    def capture_stream(self, timeout=10, phrase_time_limit=30):
+        """capture(), but delivering each word as a chunk as soon as it has been said"""
+        if not self.is_open:
+            raise RuntimeError("capture_stream() before the microphone was opened")
+        answer = self.answers.pop(0) if self.answers else "bye"
+        if answer is None:
+            time.sleep(self.timeout_seconds)
+            raise ListenTimeout()
+        time.sleep(self.reaction_seconds)
+        for word in answer.split():
+            time.sleep(1 / self.words_per_second)
+            yield word
+        time.sleep(self.pause_seconds)
+
+    def close(self):
+        self.is_open = False
+
+
+class FakeRecognizer:
+    """Cloud recognition: a round trip plus a little per word"""
+
+    def __init__(self, latency_seconds=0.6, seconds_per_word=0.02, scale=1.0):
+        self.latency_seconds = latency_seconds * scale
+        self.seconds_per_word = seconds_per_word * scale
+
+    def recognize(self, audio):
+        time.sleep(self.latency_seconds + len(audio.split()) * self.seconds_per_word)
+        if not audio:
+            raise NotUnderstood()
+        return audio
+
+
+class FakeStreamingRecognizer:
+    """On-device streaming recognition: each chunk decodes in a fraction of its duration,
+    and finishing the phrase only costs the last segment's decode"""
+
+    def __init__(self, seconds_per_chunk=0.04, finish_seconds=0.08, scale=1.0):
+        self.seconds_per_chunk = seconds_per_chunk * scale
+        self.finish_seconds = finish_seconds * scale
+
+    def start_stream(self):
+        return FakeRecognitionStream(self)
+
+    def recognize(self, audio):
+        stream = self.start_stream()
+        for word in audio.split():
+            stream.accept(word)
+        text = stream.finish()
+        if not text:
+            raise NotUnderstood()
+        return text
+
+
+class FakeRecognitionStream:
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.words = []
+
+    def accept(self, chunk):
+        time.sleep(self.recognizer.seconds_per_chunk)
+        self.words.append(chunk)
+
+    def finish(self):
+        time.sleep(self.recognizer.finish_seconds)
+        return " ".join(self.words)
+
+
+class FakeSpeaker:
+    """Speech at `words_per_second` after `startup_seconds`; beeps take their duration"""
+
+    def __init__(self, startup_seconds=0.1, words_per_second=3.3, scale=1.0):
+        self.startup_seconds = startup_seconds * scale
+        self.words_per_second = words_per_second / scale
+        self.scale = scale
+        self.words = 0
+        self.beeps = 0
+
+    def say(self, text):
+        words = len(text.split())
+        time.sleep(self.startup_seconds + words / self.words_per_second)
+        self.words += words
+
+    def beep(self, frequency, milliseconds):
+        time.sleep(milliseconds / 1000 * self.scale)
+        self.beeps += 1
+
+
+class FakeAI:
+    """GeminiSession's conversation methods, with model latency in place of requests.
+
+    Questions stream a sentence every `sentence_seconds` after `first_token_seconds`.
+    Answers the local extractor understands cost nothing; the rest take `extraction_seconds`
+    and fill the first missing field, as a model reading the question would.
+    """
+
+    def __init__(self, first_token_seconds=0.5, sentence_seconds=0.3, extraction_seconds=0.9, scale=1.0):
+        self.first_token_seconds = first_token_seconds * scale
+        self.sentence_seconds = sentence_seconds * scale
+        self.extraction_seconds = extraction_seconds * scale
+        self.requests = 0
+
+    def _stream(self, sentences):
+        self.requests += 1
+        time.sleep(self.first_token_seconds)
+        for sentence in sentences:
+            yield sentence
+            time.sleep(self.sentence_seconds)
+
+    def stream_next_question(self, applicant_data, conversation_history=""):
+        missing = missing_fields(applicant_data)
+        if not missing:
+            return iter(["All information is complete. I can now proceed with your loan assessment."])
+        name = missing[0].name.replace('_', ' ')
+        return self._stream(["Thanks, that helps.", f"Could you tell me your {name}?"])
+
+    def handle_user_response(self, user_response, applicant_data):
+        response_data = GeminiAI.extract_locally(user_response, applicant_data)
+        if response_data is not None:
+            return response_data
+        self.requests += 1
+        time.sleep(self.extraction_seconds)
+        missing = missing_fields(applicant_data)
+        if not missing:
+            return {"data_updates": {}, "needs_clarification": False, "clarification_question": ""}
+        field = missing[0]
+        return {"data_updates": {field.category: {field.key: user_response}}, "needs_clarification": False,
+                "clarification_question": ""}
+
+    def stream_assessment(self, applicant_data):
+        return self._stream(["Based on your details, you look eligible.", "An officer will confirm the terms."])
@@ -0,0 +1,73 @@
+# synthetic_camera.py
+# A cv2.VideoCapture stand-in for benchmarks: a face (cropped from the dummy Aadhaar image)
+# drifting across a textured background, delivered at a fixed frame rate.
+import math
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+DOCS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Dummy Docs')
+AADHAAR_PATH = os.path.join(DOCS_DIR, 'Dummy aadhar.png')
+# Where the Haar cascade finds the photo on the dummy Aadhaar card, with some margin
+AADHAAR_FACE = (24, 211, 282, 282)
+
+
+def load_face(size=180):
+    x, y, w, h = AADHAAR_FACE
+    card = cv2.imread(AADHAAR_PATH)
+    return cv2.resize(card[y:y + h, x:x + w], (size, size))
+
+
+class SyntheticCamera:
+    """Implements read() like cv2.VideoCapture, blocking until the next frame is due"""
+
+    def __init__(self, width=640, height=480, fps=30, face_size=180, fail_after=None):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.fail_after = fail_after
+        self.face = load_face(face_size)
+        rng = np.random.default_rng(0)
+        self.background = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (9, 9), 0)
+        self.frames_read = 0
+        self._next_frame = None
+        self._lock = threading.Lock()
+
+    def face_position(self, index):
+        """Top-left corner of the pasted face image in frame `index`"""
+        size = self.face.shape[0]
+        # Slow Lissajous drift, a few pixels per frame like a person settling in front of a webcam
+        x = int((self.width - size) * (0.5 + 0.4 * math.sin(index / 45)))
+        y = int((self.height - size) * (0.5 + 0.4 * math.sin(index / 70)))
+        return x, y
+
+    def frame_at(self, index):
+        frame = self.background.copy()
+        size = self.face.shape[0]
+        x, y = self.face_position(index)
+        frame[y:y + size, x:x + size] = self.face
+        return frame
+
+    def read(self):
+        with self._lock:
+            now = time.perf_counter()
+            if self._next_frame is None:
+                self._next_frame = now
+            delay = self._next_frame - now
+            self._next_frame = max(self._next_frame, now) + 1 / self.fps
+            index = self.frames_read
+            self.frames_read += 1
+        if delay > 0:
+            time.sleep(delay)
+        if self.fail_after is not None and index >= self.fail_after:
+            return False, None
+        return True, self.frame_at(index)
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
@@ -1,88 +1,562 @@
 from flask import Flask, Response, jsonify, request
 import cv2
-import numpy as np
 import threading
 import time
 import base64
+import os
+import json
+import logging
+import tempfile
+from collections import defaultdict, deque, namedtuple
+from contextlib import contextmanager
+from face_batch import SEGMENT_FRAMES, VIDEO_EXTENSIONS, create_pool, verify_batch
+from face_features import detect_face, extract_face_features, load_detector
+from face_registry import FaceRegistry
 
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
 
-# Initialize camera
-cap = cv2.VideoCapture(1)
+# The camera and the face cascade are opened on first use, so importing this module touches no device
+CAMERA_INDEX = int(os.getenv('CAMERA_INDEX', '1'))
+detector = None
+detector_lock = threading.Lock()
+# Descriptor of the applicant currently in front of the camera
 reference_face = None
-lock = threading.Lock()
-
-# Load face cascade
-detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-
-def extract_face_features(frame, face_rect):
-    x, y, w, h = face_rect
-    face_region = frame[y:y+h, x:x+w]
-    face_region = cv2.resize(face_region, (100, 100))
-    gray_face = cv2.cvtColor(face_region, cv2.COLOR_BGR2GRAY)
-    gray_face = cv2.equalizeHist(gray_face)
-    return gray_face.flatten().astype(np.float32) / 255.0, face_region
-
-def compare_faces(features1, features2):
-    return np.corrcoef(features1, features2)[0, 1]
-
-def generate_frames():
-    global reference_face
-    while True:
-        with lock:
-            ret, frame = cap.read()
+active_applicant = None
+
+# Enrolled faces of every applicant, kept on disk and opened on first use
+applicant_faces = None
+registry_lock = threading.Lock()
+
+# Worker processes for /verify_batch, spawned once on the first batch and shared by all of them
+batch_pool = None
+batch_pool_lock = threading.Lock()
+
+def open_camera():
+    return cv2.VideoCapture(CAMERA_INDEX)
+
+def get_detector():
+    global detector
+    with detector_lock:
+        if detector is None:
+            detector = load_detector()
+        return detector
+
+def get_face_registry():
+    global applicant_faces
+    with registry_lock:
+        if applicant_faces is None:
+            applicant_faces = FaceRegistry(os.getenv('FACE_REGISTRY_DIR', 'face_registry'))
+        return applicant_faces
+
+def get_batch_pool():
+    global batch_pool
+    with batch_pool_lock:
+        if batch_pool is None:
+            batch_pool = create_pool()
+        return batch_pool
+
+class StageTimings:
+    """Accumulates wall time per pipeline stage"""
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.totals[name] += elapsed
+                self.counts[name] += 1
+
+    def report(self):
+        with self.lock:
+            return {name: {'calls': self.counts[name], 'avg_ms': round(self.totals[name] / self.counts[name] * 1000, 3)}
+                    for name in self.totals}
+
+class FaceTracker:
+    """Runs face detection on a downscaled frame every `interval` frames and tracks the box in between.
+
+    Tracking is a template match of the last detected face inside a window around its
+    previous position. The interval grows while frames take longer than the frame budget
+    and shrinks again when there is headroom; losing the track forces a detection.
+    """
+
+    def __init__(self, detector=None, scale=0.5, min_interval=2, max_interval=15, frame_budget=1 / 30,
+                 match_threshold=0.6, search_margin=0.5):
+        self.detector = detector
+        self.scale = scale
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.frame_budget = frame_budget
+        self.match_threshold = match_threshold
+        self.search_margin = search_margin
+        self.interval = min_interval
+        self.box = None
+        self.template = None
+        # The first frame always runs a detection
+        self.frames_since_detection = max_interval
+        self.average_frame_time = 0.0
+        self.timings = StageTimings()
+
+    def update(self, gray):
+        """Returns (box or None, True if the box comes from a fresh detection) for a grayscale frame"""
+        start = time.perf_counter()
+        self.frames_since_detection += 1
+        detected = False
         
-        if not ret:
-            continue
+        if self.frames_since_detection >= self.interval:
+            with self.timings.stage('detect'):
+                self.box = self._detect(gray)
+            self.frames_since_detection = 0
+            detected = self.box is not None
+        elif self.box is not None:
+            with self.timings.stage('track'):
+                self.box = self._track(gray)
         
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = detector.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+        self._adapt(time.perf_counter() - start)
+        return self.box, detected
+
+    def _detect(self, gray):
+        if self.detector is None:
+            self.detector = get_detector()
+        small = cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        min_side = max(1, int(30 * self.scale))
+        faces = self.detector.detectMultiScale(small, scaleFactor=1.1, minNeighbors=5, minSize=(min_side, min_side))
+        if len(faces) == 0:
+            self.template = None
+            return None
         
-        if len(faces) > 0:
-            x, y, w, h = faces[0]
-            face_features, _ = extract_face_features(frame, (x, y, w, h))
-            is_same_person = True
-            similarity_score = 1.0
-            
-            if reference_face is not None:
-                similarity_score = compare_faces(reference_face, face_features)
-                is_same_person = similarity_score >= 0.5
-            
-            color = (0, 255, 0) if is_same_person else (0, 0, 255)
-            cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-            status = f"Same Person" if is_same_person else "Different Person"
-            cv2.putText(frame, status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+        x, y, w, h = (int(round(v / self.scale)) for v in faces[0])
+        self.template = gray[y:y+h, x:x+w].copy()
+        return (x, y, w, h)
+
+    def _track(self, gray):
+        x, y, w, h = self.box
+        margin_x, margin_y = int(w * self.search_margin), int(h * self.search_margin)
+        left, top = max(0, x - margin_x), max(0, y - margin_y)
+        window = gray[top:y + h + margin_y, left:x + w + margin_x]
+        if window.shape[0] < self.template.shape[0] or window.shape[1] < self.template.shape[1]:
+            return None
         
-        _, buffer = cv2.imencode('.jpg', frame)
-        frame_bytes = buffer.tobytes()
-        yield (b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+        scores = cv2.matchTemplate(window, self.template, cv2.TM_CCOEFF_NORMED)
+        _, best, _, (match_x, match_y) = cv2.minMaxLoc(scores)
+        if best < self.match_threshold:
+            # Lost the face; the next frame runs a detection
+            self.frames_since_detection = self.interval
+            return None
+        return (left + match_x, top + match_y, w, h)
+
+    def _adapt(self, elapsed):
+        self.average_frame_time = 0.9 * self.average_frame_time + 0.1 * elapsed
+        if self.average_frame_time > self.frame_budget / 2:
+            self.interval = min(self.max_interval, self.interval + 1)
+        elif self.average_frame_time < self.frame_budget / 4:
+            self.interval = max(self.min_interval, self.interval - 1)
+
+    def stats(self):
+        return {'interval': self.interval, 'average_frame_ms': round(self.average_frame_time * 1000, 3), 'stages': self.timings.report()}
+
+face_tracker = FaceTracker()
+face_status = {'is_same_person': True}
+
+def annotate_frame(frame, tracker=None):
+    """Find and verify the face in a frame and draw the result on it"""
+    tracker = tracker or face_tracker
+    with tracker.timings.stage('convert'):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    box, detected = tracker.update(gray)
+    
+    if box is not None:
+        x, y, w, h = box
+        # Verification runs on fresh detections; tracked frames reuse the verdict
+        if detected:
+            with tracker.timings.stage('verify'):
+                face_features, _ = extract_face_features(frame, box)
+                is_same_person = True
+                if reference_face is not None:
+                    is_same_person = float(reference_face @ get_face_registry().projection.describe(face_features)) >= 0.5
+                face_status['is_same_person'] = is_same_person
+        is_same_person = face_status['is_same_person']
+        
+        color = (0, 255, 0) if is_same_person else (0, 0, 255)
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+        status = f"Same Person" if is_same_person else "Different Person"
+        cv2.putText(frame, status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+    return frame
+
+# Output settings of one MJPEG stream; width None keeps the camera resolution
+StreamTier = namedtuple('StreamTier', ['width', 'quality', 'max_fps'])
+
+STREAM_TIERS = {
+    'high': StreamTier(None, 85, 30),
+    'medium': StreamTier(480, 70, 15),
+    'low': StreamTier(320, 50, 8),
+}
+DEFAULT_TIER = 'high'
+
+def tier_name(tier):
+    return f"{tier.width or 'full'}w_q{tier.quality}_{tier.max_fps}fps"
+
+def requested_tier(args):
+    """Stream tier from query parameters: a named ?tier=, optionally overridden by ?width=, ?quality= and ?fps=.
+
+    Values are clamped and rounded so that similar requests share one encoder.
+    """
+    tier = STREAM_TIERS.get(args.get('tier', DEFAULT_TIER), STREAM_TIERS[DEFAULT_TIER])
+    width = args.get('width', tier.width, type=int)
+    quality = args.get('quality', tier.quality, type=int)
+    max_fps = args.get('fps', tier.max_fps, type=int)
+    return StreamTier(
+        width=None if width is None else max(160, min(1920, width // 32 * 32)),
+        quality=max(10, min(95, quality // 5 * 5)),
+        max_fps=max(1, min(30, max_fps))
+    )
+
+def encode_frame(frame, tier):
+    """Encode a frame for one tier as the parts of a multipart chunk: (headers, JPEG bytes, trailer).
+
+    The parts are yielded separately to the client rather than concatenated, which would copy the JPEG again.
+    """
+    if tier.width is not None and tier.width < frame.shape[1]:
+        height = round(frame.shape[0] * tier.width / frame.shape[1])
+        frame = cv2.resize(frame, (tier.width, height), interpolation=cv2.INTER_AREA)
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, tier.quality])
+    frame_bytes = buffer.tobytes()
+    headers = b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n' % len(frame_bytes)
+    return headers, frame_bytes, b'\r\n'
+
+def process_frame(frame, tracker=None, tier=STREAM_TIERS[DEFAULT_TIER]):
+    """Annotate a frame and encode it for one tier"""
+    tracker = tracker or face_tracker
+    annotate_frame(frame, tracker)
+    with tracker.timings.stage('encode'):
+        return encode_frame(frame, tier)
+
+class TierStats:
+    """Encode time and bandwidth of one stream tier"""
+
+    def __init__(self):
+        self.viewers = 0
+        self.frames_encoded = 0
+        self.encode_seconds = 0.0
+        self.bytes_encoded = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.started = time.perf_counter()
+        self.next_due = 0.0
+
+    def report(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            'viewers': self.viewers,
+            'frames_encoded': self.frames_encoded,
+            'avg_encode_ms': round(self.encode_seconds / self.frames_encoded * 1000, 3) if self.frames_encoded else None,
+            'avg_frame_kb': round(self.bytes_encoded / self.frames_encoded / 1024, 1) if self.frames_encoded else None,
+            'encoded_fps': round(self.frames_encoded / elapsed, 1),
+            'sent_fps': round(self.frames_sent / elapsed, 1),
+            'sent_kbps': round(self.bytes_sent * 8 / 1000 / elapsed, 1)
+        }
+
+class FrameBroadcaster:
+    """Reads the camera on one thread and shares every processed frame with all viewers.
+
+    Frames go into a small ring buffer. Detection runs once per frame and encoding once
+    per frame for each stream tier being watched, no faster than the tier's frame rate;
+    every viewer of a tier receives the same encoded bytes. With no viewers and no frame
+    requested for `idle_timeout` seconds the capture thread stops, releasing a camera it
+    opened, and the next viewer or frame request starts it again.
+    """
+
+    def __init__(self, capture=None, annotate=annotate_frame, buffer_size=4, max_backoff=1.0, open_capture=open_camera,
+                 frame_timeout=2.0, idle_timeout=60.0):
+        # Without a capture, `open_capture()` opens one on the capture thread when the first viewer arrives
+        self.capture = capture
+        self.open_capture = open_capture
+        self.annotate = annotate
+        self.buffer = deque(maxlen=buffer_size)
+        self.sequence = 0
+        self.subscribers = 0
+        self.tiers = {}
+        self.read_failures = 0
+        self.frame_errors = 0
+        self.max_backoff = max_backoff
+        # A viewer that gets no new frame for this long is disconnected rather than left waiting
+        self.frame_timeout = frame_timeout
+        # None keeps the camera open for as long as the process runs
+        self.idle_timeout = idle_timeout
+        self.last_demand = time.monotonic()
+        self.condition = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        with self.condition:
+            self.last_demand = time.monotonic()
+            if self._thread is None:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, name='camera-capture', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self.condition:
+            thread = self._thread
+            self._running = False
+        if thread is not None:
+            thread.join()
+
+    @property
+    def capturing(self):
+        """Whether the capture thread is running and holding the camera"""
+        with self.condition:
+            return self._thread is not None
+
+    def _idle(self):
+        return (self.idle_timeout is not None and not self.subscribers
+                and time.monotonic() - self.last_demand > self.idle_timeout)
+
+    def _run(self):
+        capture = None
+        try:
+            capture = self.capture if self.capture is not None else self.open_capture()
+            backoff = 0.01
+            failing = False
+            while self._running:
+                with self.condition:
+                    if self._idle():
+                        # Nobody is watching: let go of the camera until someone is. Decided under
+                        # the lock, so a viewer arriving now starts a new thread instead of joining this one
+                        if capture is not self.capture:
+                            capture.release()
+                        capture = None
+                        self.buffer.clear()
+                        self._running = False
+                        self._thread = None
+                        return
+                ret, frame = capture.read()
+                if not ret:
+                    # Poll a camera that stopped delivering with backoff instead of spinning a core
+                    self.read_failures += 1
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, self.max_backoff)
+                    continue
+                backoff = 0.01
+                
+                chunks = {}
+                if self.subscribers:
+                    try:
+                        # Annotation draws on the frame, so registration keeps the untouched original
+                        annotated = self.annotate(frame.copy())
+                        chunks = self._encode_tiers(annotated)
+                        failing = False
+                    except Exception:
+                        # One bad frame must not stop the camera for every viewer; a run of them is logged once
+                        self.frame_errors += 1
+                        if not failing:
+                            logger.exception("Failed to annotate or encode a camera frame")
+                        failing = True
+                with self.condition:
+                    self.sequence += 1
+                    self.buffer.append((self.sequence, frame, chunks))
+                    self.condition.notify_all()
+        except Exception:
+            logger.exception("Camera capture thread stopped")
+        finally:
+            if capture is not None and capture is not self.capture:
+                capture.release()
+            with self.condition:
+                if self._thread is threading.current_thread():
+                    self._running = False
+                    self._thread = None
+                self.condition.notify_all()
+
+    def _encode_tiers(self, frame):
+        chunks = {}
+        now = time.perf_counter()
+        with self.condition:
+            watched = [(tier, stats) for tier, stats in self.tiers.items() if stats.viewers]
+        for tier, stats in watched:
+            # A few milliseconds of slack keeps e.g. 15 fps from aliasing down to 10 on a 30 fps camera
+            if now + 0.005 < stats.next_due:
+                continue
+            stats.next_due = max(stats.next_due + 1 / tier.max_fps, now)
+            start = time.perf_counter()
+            chunks[tier] = encode_frame(frame, tier)
+            stats.encode_seconds += time.perf_counter() - start
+            stats.frames_encoded += 1
+            stats.bytes_encoded += len(chunks[tier][1])
+        return chunks
+
+    def latest_frame(self, timeout=2.0):
+        """The most recent raw camera frame, or None if the camera delivers nothing in time"""
+        self.start()
+        with self.condition:
+            self.condition.wait_for(lambda: self.buffer, timeout)
+            return self.buffer[-1][1] if self.buffer else None
+
+    def frames(self, tier=STREAM_TIERS[DEFAULT_TIER]):
+        """Yield each chunk encoded for `tier` once; a slow viewer skips straight to the newest frame"""
+        with self.condition:
+            self.subscribers += 1
+            stats = self.tiers.setdefault(tier, TierStats())
+            stats.viewers += 1
+            # Subscribed before starting, so an idle capture thread cannot exit under a new viewer
+            self.start()
+        try:
+            seen = 0
+            while True:
+                with self.condition:
+                    ready = self.condition.wait_for(
+                        lambda: not self._running or (self.buffer and self.buffer[-1][0] > seen and tier in self.buffer[-1][2]),
+                        self.frame_timeout)
+                    if not ready or not self._running:
+                        # The capture thread died or the camera went quiet: free the worker thread
+                        return
+                    seen, _, chunks = self.buffer[-1]
+                    chunk = chunks[tier]
+                    stats.frames_sent += 1
+                    stats.bytes_sent += len(chunk[0]) + len(chunk[1]) + len(chunk[2])
+                yield chunk
+        finally:
+            with self.condition:
+                self.subscribers -= 1
+                stats.viewers -= 1
+                if not stats.viewers:
+                    # Unwatched tiers are not kept: their stats would pile up, one per tier ever requested
+                    del self.tiers[tier]
+                self.last_demand = time.monotonic()
+
+    def tier_stats(self):
+        with self.condition:
+            return {tier_name(tier): stats.report() for tier, stats in self.tiers.items()}
+
+broadcaster = FrameBroadcaster()
+
+def generate_frames(tier=STREAM_TIERS[DEFAULT_TIER]):
+    for chunk in broadcaster.frames(tier):
+        yield from chunk
 
 @app.route('/video_feed')
 def video_feed():
-    return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    return Response(generate_frames(requested_tier(request.args)), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@app.route('/video_stats')
+def video_stats():
+    return jsonify({'tracker': face_tracker.stats(), 'tiers': broadcaster.tier_stats(), 'read_failures': broadcaster.read_failures,
+                    'frame_errors': broadcaster.frame_errors, 'capturing': broadcaster.capturing})
+
+def requested_applicant_id(default=None):
+    body = request.get_json(silent=True) or {}
+    return request.args.get('applicant_id') or body.get('applicant_id') or default
 
 @app.route('/register_face', methods=['POST'])
 def register_face():
-    global reference_face
-    with lock:
-        ret, frame = cap.read()
+    global reference_face, active_applicant
+    applicant_id = requested_applicant_id(default='default')
+    frame = broadcaster.latest_frame()
     
-    if not ret:
+    if frame is None:
         return jsonify({'error': 'Failed to capture image'}), 500
     
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    faces = detector.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
-    
-    if len(faces) == 0:
+    face_rect = detect_face(get_detector(), frame)
+    if face_rect is None:
         return jsonify({'error': 'No face detected'}), 400
     
-    x, y, w, h = faces[0]
-    reference_face, face_image = extract_face_features(frame, (x, y, w, h))
+    face_features, face_image = extract_face_features(frame, face_rect)
+    registry = get_face_registry()
+    # Other applicants with the same face may be duplicate applications
+    duplicates = registry.search(face_features, exclude=applicant_id)
+    registry.enroll(applicant_id, face_features)
+    reference_face = registry.descriptor(applicant_id)
+    active_applicant = applicant_id
     
     _, buffer = cv2.imencode('.jpg', face_image)
     face_base64 = base64.b64encode(buffer).decode('utf-8')
     
-    return jsonify({'message': 'Face registered successfully', 'face_image': face_base64})
+    return jsonify({
+        'message': 'Face registered successfully',
+        'applicant_id': applicant_id,
+        'face_image': face_base64,
+        'possible_duplicates': [{'applicant_id': other, 'similarity': round(score, 4)} for other, score in duplicates]
+    })
+
+@app.route('/verify_face', methods=['POST'])
+def verify_face():
+    applicant_id = requested_applicant_id(default=active_applicant)
+    registry = get_face_registry()
+    if applicant_id not in registry:
+        return jsonify({'error': 'No face registered for this applicant'}), 404
+    
+    frame = broadcaster.latest_frame()
+    if frame is None:
+        return jsonify({'error': 'Failed to capture image'}), 500
+    
+    face_rect = detect_face(get_detector(), frame)
+    if face_rect is None:
+        return jsonify({'error': 'No face detected'}), 400
+    
+    face_features, _ = extract_face_features(frame, face_rect)
+    similarity, is_same_person = registry.verify(applicant_id, face_features)
+    return jsonify({'applicant_id': applicant_id, 'similarity': round(similarity, 4), 'is_same_person': is_same_person})
+
+@app.route('/verify_batch', methods=['POST'])
+def verify_batch_upload():
+    """Verify uploaded images or one recorded video against an applicant's face, streamed as JSON lines"""
+    applicant_id = requested_applicant_id(default=active_applicant)
+    registry = get_face_registry()
+    if applicant_id not in registry:
+        return jsonify({'error': 'No face registered for this applicant'}), 404
+    
+    uploads = request.files.getlist('files')
+    if not uploads:
+        return jsonify({'error': 'No files uploaded'}), 400
+    
+    # Every stride-th frame of a video is verified; a malformed one is None
+    stride = request.args.get('stride', type=int) if 'stride' in request.args else 1
+    if stride is None or not 1 <= stride <= SEGMENT_FRAMES:
+        return jsonify({'error': f'stride must be a whole number from 1 to {SEGMENT_FRAMES}'}), 400
+    
+    video_path = None
+    if len(uploads) == 1 and os.path.splitext(uploads[0].filename)[1].lower() in VIDEO_EXTENSIONS:
+        # OpenCV can only decode video from a file
+        video_file = tempfile.NamedTemporaryFile(suffix=os.path.splitext(uploads[0].filename)[1], delete=False)
+        uploads[0].save(video_file)
+        video_file.close()
+        video_path = source = video_file.name
+    else:
+        source = [(upload.filename, upload.read()) for upload in uploads]
+    
+    def generate():
+        try:
+            for result in verify_batch(source, registry, applicant_id=applicant_id, stride=stride, pool=get_batch_pool()):
+                if video_path is not None:
+                    result['source'] = uploads[0].filename
+                yield json.dumps(result) + '\n'
+        finally:
+            if video_path is not None:
+                os.remove(video_path)
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+def warm_up():
+    """Load the face cascade and the face registry and start reading the camera, ahead of the first request"""
+    get_detector()
+    get_face_registry()
+    broadcaster.start()
+
+@app.route('/warmup', methods=['POST'])
+def warmup():
+    warm_up()
+    return jsonify({'camera_started': True})
 
 if __name__ == '__main__':
+    # The debug reloader runs this file twice; only the process that serves requests opens the camera
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
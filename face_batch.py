@@ -0,0 +1,175 @@
+"""Batch face verification over image directories, uploaded images and recorded video.
+
+Decoding, detection and feature extraction run in a process pool; each worker loads the
+face cascade once and each descriptor projection the first time a task needs it, so one
+pool can serve many batches. Results stream out as JSON lines in input order.
+
+    python face_batch.py "Dummy Docs" --applicant-id A123
+    python face_batch.py recording.mp4 --reference selfie.jpg --stride 5 --workers 4
+"""
+import argparse
+import json
+import os
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import cv2
+import numpy as np
+
+from face_features import detect_face, extract_face_features, load_detector
+from face_registry import FaceProjection, FaceRegistry
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.webp', '.tif', '.tiff'}
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.webm'}
+# Frames of video per worker task; the stride can be at most this
+SEGMENT_FRAMES = 300
+
+# Scanned documents are often large; detection runs on a copy no larger than this
+MAX_DETECTION_SIDE = 1280
+
+# Per-process state: the cascade set by init_worker, projections loaded by task on first use
+worker_detector = None
+worker_projections = {}
+
+def init_worker():
+    global worker_detector
+    cv2.setNumThreads(1)
+    worker_detector = load_detector()
+
+def worker_projection(projection_path):
+    if projection_path not in worker_projections:
+        worker_projections[projection_path] = FaceProjection.load(projection_path)
+    return worker_projections[projection_path]
+
+def create_pool(workers=None):
+    """Process pool for verify_batch, meant to be created once and reused.
+
+    Workers are spawned rather than forked: a fork from a threaded server copies locks held
+    by other threads (the camera capture thread, logging) into the child.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=init_worker)
+
+def verify_frame(frame, projection_path, reference):
+    """Detect, describe and compare the first face in a frame against the reference descriptor"""
+    scale = min(1.0, MAX_DETECTION_SIDE / max(frame.shape[:2]))
+    small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else frame
+    face_rect = detect_face(worker_detector, small)
+    if face_rect is None:
+        return {'face': None, 'similarity': None, 'is_same_person': None}
+    
+    face_rect = [int(round(v / scale)) for v in face_rect]
+    features, _ = extract_face_features(frame, face_rect)
+    descriptor = worker_projection(projection_path).describe(features)
+    result = {'face': face_rect, 'descriptor': descriptor}
+    if reference is not None:
+        similarity = float(reference @ descriptor)
+        result.update(similarity=round(similarity, 4), is_same_person=similarity >= 0.5)
+    return result
+
+def verify_image(projection_path, reference, item):
+    """Worker task for one image: a path, or a (name, encoded bytes) upload"""
+    if isinstance(item, tuple):
+        source, data = item
+        frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    else:
+        source, frame = item, cv2.imread(item)
+    if frame is None:
+        return [{'source': source, 'error': 'Could not decode image'}]
+    return [dict(source=source, **verify_frame(frame, projection_path, reference))]
+
+def verify_video_segment(projection_path, reference, task):
+    """Worker task for frames [start, stop) of a video, every `stride`-th frame"""
+    path, start, stop, stride = task
+    capture = cv2.VideoCapture(path)
+    capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+    results = []
+    for index in range(start, stop):
+        # grab() skips decoding frames that are not sampled
+        if (index - start) % stride:
+            if not capture.grab():
+                break
+            continue
+        ret, frame = capture.read()
+        if not ret:
+            break
+        results.append(dict(source=path, frame=index, **verify_frame(frame, projection_path, reference)))
+    capture.release()
+    return results
+
+def video_segments(path, stride, segment_frames=SEGMENT_FRAMES):
+    if not 1 <= stride <= segment_frames:
+        raise ValueError(f"stride must be from 1 to {segment_frames}, got {stride}")
+    capture = cv2.VideoCapture(path)
+    total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    capture.release()
+    segment_frames -= segment_frames % stride
+    return [(path, start, min(start + segment_frames, total), stride) for start in range(0, total, segment_frames)]
+
+def collect_tasks(source, stride=1):
+    """Worker tasks for a directory of images, one image, a video file or a list of uploads"""
+    if isinstance(source, list):
+        return verify_image, source
+    if os.path.isdir(source):
+        paths = sorted(os.path.join(source, name) for name in os.listdir(source)
+                       if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS)
+        return verify_image, paths
+    if os.path.splitext(source)[1].lower() in VIDEO_EXTENSIONS:
+        return verify_video_segment, video_segments(source, stride)
+    return verify_image, [source]
+
+def verify_batch(source, registry, applicant_id=None, reference=None, workers=None, stride=1, include_descriptors=False, pool=None):
+    """Yield one result dict per image or sampled video frame, in input order.
+
+    The reference face is the enrolled descriptor of `applicant_id`, or the face found in
+    the `reference` image; without either, faces are only detected and described. Tasks run
+    on `pool` when given, otherwise on a pool of `workers` created for this batch.
+    """
+    projection_path = os.path.join(registry.directory, 'projection.npz')
+    if applicant_id is not None:
+        reference_descriptor = registry.descriptor(applicant_id)
+        if reference_descriptor is None:
+            raise KeyError(f"No face enrolled for applicant {applicant_id}")
+    elif reference is not None:
+        init_worker()
+        reference_result = verify_image(projection_path, None, reference)[0]
+        if reference_result.get('face') is None:
+            raise ValueError(f"No face found in reference image {reference}")
+        reference_descriptor = reference_result['descriptor']
+    else:
+        reference_descriptor = None
+
+    task, items = collect_tasks(source, stride)
+    own_pool = pool is None
+    if own_pool:
+        pool = create_pool(workers)
+    try:
+        chunksize = max(1, len(items) // (4 * (workers or os.cpu_count() or 1)))
+        for results in pool.map(partial(task, projection_path, reference_descriptor), items, chunksize=chunksize):
+            for result in results:
+                descriptor = result.pop('descriptor', None)
+                if include_descriptors and descriptor is not None:
+                    result['descriptor'] = descriptor.tolist()
+                yield result
+    finally:
+        if own_pool:
+            pool.shutdown(cancel_futures=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify faces in images or a video against a registered face")
+    parser.add_argument('source', help="image directory, image file or video file")
+    parser.add_argument('--applicant-id', help="compare against this applicant's registered face")
+    parser.add_argument('--reference', help="compare against the face in this image instead")
+    parser.add_argument('--registry', default=os.getenv('FACE_REGISTRY_DIR', 'face_registry'))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--stride', type=int, default=1, help="verify every n-th video frame")
+    args = parser.parse_args()
+
+    registry = FaceRegistry(args.registry)
+    for result in verify_batch(args.source, registry, args.applicant_id, args.reference, args.workers, args.stride):
+        sys.stdout.write(json.dumps(result) + '\n')
+        sys.stdout.flush()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+import cv2
+import numpy as np
+
+CASCADE_PATH = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+
+def load_detector():
+    return cv2.CascadeClassifier(CASCADE_PATH)
+
+def detect_face(detector, frame):
+    """Bounding box (x, y, w, h) of the first face in a BGR frame, or None"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    faces = detector.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+    return faces[0] if len(faces) > 0 else None
+
+def extract_face_features(frame, face_rect):
+    x, y, w, h = face_rect
+    face_region = frame[y:y+h, x:x+w]
+    face_region = cv2.resize(face_region, (100, 100))
+    gray_face = cv2.cvtColor(face_region, cv2.COLOR_BGR2GRAY)
+    gray_face = cv2.equalizeHist(gray_face)
+    return gray_face.flatten().astype(np.float32) / 255.0, face_region
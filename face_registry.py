@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+# extract_face_features returns a 100x100 grayscale face, flattened
+FEATURE_SIZE = 100 * 100
+DESCRIPTOR_SIZE = 128
+
+def normalize_features(features):
+    """Center and scale raw face features so that a dot product equals their correlation"""
+    features = np.asarray(features, dtype=np.float32)
+    centered = features - features.mean(axis=-1, keepdims=True)
+    norms = np.linalg.norm(centered, axis=-1, keepdims=True)
+    return centered / np.maximum(norms, 1e-12)
+
+class FaceProjection:
+    """Linear map from raw face features to compact unit-length float32 descriptors.
+
+    Fitted by PCA over sample faces when there are enough of them; otherwise a seeded
+    random projection, which preserves correlations approximately without training data.
+    """
+
+    def __init__(self, mean, components):
+        self.mean = mean.astype(np.float32)
+        self.components = components.astype(np.float32)
+
+    @property
+    def dimensions(self):
+        return self.components.shape[0]
+
+    @classmethod
+    def fit(cls, samples, dimensions=DESCRIPTOR_SIZE):
+        # Uncentered: the leading singular vectors of the normalized faces keep their dot
+        # products (correlations), which subtracting a mean face would not
+        samples = normalize_features(samples)
+        _, _, vt = np.linalg.svd(samples, full_matrices=False)
+        return cls(np.zeros(samples.shape[1], dtype=np.float32), vt[:dimensions])
+
+    @classmethod
+    def random(cls, dimensions=DESCRIPTOR_SIZE, feature_size=FEATURE_SIZE, seed=0):
+        rng = np.random.default_rng(seed)
+        components = rng.standard_normal((dimensions, feature_size), dtype=np.float32) / np.sqrt(dimensions)
+        return cls(np.zeros(feature_size, dtype=np.float32), components)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data['mean'], data['components'])
+
+    def save(self, path):
+        np.savez(path, mean=self.mean, components=self.components)
+
+    def describe(self, features):
+        """Descriptor(s) for one feature vector or a batch of them"""
+        projected = (normalize_features(features) - self.mean) @ self.components.T
+        norms = np.linalg.norm(projected, axis=-1, keepdims=True)
+        return (projected / np.maximum(norms, 1e-12)).astype(np.float32)
+
+class FaceRegistry:
+    """Face descriptors for many applicants, in a memory-mapped float32 matrix keyed by applicant id.
+
+    One row per applicant; enrolling again replaces the row. Verification is a dot product
+    against one row and duplicate search a single matrix-vector product over all of them.
+    """
+
+    def __init__(self, directory, projection=None, initial_capacity=1024):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.projection = projection or self._load_projection()
+        self.lock = threading.RLock()
+        self.ids = []
+        self.rows = {}
+        self._ids_path = os.path.join(directory, 'ids.jsonl')
+        self._matrix_path = os.path.join(directory, 'descriptors.f32')
+        self._load_ids()
+        self._open_matrix(max(initial_capacity, len(self.ids)))
+
+    def _load_projection(self):
+        path = os.path.join(self.directory, 'projection.npz')
+        if os.path.exists(path):
+            return FaceProjection.load(path)
+        projection = FaceProjection.random()
+        projection.save(path)
+        return projection
+
+    def _load_ids(self):
+        if not os.path.exists(self._ids_path):
+            return
+        with open(self._ids_path) as f:
+            for line in f:
+                applicant_id = json.loads(line)
+                if applicant_id not in self.rows:
+                    self.rows[applicant_id] = len(self.ids)
+                    self.ids.append(applicant_id)
+
+    def _open_matrix(self, capacity):
+        dimensions = self.projection.dimensions
+        existing = os.path.getsize(self._matrix_path) // (4 * dimensions) if os.path.exists(self._matrix_path) else 0
+        capacity = max(capacity, existing)
+        if existing < capacity:
+            with open(self._matrix_path, 'ab') as f:
+                f.truncate(capacity * dimensions * 4)
+        self.matrix = np.memmap(self._matrix_path, dtype=np.float32, mode='r+', shape=(capacity, dimensions))
+
+    def _ensure_capacity(self, count):
+        if count > self.matrix.shape[0]:
+            self.matrix.flush()
+            del self.matrix
+            self._open_matrix(max(count, 2 * len(self.ids)))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, applicant_id):
+        return applicant_id in self.rows
+
+    def enroll(self, applicant_id, features):
+        """Store the face for an applicant from extract_face_features output"""
+        self.enroll_descriptors([applicant_id], self.projection.describe(features)[None, :])
+
+    def enroll_descriptors(self, applicant_ids, descriptors):
+        """Bulk-store already projected descriptors, one row per applicant id"""
+        with self.lock:
+            new_ids = [applicant_id for applicant_id in dict.fromkeys(applicant_ids) if applicant_id not in self.rows]
+            self._ensure_capacity(len(self.ids) + len(new_ids))
+            if new_ids:
+                with open(self._ids_path, 'a') as f:
+                    f.writelines(json.dumps(applicant_id) + '\n' for applicant_id in new_ids)
+                for applicant_id in new_ids:
+                    self.rows[applicant_id] = len(self.ids)
+                    self.ids.append(applicant_id)
+            self.matrix[[self.rows[applicant_id] for applicant_id in applicant_ids]] = descriptors
+            self.matrix.flush()
+
+    def descriptor(self, applicant_id):
+        with self.lock:
+            row = self.rows.get(applicant_id)
+            return None if row is None else np.array(self.matrix[row])
+
+    def verify(self, applicant_id, features, threshold=0.5):
+        """1:1 check of a face against an enrolled applicant; returns (similarity, is_same_person)"""
+        enrolled = self.descriptor(applicant_id)
+        if enrolled is None:
+            raise KeyError(f"No face enrolled for applicant {applicant_id}")
+        similarity = float(enrolled @ self.projection.describe(features))
+        return similarity, similarity >= threshold
+
+    def search(self, features, top_k=5, threshold=0.5, exclude=None):
+        """1:N search for enrolled applicants resembling a face, best first, as (applicant_id, similarity)"""
+        return self.search_descriptor(self.projection.describe(features), top_k, threshold, exclude)
+
+    def search_descriptor(self, descriptor, top_k=5, threshold=0.5, exclude=None):
+        with self.lock:
+            count = len(self.ids)
+            if count == 0:
+                return []
+            scores = self.matrix[:count] @ descriptor
+            k = min(top_k + 1, count)
+            candidates = np.argpartition(-scores, k - 1)[:k]
+            candidates = candidates[np.argsort(-scores[candidates])]
+            matches = [(self.ids[row], float(scores[row])) for row in candidates
+                       if scores[row] >= threshold and self.ids[row] != exclude]
+            return matches[:top_k]
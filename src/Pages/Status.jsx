@@ -21,7 +21,7 @@ const Status = () => {
             try {
                 setLoading(true);
                 // Replace with your actual API endpoint
-                const response = await fetch(`https://ai-for-loan-manager.onrender.com/api/report`);
+                const response = await fetch(`https://ai-for-loan-manager.onrender.com/api/report?id=${encodeURIComponent(applicationId)}`);
                 console.log(response);
                 if (!response.ok) {
                     throw new Error(`API responded with status: ${response.status}`);
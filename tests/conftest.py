@@ -0,0 +1,9 @@
+# conftest.py
+# The backend modules import each other by name, the face modules sit at the repository root
+# and the fake Gemini server lives with the benchmarks
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT_DIR, 'Backend'), ROOT_DIR, os.path.join(ROOT_DIR, 'benchmarks')]
+os.environ.setdefault('GEMINI_API_KEY', 'fake')
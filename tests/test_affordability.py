@@ -0,0 +1,82 @@
+# test_affordability.py
+# LoanEligibilityEngine.solve_affordability(_batch): the largest approvable loan and the
+# shortest passing term, solved in closed form from the rules that depend on them
+import math
+
+import numpy as np
+import pytest
+
+from bench_batch_eligibility import as_applicant, random_book
+from loan_eligibility import LoanEligibilityEngine
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return LoanEligibilityEngine()
+
+
+def applicant(loan_amount=6000000, loan_term=10, interest_rate=0.0, property_value=100000000, salary=100000):
+    return {
+        'financial': {'credit_score': 760, 'monthly_expenses': 30000},
+        'employment': {'net_monthly_salary': salary, 'work_experience': 5},
+        'loan_request': {'loan_amount': loan_amount, 'loan_term': loan_term, 'interest_rate': interest_rate,
+                         'property_value': property_value}
+    }
+
+
+def test_zero_interest_rate(engine):
+    # Half of a 100,000 salary for 120 months, with no interest on it
+    assert engine.solve_affordability(applicant()) == {'max_loan_amount': 6000000, 'min_loan_term': 10}
+    assert engine.solve_affordability(applicant(loan_amount=6000001))['min_loan_term'] == 11
+
+
+def test_no_term_meets_the_emi_cap(engine):
+    # 1% a month on 6,000,000 is more than the 50,000 EMI cap before any principal is repaid
+    solution = engine.solve_affordability(applicant(interest_rate=12.0))
+    assert solution['min_loan_term'] is None
+    assert solution['max_loan_amount'] < 6000000
+
+
+def test_no_loan_without_a_property_value(engine):
+    assert engine.solve_affordability(applicant(interest_rate=8.5, property_value=0))['max_loan_amount'] is None
+
+
+@pytest.mark.parametrize('interest_rate, loan_term', [(8.5, 20), (12.0, 5), (7.5, 1), (0.0, 3)])
+def test_max_loan_round_trip_reaches_the_emi_cap(engine, interest_rate, loan_term):
+    data = applicant(interest_rate=interest_rate, loan_term=loan_term)
+    max_loan = engine.solve_affordability(data)['max_loan_amount']
+    cap = 0.5 * 100000
+    emi = engine.calculate_emi(max_loan, interest_rate, loan_term)
+    # The largest whole amount: its EMI is within one rupee's EMI of the cap, and one more rupee goes over
+    assert emi <= cap
+    assert emi == pytest.approx(cap, abs=engine.calculate_emi(1, interest_rate, loan_term))
+    assert engine.calculate_emi(max_loan + 1, interest_rate, loan_term) > cap
+    data['loan_request']['loan_amount'] = max_loan
+    assert engine.check_eligibility(data)['status'] == "APPROVED"
+    data['loan_request']['loan_amount'] = max_loan + 1
+    assert engine.check_eligibility(data)['status'] != "APPROVED"
+
+
+def test_min_term_round_trip(engine):
+    data = applicant(loan_amount=5000000, interest_rate=8.5)
+    term = engine.solve_affordability(data)['min_loan_term']
+    assert engine.check_eligibility(applicant(loan_amount=5000000, interest_rate=8.5, loan_term=term))['status'] == "APPROVED"
+    assert engine.check_eligibility(applicant(loan_amount=5000000, interest_rate=8.5, loan_term=term - 1))['status'] != "APPROVED"
+
+
+def test_batch_matches_scalar(engine):
+    columns = random_book(300, seed=11)
+    columns['interest_rate'][:20] = 0.0
+    batch = engine.solve_affordability_batch(columns)
+    for i in range(300):
+        scalar = engine.solve_affordability(as_applicant(columns, i))
+        max_loan, min_term = batch['max_loan_amount'][i], batch['min_loan_term'][i]
+        assert scalar['max_loan_amount'] == (None if np.isnan(max_loan) else math.inf if np.isinf(max_loan) else int(max_loan))
+        assert scalar['min_loan_term'] == (None if not np.isfinite(min_term) else int(min_term))
+
+
+def test_invalid_rows_have_no_solution(engine):
+    columns = engine.columns_from_applicants([applicant(), applicant(salary='abc')])
+    batch = engine.solve_affordability_batch(columns)
+    assert np.isnan(batch['max_loan_amount'][1]) and np.isnan(batch['min_loan_term'][1])
+    assert batch['max_loan_amount'][0] == 6000000
@@ -0,0 +1,98 @@
+# test_answer_extractor.py
+# Local parsing of one-number answers: which field an answer names, when it must fit a
+# single missing field, and the answers always left to Gemini
+import pytest
+
+from answer_extractor import MAX_WORDS, extract_answer, parse_quantity
+from applicant_schema import REQUIRED_FIELDS
+
+
+def extracted(text, applicant_data=None):
+    result = extract_answer(text, applicant_data or {}, REQUIRED_FIELDS)
+    if result is None:
+        return None
+    assert result['needs_clarification'] is False
+    (category, fields), = result['data_updates'].items()
+    (field, value), = fields.items()
+    return f"{category}.{field}", value
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("My salary is 85,000", ('employment.net_monthly_salary', 85000)),
+    ("my earnings are 85k", ('employment.net_monthly_salary', 85000)),
+    ("Credit score 750", ('financial.credit_score', 750)),
+    ("I spend about 25000 on expenses", ('financial.monthly_expenses', 25000)),
+    ("I need 20 lakhs", ('loan_request.loan_amount', 2000000)),
+    ("the rate is 8.5%", ('loan_request.interest_rate', 8.5)),
+    ("a term of 240 months", ('loan_request.loan_term', 20)),
+    ("I have 6 years of experience", ('employment.work_experience', 6)),
+    ("my house is worth 1.2 crore", ('loan_request.property_value', 12000000)),
+])
+def test_named_fields(text, expected):
+    assert extracted(text) == expected
+
+
+@pytest.mark.parametrize('text', [
+    # "rate" inside "separate", "term" inside "determined", "job" inside "jobless"
+    "separately 12",
+    "I determined it as 15",
+    "I have been jobless for 2 years",
+])
+def test_keywords_inside_other_words_name_nothing(text):
+    # Each number fits several missing fields, so without a named field it is ambiguous
+    assert extracted(text) is None
+
+
+def test_need_and_job_name_their_own_fields():
+    assert extracted("I need 15 lakh") == ('loan_request.loan_amount', 1500000)
+    assert extracted("5 years in this job") == ('employment.work_experience', 5)
+    # "needle" is not "need": 15 lakh then fits loan amount and property value alike
+    assert extracted("needle 15 lakh") is None
+
+
+def test_unnamed_answer_fills_the_only_missing_field_it_fits():
+    applicant_data = {'financial': {'credit_score': 750, 'monthly_expenses': 20000},
+                      'employment': {'net_monthly_salary': 85000, 'work_experience': 5},
+                      'loan_request': {'loan_amount': 2000000, 'interest_rate': 8.5, 'property_value': 5000000}}
+    assert extracted("20", applicant_data) == ('loan_request.loan_term', 20)
+    assert extracted("20") is None
+
+
+@pytest.mark.parametrize('text', [
+    "I don't earn 50000",
+    "not 750",
+    "maybe 20 years",
+    "between 8 and 9 percent",
+    "12 lpa",
+    "my salary is 12 lakh per year",
+    "I guess 700",
+])
+def test_uncertain_answers_are_left_to_gemini(text):
+    assert extracted(text) is None
+
+
+def test_long_answers_are_left_to_gemini():
+    words = ["well"] * (MAX_WORDS - 2)
+    assert extracted(" ".join(words + ["salary", "85000"])) == ('employment.net_monthly_salary', 85000)
+    assert extracted(" ".join(words + ["my", "salary", "85000"])) is None
+
+
+@pytest.mark.parametrize('text', ["", "   ", "no number here", "750 and 800", "salary 85000 expenses 20000"])
+def test_answers_without_exactly_one_number(text):
+    assert extracted(text) is None
+
+
+def test_fractional_years_are_not_rounded():
+    assert extracted("work experience of 18 months") is None
+    assert extracted("tenure 1.5 years") is None
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("rs 85,000", (85000, 'currency')),
+    ("8.5 percent", (8.5, 'percent')),
+    ("2 crores", (20000000, 'currency')),
+    ("36 months", (36, 'months')),
+    ("10 and 20", None),
+])
+def test_parse_quantity(text, expected):
+    assert parse_quantity(text) == expected
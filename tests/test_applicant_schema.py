@@ -0,0 +1,131 @@
+# test_applicant_schema.py
+# Field coercion, compiled getters/setters and the ApplicantRecord missing-field bitmask,
+# which must agree with a fresh walk of the data after every write
+import math
+
+import pytest
+
+from applicant_schema import (APPLICANT_SCHEMA, FIELD_INDEX, ApplicantRecord, coerce, compile_getter,
+                              compile_parser, compile_setter, missing_fields, missing_mask)
+from gemini_integration import GeminiAI
+
+FIELDS = {field.path: field for field in APPLICANT_SCHEMA}
+ANSWERS = {
+    'financial.credit_score': '750',
+    'employment.net_monthly_salary': 'Rs 80,000',
+    'financial.monthly_expenses': 25000,
+    'employment.work_experience': '5 years',
+    'loan_request.loan_amount': '10 lakh',
+    'loan_request.loan_term': '240 months',
+    'loan_request.interest_rate': '8.5%',
+    'loan_request.property_value': '50,00,000',
+    'personal_information.date_of_birth': ' 1990-04-12 ',
+    'personal_information.gender': 'female',
+}
+
+
+def test_missing_mask_follows_every_set():
+    record = ApplicantRecord()
+    assert record.missing_mask == (1 << len(APPLICANT_SCHEMA)) - 1
+
+    for path, value in ANSWERS.items():
+        record.set(path, value)
+        assert record.missing_mask == missing_mask(record.data)
+        assert not record.missing_mask & (1 << FIELD_INDEX[path])
+    assert record.is_complete()
+
+    record.set('financial.credit_score', '')
+    assert record.missing_mask == 1 << FIELD_INDEX['financial.credit_score']
+    assert record.get('financial.credit_score') is None
+    record.set('loan_request.loan_term', None)
+    assert record.missing_mask == missing_mask(record.data)
+    assert [field.path for field in record.missing_fields()] == ['financial.credit_score', 'loan_request.loan_term']
+
+
+def test_update_applies_nested_data_updates():
+    record = ApplicantRecord()
+    record.update({'financial': {'credit_score': '720'}, 'loan_request': {'interest_rate': '9.2'}})
+    assert record.get('financial.credit_score') == 720
+    assert record.get('loan_request.interest_rate') == 9.2
+    assert record.missing_mask == missing_mask(record.data)
+
+
+def test_parsed_values():
+    record = ApplicantRecord()
+    for path, value in ANSWERS.items():
+        record.set(path, value)
+    assert record.get('employment.net_monthly_salary') == 80000
+    assert record.get('loan_request.loan_amount') == 1000000
+    assert record.get('loan_request.loan_term') == 20
+    assert record.get('loan_request.interest_rate') == 8.5
+    assert record.get('personal_information.date_of_birth') == '1990-04-12'
+
+
+def test_paths_outside_the_schema_are_stored_as_they_are():
+    record = ApplicantRecord()
+    record.set('personal_information.address.city', 'Pune')
+    assert record.data['personal_information']['address'] == {'city': 'Pune'}
+    assert record.missing_mask == missing_mask(record.data)
+
+
+@pytest.mark.parametrize('value', ['abc', 'about a lot', '', None, True, math.inf, 'nan', '1 2'])
+def test_numeric_fields_reject_values_that_are_not_one_number(value):
+    field = FIELDS['loan_request.loan_amount']
+    assert coerce(field, value) is None
+    assert compile_parser(field)(value) is None
+
+
+@pytest.mark.parametrize('value', ['1.5', 2.5, '18 months', '7.25 years'])
+def test_year_fields_reject_fractional_years(value):
+    field = FIELDS['employment.work_experience']
+    assert coerce(field, value) is None
+    assert compile_parser(field)(value) is None
+
+
+@pytest.mark.parametrize('value, expected', [('24 months', 2), ('5', 5), (7.0, 7), ('10 years', 10)])
+def test_year_fields_accept_whole_years(value, expected):
+    field = FIELDS['loan_request.loan_term']
+    assert coerce(field, value) == expected
+    assert compile_parser(field)(value) == expected
+
+
+@pytest.mark.parametrize('path', [field.path for field in APPLICANT_SCHEMA])
+@pytest.mark.parametrize('value', ['750', 750, 8.5, '9.2%', 'Rs 1,00,000', 'abc', '', None])
+def test_compiled_parser_matches_coerce(path, value):
+    field = FIELDS[path]
+    assert compile_parser(field)(value) == coerce(field, value)
+
+
+@pytest.mark.parametrize('path', ['financial.credit_score', 'personal_information.address.city', 'a.b.c.d'])
+def test_getter_and_setter_round_trip(path):
+    get, set_value = compile_getter(path), compile_setter(path)
+    data = {}
+    assert get(data) is None
+    set_value(data, 42)
+    assert get(data) == 42
+    set_value(data, 'replaced')
+    assert get(data) == 'replaced'
+
+
+def test_getter_tolerates_non_dict_levels():
+    assert compile_getter('financial.credit_score')({'financial': 'n/a'}) is None
+    assert compile_getter('a.b.c')({'a': {'b': 5}}) is None
+
+
+def test_setter_replaces_a_non_dict_category():
+    data = {'financial': None}
+    compile_setter('financial.credit_score')(data, 700)
+    assert data == {'financial': {'credit_score': 700}}
+
+
+def test_required_fields_include_date_of_birth_and_gender():
+    data = {path.split('.')[0]: {} for path in ANSWERS}
+    for path, value in ANSWERS.items():
+        category, key = path.split('.')
+        data[category][key] = value
+    assert GeminiAI.check_required_fields(data) == []
+
+    del data['personal_information']
+    assert GeminiAI.check_required_fields(data) == ['date_of_birth', 'gender']
+    assert GeminiAI.check_required_fields(ApplicantRecord(data)) == ['date_of_birth', 'gender']
+    assert [field.name for field in missing_fields(None)] == [field.name for field in APPLICANT_SCHEMA]
@@ -0,0 +1,143 @@
+# test_applicant_store.py
+# Both applicant stores: save/load/update round trips, export and import, applicant id
+# validation, SQLite field upserts and the one-time migration of the legacy JSON file
+import io
+import json
+import os
+
+import pytest
+
+from applicant_store import (DEFAULT_APPLICANT_ID, JSONFileApplicantStore, SQLiteApplicantStore, create_applicant_store,
+                             empty_applicant_data, load_or_migrate)
+
+APPLICANT = {
+    'personal_information': {'name': 'Asha Rao', 'address': {'city': 'Pune', 'pin': '411001'}},
+    'identification': {},
+    'employment': {'net_monthly_salary': 85000, 'work_experience': 5},
+    'financial': {'credit_score': 750, 'accounts': ['savings', 'salary']},
+    'loan_request': {'loan_amount': 2000000.5, 'notes': None},
+}
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'json':
+        store = JSONFileApplicantStore(str(tmp_path / 'applicants'))
+    else:
+        store = SQLiteApplicantStore(str(tmp_path / 'applicants.db'))
+    yield store
+    store.close()
+
+
+def test_save_and_load_round_trip(store):
+    assert store.load('A1') is None
+    store.save('A1', APPLICANT)
+    assert store.load('A1') == APPLICANT
+    assert store.applicant_ids() == ['A1']
+
+    store.save('A1', empty_applicant_data())
+    assert store.load('A1') == empty_applicant_data()
+    store.delete('A1')
+    assert store.load('A1') is None
+    store.delete('A1')
+
+
+def test_update_sets_dotted_paths(store):
+    store.update('A1', {'employment.net_monthly_salary': 85000, 'personal_information.address.city': 'Pune'})
+    data = store.load('A1')
+    assert data['employment'] == {'net_monthly_salary': 85000}
+    assert data['personal_information'] == {'address': {'city': 'Pune'}}
+
+    store.update('A1', {'employment.net_monthly_salary': 90000})
+    assert store.load('A1')['employment'] == {'net_monthly_salary': 90000}
+
+
+def test_export_and_import_round_trip(store, tmp_path):
+    store.save('A1', APPLICANT)
+    store.save('A2', empty_applicant_data())
+    exported = io.StringIO()
+    assert store.export_jsonl(exported) == 2
+
+    copy = SQLiteApplicantStore(str(tmp_path / 'copy.db'))
+    try:
+        assert copy.import_jsonl(io.StringIO(exported.getvalue())) == 2
+        assert copy.load('A1') == APPLICANT
+        assert copy.load('A2') == empty_applicant_data()
+    finally:
+        copy.close()
+
+
+@pytest.mark.parametrize('applicant_id', ['../escape', 'a/b', '', 'x' * 65, 'id with spaces', None])
+def test_json_store_rejects_invalid_ids_before_writing(tmp_path, applicant_id):
+    store = JSONFileApplicantStore(str(tmp_path / 'applicants'))
+    for operation in (lambda: store.save(applicant_id, APPLICANT), lambda: store.load(applicant_id),
+                      lambda: store.update(applicant_id, {'financial.credit_score': 1})):
+        with pytest.raises(ValueError):
+            operation()
+    assert os.listdir(store.directory) == []
+    assert not (tmp_path / 'escape.json').exists()
+
+
+def test_sqlite_update_replaces_children_and_leaf_parents(tmp_path):
+    store = SQLiteApplicantStore(str(tmp_path / 'applicants.db'))
+    try:
+        store.save('A1', APPLICANT)
+        # A value replaces everything stored below its path
+        store.update('A1', {'personal_information.address': {'city': 'Mumbai'}})
+        assert store.load('A1')['personal_information'] == {'name': 'Asha Rao', 'address': {'city': 'Mumbai'}}
+        store.update('A1', {'personal_information.address': 'unknown'})
+        assert store.load('A1')['personal_information']['address'] == 'unknown'
+
+        # A leaf stored at a parent, like an empty category, makes way for the field
+        store.update('A1', {'identification.pan_number': 'ABCDE1234F'})
+        assert store.load('A1')['identification'] == {'pan_number': 'ABCDE1234F'}
+        store.update('A1', {'personal_information.address.city': 'Pune'})
+        assert store.load('A1')['personal_information']['address'] == {'city': 'Pune'}
+
+        # Upserts touch only the fields named
+        assert store.load('A1')['employment'] == APPLICANT['employment']
+        rows = store._connection.execute("SELECT COUNT(*) FROM applicant_fields WHERE applicant_id = 'A1'").fetchone()[0]
+        assert rows == 9
+    finally:
+        store.close()
+
+
+def test_sqlite_store_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / 'applicants.db')
+    writer, reader = SQLiteApplicantStore(path), SQLiteApplicantStore(path)
+    try:
+        writer.update('A1', {'financial.credit_score': 750})
+        assert reader.load('A1') == {'financial': {'credit_score': 750}}
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_create_applicant_store_picks_the_backend(tmp_path):
+    directory = tmp_path / 'applicants'
+    directory.mkdir()
+    assert isinstance(create_applicant_store(str(directory)), JSONFileApplicantStore)
+    store = create_applicant_store(str(tmp_path / 'applicants.db'))
+    assert isinstance(store, SQLiteApplicantStore)
+    store.close()
+
+
+def test_load_or_migrate_seeds_the_default_applicant_once(store, tmp_path):
+    legacy_path = tmp_path / 'applicant_data_structured.json'
+    legacy_path.write_text(json.dumps(APPLICANT), encoding='utf-8')
+
+    assert load_or_migrate(store, DEFAULT_APPLICANT_ID, str(legacy_path)) == APPLICANT
+    assert store.load(DEFAULT_APPLICANT_ID) == APPLICANT
+
+    # Later changes to either copy stay apart: the store is the record from now on
+    legacy_path.write_text(json.dumps(empty_applicant_data()), encoding='utf-8')
+    store.update(DEFAULT_APPLICANT_ID, {'financial.credit_score': 800})
+    assert load_or_migrate(store, DEFAULT_APPLICANT_ID, str(legacy_path))['financial']['credit_score'] == 800
+
+
+def test_load_or_migrate_starts_others_empty(store, tmp_path):
+    legacy_path = tmp_path / 'applicant_data_structured.json'
+    legacy_path.write_text(json.dumps(APPLICANT), encoding='utf-8')
+    assert load_or_migrate(store, 'A1', str(legacy_path)) == empty_applicant_data()
+    assert load_or_migrate(store, DEFAULT_APPLICANT_ID, str(tmp_path / 'missing.json')) == empty_applicant_data()
+    assert store.applicant_ids() == []
@@ -0,0 +1,111 @@
+# test_async_gemini.py
+# AsyncGeminiClient against the local fake Gemini server: retries, Retry-After, the
+# concurrency cap and failures that must not be retried
+import asyncio
+import time
+
+import pytest
+
+from async_gemini import AsyncGeminiChat, AsyncGeminiClient, GeminiRequestError
+from fake_gemini_server import FakeGeminiServer
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def generate(gemini, prompt="what's the next question", **options):
+    options = {'backoff_base': 0.001, **options}
+    async with AsyncGeminiClient(api_key='fake', base_url=gemini.base_url, **options) as client:
+        return await client.generate_text(prompt)
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_transient_failures_are_retried_after_retry_after(status):
+    async def scenario():
+        async with FakeGeminiServer(fail_first=2, fail_status=status, retry_after=0.2) as gemini:
+            start = time.perf_counter()
+            reply = await generate(gemini, max_retries=3)
+            return reply, time.perf_counter() - start, gemini.requests
+
+    reply, seconds, requests = run(scenario())
+    assert reply == "Could you tell me your monthly salary?"
+    assert requests == 3
+    # Two backoffs, each held to the server's Retry-After rather than the millisecond backoff
+    assert seconds >= 0.4
+
+
+def test_retries_give_up_with_the_last_status():
+    async def scenario():
+        async with FakeGeminiServer(fail_every=1, fail_status=503) as gemini:
+            with pytest.raises(GeminiRequestError) as error:
+                await generate(gemini, max_retries=2)
+            return error.value, gemini.requests
+
+    error, requests = run(scenario())
+    assert error.status == 503
+    assert requests == 3
+
+
+@pytest.mark.parametrize('status', [400, 403, 404])
+def test_non_retryable_failures_fail_fast(status):
+    async def scenario():
+        async with FakeGeminiServer(fail_every=1, fail_status=status, retry_after=5) as gemini:
+            start = time.perf_counter()
+            with pytest.raises(GeminiRequestError) as error:
+                await generate(gemini, max_retries=3)
+            return error.value, time.perf_counter() - start, gemini.requests
+
+    error, seconds, requests = run(scenario())
+    assert error.status == status
+    assert requests == 1
+    assert seconds < 1.0
+
+
+def test_connection_errors_are_retried_then_raised():
+    async def scenario():
+        async with FakeGeminiServer() as gemini:
+            base_url = gemini.base_url
+        # Nothing listens on the port any more
+        with pytest.raises(GeminiRequestError) as error:
+            async with AsyncGeminiClient(api_key='fake', base_url=base_url, max_retries=1, backoff_base=0.001) as client:
+                await client.generate_text("hello")
+        return error.value
+
+    assert run(scenario()).status is None
+
+
+def test_concurrency_is_capped_across_callers():
+    async def scenario():
+        async with FakeGeminiServer(latency=0.05) as gemini:
+            async with AsyncGeminiClient(api_key='fake', base_url=gemini.base_url, max_concurrency=3) as client:
+                replies = await client.generate_many(["what's the next question"] * 20)
+            return replies, gemini.max_in_flight
+
+    replies, max_in_flight = run(scenario())
+    assert len(replies) == 20
+    assert max_in_flight == 3
+
+
+def test_streams_are_retried_before_the_first_chunk():
+    async def scenario():
+        async with FakeGeminiServer(fail_first=1, fail_status=429, token_interval=0.001) as gemini:
+            async with AsyncGeminiClient(api_key='fake', base_url=gemini.base_url, backoff_base=0.001) as client:
+                chunks = [chunk async for chunk in client.stream_text("what's the next question")]
+            return ''.join(chunks), gemini.requests
+
+    assert run(scenario()) == ("Could you tell me your monthly salary?", 2)
+
+
+def test_chat_history_keeps_the_last_turns():
+    async def scenario():
+        async with FakeGeminiServer() as gemini:
+            async with AsyncGeminiClient(api_key='fake', base_url=gemini.base_url) as client:
+                chat = AsyncGeminiChat(client, max_turns=2)
+                for i in range(5):
+                    await chat.send_message(f"message {i}")
+                return list(chat.history)
+
+    history = run(scenario())
+    assert len(history) == 4
+    assert [entry['parts'][0]['text'] for entry in history[::2]] == ["message 3", "message 4"]
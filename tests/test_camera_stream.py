@@ -0,0 +1,119 @@
+# test_camera_stream.py
+# FrameBroadcaster's viewer bookkeeping: tier stats live only while watched, and the capture
+# thread lets go of the camera once nobody is watching or asking for frames
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('cv2')
+camera = pytest.importorskip('camera')
+
+
+class FakeCapture:
+    def __init__(self):
+        self.released = False
+
+    def read(self):
+        time.sleep(0.005)
+        return True, np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+class CaptureOpener:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self):
+        self.opened.append(FakeCapture())
+        return self.opened[-1]
+
+
+def broadcaster(**options):
+    opener = CaptureOpener()
+    return camera.FrameBroadcaster(open_capture=opener, annotate=lambda frame: frame, **options), opener
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_tier_stats_are_dropped_with_the_last_viewer():
+    frames, _ = broadcaster()
+    low, high = camera.STREAM_TIERS['low'], camera.STREAM_TIERS['high']
+    first, second, other = frames.frames(low), frames.frames(low), frames.frames(high)
+    for stream in (first, second, other):
+        next(stream)
+    assert frames.tiers[low].viewers == 2 and frames.tiers[high].viewers == 1
+
+    first.close()
+    assert frames.tiers[low].viewers == 1
+    second.close()
+    other.close()
+    assert frames.tiers == {} and frames.subscribers == 0
+    assert frames.tier_stats() == {}
+    frames.stop()
+
+
+def test_capture_idles_without_viewers_and_restarts_on_demand():
+    frames, opener = broadcaster(idle_timeout=0.1)
+    assert frames.latest_frame() is not None
+    assert frames.capturing
+
+    assert wait_until(lambda: not frames.capturing)
+    assert opener.opened[0].released
+    assert not frames.buffer
+
+    assert frames.latest_frame() is not None
+    assert len(opener.opened) == 2 and not opener.opened[1].released
+    frames.stop()
+    assert opener.opened[1].released
+
+
+def test_capture_stays_up_while_watched():
+    frames, opener = broadcaster(idle_timeout=0.05)
+    stream = frames.frames()
+    deadline = time.monotonic() + 0.3
+    while time.monotonic() < deadline:
+        next(stream)
+    assert frames.capturing and len(opener.opened) == 1
+
+    stream.close()
+    assert wait_until(lambda: not frames.capturing)
+    assert opener.opened[0].released
+
+
+def test_viewers_arriving_as_the_capture_idles_get_frames():
+    frames, opener = broadcaster(idle_timeout=0.01)
+    received = []
+
+    def view():
+        stream = frames.frames()
+        received.append(next(stream, None))
+        stream.close()
+
+    for _ in range(20):
+        time.sleep(0.02)
+        viewer = threading.Thread(target=view)
+        viewer.start()
+        viewer.join(timeout=5)
+    assert len(received) == 20 and None not in received
+    frames.stop()
+
+
+def test_a_capture_passed_in_is_not_released():
+    capture = FakeCapture()
+    frames = camera.FrameBroadcaster(capture, annotate=lambda frame: frame, idle_timeout=0.05)
+    assert frames.latest_frame() is not None
+    assert wait_until(lambda: not frames.capturing)
+    assert not capture.released
+    assert frames.latest_frame() is not None
+    frames.stop()
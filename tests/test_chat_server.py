@@ -0,0 +1,154 @@
+# test_chat_server.py
+# The chat HTTP API through aiohttp's test client, against the local fake Gemini server:
+# session create, message, SSE stream and delete, request validation, the idle sweep and
+# max_sessions eviction
+import asyncio
+import json
+import time
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from applicant_store import SQLiteApplicantStore
+from async_gemini import AsyncGeminiClient
+from chat_server import ChatServer, create_app
+from fake_gemini_server import FakeGeminiServer
+from loan_eligibility import LoanEligibilityEngine
+from report_service import ReportService
+
+QUESTION = "Could you tell me your monthly salary?"
+
+
+def run_chat(tmp_path, scenario, gemini_options=None, **options):
+    async def main():
+        async with FakeGeminiServer(**(gemini_options or {})) as gemini:
+            client = AsyncGeminiClient(api_key='fake', base_url=gemini.base_url, max_retries=0)
+            store = SQLiteApplicantStore(str(tmp_path / 'applicants.db'))
+            server = ChatServer(client, store, ReportService(store, LoanEligibilityEngine()), **options)
+            try:
+                async with TestClient(TestServer(create_app(server))) as http:
+                    return await scenario(http, server, store)
+            finally:
+                store.close()
+    return asyncio.run(main())
+
+
+def sse_events(body):
+    events = []
+    for frame in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in frame.split('\n'))
+        events.append((lines.get('event'), json.loads(lines['data'])))
+    return events
+
+
+def test_session_lifecycle(tmp_path):
+    async def scenario(http, server, store):
+        response = await http.post('/api/sessions', json={'applicant_id': 'A1'})
+        assert response.status == 200
+        assert await response.json() == {'session_id': 'A1', 'reply': QUESTION, 'updates': {}, 'complete': False}
+
+        response = await http.post('/api/sessions/A1/messages', json={'text': 'My salary is 85000'})
+        assert response.status == 200
+        reply = await response.json()
+        assert reply['updates'] == {'employment.net_monthly_salary': 85000}
+        assert reply['reply'] == QUESTION
+        assert store.load('A1')['employment']['net_monthly_salary'] == 85000
+        assert server.turns == 1
+
+        response = await http.delete('/api/sessions/A1')
+        assert await response.json() == {'ended': True}
+        assert 'A1' not in server.sessions
+        response = await http.delete('/api/sessions/A1')
+        assert await response.json() == {'ended': False}
+
+    run_chat(tmp_path, scenario)
+
+
+def test_session_without_an_id_gets_one(tmp_path):
+    async def scenario(http, server, store):
+        response = await http.post('/api/sessions')
+        session_id = (await response.json())['session_id']
+        assert response.status == 200 and session_id in server.sessions
+
+    run_chat(tmp_path, scenario)
+
+
+def test_stream_sends_updates_sentences_and_done(tmp_path):
+    async def scenario(http, server, store):
+        response = await http.post('/api/sessions/A1/stream', json={'text': 'My salary is 85000'})
+        assert response.headers['Content-Type'] == 'text/event-stream'
+        events = sse_events(await response.text())
+        assert events[0] == ('update', {'type': 'update', 'fields': {'employment.net_monthly_salary': 85000}})
+        assert events[1] == ('sentence', {'text': QUESTION})
+        assert events[-1] == ('done', {'complete': False, 'text': QUESTION})
+
+        response = await http.post('/api/sessions/A2/stream')
+        assert sse_events(await response.text()) == [('sentence', {'text': QUESTION}),
+                                                     ('done', {'complete': False, 'text': QUESTION})]
+
+    run_chat(tmp_path, scenario)
+
+
+@pytest.mark.parametrize('path, body', [
+    ('/api/sessions', '[1, 2]'),
+    ('/api/sessions', '"A1"'),
+    ('/api/sessions', '{not json'),
+    ('/api/sessions/A1/messages', '["hello"]'),
+    ('/api/sessions/A1/messages', '{"text": "  "}'),
+    ('/api/sessions/A1/stream', '42'),
+    ('/api/sessions/..%2Fetc/messages', '{"text": "hello"}'),
+])
+def test_bad_requests_are_rejected(tmp_path, path, body):
+    async def scenario(http, server, store):
+        response = await http.post(path, data=body, headers={'Content-Type': 'application/json'})
+        assert response.status == 400
+        assert not server.sessions
+
+    run_chat(tmp_path, scenario)
+
+
+def test_unreachable_model_is_reported(tmp_path):
+    async def scenario(http, server, store):
+        response = await http.post('/api/sessions', json={'applicant_id': 'A1'})
+        assert response.status == 502
+        assert (await response.json())['error']['status'] == 503
+
+    run_chat(tmp_path, scenario, gemini_options={'fail_every': 1})
+
+
+def test_idle_sessions_are_swept(tmp_path):
+    async def scenario(http, server, store):
+        for applicant_id in ('A1', 'A2'):
+            await http.post('/api/sessions', json={'applicant_id': applicant_id})
+        server.sessions['A1'].last_active -= 120
+        assert server.evict_idle() == 1
+        assert list(server.sessions) == ['A2']
+
+        # A session in the middle of a turn stays, and so does every session behind it
+        server.sessions['A2'].last_active -= 120
+        async with server.sessions['A2'].lock:
+            assert server.evict_idle() == 0
+        assert server.evict_idle(now=time.monotonic()) == 1
+        assert server.evicted == 2
+
+    run_chat(tmp_path, scenario, idle_timeout=60)
+
+
+def test_least_recently_active_session_is_evicted_past_max_sessions(tmp_path):
+    async def scenario(http, server, store):
+        for applicant_id in ('A1', 'A2'):
+            await http.post('/api/sessions', json={'applicant_id': applicant_id})
+        await http.post('/api/sessions/A1/messages', json={'text': 'My salary is 85000'})
+        await http.post('/api/sessions', json={'applicant_id': 'A3'})
+        assert list(server.sessions) == ['A1', 'A3']
+        assert server.evicted == 1
+
+        await http.post('/api/sessions/A1/messages', json={'text': 'My credit score is 750'})
+        await http.delete('/api/sessions/A1')
+        # A dropped session comes back from the store with its answers
+        await http.post('/api/sessions', json={'applicant_id': 'A1'})
+        record = server.sessions['A1'].record
+        assert record.get('employment.net_monthly_salary') == 85000
+        assert record.get('financial.credit_score') == 750
+
+    run_chat(tmp_path, scenario, max_sessions=2)
@@ -0,0 +1,29 @@
+# test_event_log.py
+import time
+
+import pytest
+
+from event_log import SessionEventLog, open_event_log, replay_session
+
+
+def test_quiet_session_is_synced_after_flush_interval(tmp_path):
+    log = SessionEventLog(str(tmp_path / 'session'), flush_every=32, flush_interval=0.1)
+    log.utterance('User', "My salary is 85000")
+    assert log.syncs == 0
+    time.sleep(0.3)
+    assert (log.syncs, log.pending) == (1, 0)
+    log.close()
+
+
+def test_close_syncs_and_cancels_the_timer(tmp_path):
+    log = SessionEventLog(str(tmp_path / 'session'), flush_interval=60)
+    log.field_update('employment.net_monthly_salary', 85000)
+    log.close()
+    assert log._timer is None
+    assert replay_session(str(tmp_path / 'session')).applicant_data == {'employment': {'net_monthly_salary': 85000}}
+
+
+@pytest.mark.parametrize('session_id', ['../escape', 'a/b', '', '.', 'x' * 65])
+def test_session_ids_cannot_leave_the_log_directory(tmp_path, session_id):
+    with pytest.raises(ValueError):
+        open_event_log(session_id, directory=str(tmp_path))
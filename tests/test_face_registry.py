@@ -0,0 +1,85 @@
+# test_face_registry.py
+# FaceRegistry enroll/verify/search round trips, re-enrolment, growth past the initial
+# capacity and reopening the memory-mapped matrix from disk
+import numpy as np
+import pytest
+
+from face_registry import FEATURE_SIZE, FaceProjection, FaceRegistry
+
+
+def random_faces(count, seed=0):
+    return np.random.default_rng(seed).random((count, FEATURE_SIZE), dtype=np.float32)
+
+
+def noisy(face, seed=1, amount=0.05):
+    return face + np.random.default_rng(seed).normal(0, amount, face.shape).astype(np.float32)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return FaceRegistry(str(tmp_path / 'registry'), initial_capacity=2)
+
+
+def test_verify_matches_the_same_face_and_rejects_another(registry):
+    faces = random_faces(2)
+    registry.enroll('A1', faces[0])
+
+    similarity, is_same_person = registry.verify('A1', noisy(faces[0]))
+    assert similarity > 0.9 and is_same_person
+    similarity, is_same_person = registry.verify('A1', faces[1])
+    assert similarity < 0.5 and not is_same_person
+
+
+def test_verify_unknown_applicant_raises(registry):
+    with pytest.raises(KeyError):
+        registry.verify('missing', random_faces(1)[0])
+
+
+def test_search_finds_the_enrolled_applicant_first(registry):
+    faces = random_faces(20)
+    for i, face in enumerate(faces):
+        registry.enroll(f"A{i}", face)
+
+    assert len(registry) == 20
+    matches = registry.search(noisy(faces[7]))
+    assert matches[0][0] == 'A7'
+    assert all(similarity >= 0.5 for _, similarity in matches)
+    assert 'A7' not in [applicant_id for applicant_id, _ in registry.search(faces[7], exclude='A7')]
+
+
+def test_search_of_an_empty_registry_finds_nothing(registry):
+    assert registry.search(random_faces(1)[0]) == []
+
+
+def test_enrolling_again_replaces_the_row(registry):
+    faces = random_faces(2)
+    registry.enroll('A1', faces[0])
+    registry.enroll('A1', faces[1])
+
+    assert len(registry) == 1
+    assert registry.verify('A1', faces[1])[1]
+    assert not registry.verify('A1', faces[0])[1]
+
+
+def test_descriptors_survive_reopening(tmp_path):
+    directory = str(tmp_path / 'registry')
+    faces = random_faces(3)
+    registry = FaceRegistry(directory)
+    for i, face in enumerate(faces):
+        registry.enroll(f"A{i}", face)
+    expected = registry.descriptor('A2')
+    del registry
+
+    reopened = FaceRegistry(directory)
+    assert len(reopened) == 3 and 'A2' in reopened
+    np.testing.assert_array_equal(reopened.descriptor('A2'), expected)
+    assert reopened.search(faces[1])[0][0] == 'A1'
+
+
+def test_fitted_projection_keeps_correlations():
+    faces = random_faces(300)
+    projection = FaceProjection.fit(faces, dimensions=128)
+    descriptors = projection.describe(faces[:2])
+    assert descriptors.shape == (2, 128)
+    np.testing.assert_allclose(np.linalg.norm(descriptors, axis=1), 1.0, rtol=1e-5)
+    assert float(projection.describe(faces[0]) @ projection.describe(noisy(faces[0]))) > 0.9
@@ -0,0 +1,78 @@
+# test_json_extraction.py
+# find_json_object on model replies with prose, braces, quotes and code fences around the JSON,
+# using the fuzz generators of benchmarks/bench_json_extraction.py
+import json
+import random
+import time
+
+import pytest
+
+from bench_json_extraction import random_object, random_reply
+from gemini_integration import GeminiAI, find_json_object, validate_user_response
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_fuzzed_replies_parse_to_the_embedded_object(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        obj = random_object(rng)
+        assert find_json_object(random_reply(rng, obj)) == obj
+
+
+@pytest.mark.parametrize('reply, expected', [
+    ('{"a": 1}', {'a': 1}),
+    ('Here you go:\n```json\n{"a": {"b": [1, 2]}}\n```', {'a': {'b': [1, 2]}}),
+    ('Use {} for nothing. {"a": "}"}', {}),
+    ('{oops} then {"a": "x { y"} and } more', {'a': 'x { y'}),
+    ('{"a": "quote \\" and brace }"}', {'a': 'quote " and brace }'}),
+    ('{"outer": {"inner": 1}, "note": "{"}', {'outer': {'inner': 1}, 'note': '{'}),
+    ('{not json {"a": 2}}', {'a': 2}),
+])
+def test_edge_cases(reply, expected):
+    assert find_json_object(reply) == expected
+
+
+@pytest.mark.parametrize('reply', ['', 'no braces here', '{"a": 1', '{"unterminated: 1}', '} {'])
+def test_replies_without_an_object_raise(reply):
+    with pytest.raises(ValueError):
+        find_json_object(reply)
+
+
+@pytest.mark.parametrize('reply', [
+    '{' * 8000, '{ {' * 8000 + '}' * 8000, '{"a":1,' * 8000 + '}' * 8000, '{' * 8000 + '}' * 8000,
+    '{"a":' * 8000 + 'x' + '}' * 8000, '{x}' * 8000, '{"a": [' * 8000,
+], ids=['open', 'spaced', 'members', 'balanced', 'deep', 'placeholders', 'arrays'])
+def test_unbalanced_or_broken_braces_take_linear_time(reply):
+    start = time.perf_counter()
+    with pytest.raises(ValueError):
+        find_json_object(reply)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_placeholders_before_the_object_are_skipped():
+    reply = "Fill in {name} and {amount}. " * 20 + '{"needs_clarification": false}'
+    assert find_json_object(reply) == {'needs_clarification': False}
+
+
+def test_large_reply_with_trailing_braces():
+    update = {"data_updates": {"loan_request": {"loan_amount": 1500000, "note": "{not a brace}"}},
+              "needs_clarification": False, "clarification_question": ""}
+    filler = "The applicant discussed their plans at length. " * 2000
+    reply = f"{filler}\n{json.dumps(update)}\nLet me know if {{anything}} else is needed. {filler}"
+    assert find_json_object(reply) == update
+
+
+@pytest.mark.parametrize('data', [
+    [], {"data_updates": []}, {"data_updates": {"employment": 80000}},
+    {"data_updates": {"employment": {"net_monthly_salary": {"value": 1}}}}, {"needs_clarification": "no"},
+    {"clarification_question": 3},
+])
+def test_schema_rejects_malformed_replies(data):
+    with pytest.raises(ValueError):
+        validate_user_response(data)
+
+
+def test_unparseable_reply_asks_to_rephrase():
+    result = GeminiAI.parse_user_response("Sorry, I can't help with {that")
+    assert result['needs_clarification'] is True
+    assert result['data_updates'] == {}
@@ -0,0 +1,52 @@
+# test_kyc_documents.py
+import pytest
+
+import kyc_documents
+from kyc_documents import page_tasks, parse_labels, read_documents
+
+
+def ocr_lines(*texts, confidence=0.9):
+    """Lines as the OCR workers return them: (box, word, confidence) per word"""
+    return [[(None, word, confidence) for word in text.split()] for text in texts]
+
+
+def test_invoice_loan_amount_is_typed():
+    for text in ("Rs 8,50,000", "₹8,50,000/-", "8.5 lakh", "INR 850000.00"):
+        assert parse_labels('invoice', ocr_lines(f"Loan Amount: {text}")) == {'loan_request.loan_amount': 850000}
+
+
+def test_invoice_terms_are_typed():
+    fields = parse_labels('invoice', ocr_lines("Loan Term: 60 months", "Interest Rate: 9.5% p.a.", "Loan Amount: Rs 8,50,000"))
+    assert fields == {'loan_request.loan_term': 5, 'loan_request.interest_rate': 9.5, 'loan_request.loan_amount': 850000}
+
+
+@pytest.mark.parametrize('line, path', [
+    ("Loan Term: S years", 'loan_request.loan_term'),
+    ("Loan Term: 18 months", 'loan_request.loan_term'),
+    ("Loan Term: 500 years", 'loan_request.loan_term'),
+    ("Interest Rate: 8,75%", 'loan_request.interest_rate'),
+    ("Interest Rate: l0.5%", 'loan_request.interest_rate'),
+    ("Loan Amount: Rs 12", 'loan_request.loan_amount'),
+    ("Loan Amount: NIL", 'loan_request.loan_amount'),
+])
+def test_ocr_noise_is_dropped(line, path):
+    assert path not in parse_labels('invoice', ocr_lines(line))
+
+
+def test_uploads_sharing_a_name_are_separate_documents(monkeypatch):
+    uploads = [('scan.png', b'pan'), ('scan.png', b'invoice'), ('other.png', b'aadhaar')]
+    tasks = page_tasks(uploads)
+    assert [task[0] for task in tasks] == [0, 1, 2]
+
+    texts = {b'pan': "INCOME TAX DEPARTMENT", b'invoice': "INVOICE", b'aadhaar': "AADHAAR"}
+
+    def fake_ocr_pages(tasks, *args):
+        for document, source, page_number, data in tasks:
+            yield {'document': document, 'source': source, 'page': page_number,
+                   'lines': ocr_lines(texts[data]), 'seconds': 0.0}
+
+    monkeypatch.setattr(kyc_documents, 'ocr_pages', fake_ocr_pages)
+    documents = list(read_documents(uploads))
+    assert [(document['source'], document['document_type']) for document in documents] == [
+        ('scan.png', 'pan'), ('scan.png', 'invoice'), ('other.png', 'aadhaar')]
+    assert all(document['pages'] == 1 for document in documents)
@@ -0,0 +1,54 @@
+# test_loan_eligibility.py
+import pytest
+
+from loan_eligibility import LoanEligibilityEngine
+
+
+@pytest.fixture
+def engine():
+    return LoanEligibilityEngine()
+
+
+@pytest.mark.parametrize('tenure_years', [20, 1.5, 1.51, 2.04, 0.5])
+@pytest.mark.parametrize('interest_rate', [8.5, 0.0])
+def test_schedule_amortizes_its_own_emi(engine, interest_rate, tenure_years):
+    schedule = list(engine.amortization_schedule(1000000, interest_rate, tenure_years))
+    months = round(tenure_years * 12)
+    emi = engine.calculate_emi(1000000, interest_rate, months / 12)
+    assert len(schedule) == months
+    # The last instalment only absorbs rounding, not a different tenure
+    assert schedule[-1]['payment'] == pytest.approx(emi, rel=1e-9)
+    assert all(row['payment'] == pytest.approx(emi, rel=1e-9) for row in schedule)
+    assert sum(row['principal'] for row in schedule) == pytest.approx(1000000)
+    assert schedule[-1]['balance'] == 0.0
+
+
+def test_zero_rate_repays_in_equal_instalments(engine):
+    assert engine.calculate_emi(120000, 0.0, 1) == pytest.approx(10000)
+    schedule = list(engine.amortization_schedule(120000, 0.0, 1))
+    assert {row['interest'] for row in schedule} == {0.0}
+    assert [row['balance'] for row in schedule][:3] == pytest.approx([110000, 100000, 90000])
+
+
+def test_zero_tenure(engine):
+    assert list(engine.amortization_schedule(100000, 8.5, 0)) == []
+    assert engine.calculate_emi(100000, 8.5, 0) == float('inf')
+    assert engine.calculate_emi(0, 8.5, 0) == 0.0
+
+
+def test_emi_cache_counts_hits_per_rate_and_tenure(engine):
+    assert engine.emi_cache_stats()['size'] == 0
+    engine.calculate_emi(1000000, 8.5, 20)
+    engine.calculate_emi(2500000, 8.5, 20)
+    engine.calculate_emi(1000000, 9.0, 20)
+    stats = engine.emi_cache_stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 2, 2)
+    assert stats['hit_rate'] == pytest.approx(1 / 3)
+
+
+def test_emi_cache_is_bounded():
+    engine = LoanEligibilityEngine(emi_cache_size=2)
+    for tenure in (1, 2, 3, 1):
+        engine.calculate_emi(100000, 8.5, tenure)
+    stats = engine.emi_cache_stats()
+    assert (stats['size'], stats['max_size'], stats['misses']) == (2, 2, 4)
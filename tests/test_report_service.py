@@ -0,0 +1,147 @@
+# test_report_service.py
+# The report API through Flask's test client: ETag revalidation, id validation, and cached
+# reports going stale when the applicant's data or the rule file changes
+import json
+import os
+import threading
+
+import pytest
+
+from applicant_store import JSONFileApplicantStore
+from loan_eligibility import DEFAULT_RULES_PATH, LoanEligibilityEngine
+from report_service import ReportService, create_app
+
+APPLICANT = {
+    'financial': {'credit_score': 720, 'monthly_expenses': 20000},
+    'employment': {'net_monthly_salary': 90000, 'work_experience': 5},
+    'loan_request': {'loan_amount': 2000000, 'loan_term': 20, 'interest_rate': 8.5, 'property_value': 5000000},
+}
+
+
+def write_rules(path, definition, tick):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(definition, file)
+    # A distinct mtime, however coarse the file system's clock
+    os.utime(path, ns=(tick * 10 ** 9, tick * 10 ** 9))
+
+
+@pytest.fixture
+def rules(tmp_path):
+    with open(DEFAULT_RULES_PATH, encoding='utf-8') as file:
+        definition = json.load(file)
+    path = str(tmp_path / 'rules.json')
+    write_rules(path, definition, 1)
+    return path, definition
+
+
+@pytest.fixture
+def service(tmp_path, rules):
+    store = JSONFileApplicantStore(str(tmp_path / 'applicants'))
+    store.save('A1', APPLICANT)
+    engine = LoanEligibilityEngine(rules_path=rules[0])
+    engine.rule_loader.check_interval = 0
+    assessments = []
+
+    def assess(applicant_id, applicant_data):
+        assessments.append(applicant_id)
+        return f"Assessment {len(assessments)}"
+
+    service = ReportService(store, engine, assess)
+    service.assessments = assessments
+    return service
+
+
+@pytest.fixture
+def client(service):
+    return create_app(service).test_client()
+
+
+def test_matching_etag_gets_304_without_a_build(client, service):
+    response = client.get('/api/report?id=A1')
+    assert response.status_code == 200
+    assert response.json['eligibility_assessment']['status'] == 'APPROVED'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    etag = response.headers['ETag']
+
+    response = client.get('/api/report?id=A1', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert service.builds == 1
+
+    response = client.get('/api/report?id=A1')
+    assert response.status_code == 200 and response.headers['ETag'] == etag
+    assert service.stats() == {'entries': 1, 'hits': 1, 'builds': 1}
+
+
+def test_changed_data_gets_a_new_report(client, service):
+    etag = client.get('/api/report?id=A1').headers['ETag']
+    service.store.update('A1', {'financial.credit_score': 650})
+
+    response = client.get('/api/report?id=A1', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.json['applicant_data']['financial']['credit_score'] == 650
+    assert service.builds == 2
+
+
+def test_rule_reload_invalidates_cached_reports(client, service, rules):
+    path, definition = rules
+    response = client.get('/api/report?id=A1')
+    etag = response.headers['ETag']
+    assert response.json['eligibility_assessment']['factors'] == []
+
+    definition['criteria']['minimum_credit_score'] = 750
+    write_rules(path, definition, 2)
+    response = client.get('/api/report?id=A1', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.json['eligibility_assessment']['factors'] == ["Credit score (720) below minimum requirement (750)"]
+
+
+@pytest.mark.parametrize('url', ['/api/report?id=../A1', '/api/report?id=', '/api/report?id=' + 'a' * 65,
+                                 '/api/reports/export?ids=A1,..%2Fsecret'])
+def test_invalid_ids_get_400(client, url):
+    response = client.get(url)
+    assert response.status_code == 400
+    assert 'error' in response.json
+
+
+def test_unknown_applicant_gets_404(client):
+    assert client.get('/api/report?id=nobody').status_code == 404
+
+
+def test_assessment_is_cached_with_the_report(client, service):
+    plain = client.get('/api/report?id=A1')
+    assessed = client.get('/api/report?id=A1&assessment=1')
+    assert 'ai_assessment' not in plain.json
+    assert assessed.json['ai_assessment'] == "Assessment 1"
+    assert assessed.headers['ETag'] != plain.headers['ETag']
+
+    assert client.get('/api/report?id=A1&assessment=true').json['ai_assessment'] == "Assessment 1"
+    assert service.assessments == ['A1']
+
+
+def test_export_streams_every_applicant(client, service):
+    service.store.save('A2', {**APPLICANT, 'financial': {'credit_score': 600, 'monthly_expenses': 20000}})
+    lines = [json.loads(line) for line in client.get('/api/reports/export').data.decode().splitlines()]
+    assert [line['applicant_id'] for line in lines] == ['A1', 'A2']
+    assert lines[1]['report']['eligibility_assessment']['status'] != 'APPROVED'
+
+    lines = client.get('/api/reports/export?ids=A2,missing').data.decode().splitlines()
+    assert [json.loads(line)['applicant_id'] for line in lines] == ['A2']
+
+
+def test_concurrent_requests_build_one_report(service):
+    barrier = threading.Barrier(8)
+
+    def request():
+        barrier.wait()
+        service.report('A1', with_assessment=True)
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert service.builds == 1
+    assert service.assessments == ['A1']
@@ -0,0 +1,155 @@
+# test_response_cache.py
+# ResponseCache over the in-memory and SQLite backends: TTL expiry, LRU eviction, key
+# normalization, and extraction prompts keyed by the question being answered
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import gemini_integration
+from gemini_integration import GeminiAI, MemoryCacheBackend, ResponseCache, SQLiteCacheBackend
+from gemini_session import GeminiSession
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(gemini_integration.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_backend(request, tmp_path):
+    backends = []
+
+    def make(**options):
+        if request.param == 'memory':
+            backend = MemoryCacheBackend(**options)
+        else:
+            backend = SQLiteCacheBackend(str(tmp_path / 'responses.db'), **options)
+        backends.append(backend)
+        return backend
+
+    yield make
+    for backend in backends:
+        if hasattr(backend, 'close'):
+            backend.close()
+
+
+def test_entries_expire_after_ttl(make_backend, clock):
+    backend = make_backend(ttl=60)
+    backend.set('key', 'reply')
+    clock[0] += 59
+    assert backend.get('key') == 'reply'
+    clock[0] += 2
+    assert backend.get('key') is None
+    assert len(backend) == 0
+
+
+def test_least_recently_used_entry_is_evicted(make_backend, clock):
+    backend = make_backend(max_entries=2)
+    backend.set('a', '1')
+    clock[0] += 1
+    backend.set('b', '2')
+    clock[0] += 1
+    assert backend.get('a') == '1'
+    clock[0] += 1
+    backend.set('c', '3')
+
+    assert len(backend) == 2
+    assert backend.get('b') is None
+    assert backend.get('a') == '1'
+    assert backend.get('c') == '3'
+
+
+def test_replacing_an_entry_keeps_one_row(make_backend):
+    backend = make_backend()
+    backend.set('key', 'old')
+    backend.set('key', 'new')
+    assert backend.get('key') == 'new'
+    assert len(backend) == 1
+
+
+def test_sqlite_cache_is_shared_through_the_file(tmp_path):
+    path = str(tmp_path / 'responses.db')
+    writer, reader = SQLiteCacheBackend(path), SQLiteCacheBackend(path)
+    try:
+        writer.set('key', 'reply')
+        assert reader.get('key') == 'reply'
+        assert len(reader) == 1
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_sqlite_cache_is_safe_across_threads(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / 'responses.db'), max_entries=50)
+    errors = []
+
+    def worker(worker_id):
+        try:
+            for i in range(100):
+                backend.set(f"{worker_id}-{i}", 'reply')
+                backend.get(f"{worker_id}-{i // 2}")
+                len(backend)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker, args=(worker_id,)) for worker_id in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    backend.close()
+    assert not errors
+
+
+def test_prompt_whitespace_and_unicode_forms_share_a_key():
+    assert ResponseCache.key('model', ' my  salary\nis 80000 ') == ResponseCache.key('model', 'my salary is 80000')
+    assert ResponseCache.key('model', 'ｙｅｓ') == ResponseCache.key('model', 'yes')
+    assert ResponseCache.key('model', 'yes') != ResponseCache.key('other-model', 'yes')
+
+
+def test_stats_count_hits_and_misses():
+    cache = ResponseCache()
+    assert cache.lookup('model', 'yes') is None
+    cache.store('model', 'yes', 'reply')
+    assert cache.lookup('model', ' yes ') == 'reply'
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'lookups': 2, 'hit_rate': 0.5, 'entries': 1}
+
+
+def test_extraction_prompt_carries_the_question():
+    question = "How many years have you been with your current employer?"
+    prompt = GeminiAI.build_extraction_prompt("5", {}, question)
+    assert question in prompt
+    assert prompt != GeminiAI.build_extraction_prompt("5", {}, "How many dependents do you have?")
+
+
+class RecordingModel:
+    """SDK model stand-in that asks `question` in the chat and records extraction prompts"""
+
+    model_name = 'fake-model'
+
+    def __init__(self, question):
+        self.question = question
+        self.prompts = []
+
+    def generate_content(self, contents):
+        if isinstance(contents, str):
+            self.prompts.append(contents)
+            return SimpleNamespace(text='{"data_updates": {}, "needs_clarification": false, "clarification_question": ""}')
+        return SimpleNamespace(text=self.question, usage_metadata=None)
+
+
+def test_answers_to_different_questions_do_not_share_a_reply():
+    cache = ResponseCache()
+    for question in ["How many years have you worked there?", "How many dependents do you have?"]:
+        model = RecordingModel(question)
+        session = GeminiSession(model=model, cache=cache, fast_path=False)
+        session.get_next_question({})
+        session.handle_user_response("5", {})
+        assert question in model.prompts[0]
+
+    assert cache.stats()['hits'] == 0
+    assert cache.stats()['entries'] == 2
@@ -0,0 +1,167 @@
+# test_rule_engine.py
+# The compiled rule set against the if-chain it replaced (benchmarks/bench_rule_engine.py),
+# its early exit, explanations and hot reload
+import itertools
+import json
+import logging
+import os
+
+import numpy as np
+import pytest
+
+from bench_rule_engine import legacy_check_eligibility
+from loan_eligibility import DEFAULT_RULES_PATH, LoanEligibilityEngine
+from rule_engine import INVALID_INPUT, REJECTION_THRESHOLD, CompiledRuleSet, Field, Metric
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return LoanEligibilityEngine()
+
+
+def applicant(credit_score=760, salary=100000, expenses=30000, experience=5, loan_amount=800000,
+              loan_term=20, interest_rate=8.5, property_value=1000000):
+    return {
+        'financial': {'credit_score': credit_score, 'monthly_expenses': expenses},
+        'employment': {'net_monthly_salary': salary, 'work_experience': experience},
+        'loan_request': {'loan_amount': loan_amount, 'loan_term': loan_term, 'interest_rate': interest_rate,
+                         'property_value': property_value}
+    }
+
+
+# Values on and either side of every threshold in the shipped rules: a DTI and LTV of exactly
+# 0.5 and 0.8, an EMI of exactly half the salary (400,000 at 0% over 1 year is 33,333.33)
+BOUNDARIES = {
+    'credit_score': (699, 700, 701),
+    'salary': (49999, 50000, 66666, 66667, 100000),
+    'expenses': (0, 33333, 50000, 50001),
+    'experience': (1, 2),
+    'loan_amount': (0, 400000, 800000, 800001),
+    'loan_term': (0, 1, 20),
+    'interest_rate': (0.0, 8.5),
+    'property_value': (0, 1000000),
+}
+BOUNDARY_APPLICANTS = [applicant(**dict(zip(BOUNDARIES, values))) for values in itertools.product(*BOUNDARIES.values())]
+
+
+def test_matches_the_legacy_if_chain_on_boundaries(engine):
+    mismatches = [data for data in BOUNDARY_APPLICANTS if engine.check_eligibility(data) != legacy_check_eligibility(engine, data)]
+    assert not mismatches, mismatches[:3]
+
+
+@pytest.mark.parametrize('value', ['abc', None, []])
+def test_unparseable_values_reject_like_the_legacy_chain(engine, value):
+    data = applicant(credit_score=value)
+    assert engine.check_eligibility(data) == legacy_check_eligibility(engine, data)
+
+
+def test_batch_matches_scalar_on_boundaries(engine):
+    batch = engine.check_eligibility_batch(engine.columns_from_applicants(BOUNDARY_APPLICANTS))
+    assert [batch.to_result(i) for i in range(len(batch))] == [engine.check_eligibility(data) for data in BOUNDARY_APPLICANTS]
+
+
+def test_failed_looks_bits_up_by_rule_id(engine):
+    batch = engine.check_eligibility_batch(engine.columns_from_applicants(
+        [applicant(credit_score=650), applicant(), applicant(salary='abc')]))
+    assert batch.failed('credit_score').tolist() == [True, False, False]
+    assert batch.failed(INVALID_INPUT).tolist() == [False, False, True]
+    with pytest.raises(ValueError):
+        batch.failed('no_such_rule')
+
+
+def test_check_status_stops_at_rejection(engine):
+    assert [engine.check_status(data) for data in BOUNDARY_APPLICANTS] == \
+        [engine.check_eligibility(data)['status'] for data in BOUNDARY_APPLICANTS]
+    rejected = applicant(credit_score=500, salary=20000, expenses=20000, experience=0, loan_term=1, property_value=0)
+    mask, failures = engine.rules.evaluate(rejected, stop_at_rejection=True)
+    assert failures == REJECTION_THRESHOLD + 1
+    assert bin(mask).count('1') == failures
+    assert engine.rules.evaluate(rejected)[1] == 6
+
+
+def test_early_exit_skips_costly_metrics():
+    calls = []
+
+    def costly(value):
+        calls.append(value)
+        return value
+
+    fields = {name: Field('data', int) for name in 'abcd'}
+    metrics = {'costly': Metric(10, ('d',), costly, None)}
+    definition = {'rules': [{'id': name, 'metric': name, 'op': '<', 'threshold': 1} for name in 'abc']
+                  + [{'id': 'costly', 'metric': 'costly', 'op': '<', 'threshold': 1}]}
+    rule_set = CompiledRuleSet(definition, fields, metrics)
+    assert [rule['id'] for rule in rule_set.plan][-1] == 'costly'
+    failing = {'data': {'a': 0, 'b': 0, 'c': 0, 'd': 0}}
+    assert rule_set.evaluate(failing, stop_at_rejection=True) == (0b0111, 3)
+    assert calls == []
+    assert rule_set.evaluate(failing) == (0b1111, 4)
+    assert calls == [0]
+
+
+def test_explain(engine):
+    mask, failures, factors, recommendations = engine.rules.explain(applicant(credit_score=650, salary=60000, expenses=40000))
+    assert failures == 2
+    assert mask == engine.rules.bit('credit_score') | engine.rules.bit('dti_ratio')
+    assert factors == ["Credit score (650) below minimum requirement (700)", "Debt-to-income ratio too high"]
+    assert recommendations == ["Work on improving your credit score", "Reduce your monthly expenses or debt obligations"]
+    assert engine.rules.explain(applicant())[1:] == (0, [], [])
+
+
+def write_rules(path, definition, tick):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(definition, file)
+    # A distinct mtime, however coarse the file system's clock
+    os.utime(path, ns=(tick * 10 ** 9, tick * 10 ** 9))
+
+
+@pytest.fixture
+def reloading_engine(tmp_path):
+    with open(DEFAULT_RULES_PATH, encoding='utf-8') as file:
+        definition = json.load(file)
+    path = str(tmp_path / 'rules.json')
+    write_rules(path, definition, 1)
+    engine = LoanEligibilityEngine(rules_path=path)
+    engine.rule_loader.check_interval = 0
+    return engine, path, definition
+
+
+def test_hot_reload_picks_up_new_criteria(reloading_engine):
+    engine, path, definition = reloading_engine
+    digest = engine.rules.digest
+    assert engine.check_eligibility(applicant(credit_score=720))['status'] == "APPROVED"
+    definition['criteria']['minimum_credit_score'] = 750
+    write_rules(path, definition, 2)
+    result = engine.check_eligibility(applicant(credit_score=720))
+    assert result['factors'] == ["Credit score (720) below minimum requirement (750)"]
+    assert engine.rules.digest != digest
+
+
+def test_reordered_rules_keep_their_meaning(reloading_engine):
+    engine, path, definition = reloading_engine
+    definition['rules'].reverse()
+    definition['rules'].append({'id': 'minimum_term', 'metric': 'loan_term', 'op': '<', 'threshold': 2})
+    write_rules(path, definition, 2)
+    batch = engine.check_eligibility_batch(engine.columns_from_applicants([applicant(credit_score=650), applicant(salary='x')]))
+    assert engine.rules.bit('credit_score') == 1 << 5
+    assert batch.failed('credit_score').tolist() == [True, False]
+    assert batch.failed('minimum_term').tolist() == [False, False]
+    assert batch.failed(INVALID_INPUT).tolist() == [False, True]
+    assert engine.rules.invalid_bit == 1 << 7
+
+
+def test_broken_file_keeps_the_last_good_rules(reloading_engine, caplog):
+    engine, path, _ = reloading_engine
+    rules = engine.rules
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('{"rules": [')
+    os.utime(path, ns=(3 * 10 ** 9, 3 * 10 ** 9))
+    with caplog.at_level(logging.ERROR, logger='rule_engine'):
+        assert engine.rules is rules
+    assert "Error reloading rule set" in caplog.text
+
+
+def test_batch_masks_fit_the_rule_count(engine):
+    batch = engine.check_eligibility_batch(engine.columns_from_applicants([applicant(credit_score='x')]))
+    assert int(batch.failure_masks[0]) == engine.rules.invalid_bit
+    assert np.iinfo(batch.failure_masks.dtype).max >= engine.rules.invalid_bit
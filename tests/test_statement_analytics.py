@@ -0,0 +1,49 @@
+# test_statement_analytics.py
+import logging
+
+from statement_analytics import StatementAnalytics, transaction_chunks
+
+
+def month(year, month_number, coffees=1):
+    rows = [(f"{year:04d}-{month_number:02d}-01", "NEFT/SAL/TCS/8812", 0.0, 130000.0),
+            (f"{year:04d}-{month_number:02d}-05", "NACH/HDFC LOAN EMI", 20855.56, 0.0)]
+    rows += [(f"{year:04d}-{month_number:02d}-10", "UPI/CAFE", 250.0, 0.0)] * coffees
+    return rows
+
+
+def test_overlapping_statement_adds_only_new_rows():
+    analytics = StatementAnalytics()
+    assert analytics.ingest(transaction_chunks(month(2025, 1) + month(2025, 2))) == 6
+    assert analytics.ingest(transaction_chunks(month(2025, 2) + month(2025, 3))) == 3
+    assert analytics.rows == 9
+
+
+def test_backfilled_older_statement_is_added_once():
+    analytics = StatementAnalytics()
+    analytics.ingest(transaction_chunks(month(2025, 5) + month(2025, 6)))
+    assert analytics.ingest(transaction_chunks(month(2025, 3) + month(2025, 4))) == 6
+    assert analytics.ingest(transaction_chunks(month(2025, 3) + month(2025, 4))) == 0
+    assert analytics.rows == 12
+
+
+def test_identical_rows_within_a_statement_all_count():
+    analytics = StatementAnalytics()
+    assert analytics.ingest(transaction_chunks(month(2025, 1, coffees=2))) == 4
+    # A later download with a third coffee adds just that one
+    assert analytics.ingest(transaction_chunks(month(2025, 1, coffees=3))) == 1
+
+
+def test_rows_before_the_window_are_skipped_and_logged(caplog):
+    analytics = StatementAnalytics(window_months=12)
+    analytics.ingest(transaction_chunks(month(2025, 6)))
+    with caplog.at_level(logging.WARNING, logger='statement_analytics'):
+        assert analytics.ingest(transaction_chunks(month(2024, 1) + month(2025, 5))) == 3
+    assert "Skipped 3 rows from before 2024-07" in caplog.text
+
+
+def test_saved_state_still_recognizes_repeated_rows(tmp_path):
+    path = str(tmp_path / 'state.json')
+    analytics = StatementAnalytics()
+    analytics.ingest(transaction_chunks(month(2025, 1) + month(2025, 2)))
+    analytics.save(path)
+    assert StatementAnalytics.load(path).ingest(transaction_chunks(month(2025, 1))) == 0
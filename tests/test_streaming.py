@@ -0,0 +1,75 @@
+# test_streaming.py
+# Sentence splitting of streamed replies, however the text is chunked, and SSE framing
+import asyncio
+import json
+
+import pytest
+
+from streaming import SentenceSplitter, async_split_sentences, async_sse_sentences, format_sse, split_sentences
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("Hello there. How are you? Fine!", ["Hello there.", "How are you?", "Fine!"]),
+    ("Your rate is 8.5% for 20 years. Is that okay?", ["Your rate is 8.5% for 20 years.", "Is that okay?"]),
+    ("Mr. Rao, your EMI is Rs. 17,356. Dr. Shah agrees.", ["Mr. Rao, your EMI is Rs. 17,356.", "Dr. Shah agrees."]),
+    ("Please share your account no. 1234 details. Thanks.", ["Please share your account no. 1234 details.", "Thanks."]),
+    ("The answer is no. You need a higher score.", ["The answer is no.", "You need a higher score."]),
+    ("No. That will not work.", ["No.", "That will not work."]),
+    ("Loan approved (see No. 42). Next step?", ["Loan approved (see No. 42).", "Next step?"]),
+    ('He said "yes." Then he left.', ['He said "yes."', "Then he left."]),
+    ("First line\nSecond line", ["First line", "Second line"]),
+    ("Wait... really?! Yes.", ["Wait...", "really?!", "Yes."]),
+])
+@pytest.mark.parametrize('size', [1, 3, 7, 1000])
+def test_sentences_do_not_depend_on_chunking(text, expected, size):
+    assert list(split_sentences(chunked(text, size))) == expected
+
+
+def test_boundary_waits_for_the_next_chunk():
+    splitter = SentenceSplitter()
+    # "8." may continue as "8.5%", and "no." may be followed by a number
+    assert splitter.feed("Your rate is 8.") == []
+    assert splitter.feed("5%. Account no. ") == ["Your rate is 8.5%."]
+    assert splitter.feed("12 is linked. ") == ["Account no. 12 is linked."]
+    assert splitter.feed("Reply no. ") == []
+    assert splitter.feed("Thanks") == ["Reply no."]
+    assert splitter.flush() == ["Thanks"]
+    assert splitter.flush() == []
+
+
+def test_async_split_sentences():
+    async def chunks():
+        for chunk in chunked("One. Two? Three", 2):
+            yield chunk
+
+    async def collect():
+        return [sentence async for sentence in async_split_sentences(chunks())]
+
+    assert asyncio.run(collect()) == ["One.", "Two?", "Three"]
+
+
+def test_format_sse():
+    assert format_sse({'text': 'Hi "there"'}) == 'data: {"text": "Hi \\"there\\""}\n\n'
+    assert format_sse({'text': 'line\nbreak'}, 'sentence') == 'event: sentence\ndata: {"text": "line\\nbreak"}\n\n'
+
+
+def test_async_sse_sentences_ends_with_done():
+    done = {}
+
+    async def sentences():
+        yield "One."
+        yield "Two."
+        done['complete'] = True
+
+    async def collect():
+        return [frame async for frame in async_sse_sentences(sentences(), done)]
+
+    frames = asyncio.run(collect())
+    assert frames[:2] == [format_sse({'text': "One."}, 'sentence'), format_sse({'text': "Two."}, 'sentence')]
+    event, data = frames[2].strip().split('\n')
+    assert event == 'event: done'
+    assert json.loads(data[len('data: '):]) == {'complete': True, 'text': "One. Two."}